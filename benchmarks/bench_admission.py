@@ -0,0 +1,113 @@
+"""Prueba de carga del control de admision contra un LLM simulado.
+
+Varios tenants envian rafagas de solicitudes a `SolutionArchitectAgent.propose`
+detras de `AdmissionController`. El LLM simulado responde la propuesta
+determinista con una latencia lognormal. Se informa cuantas solicitudes se
+admitieron, cuantas recibieron 429 (rate limit o descarte por cola), la
+latencia de las admitidas y el Retry-After sugerido.
+
+Uso: python -m benchmarks.bench_admission [--clients N] [--requests N] [--tenants N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agent import SolutionArchitectAgent
+from src.api.admission import AdmissionController, ConcurrencyLimiter, Overloaded, RateLimited, RateLimiter
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+
+
+class FakeLLM:
+    """Cliente sincrono que devuelve la propuesta determinista tras una latencia lognormal."""
+
+    def __init__(self, median_seconds: float, sigma: float = 0.5, seed: int = 0) -> None:
+        self._body = json.dumps(generate_solution(Requirements()).model_dump())
+        self._median = median_seconds
+        self._sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create(self, messages):
+        with self._lock:
+            delay = self._median * self._random.lognormvariate(0.0, self._sigma)
+        time.sleep(delay)
+        return {"content": self._body, "usage": {"prompt_tokens": 1500, "completion_tokens": 1500}}
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32, help="hilos que envian solicitudes")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=5.0, help="solicitudes/s por tenant")
+    parser.add_argument("--burst", type=float, default=10)
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--max-queue-age", type=float, default=1.0)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mediana en segundos")
+    args = parser.parse_args()
+
+    controller = AdmissionController(
+        ConcurrencyLimiter(args.max_concurrent, args.max_queue, args.max_queue_age),
+        RateLimiter(args.rate, args.burst),
+    )
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=FakeLLM(args.llm_latency))
+    requirements = Requirements()
+    outcomes: Counter = Counter()
+    latencies = []
+    retry_after = []
+    lock = threading.Lock()
+
+    def send(index: int) -> None:
+        tenant = f"tenant-{index % args.tenants}"
+        start = time.perf_counter()
+        try:
+            controller.propose(agent, tenant, requirements)
+            outcome = "admitida"
+        except RateLimited as exc:
+            outcome, hint = "429 rate limit", exc.retry_after
+        except Overloaded as exc:
+            outcome, hint = "429 sobrecarga", exc.retry_after
+        elapsed = time.perf_counter() - start
+        with lock:
+            outcomes[outcome] += 1
+            if outcome == "admitida":
+                latencies.append(elapsed)
+            else:
+                retry_after.append(hint)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        list(pool.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.requests} solicitudes, {args.clients} clientes, {args.tenants} tenants, "
+        f"max_concurrent={args.max_concurrent}, LLM p50={args.llm_latency * 1000:.0f}ms"
+    )
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:15s} {count}")
+    print(f"  throughput admitidas: {outcomes['admitida'] / elapsed:.1f}/s")
+    print(
+        f"  latencia admitidas p50/p95/max: {_percentile(latencies, 0.5) * 1000:.0f} / "
+        f"{_percentile(latencies, 0.95) * 1000:.0f} / {max(latencies, default=0) * 1000:.0f} ms"
+    )
+    if retry_after:
+        print(f"  Retry-After p50/max: {_percentile(retry_after, 0.5):.2f} / {max(retry_after):.2f} s")
+
+
+if __name__ == "__main__":
+    main()
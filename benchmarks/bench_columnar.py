@@ -0,0 +1,156 @@
+"""Export columnar de un lote grande y tiempo de las agregaciones group-by.
+
+Arma `--variants` propuestas deterministas (proveedor, recursos y compliance al
+azar; una parte con texto reescrito como si viniera del LLM y costos por linea
+aleatorios) y las agrega al sink `--proposals` veces con ids distintos hasta
+superar el millon de filas entre todas las tablas. Luego abre el directorio en
+frio y mide cada consulta, comparando una contra un conteo ingenuo.
+
+Tambien mide el camino de `src.batch work --columnar`: el sink con journal (un
+append con fsync por trabajo) a la misma escala, y `--batch-jobs` trabajos de
+punta a punta con `BatchWorker` y `PipelineJobProcessor`, contando los chunks.
+
+Uso: python -m benchmarks.bench_columnar [--proposals N] [--batch-jobs N] [--format auto|npz|parquet]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+from src.batch import BatchWorker, PipelineJobProcessor
+from src.core.columnar import ColumnarDataset, ColumnarSink
+from src.core.generator import generate_solution
+from src.core.schemas import CostLine, Requirements, SolutionProposal
+from src.core.work_queue import MemoryWorkQueue
+
+PROVIDERS = ["Azure", "AWS", "GCP"]
+RESOURCES = ["Storage Account", "Cosmos DB", "Key Vault", "Service Bus", "Event Grid", "Container Instance"]
+COMPLIANCE = ["GDPR", "HIPAA", "PCI DSS", "SOC 2"]
+
+
+def _variants(count: int, rng: random.Random) -> List[SolutionProposal]:
+    proposals = []
+    for serial in range(count):
+        requirements = Requirements(
+            cloud_provider=rng.choice(PROVIDERS),
+            resources=rng.sample(RESOURCES, rng.randint(2, len(RESOURCES))),
+            compliance=rng.sample(COMPLIANCE, rng.randint(0, 2)),
+        )
+        proposal = generate_solution(requirements)
+        payload = proposal.model_dump()
+        if rng.random() < 0.3:
+            for risk in payload["risks"]:
+                risk["mitigation"] = f"{risk['mitigation']} (variante {serial})"
+        payload["cost_estimate"]["breakdown"] = [
+            CostLine(resource=name, driver="consumo", p10=p50 * 0.6, p50=p50, p90=p50 * 1.8).model_dump()
+            for name, p50 in ((name, rng.uniform(5, 500)) for name in requirements.resources)
+        ]
+        payload["cost_estimate"]["p50"] = sum(line["p50"] for line in payload["cost_estimate"]["breakdown"])
+        proposals.append(SolutionProposal.model_validate(payload))
+    return proposals
+
+
+def _timed(label: str, action):
+    start = time.perf_counter()
+    result = action()
+    print(f"{label:<44} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def _chunk_files(directory: Path) -> int:
+    return sum(1 for _ in directory.rglob("part-*"))
+
+
+def _batch_path(variants: List[SolutionProposal], picks: List[int], jobs: int, chunk_rows: int, fmt: str) -> None:
+    """Export como lo hace `src.batch work --columnar`: journal y un append por trabajo."""
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+
+        def export() -> None:
+            with ColumnarSink(directory, chunk_rows=chunk_rows, fmt=fmt, journal=True) as sink:
+                for serial, pick in enumerate(picks):
+                    sink.append(f"p{serial:07d}", variants[pick])
+
+        _timed(f"export con journal de {len(picks)} propuestas", export)
+        print(f"chunks en disco: {_chunk_files(directory)}")
+
+    if jobs <= 0:
+        return
+    root = Path(__file__).resolve().parents[1]
+    payload = json.loads((root / "data" / "requirements.json").read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        config = directory / "config.yml"
+        config.write_text("llm:\n  enabled: false\nregistry:\n  enabled: false\n", encoding="utf-8")
+        queue = MemoryWorkQueue()
+        queue.enqueue("bench", [(f"j{serial:05d}", {"requirements": payload}) for serial in range(jobs)])
+        sink = ColumnarSink(directory / "columnar", chunk_rows=chunk_rows, fmt=fmt, journal=True)
+        processor = PipelineJobProcessor(str(config), directory / "out", sink=sink)
+
+        def work() -> None:
+            logging.disable(logging.WARNING)  # sin el log y los avisos de scraping de cada trabajo
+            try:
+                BatchWorker(queue, processor, worker_id="bench").run()
+                sink.close()
+            finally:
+                logging.disable(logging.NOTSET)
+
+        _timed(f"src.batch work --columnar ({jobs} trabajos)", work)
+        dataset = ColumnarDataset(directory / "columnar")
+        print(f"chunks en disco: {_chunk_files(directory / 'columnar')}  propuestas: {dataset.row_counts()['proposals']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--proposals", type=int, default=50_000)
+    parser.add_argument("--variants", type=int, default=200)
+    parser.add_argument("--chunk-rows", type=int, default=65_536)
+    parser.add_argument("--format", choices=["auto", "npz", "parquet"], default="auto")
+    parser.add_argument("--batch-jobs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    variants = _variants(args.variants, rng)
+    picks = [rng.randrange(len(variants)) for _ in range(args.proposals)]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+
+        def export() -> None:
+            with ColumnarSink(directory, chunk_rows=args.chunk_rows, fmt=args.format) as sink:
+                for serial, pick in enumerate(picks):
+                    sink.append(f"p{serial:07d}", variants[pick])
+
+        _timed(f"export de {args.proposals} propuestas", export)
+        size = sum(path.stat().st_size for path in directory.rglob("part-*"))
+        dataset = ColumnarDataset(directory)
+        counts = _timed("conteo de filas", dataset.row_counts)
+        print(f"filas: {sum(counts.values()):,} {counts}  ({size / 1e6:.1f} MB en disco)")
+
+        rows = _timed("risks por id, impact", lambda: dataset.group_count("risks", ["id", "impact"]))
+        _timed("risks por mitigation (top 10)", lambda: dataset.group_count("risks", ["mitigation"], top=10))
+        _timed("components por name", lambda: dataset.group_count("components", ["name"]))
+        _timed("backlog por epic, priority", lambda: dataset.group_count("backlog", ["epic", "priority"]))
+        _timed("cost_lines por resource (suma/media p50)", lambda: dataset.group_count("cost_lines", ["resource"], value="p50"))
+        _timed("cost_lines Key Vault por driver", lambda: dataset.group_count("cost_lines", ["driver"], where={"resource": "Key Vault"}))
+        _timed("proposals p50 (percentiles)", lambda: dataset.describe("proposals", "p50"))
+
+        expected = Counter()
+        for pick in picks:
+            for risk in variants[pick].risks:
+                expected[(risk.id, risk.impact)] += 1
+        assert {(row["id"], row["impact"]): row["count"] for row in rows} == expected, "conteo distinto"
+
+    _batch_path(variants, picks, args.batch_jobs, args.chunk_rows, args.format)
+
+
+if __name__ == "__main__":
+    main()
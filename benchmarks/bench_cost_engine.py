@@ -0,0 +1,43 @@
+"""Mide la simulacion Monte Carlo de costos: 10k escenarios x 50 recursos x 5 regiones.
+
+Uso: python -m benchmarks.bench_cost_engine [--scenarios N] [--resources N] [--regions N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.core.cost_engine import DEFAULT_UNIT_PRICES, simulate_costs
+
+REGIONS = ["us-east-1", "westeurope", "ap-southeast-1", "brazilsouth", "uksouth", "eastus2", "eu-west-1"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--resources", type=int, default=50)
+    parser.add_argument("--regions", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    keywords = list(DEFAULT_UNIT_PRICES)
+    resources = [f"{keywords[i % len(keywords)]} {i}" for i in range(args.resources)]
+    regions = [REGIONS[i % len(REGIONS)] for i in range(args.regions)]
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        estimate = simulate_costs(
+            resources, regions, traffic_profile="Picos de 50 rps", scenarios=args.scenarios
+        ).to_cost_estimate()
+        best = min(best, time.perf_counter() - start)
+    print(
+        f"{args.scenarios} escenarios x {args.resources} recursos x {args.regions} regiones: "
+        f"{best * 1000:.1f} ms (mejor de {args.repeat})"
+    )
+    print(f"P10/P50/P90: {estimate.range_low} / {estimate.range_mid} / {estimate.range_high}")
+
+
+if __name__ == "__main__":
+    main()
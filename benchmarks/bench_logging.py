@@ -0,0 +1,61 @@
+"""Mide el costo por llamada de log en el hilo que registra.
+
+Compara el handler sincrono de texto con JSON y con el modo en cola
+(QueueHandler/QueueListener), escribiendo a un archivo temporal desde varios
+hilos; tambien mide el DEBUG muestreado. Para el modo en cola se informa ademas
+el tiempo de vaciado de la cola al detener el listener.
+
+Uso: python -m benchmarks.bench_logging [--calls N] [--threads N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoring.logger import configure_logging, get_logger, shutdown_logging
+
+MODES = (
+    ("texto sincrono", dict(fmt="text", use_queue=False)),
+    ("json sincrono", dict(fmt="json", use_queue=False)),
+    ("texto en cola", dict(fmt="text", use_queue=True)),
+    ("json en cola", dict(fmt="json", use_queue=True)),
+    ("debug 1% en cola", dict(fmt="json", use_queue=True, level="DEBUG", debug_sample_rate=0.01)),
+)
+
+
+def _worker(calls: int, debug: bool) -> None:
+    logger = get_logger("solution-architect.bench", request_id="bench")
+    log = logger.debug if debug else logger.info
+    for index in range(calls):
+        log("Escribiendo %s", index, extra={"stage": "write", "duration_ms": 1.5})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000, help="llamadas por hilo")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    total = args.calls * args.threads
+    print(f"{total} llamadas ({args.threads} hilos x {args.calls})")
+    for label, options in MODES:
+        with tempfile.TemporaryFile("w") as sink:
+            configure_logging(stream=sink, **options)
+            debug = options.get("level") == "DEBUG"
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                for _ in range(args.threads):
+                    pool.submit(_worker, args.calls, debug)
+            elapsed = time.perf_counter() - start
+            drain_start = time.perf_counter()
+            shutdown_logging()
+            drain = time.perf_counter() - drain_start
+        extra = f", vaciado de la cola {drain * 1000:.0f} ms" if options["use_queue"] else ""
+        print(f"{label:18s} {elapsed / total * 1e6:6.2f} us/llamada{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Mide el motor de reglas indexado contra la evaluacion de todas las reglas.
+
+Genera un catalogo sintetico (por defecto 5k reglas, 10 % con regex) y evalua
+solicitudes con el indice invertido y el automata regex compartido frente a
+verificar cada regla contra cada campo.
+
+Uso: python -m benchmarks.bench_rules [--rules N] [--regex-share F] [--requests N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.core.rules import RequirementDoc, RuleEngine
+from src.core.schemas import Requirements
+
+FIELDS = ["resources", "compliance", "constraints", "data_sources", "non_functional_requirements"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 8)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--regex-share", type=float, default=0.1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [_word(rng) for _ in range(2000)]
+    items = []
+    for index in range(args.rules):
+        field = rng.choice(FIELDS)
+        if rng.random() < args.regex_share:
+            predicate = {"field": field, "regex": f"{rng.choice(vocabulary)}\\s+\\d+"}
+        else:
+            predicate = {"field": field, "contains": " ".join(rng.sample(vocabulary, 2))}
+        items.append({"id": f"regla-{index}", "when": predicate})
+
+    start = time.perf_counter()
+    engine = RuleEngine.from_dicts(items)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    requests = [
+        Requirements(
+            **{
+                field: [
+                    f"{' '.join(rng.sample(vocabulary, 2))} {rng.randint(1, 99)}" for _ in range(12)
+                ]
+                for field in FIELDS
+            }
+        )
+        for _ in range(args.requests)
+    ]
+
+    start = time.perf_counter()
+    indexed = [sorted(engine.evaluate(req).matched) for req in requests]
+    indexed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive = []
+    for req in requests:
+        doc = RequirementDoc.from_requirements(req)
+        naive.append(sorted(rule.id for rule in engine.rules if rule.matches(doc)))
+    naive_s = time.perf_counter() - start
+
+    assert indexed == naive, "el indice y la evaluacion completa difieren"
+    matches = sum(len(ids) for ids in indexed)
+    print(f"{args.rules} reglas compiladas en {compile_ms:.0f} ms; {args.requests} solicitudes, {matches} coincidencias")
+    print(f"indexado: {indexed_s / args.requests * 1000:.2f} ms/solicitud")
+    print(f"todas las reglas: {naive_s / args.requests * 1000:.2f} ms/solicitud ({naive_s / indexed_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
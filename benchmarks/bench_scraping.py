@@ -0,0 +1,49 @@
+"""Compara el parseo completo de las paginas de precios con la extraccion en una pasada.
+
+Uso: python -m benchmarks.bench_scraping [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from src.core.scraping import fast_html_parser, parse_pricing_page
+
+FIXTURES = Path(__file__).resolve().parents[1] / "test" / "fixtures" / "pricing"
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"parser rapido: {fast_html_parser()}")
+    print(f"{'provider':<8} {'filas':>6} {'completo ms':>12} {'rapido ms':>10} {'speedup':>8}")
+    for fixture in sorted(FIXTURES.glob("*.html")):
+        provider = fixture.stem
+        html = fixture.read_text(encoding="utf-8")
+        reference = parse_pricing_page(provider, html, fast=False)
+        fast = parse_pricing_page(provider, html)
+        if fast != reference:
+            raise SystemExit(f"{provider}: las filas extraidas difieren del parseo completo")
+        slow_s = _best_of(lambda: parse_pricing_page(provider, html, fast=False), args.repeat)
+        fast_s = _best_of(lambda: parse_pricing_page(provider, html), args.repeat)
+        print(
+            f"{provider:<8} {len(fast):>6} {slow_s * 1000:>12.1f} {fast_s * 1000:>10.1f} "
+            f"{slow_s / fast_s:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
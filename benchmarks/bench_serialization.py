@@ -0,0 +1,99 @@
+"""Tamano y throughput de `src.core.serialization` frente al JSON de pydantic.
+
+Genera `--proposals` propuestas deterministas distintas (proveedor, recursos,
+compliance y lineas de costo al azar) y, para cada codec y compresion
+disponibles, mide el tamano medio, la codificacion y la decodificacion
+validada y `trusted`. La linea base es `model_dump_json` / `model_validate_json`.
+Verifica que cada decodificacion sea igual al original. Cada entrada se
+decodifica y se descarta, como en un hit de cache o un consumidor de cola;
+retener miles de propuestas decodificadas agrega pausas del GC que afectan mas a
+la ruta `trusted` (sus objetos se crean desde Python).
+
+Uso: python -m benchmarks.bench_serialization [--proposals N] [--rounds N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+from typing import Callable, List
+
+from src.core.generator import generate_solution
+from src.core.schemas import CostLine, Requirements, SolutionProposal
+from src.core.serialization import available_codecs, available_compressions, dumps, json_backend, loads
+
+PROVIDERS = ["Azure", "AWS", "GCP"]
+RESOURCES = ["Storage Account", "Cosmos DB", "Key Vault", "Service Bus", "Event Grid", "Container Instance"]
+COMPLIANCE = ["GDPR", "HIPAA", "PCI DSS", "SOC 2"]
+
+
+def _proposals(count: int, rng: random.Random) -> List[SolutionProposal]:
+    proposals = []
+    for _ in range(count):
+        requirements = Requirements(
+            project_name=f"Proyecto {rng.randint(1, 999)}",
+            cloud_provider=rng.choice(PROVIDERS),
+            resources=rng.sample(RESOURCES, rng.randint(2, len(RESOURCES))),
+            compliance=rng.sample(COMPLIANCE, rng.randint(0, 2)),
+        )
+        proposal = generate_solution(requirements)
+        lines = [
+            CostLine(resource=name, driver="consumo", p10=value * 0.6, p50=value, p90=value * 1.8)
+            for name, value in ((name, rng.uniform(5, 500)) for name in requirements.resources)
+        ]
+        cost = proposal.cost_estimate.model_copy(update={"breakdown": lines, "p50": sum(line.p50 for line in lines)})
+        proposals.append(proposal.model_copy(update={"cost_estimate": cost}))
+    return proposals
+
+
+def _per_item(action: Callable[[object], object], items: List[object], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        for item in items:
+            action(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--proposals", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    proposals = _proposals(args.proposals, random.Random(args.seed))
+    count = len(proposals)
+    baseline = [proposal.model_dump_json().encode("utf-8") for proposal in proposals]
+    base_size = sum(map(len, baseline)) / count
+    base_encode = _per_item(lambda proposal: proposal.model_dump_json(), proposals, args.rounds)
+    base_decode = _per_item(SolutionProposal.model_validate_json, baseline, args.rounds)
+
+    print(f"{count} propuestas; backend JSON: {json_backend()}; codecs: {', '.join(available_codecs())}")
+    print(f"{'formato':<16} {'bytes':>7} {'tamano':>7} {'encode us':>10} {'decode us':>10} {'trusted us':>11} {'speedup':>8}")
+    print(f"{'pydantic json':<16} {base_size:>7.0f} {1:>7.0%} {base_encode:>10.1f} {base_decode:>10.1f} {'-':>11} {'1.00x':>8}")
+    for codec in available_codecs():
+        for compression in available_compressions():
+            encoded = [dumps(proposal, codec=codec, compression=compression) for proposal in proposals]
+            for original, data in zip(proposals, encoded):
+                assert loads(data, SolutionProposal) == original
+                assert loads(data, SolutionProposal, trusted=True) == original
+            size = sum(map(len, encoded)) / count
+            encode = _per_item(lambda proposal: dumps(proposal, codec=codec, compression=compression), proposals, args.rounds)
+            decode = _per_item(lambda data: loads(data, SolutionProposal), encoded, args.rounds)
+            trusted = _per_item(lambda data: loads(data, SolutionProposal, trusted=True), encoded, args.rounds)
+            label = codec if compression == "none" else f"{codec}+{compression}"
+            speedup = (base_encode + base_decode) / (encode + trusted)
+            print(
+                f"{label:<16} {size:>7.0f} {size / base_size:>7.0%} {encode:>10.1f} {decode:>10.1f} "
+                f"{trusted:>11.1f} {speedup:>7.2f}x"
+            )
+    print("speedup: (encode + decode) de pydantic json frente a (encode + decode trusted)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Escalado de la cola compartida (SQLite) con varios procesos worker.
+
+Cada trabajo simula la generacion con una espera fija (la latencia del LLM
+domina una propuesta real). Para 1, 2, 4, ... workers se encola un lote nuevo,
+se lanzan los procesos y se mide throughput y eficiencia frente a un worker.
+Con `--job-ms 0` se mide el costo de reclamar/completar por trabajo.
+
+Uso: python -m benchmarks.bench_work_queue [--jobs N] [--job-ms MS] [--workers 1,2,4,8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from src.batch import BatchWorker
+from src.core.work_queue import SQLiteWorkQueue
+
+
+def _work(path: str, batch: str, job_seconds: float, worker_id: str) -> None:
+    def process(job):
+        time.sleep(job_seconds)
+        return {}, {"propose": job_seconds}
+
+    BatchWorker(SQLiteWorkQueue(Path(path)), process, worker_id=worker_id, batch=batch, poll_seconds=0.01).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--job-ms", type=float, default=50.0, help="duracion simulada de cada trabajo")
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    counts = [int(value) for value in args.workers.split(",")]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "jobs.sqlite")
+        queue = SQLiteWorkQueue(Path(path))
+        baseline = None
+        print(f"{'workers':>7}  {'segundos':>8}  {'trabajos/s':>10}  {'speedup':>7}  {'eficiencia':>10}")
+        for workers in counts:
+            batch = f"bench-{workers}"
+            queue.enqueue(batch, [(str(index), {}) for index in range(args.jobs)])
+            processes = [
+                multiprocessing.Process(target=_work, args=(path, batch, args.job_ms / 1000, f"w{n}"))
+                for n in range(workers)
+            ]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+            assert queue.counts(batch)["done"] == args.jobs
+            rate = args.jobs / elapsed
+            baseline = baseline or rate
+            speedup = rate / baseline
+            print(f"{workers:>7}  {elapsed:>8.2f}  {rate:>10.1f}  {speedup:>7.2f}  {speedup / (workers / counts[0]):>10.0%}")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
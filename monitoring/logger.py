@@ -1,8 +1,27 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
 import uuid
-from typing import Optional
+from typing import Any, Dict, MutableMapping, Optional, Tuple
+
+BASE_LOGGER = "solution-architect"
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(trace_id)s] %(name)s %(message)s"
+# Campos estructurados que se copian del `extra` de cada llamada a la linea JSON.
+_JSON_FIELDS = ("trace_id", "stage", "duration_ms")
+# Adapters reutilizados por (logger, trace id); acotado porque daemon y batch crean un trace id por trabajo.
+_ADAPTER_CACHE_SIZE = 256
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampler: Optional["SamplingFilter"] = None
+_configure_lock = threading.Lock()
 
 
 class TraceFormatter(logging.Formatter):
@@ -12,19 +31,177 @@ class TraceFormatter(logging.Formatter):
         return super().format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """Una linea JSON por registro: ts, level, logger, message y los campos de traza."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in _JSON_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None and value != "-":
+                payload[name] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Muestrea y limita por segundo los registros por debajo de `max_level` (DEBUG por defecto)."""
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        max_per_second: Optional[float] = None,
+        max_level: int = logging.DEBUG,
+        seed: Optional[int] = None,
+        clock=time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self.max_level = max_level
+        self.dropped = 0
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._tokens = max_per_second or 0.0
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Los registros de un TraceAdapter ya se muestrearon antes de crearse.
+        return getattr(record, "sampled", False) or self.allow(record.levelno)
+
+    def allow(self, levelno: int) -> bool:
+        if levelno > self.max_level:
+            return True
+        with self._lock:
+            keep = self.sample_rate >= 1.0 or self._random.random() < self.sample_rate
+            if keep and self.max_per_second is not None:
+                now = self._clock()
+                self._tokens = min(self.max_per_second, self._tokens + (now - self._last) * self.max_per_second)
+                self._last = now
+                keep = self._tokens >= 1.0
+                if keep:
+                    self._tokens -= 1.0
+            if not keep:
+                self.dropped += 1
+            return keep
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Encola el registro con el mensaje ya interpolado; el formato y la E/S los hace el listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Los argumentos se interpolan aqui porque pueden mutar despues de la llamada.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class TraceAdapter(logging.LoggerAdapter):
+    """Adapter con trace id que conserva el `extra` de cada llamada (stage, duration_ms).
+
+    El DEBUG muestreado se descarta antes de crear el `LogRecord`.
+    """
+
+    def log(self, level: int, msg: Any, *args: Any, **kwargs: Any) -> None:
+        sampler = _sampler
+        if sampler is not None and level <= sampler.max_level:
+            if not self.isEnabledFor(level) or not sampler.allow(level):
+                return
+            kwargs["extra"] = {**(kwargs.get("extra") or {}), "sampled": True}
+        super().log(level, msg, *args, **kwargs)
+
+    def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
+        kwargs["extra"] = {**self.extra, **(kwargs.get("extra") or {})}
+        return msg, kwargs
+
+
+def configure_logging(
+    fmt: str = "text",
+    use_queue: bool = False,
+    level: str | int = "INFO",
+    debug_sample_rate: float = 1.0,
+    debug_max_per_second: Optional[float] = None,
+    stream=None,
+) -> logging.Logger:
+    """Configura el logger base: texto o JSON, y opcionalmente via cola con un hilo de fondo."""
+    global _listener, _sampler
+    with _configure_lock:
+        base = logging.getLogger(BASE_LOGGER)
+        _shutdown_listener()
+        for handler in list(base.handlers):
+            base.removeHandler(handler)
+            handler.close()
+
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JsonFormatter() if fmt == "json" else TraceFormatter(fmt=TEXT_FORMAT))
+        if use_queue:
+            records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            handler: logging.Handler = DeferredQueueHandler(records)
+            _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+            _listener.start()
+        else:
+            handler = output
+        _sampler = None
+        if debug_sample_rate < 1.0 or debug_max_per_second is not None:
+            _sampler = SamplingFilter(debug_sample_rate, debug_max_per_second)
+            handler.addFilter(_sampler)
+        base.addHandler(handler)
+        base.setLevel(level if isinstance(level, int) else level.upper())
+        base.propagate = False
+        return base
+
+
+def shutdown_logging() -> None:
+    """Vacia la cola pendiente y detiene el hilo del listener."""
+    with _configure_lock:
+        _shutdown_listener()
+
+
+def _shutdown_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str, request_id: Optional[str] = None) -> logging.Logger:
     logger = logging.getLogger(name)
-    if not logger.handlers:
+    if not _has_own_handler(logger):
         handler = logging.StreamHandler()
-        formatter = TraceFormatter(
-            fmt="%(asctime)s %(levelname)s [%(trace_id)s] %(name)s %(message)s"
-        )
+        formatter = TraceFormatter(fmt=TEXT_FORMAT)
         handler.setFormatter(formatter)
         logger.addHandler(handler)
         logger.setLevel(logging.INFO)
-    extra = {"trace_id": request_id or "-"}
-    logger = logging.LoggerAdapter(logger, extra=extra)
-    return logger
+    return _trace_adapter(name, request_id or "-")
+
+
+@functools.lru_cache(maxsize=_ADAPTER_CACHE_SIZE)
+def _trace_adapter(name: str, trace_id: str) -> TraceAdapter:
+    # `process` copia `extra` en cada llamada, asi que el adapter se comparte entre hilos.
+    return TraceAdapter(logging.getLogger(name), extra={"trace_id": trace_id})
+
+
+def _has_own_handler(logger: logging.Logger) -> bool:
+    # Handlers en el logger o en sus ancestros, sin contar el root.
+    current: Optional[logging.Logger] = logger
+    while current is not None and current is not logging.getLogger():
+        if current.handlers:
+            return True
+        if not current.propagate:
+            return False
+        current = current.parent
+    return False
 
 
 def new_trace_id() -> str:
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class MetricsRegistry:
+    """Contadores en proceso, seguros entre hilos, para metricas de ejecucion."""
+
+    def __init__(self) -> None:
+        self._counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = MetricsRegistry()
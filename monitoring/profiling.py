@@ -0,0 +1,286 @@
+"""Perfilado opcional por etapa: pstats, pilas colapsadas y asignaciones.
+
+Los puntos de perfilado (`profile_section`, `@profiled`) quedan en el codigo de
+produccion: sin un `Profiler` activo solo leen una variable global. Con
+`start_profiling()` (o `--profile` en la CLI) cada seccion:
+
+- corre bajo su propio `cProfile.Profile` (las llamadas repetidas de una
+  seccion se acumulan) y se guarda en `<seccion>.pstats`;
+- se muestrea cada `sample_interval` segundos desde un hilo aparte, que toma
+  la pila del hilo que ejecuta la seccion; el resultado va a
+  `<seccion>.collapsed` y `all.collapsed` ("marco;marco;... N", el formato de
+  flamegraph.pl, speedscope o inferno);
+- con `trace_allocations`, compara snapshots de `tracemalloc` al entrar y salir
+  y guarda los sitios con mas memoria asignada. tracemalloc es global al
+  proceso, asi que con etapas concurrentes las cifras se mezclan.
+
+Una seccion anidada en el mismo hilo pausa la exterior, de modo que el tiempo
+de cada funcion se atribuye a la seccion mas interna.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_active: Optional["Profiler"] = None
+_NULL_SECTION = nullcontext()
+_active_lock = threading.Lock()
+
+
+def profile_section(name: str) -> ContextManager[Any]:
+    """Seccion perfilada; sin perfilador activo devuelve un contexto nulo compartido."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SECTION
+    return profiler.section(name)
+
+
+def profiled(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorador: perfila cada llamada como la seccion `name` (por defecto, el nombre de la funcion)."""
+
+    def decorate(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.section(label):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class Profiler:
+    def __init__(
+        self,
+        output_dir: Path,
+        trace_allocations: bool = False,
+        top_allocations: int = 10,
+        sample_interval: float = 0.005,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.trace_allocations = trace_allocations
+        self.top_allocations = top_allocations
+        self.sample_interval = sample_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, List[cProfile.Profile]] = defaultdict(list)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._calls: Counter = Counter()
+        self._samples: Dict[str, Counter] = defaultdict(Counter)
+        self._allocations: Dict[str, Counter] = defaultdict(Counter)
+        self._running: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> Path:
+        """Detiene el muestreo y escribe los archivos; devuelve el directorio de salida."""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return self.write()
+
+    def configure(
+        self,
+        output_dir: Optional[Path] = None,
+        trace_allocations: Optional[bool] = None,
+        top_allocations: Optional[int] = None,
+        sample_interval: Optional[float] = None,
+    ) -> None:
+        """Ajusta un perfilador ya activo, p. ej. con la configuracion cargada despues de arrancarlo."""
+        if output_dir is not None:
+            self.output_dir = Path(output_dir)
+        if top_allocations is not None:
+            self.top_allocations = top_allocations
+        if sample_interval is not None:
+            self.sample_interval = sample_interval
+        if trace_allocations and not self.trace_allocations:
+            self.trace_allocations = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        stack: List[Tuple[str, cProfile.Profile]] = self._local.__dict__.setdefault("stack", [])
+        if stack:
+            stack[-1][1].disable()
+        profile = cProfile.Profile()
+        before = tracemalloc.take_snapshot() if self.trace_allocations and tracemalloc.is_tracing() else None
+        ident = threading.get_ident()
+        with self._lock:
+            self._running[ident] = name
+        stack.append((name, profile))
+        started = time.perf_counter()
+        enabled = _enable(profile)
+        try:
+            yield
+        finally:
+            if enabled:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            after = tracemalloc.take_snapshot() if before is not None else None
+            with self._lock:
+                if enabled:
+                    self._profiles[name].append(profile)
+                self._seconds[name] += elapsed
+                self._calls[name] += 1
+                if stack:
+                    self._running[ident] = stack[-1][0]
+                else:
+                    self._running.pop(ident, None)
+                if after is not None:
+                    for stat in after.compare_to(before, "lineno"):
+                        if stat.size_diff > 0 and not _is_own_frame(stat.traceback[0].filename):
+                            self._allocations[name][str(stat.traceback[0])] += stat.size_diff
+            if stack:
+                _enable(stack[-1][1])
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                running = dict(self._running)
+            if not running:
+                continue
+            frames = sys._current_frames()
+            for ident, name in running.items():
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = _collapse(frame)
+                if not stack:
+                    continue
+                with self._lock:
+                    self._samples[name][stack] += 1
+
+    def write(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary: Dict[str, Any] = {}
+        all_lines: List[str] = []
+        with self._lock:
+            sections = sorted(self._calls)
+            for name in sections:
+                filename = _safe_name(name)
+                profiles = [profile for profile in self._profiles.get(name, []) if profile.getstats()]
+                if profiles:
+                    stats = pstats.Stats(profiles[0])
+                    for profile in profiles[1:]:
+                        stats.add(profile)
+                    stats.dump_stats(self.output_dir / f"{filename}.pstats")
+                samples = self._samples.get(name, Counter())
+                lines = [f"{name};{stack} {count}" for stack, count in sorted(samples.items())]
+                (self.output_dir / f"{filename}.collapsed").write_text(
+                    "\n".join(lines) + ("\n" if lines else ""), encoding="utf-8"
+                )
+                all_lines.extend(lines)
+                summary[name] = {
+                    "calls": self._calls[name],
+                    "seconds": round(self._seconds[name], 6),
+                    "samples": sum(samples.values()),
+                }
+                if name in self._allocations:
+                    summary[name]["top_allocations"] = [
+                        {"site": site, "bytes": size}
+                        for site, size in self._allocations[name].most_common(self.top_allocations)
+                    ]
+        (self.output_dir / "all.collapsed").write_text(
+            "\n".join(all_lines) + ("\n" if all_lines else ""), encoding="utf-8"
+        )
+        (self.output_dir / "summary.json").write_text(
+            json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        return self.output_dir
+
+
+def start_profiling(
+    output_dir: Path,
+    trace_allocations: bool = False,
+    top_allocations: int = 10,
+    sample_interval: float = 0.005,
+) -> Profiler:
+    """Activa el perfilado global del proceso."""
+    global _active
+    with _active_lock:
+        if _active is not None:
+            raise RuntimeError("Ya hay un perfilador activo.")
+        profiler = Profiler(output_dir, trace_allocations, top_allocations, sample_interval)
+        profiler.start()
+        _active = profiler
+        return profiler
+
+
+def stop_profiling() -> Optional[Path]:
+    """Desactiva el perfilado y escribe los resultados; None si no estaba activo."""
+    global _active
+    with _active_lock:
+        profiler, _active = _active, None
+    return profiler.stop() if profiler is not None else None
+
+
+@contextmanager
+def profiling(output_dir: Path, trace_allocations: bool = False, top_allocations: int = 10) -> Iterator[Profiler]:
+    profiler = start_profiling(output_dir, trace_allocations, top_allocations)
+    try:
+        yield profiler
+    finally:
+        stop_profiling()
+
+
+def _enable(profile: cProfile.Profile) -> bool:
+    # Desde Python 3.12 solo un perfilador puede estar activo a la vez en el proceso;
+    # en ese caso la seccion queda solo con muestreo y tiempos.
+    try:
+        profile.enable()
+    except ValueError:
+        return False
+    return True
+
+
+def _collapse(frame) -> str:
+    names: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        if not _is_own_frame(code.co_filename):
+            names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _is_own_frame(filename: str) -> bool:
+    return filename == __file__ or filename.endswith(("contextlib.py", "tracemalloc.py"))
+
+
+def _safe_name(name: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in name)
@@ -1,4 +1,4 @@
-from src.agent.solution_architect_agent import SolutionArchitectAgent
+from src.agent.solution_architect_agent import SolutionArchitectAgent, build_agent
 from src.agent.tools import write_docs
 
-__all__ = ["SolutionArchitectAgent", "write_docs"]
+__all__ = ["SolutionArchitectAgent", "build_agent", "write_docs"]
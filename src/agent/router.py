@@ -0,0 +1,156 @@
+"""Enrutamiento de solicitudes entre varios modelos y el generador determinista.
+
+Cada ruta registra la latencia y el resultado de sus llamadas recientes. Para
+cada solicitud el router arma un plan ordenado: primero la ruta preferida que
+admite el tamano de la solicitud y cuya latencia estimada (p95 observado o la
+latencia esperada configurada) cabe en el SLO; luego el resto de rutas sanas
+de la mas rapida a la mas lenta; y al final el generador determinista, que
+siempre esta disponible.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from src.core.config import RouterConfig
+from src.core.llm import build_model_client
+from src.core.schemas import Requirements
+
+
+def request_size(requirements: Requirements) -> int:
+    """Cantidad de elementos de lista (requerimientos, recursos, regiones, ...) de la solicitud."""
+    payload = requirements.model_dump()
+    return sum(len(value) for value in payload.values() if isinstance(value, list))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Ventana deslizante en el tiempo con latencias y errores de una ruta."""
+
+    def __init__(
+        self, window_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._window = window_seconds
+        self._clock = clock
+        self._samples: Deque[Tuple[float, float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((self._clock(), latency, ok))
+            self._trim()
+
+    def _trim(self) -> None:
+        limit = self._clock() - self._window
+        while self._samples and self._samples[0][0] < limit:
+            self._samples.popleft()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            self._trim()
+            latencies = [latency for _, latency, ok in self._samples if ok]
+            errors = sum(1 for _, _, ok in self._samples if not ok)
+            count = len(self._samples)
+        return {
+            "count": count,
+            "error_rate": errors / count if count else 0.0,
+            "p50": _percentile(latencies, 0.50) if latencies else 0.0,
+            "p95": _percentile(latencies, 0.95) if latencies else 0.0,
+        }
+
+
+@dataclass
+class ModelRoute:
+    name: str
+    client: object
+    max_request_size: Optional[int] = None
+    expected_latency_seconds: float = 30.0
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        routes: List[ModelRoute],
+        window_seconds: float = 300.0,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.routes = list(routes)
+        self._min_samples = min_samples
+        self._max_error_rate = max_error_rate
+        self._trackers = {
+            route.name: LatencyTracker(window_seconds=window_seconds, clock=clock)
+            for route in self.routes
+        }
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        self._trackers[name].record(latency, ok)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: tracker.snapshot() for name, tracker in self._trackers.items()}
+
+    def estimated_latency(self, route: ModelRoute) -> float:
+        snapshot = self._trackers[route.name].snapshot()
+        if snapshot["count"] >= self._min_samples and snapshot["p95"] > 0:
+            return snapshot["p95"]
+        return route.expected_latency_seconds
+
+    def is_degraded(self, route: ModelRoute) -> bool:
+        snapshot = self._trackers[route.name].snapshot()
+        return (
+            snapshot["count"] >= self._min_samples
+            and snapshot["error_rate"] >= self._max_error_rate
+        )
+
+    def plan(
+        self, requirements: Requirements, slo_seconds: Optional[float] = None
+    ) -> List[Optional[ModelRoute]]:
+        """Rutas a intentar en orden; `None` representa el generador determinista."""
+        size = request_size(requirements)
+        eligible = [
+            route
+            for route in self.routes
+            if not self.is_degraded(route)
+            and (route.max_request_size is None or size <= route.max_request_size)
+            and (slo_seconds is None or self.estimated_latency(route) <= slo_seconds)
+        ]
+        if not eligible:
+            return [None]
+        primary, rest = eligible[0], eligible[1:]
+        rest.sort(key=self.estimated_latency)
+        return [primary, *rest, None]
+
+
+def build_model_router(config: RouterConfig) -> Optional[ModelRouter]:
+    if not config.enabled:
+        return None
+    routes = [
+        ModelRoute(
+            name=route.name,
+            client=build_model_client(route),
+            max_request_size=route.max_request_size,
+            expected_latency_seconds=route.expected_latency_seconds,
+        )
+        for route in config.routes
+        if route.enabled
+    ]
+    if not routes:
+        # Sin rutas el plan seria solo el generador determinista, ignorando `llm`.
+        raise ValueError("router.enabled requiere al menos una ruta habilitada en router.routes.")
+    return ModelRouter(
+        routes,
+        window_seconds=config.window_seconds,
+        min_samples=config.min_samples,
+        max_error_rate=config.max_error_rate,
+    )
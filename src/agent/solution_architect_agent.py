@@ -3,11 +3,50 @@ from __future__ import annotations
 import asyncio
 import json
 import re
-from typing import Optional
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
 
-from src.core.generator import generate_solution
-from src.core.schemas import Requirements, SolutionProposal
-from src.core.validators import ensure_no_gateway_in_proposal
+from pydantic import ValidationError
+
+from monitoring.metrics import metrics
+from src.agent.router import ModelRouter, build_model_router
+from src.core.cassette import Cassette, build_cassette
+from src.core.config import AppConfig
+from src.core.deadline import Deadline, DeadlineExceeded
+from src.core.generator import generate_sections, generate_solution
+from src.core.schemas import (
+    ADR,
+    BacklogItem,
+    Component,
+    CostEstimate,
+    Flow,
+    Requirements,
+    PROPOSAL_SECTIONS,
+    Risk,
+    SolutionProposal,
+)
+from src.core.llm import build_model_client
+from src.core.section_stream import SectionStreamParser, validate_section
+from src.core.semantic_cache import SemanticCache, build_semantic_cache
+from src.core.validators import ensure_no_gateway_in_proposal, ensure_no_gateway_in_section
+
+
+def build_agent(config: AppConfig) -> "SolutionArchitectAgent":
+    """Construye el agente (clientes de modelo, router y cache) a partir de la configuracion."""
+    cassette = build_cassette(config.cassette) if config.llm.enabled else None
+    replaying = cassette is not None and cassette.replaying
+    # Al reproducir un cassette no se construyen clientes: no hay red.
+    router = None if replaying else build_model_router(config.router)
+    uses_llm = config.llm.enabled or router is not None
+    return SolutionArchitectAgent(
+        enable_autogen=config.llm.enabled,
+        model_client=None if replaying else build_model_client(config.llm),
+        cache=build_semantic_cache(config.cache) if uses_llm else None,
+        max_repair_attempts=config.llm.max_repair_attempts,
+        router=router,
+        cassette=cassette,
+    )
 
 
 class SolutionArchitectAgent:
@@ -15,31 +54,326 @@ class SolutionArchitectAgent:
         self,
         enable_autogen: bool = False,
         model_client: Optional[object] = None,
+        cache: Optional[SemanticCache] = None,
+        max_repair_attempts: int = 2,
+        router: Optional[ModelRouter] = None,
+        cassette: Optional[Cassette] = None,
     ) -> None:
         self._enable_autogen = enable_autogen
         self._model_client = model_client
-        if self._enable_autogen and self._model_client is None:
+        self._cache = cache
+        self._max_repair_attempts = max_repair_attempts
+        self._router = router
+        self._cassette = cassette
+        replaying = cassette is not None and cassette.replaying
+        if self._enable_autogen and self._model_client is None and self._router is None and not replaying:
             raise ValueError("model_client es requerido cuando enable_autogen=True.")
 
-    def propose(self, requirements: Requirements) -> SolutionProposal:
-        if self._enable_autogen:
-            proposal = self._propose_with_llm(requirements)
+    @property
+    def cache(self) -> Optional[SemanticCache]:
+        return self._cache
+
+    @property
+    def router(self) -> Optional[ModelRouter]:
+        return self._router
+
+    @property
+    def mode(self) -> str:
+        if self._router is not None:
+            return "router"
+        if self._cassette is not None and self._cassette.replaying:
+            return "replay"
+        return "LLM" if self._enable_autogen else "determinista"
+
+    def propose(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline] = None,
+        slo_seconds: Optional[float] = None,
+        unit_prices: Optional[Mapping[str, float]] = None,
+    ) -> SolutionProposal:
+        """`unit_prices` (precios del catalogo) solo aplica a la propuesta determinista."""
+        if self._router is not None:
+            try:
+                proposal = self._propose_routed(requirements, deadline, slo_seconds, unit_prices)
+            except DeadlineExceeded as exc:
+                if deadline is None:
+                    raise
+                deadline.warn(f"{exc} Se usa la propuesta determinista.")
+                proposal = generate_solution(requirements, unit_prices=unit_prices)
+        elif self._enable_autogen:
+            try:
+                proposal, _ = self._propose_cached(requirements, deadline)
+            except DeadlineExceeded as exc:
+                if deadline is None:
+                    raise
+                # Respuesta parcial: se entrega la propuesta determinista con advertencias.
+                deadline.warn(f"{exc} Se usa la propuesta determinista.")
+                proposal = generate_solution(requirements, unit_prices=unit_prices)
         else:
-            proposal = generate_solution(requirements)
+            proposal = generate_solution(requirements, unit_prices=unit_prices)
+        if deadline is not None and deadline.warnings:
+            proposal = proposal.model_copy(update={"warnings": deadline.warnings})
         ensure_no_gateway_in_proposal(proposal)
         return proposal
 
-    def _propose_with_llm(self, requirements: Requirements) -> SolutionProposal:
+    async def stream_sections(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Secciones validadas en cuanto se generan; al final `("proposal", propuesta)`.
+
+        Sin LLM se recorre `generate_sections`; con un cliente que tenga
+        `create_stream` se validan las secciones a medida que llega el JSON; en
+        los demas casos (router, cassette, cache) se emite la propuesta completa.
+        Cancelar el iterador cancela la llamada en curso al modelo. Si el deadline
+        vence entre secciones deterministas, se termina con `("warnings", avisos)`
+        en lugar de la propuesta: lo emitido hasta ahi es la respuesta parcial.
+        """
+        client = self._model_client
+        replaying = self._cassette is not None and self._cassette.replaying
+        streamable = (
+            self._enable_autogen
+            and self._router is None
+            and not replaying
+            and getattr(client, "create_stream", None) is not None
+        )
+        if not self._enable_autogen and self._router is None:
+            sections: Dict[str, Any] = {}
+            iterator = generate_sections(requirements)
+            while True:
+                item = await asyncio.to_thread(next, iterator, None)
+                if item is None:
+                    break
+                name, value = item
+                ensure_no_gateway_in_section(name, value)
+                sections[name] = value
+                yield name, value
+                if deadline is not None and deadline.expired and len(sections) < len(PROPOSAL_SECTIONS):
+                    if deadline.cancelled:
+                        deadline.check("generate")
+                    deadline.warn("Se agoto el tiempo de la etapa generate. Se entregan solo las secciones generadas.")
+                    yield "warnings", deadline.warnings
+                    return
+            proposal = SolutionProposal(**sections)
+            if deadline is not None and deadline.warnings:
+                proposal = proposal.model_copy(update={"warnings": deadline.warnings})
+        elif not streamable:
+            proposal = await asyncio.to_thread(self.propose, requirements, deadline)
+            for name in PROPOSAL_SECTIONS:
+                yield name, getattr(proposal, name)
+        else:
+            emitted: Dict[str, Any] = {}
+            proposal = None
+            async for name, value in self._stream_with_llm(requirements, deadline, client, emitted):
+                if name == "proposal":
+                    proposal = value
+                else:
+                    yield name, value
+            for name in PROPOSAL_SECTIONS:
+                if name not in emitted:
+                    yield name, getattr(proposal, name)
+        yield "proposal", proposal
+
+    async def _stream_with_llm(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline],
+        client: object,
+        emitted: Dict[str, Any],
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        if self._cache is not None:
+            # Una sola busqueda: un acierto se entrega completo, sin llamar al modelo.
+            cached = await asyncio.to_thread(self._cache.lookup, requirements)
+            if cached is not None:
+                metrics.increment("cache.hits")
+                if deadline is not None and deadline.warnings:
+                    cached = cached.model_copy(update={"warnings": deadline.warnings})
+                yield "proposal", cached
+                return
+            metrics.increment("cache.misses")
+        messages = _messages(self._build_prompt(requirements))
+        parser = SectionStreamParser()
+        parts: List[str] = []
+        final: object = None
+        started = time.perf_counter()
+        async for chunk in client.create_stream(messages=messages):
+            if deadline is not None:
+                deadline.check("generate")
+            if not isinstance(chunk, str):
+                final = chunk  # CreateResult de AutoGen: contenido completo y uso de tokens
+                continue
+            parts.append(chunk)
+            for name, raw in parser.feed(chunk):
+                if name not in PROPOSAL_SECTIONS:
+                    continue
+                try:
+                    value = validate_section(name, raw)
+                except (ValidationError, ValueError):
+                    continue  # se corrige al final con la reparacion por secciones
+                emitted[name] = value
+                metrics.increment("llm.stream.sections")
+                yield name, value
+        content = "".join(parts) or (_extract_content(final) if final is not None else "")
+        prompt_tokens, completion_tokens = _extract_usage(final) if final is not None else (0, 0)
+        if self._cassette is not None:
+            self._cassette.record(messages, content, prompt_tokens, completion_tokens, time.perf_counter() - started)
+        metrics.increment("llm.calls")
+        metrics.increment("llm.tokens.prompt", prompt_tokens)
+        metrics.increment("llm.tokens.completion", completion_tokens)
+        # La reparacion usa el camino sincrono del cliente; corre fuera del event loop.
+        proposal = await asyncio.to_thread(self._parse_proposal, _extract_json(content), deadline, client)
+        if deadline is not None and deadline.warnings:
+            proposal = proposal.model_copy(update={"warnings": deadline.warnings})
+        ensure_no_gateway_in_proposal(proposal)
+        if self._cache is not None:
+            self._cache.store(requirements, proposal)
+        yield "proposal", proposal
+
+    def _propose_routed(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline] = None,
+        slo_seconds: Optional[float] = None,
+        unit_prices: Optional[Mapping[str, float]] = None,
+    ) -> SolutionProposal:
+        """Intenta las rutas del plan en orden y cae al generador determinista."""
+        started = time.perf_counter()
+        for route in self._router.plan(requirements, slo_seconds):
+            if route is None:
+                metrics.increment("router.deterministic")
+                return generate_solution(requirements, unit_prices=unit_prices)
+            attempt = deadline or Deadline()
+            if slo_seconds is not None:
+                slo_left = slo_seconds - (time.perf_counter() - started)
+                if slo_left <= 0:
+                    metrics.increment("router.deterministic")
+                    return generate_solution(requirements, unit_prices=unit_prices)
+                attempt = attempt.within(slo_left)
+            call_started = time.perf_counter()
+            try:
+                proposal, cache_hit = self._propose_cached(requirements, attempt, client=route.client)
+            except DeadlineExceeded:
+                if deadline is not None and deadline.expired:
+                    raise
+                self._router.record(route.name, time.perf_counter() - call_started, ok=False)
+                metrics.increment(f"router.{route.name}.timeouts")
+                continue
+            except Exception:
+                self._router.record(route.name, time.perf_counter() - call_started, ok=False)
+                metrics.increment(f"router.{route.name}.errors")
+                continue
+            # Un acierto de cache no mide al modelo: no entra en la ventana de latencias.
+            if not cache_hit:
+                self._router.record(route.name, time.perf_counter() - call_started, ok=True)
+            metrics.increment(f"router.{route.name}.requests")
+            return proposal
+        return generate_solution(requirements, unit_prices=unit_prices)
+
+    def _propose_cached(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline] = None,
+        client: Optional[object] = None,
+    ) -> Tuple[SolutionProposal, bool]:
+        """(propuesta, True si vino de la cache semantica sin llamar al modelo)."""
+        if self._cache is None:
+            return self._propose_with_llm(requirements, deadline, client), False
+        cached = self._cache.lookup(requirements)
+        if cached is not None:
+            metrics.increment("cache.hits")
+            return cached, True
+        metrics.increment("cache.misses")
+        proposal = self._propose_with_llm(requirements, deadline, client)
+        ensure_no_gateway_in_proposal(proposal)
+        self._cache.store(requirements, proposal)
+        return proposal, False
+
+    def _propose_with_llm(
+        self,
+        requirements: Requirements,
+        deadline: Optional[Deadline] = None,
+        client: Optional[object] = None,
+    ) -> SolutionProposal:
         prompt = self._build_prompt(requirements)
-        response_text = self._call_model(prompt)
-        payload = _extract_json(response_text)
+        response_text = self._call_model(prompt, deadline, client)
+        return self._parse_proposal(_extract_json(response_text), deadline, client)
+
+    def _parse_proposal(
+        self,
+        payload: str,
+        deadline: Optional[Deadline] = None,
+        client: Optional[object] = None,
+    ) -> SolutionProposal:
         try:
             if hasattr(SolutionProposal, "model_validate_json"):
                 return SolutionProposal.model_validate_json(payload)
             return SolutionProposal.parse_raw(payload)
+        except ValidationError as exc:
+            repaired = self._repair_sections(payload, exc, deadline, client)
+            if repaired is not None:
+                return repaired
+            raise ValueError("No se pudo parsear la respuesta del LLM.") from exc
         except Exception as exc:  # pragma: no cover - defensive
             raise ValueError("No se pudo parsear la respuesta del LLM.") from exc
 
+    def _repair_sections(
+        self,
+        payload: str,
+        error: ValidationError,
+        deadline: Optional[Deadline] = None,
+        client: Optional[object] = None,
+    ) -> Optional[SolutionProposal]:
+        """Regenera solo las secciones invalidas en lugar de repetir el prompt completo."""
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        for _ in range(self._max_repair_attempts):
+            paths = _failing_sections(error)
+            if not paths:
+                return None
+            metrics.increment("llm.repair.attempts")
+            metrics.increment("llm.repair.sections", len(paths))
+            response_text = self._call_model(_build_repair_prompt(data, paths), deadline, client)
+            try:
+                fixes = json.loads(_extract_json(response_text))
+            except ValueError:
+                continue
+            if not isinstance(fixes, dict):
+                continue
+            for path in paths:
+                key = _path_key(path)
+                if key in fixes:
+                    _set_fragment(data, path, fixes[key])
+            try:
+                proposal = SolutionProposal.model_validate(data)
+            except ValidationError as exc:
+                error = exc
+                continue
+            metrics.increment("llm.repair.success")
+            return proposal
+        metrics.increment("llm.repair.failures")
+        return None
+
+    def build_messages(self, requirements: Requirements) -> List[Dict[str, str]]:
+        """Mensajes de chat de `propose`, para enviarlos por otra via (p. ej. la batch API)."""
+        return _messages(self._build_prompt(requirements))
+
+    def proposal_from_response(self, response: object) -> SolutionProposal:
+        """Valida una respuesta de chat-completions obtenida fuera de `propose`."""
+        content = _extract_content(response)
+        if not isinstance(content, str) or not content.strip():
+            # `content: null`: rechazo del modelo o llamada a herramienta.
+            raise ValueError("La respuesta del LLM no tiene contenido.")
+        proposal = self._parse_proposal(_extract_json(content))
+        ensure_no_gateway_in_proposal(proposal)
+        return proposal
+
     def _build_prompt(self, requirements: Requirements) -> str:
         return (
             "Eres un Arquitecto de Solucion. Genera una propuesta completa "
@@ -51,30 +385,91 @@ class SolutionArchitectAgent:
             "backlog, risks, cost_estimate."
         )
 
-    def _call_model(self, prompt: str) -> str:
-        if self._model_client is None:
-            raise RuntimeError("model_client no configurado.")
+    def _call_model(
+        self,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+        client: Optional[object] = None,
+    ) -> str:
+        if deadline is not None:
+            deadline.check("generate")
+
+        messages = _messages(prompt)
+
+        if self._cassette is not None and self._cassette.replaying:
+            response = self._cassette.replay(messages, deadline)
+            metrics.increment("llm.replayed")
+        else:
+            started = time.perf_counter()
+            response = self._create(client or self._model_client, messages, deadline)
+            latency = time.perf_counter() - started
+
+        prompt_tokens, completion_tokens = _extract_usage(response)
+        content = _extract_content(response)
+        if self._cassette is not None and not self._cassette.replaying:
+            self._cassette.record(messages, content, prompt_tokens, completion_tokens, latency)
+        metrics.increment("llm.calls")
+        metrics.increment("llm.tokens.prompt", prompt_tokens)
+        metrics.increment("llm.tokens.completion", completion_tokens)
+        return content
 
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "Responde solo con JSON valido. No incluyas texto extra."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ]
-
-        create_fn = getattr(self._model_client, "create", None)
+    @staticmethod
+    def _create(model_client: Optional[object], messages: List[Dict[str, str]], deadline: Optional[Deadline]) -> object:
+        if model_client is None:
+            raise RuntimeError("model_client no configurado.")
+        create_fn = getattr(model_client, "create", None)
         if create_fn is None:
             raise RuntimeError("model_client no tiene metodo create.")
 
+        timeout = deadline.timeout() if deadline is not None else None
         if asyncio.iscoroutinefunction(create_fn):
-            response = asyncio.run(create_fn(messages=messages))
-        else:
+            try:
+                response = asyncio.run(
+                    asyncio.wait_for(create_fn(messages=messages), timeout=timeout)
+                )
+            except asyncio.TimeoutError as exc:
+                raise DeadlineExceeded("Se agoto el tiempo de la etapa generate.") from exc
+        elif timeout is None:
             response = create_fn(messages=messages)
+        else:
+            response = _call_with_timeout(lambda: create_fn(messages=messages), timeout)
+        return response
+
 
-        return _extract_content(response)
+def _call_with_timeout(fn: Callable[[], object], timeout: float) -> object:
+    """Corre una llamada bloqueante en un hilo y espera a lo sumo `timeout` segundos.
+
+    Si se agota el tiempo el hilo se abandona (es daemon) y su resultado se descarta.
+    """
+    outcome: Dict[str, Any] = {}
+    done = threading.Event()
+
+    def target() -> None:
+        try:
+            outcome["response"] = fn()
+        except BaseException as exc:  # se relanza en el hilo que espera
+            outcome["error"] = exc
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name="llm-create", daemon=True).start()
+    if not done.wait(timeout):
+        raise DeadlineExceeded("Se agoto el tiempo de la etapa generate.")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["response"]
+
+
+def _messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Responde solo con JSON valido. No incluyas texto extra."
+            ),
+        },
+        {"role": "user", "content": prompt},
+    ]
 
 
 def _extract_content(response: object) -> str:
@@ -95,6 +490,92 @@ def _extract_content(response: object) -> str:
     return str(response)
 
 
+def _extract_usage(response: object) -> Tuple[int, int]:
+    """(tokens de prompt, tokens de respuesta) de respuestas estilo OpenAI o AutoGen."""
+    usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    if isinstance(usage, dict):
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    return int(getattr(usage, "prompt_tokens", 0) or 0), int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+_SECTION_MODELS: Dict[str, Any] = {
+    "components": Component,
+    "flows": Flow,
+    "adrs": ADR,
+    "backlog": BacklogItem,
+    "risks": Risk,
+    "cost_estimate": CostEstimate,
+}
+
+
+def _failing_sections(error: ValidationError) -> List[Tuple[Any, ...]]:
+    """Agrupa los errores de pydantic por seccion (p. ej. ('flows', 0) o ('cost_estimate',))."""
+    paths: List[Tuple[Any, ...]] = []
+    for item in error.errors():
+        loc = tuple(item.get("loc", ()))
+        if not loc:
+            return []
+        path = loc[:2] if len(loc) > 1 and isinstance(loc[1], int) else loc[:1]
+        if path not in paths:
+            paths.append(path)
+    # Si falla la lista completa, no tiene sentido reparar elementos sueltos de ella.
+    whole = {path[0] for path in paths if len(path) == 1}
+    return [path for path in paths if len(path) == 1 or path[0] not in whole]
+
+
+def _path_key(path: Tuple[Any, ...]) -> str:
+    return ".".join(str(part) for part in path)
+
+
+def _section_schema(path: Tuple[Any, ...]) -> Dict[str, Any]:
+    model = _SECTION_MODELS.get(path[0])
+    if model is None:
+        return {"type": "string"}
+    schema = model.model_json_schema()
+    if len(path) == 1 and path[0] != "cost_estimate":
+        return {"type": "array", "items": schema}
+    return schema
+
+
+def _get_fragment(data: Dict[str, Any], path: Tuple[Any, ...]) -> Any:
+    value: Any = data
+    for part in path:
+        try:
+            value = value[part]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return value
+
+
+def _set_fragment(data: Dict[str, Any], path: Tuple[Any, ...], value: Any) -> None:
+    if len(path) == 1:
+        data[path[0]] = value
+        return
+    section, index = path
+    items = data.get(section)
+    if isinstance(items, list) and 0 <= index < len(items):
+        items[index] = value
+
+
+def _build_repair_prompt(data: Dict[str, Any], paths: List[Tuple[Any, ...]]) -> str:
+    sections = []
+    for path in paths:
+        sections.append(
+            f"Seccion {_path_key(path)}\n"
+            f"Schema:\n{json.dumps(_section_schema(path), ensure_ascii=False)}\n"
+            f"Fragmento invalido:\n{json.dumps(_get_fragment(data, path), ensure_ascii=False)}"
+        )
+    keys = ", ".join(_path_key(path) for path in paths)
+    return (
+        "Las siguientes secciones de una propuesta SolutionProposal no cumplen "
+        "su schema. Corrigelas sin usar componentes de entrada gestionados. "
+        f"Devuelve SOLO un JSON cuyas claves sean exactamente: {keys}.\n\n"
+        + "\n\n".join(sections)
+    )
+
+
 def _extract_json(text: str) -> str:
     fenced = re.findall(r"```(?:json)?\s*(.*?)```", text, flags=re.DOTALL | re.IGNORECASE)
     if fenced:
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from src.core.cost_excel import cost_estimate_to_excel
+from src.core.bundle import ArtifactBundle
+from src.core.cost_excel import cost_estimate_to_excel_bytes
+from src.core.deadline import Deadline
+from src.core.pricing_catalog import PricingCatalog
 from src.core.schemas import SolutionProposal
 from src.core.scraping import fetch_cloud_pricing
+from src.core.storage import ArtifactStore, LocalStore, StoreResult
 from src.core.templates import (
     adr_to_markdown,
     backlog_to_csv,
@@ -21,47 +26,117 @@ def write_docs(
     scrape_provider: Optional[str] = None,
     resources: Optional[list[str]] = None,
     logger: Optional[logging.Logger] = None,
-) -> None:
+    scraped_rows: Optional[List[dict[str, Any]]] = None,
+    deadline: Optional[Deadline] = None,
+    catalog: Optional[PricingCatalog] = None,
+    region: Optional[str] = None,
+    store: Optional[ArtifactStore] = None,
+) -> StoreResult:
     log = logger or logging.getLogger("solution-architect.write_docs")
-    output_path = base_path
-    log.info("Creando directorios en %s", output_path)
-    (output_path / "architecture").mkdir(parents=True, exist_ok=True)
-    (output_path / "adr").mkdir(parents=True, exist_ok=True)
-    (output_path / "backlog").mkdir(parents=True, exist_ok=True)
-    (output_path / "risk").mkdir(parents=True, exist_ok=True)
-    (output_path / "cost").mkdir(parents=True, exist_ok=True)
-
-    architecture_path = output_path / "architecture" / "solution-proposal.md"
-    log.info("Escribiendo propuesta en %s", architecture_path)
-    architecture_path.write_text(proposal_to_markdown(proposal), encoding="utf-8")
-
-    if proposal.adrs:
-        adr = proposal.adrs[0]
-        adr_path = output_path / "adr" / f"{adr.id}-{_slugify(adr.title)}.md"
-        log.info("Escribiendo ADR en %s", adr_path)
-        adr_path.write_text(adr_to_markdown(adr), encoding="utf-8")
-
-    backlog_path = output_path / "backlog" / "backlog.csv"
-    log.info("Escribiendo backlog en %s", backlog_path)
-    backlog_path.write_text(backlog_to_csv(proposal.backlog), encoding="utf-8")
-
-    risk_path = output_path / "risk" / "risk-register.md"
-    log.info("Escribiendo registro de riesgos en %s", risk_path)
-    risk_path.write_text(risks_to_markdown(proposal.risks), encoding="utf-8")
-
-    cost_path = output_path / "cost" / "cost-estimate.xlsx"
-    scraped_rows: list = []
-    if scrape_provider and scrape_provider.strip():
-        log.info("Obteniendo precios por scraping: provider=%s", scrape_provider)
-        scraped_rows = fetch_cloud_pricing(scrape_provider.strip())
-        log.info("Scraping completado: %d filas de precios", len(scraped_rows))
-    log.info("Escribiendo estimacion de costos en %s", cost_path)
-    cost_estimate_to_excel(
-        proposal.cost_estimate,
-        cost_path,
-        scraped_rows=scraped_rows or None,
+    bundle = render_bundle(
+        proposal,
+        scrape_provider=scrape_provider,
         resources=resources,
+        logger=log,
+        scraped_rows=scraped_rows,
+        deadline=deadline,
+        catalog=catalog,
+        region=region,
     )
+    persist = deadline.stage("persist") if deadline is not None else None
+    return write_artifacts(base_path, bundle.artifacts, logger=log, deadline=persist, store=store)
+
+
+def render_bundle(
+    proposal: SolutionProposal,
+    scrape_provider: Optional[str] = None,
+    resources: Optional[list[str]] = None,
+    logger: Optional[logging.Logger] = None,
+    scraped_rows: Optional[List[dict[str, Any]]] = None,
+    deadline: Optional[Deadline] = None,
+    catalog: Optional[PricingCatalog] = None,
+    region: Optional[str] = None,
+) -> ArtifactBundle:
+    """Como `write_docs`, pero deja todos los artefactos en memoria para empaquetarlos.
+
+    El scraping corre con el presupuesto de la etapa `ingest` de `deadline`.
+    """
+    log = logger or logging.getLogger("solution-architect.write_docs")
+    if scraped_rows is None and catalog is None:
+        ingest = deadline.stage("ingest") if deadline is not None else None
+        scraped_rows = scrape_pricing(scrape_provider, logger=log, deadline=ingest)
+    if deadline is not None and deadline.warnings:
+        proposal = proposal.model_copy(update={"warnings": deadline.warnings})
+    artifacts = render_artifacts(
+        proposal,
+        scraped_rows=scraped_rows,
+        resources=resources,
+        catalog=catalog,
+        provider=scrape_provider,
+        region=region,
+    )
+    return ArtifactBundle(artifacts)
+
+
+def scrape_pricing(
+    scrape_provider: Optional[str],
+    logger: Optional[logging.Logger] = None,
+    deadline: Optional[Deadline] = None,
+) -> List[dict[str, Any]]:
+    log = logger or logging.getLogger("solution-architect.write_docs")
+    if not scrape_provider or not scrape_provider.strip():
+        return []
+    log.info("Obteniendo precios por scraping: provider=%s", scrape_provider)
+    rows = fetch_cloud_pricing(scrape_provider.strip(), deadline=deadline)
+    log.info("Scraping completado: %d filas de precios", len(rows))
+    return rows
+
+
+def render_artifacts(
+    proposal: SolutionProposal,
+    scraped_rows: Optional[List[dict[str, Any]]] = None,
+    resources: Optional[list[str]] = None,
+    max_workers: int = 4,
+    catalog: Optional[PricingCatalog] = None,
+    provider: Optional[str] = None,
+    region: Optional[str] = None,
+) -> Dict[str, bytes]:
+    """Renderiza en paralelo cada artefacto; devuelve {ruta relativa: contenido}."""
+    renderers: Dict[str, Callable[[], bytes]] = {
+        "architecture/solution-proposal.md": lambda: _utf8(proposal_to_markdown(proposal)),
+        "backlog/backlog.csv": lambda: _utf8(backlog_to_csv(proposal.backlog)),
+        "risk/risk-register.md": lambda: _utf8(risks_to_markdown(proposal.risks)),
+        "cost/cost-estimate.xlsx": lambda: cost_estimate_to_excel_bytes(
+            proposal.cost_estimate,
+            scraped_rows=scraped_rows or None,
+            resources=resources,
+            catalog=catalog,
+            provider=provider,
+            region=region,
+        ),
+    }
+    for adr in proposal.adrs:
+        renderers[f"adr/{adr.id}-{_slugify(adr.title)}.md"] = lambda adr=adr: _utf8(adr_to_markdown(adr))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render") as pool:
+        futures = {name: pool.submit(fn) for name, fn in renderers.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def write_artifacts(
+    base_path: Path,
+    artifacts: Dict[str, bytes],
+    logger: Optional[logging.Logger] = None,
+    deadline: Optional[Deadline] = None,
+    store: Optional[ArtifactStore] = None,
+) -> StoreResult:
+    """Persiste los artefactos en `store` (por defecto, el directorio `base_path`)."""
+    log = logger or logging.getLogger("solution-architect.write_docs")
+    return (store or LocalStore(base_path)).write_all(artifacts, logger=log, deadline=deadline)
+
+
+def _utf8(text: str) -> bytes:
+    return text.encode("utf-8")
 
 
 def _slugify(value: str) -> str:
@@ -1 +1 @@
-"""API layer placeholder."""
+"""Capa API: admision (`admission`), streaming SSE (`streaming`) y app FastAPI (`app`)."""
@@ -0,0 +1,262 @@
+"""Control de admision en la capa API: rate limit por tenant y concurrencia global.
+
+Sin un servicio de entrada gestionado (ADR-0001), la propia API protege la
+cuota del LLM:
+
+- `RateLimiter`: token bucket por tenant/API key. El estado vive en memoria o,
+  para compartirlo entre procesos del mismo host, en SQLite (`SQLiteRateBackend`).
+- `ConcurrencyLimiter`: como maximo `max_concurrent` propuestas a la vez; el
+  resto espera en una cola FIFO. Se descarta carga (429) cuando la cola esta
+  llena o la solicitud mas antigua lleva mas de `max_queue_age_seconds`
+  esperando, con un Retry-After estimado a partir del backlog y del tiempo
+  medio de servicio.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, Mapping, Optional, Tuple
+
+from monitoring.metrics import metrics
+from src.core.config import AdmissionConfig
+from src.core.deadline import Deadline
+
+
+class AdmissionRejected(Exception):
+    """Solicitud rechazada; la API responde 429 con `Retry-After`."""
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class RateLimited(AdmissionRejected):
+    pass
+
+
+class Overloaded(AdmissionRejected):
+    pass
+
+
+class MemoryRateBackend:
+    """Buckets en memoria, acotados a `max_keys` tenants (LRU)."""
+
+    def __init__(self, max_keys: int = 10_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, wait = _refill_and_take(tokens, now - updated, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SQLiteRateBackend:
+    """Buckets compartidos entre procesos via SQLite (WAL); usa reloj de pared."""
+
+    def __init__(self, path: Path, clock: Callable[[], float] = time.time) -> None:
+        self.clock = clock
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = self.clock()
+            row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens, wait = _refill_and_take(tokens, now - updated, rate, burst, cost)
+            conn.execute("INSERT OR REPLACE INTO rate_buckets VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def _refill_and_take(tokens: float, elapsed: float, rate: float, burst: float, cost: float) -> Tuple[float, float]:
+    tokens = min(burst, tokens + max(0.0, elapsed) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate if rate > 0 else math.inf
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: float,
+        tenants: Optional[Mapping[str, Tuple[float, float]]] = None,
+        backend=None,
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tenants = dict(tenants or {})
+        self._backend = backend or MemoryRateBackend()
+
+    def check(self, tenant: str) -> float:
+        """Consume un token de `tenant`; devuelve 0 si se admite o los segundos a esperar."""
+        rate, burst = self._tenants.get(tenant, (self.rate_per_second, self.burst))
+        return self._backend.take(tenant, rate, burst)
+
+
+class ConcurrencyLimiter:
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queue: int = 32,
+        max_queue_age_seconds: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.max_queue_age_seconds = max_queue_age_seconds
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting: Deque[Tuple[int, float]] = deque()
+        self._tickets = 0
+        # Media movil exponencial del tiempo de servicio, para estimar Retry-After.
+        self._service_seconds: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "oldest_wait_seconds": self._oldest_age(),
+                "retry_after": self._retry_after(),
+            }
+
+    @contextmanager
+    def slot(self, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        self._acquire(deadline)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._release(self._clock() - started)
+
+    def _acquire(self, deadline: Optional[Deadline]) -> None:
+        with self._cond:
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                return
+            if len(self._waiting) >= self.max_queue:
+                raise Overloaded("Cola de propuestas llena.", self._retry_after())
+            if self._oldest_age() >= self.max_queue_age_seconds:
+                raise Overloaded("La cola de propuestas esta atrasada.", self._retry_after())
+            self._tickets += 1
+            ticket = (self._tickets, self._clock())
+            self._waiting.append(ticket)
+            try:
+                while self._active >= self.max_concurrent or self._waiting[0] is not ticket:
+                    remaining = self.max_queue_age_seconds - (self._clock() - ticket[1])
+                    deadline_left = deadline.remaining() if deadline is not None else None
+                    if deadline_left is not None:
+                        remaining = min(remaining, deadline_left)
+                    if remaining <= 0:
+                        raise Overloaded("Se agoto el tiempo de espera en la cola.", self._retry_after())
+                    self._cond.wait(remaining)
+                self._waiting.popleft()
+                self._active += 1
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+
+    def _release(self, service_seconds: float) -> None:
+        with self._cond:
+            self._active -= 1
+            previous = self._service_seconds
+            self._service_seconds = service_seconds if previous is None else 0.8 * previous + 0.2 * service_seconds
+            self._cond.notify_all()
+
+    def _oldest_age(self) -> float:
+        return self._clock() - self._waiting[0][1] if self._waiting else 0.0
+
+    def _retry_after(self) -> float:
+        # Tiempo hasta que se atienda todo lo encolado mas esta solicitud.
+        service = self._service_seconds or 1.0
+        backlog = len(self._waiting) + 1
+        return max(1.0, backlog * service / self.max_concurrent)
+
+
+class AdmissionController:
+    def __init__(self, limiter: ConcurrencyLimiter, rate_limiter: Optional[RateLimiter] = None) -> None:
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+
+    @contextmanager
+    def admit(self, tenant: str, deadline: Optional[Deadline] = None) -> Iterator[None]:
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.check(tenant)
+            if wait > 0:
+                metrics.increment("admission.rate_limited")
+                raise RateLimited(f"Limite de solicitudes excedido para {tenant}.", wait)
+        try:
+            with self.limiter.slot(deadline):
+                metrics.increment("admission.admitted")
+                yield
+        except Overloaded:
+            metrics.increment("admission.shed")
+            raise
+
+    def propose(self, agent, tenant: str, requirements, deadline: Optional[Deadline] = None, slo_seconds=None):
+        with self.admit(tenant, deadline):
+            return agent.propose(requirements, deadline=deadline, slo_seconds=slo_seconds)
+
+
+def build_admission_controller(config: AdmissionConfig) -> Optional[AdmissionController]:
+    if not config.enabled:
+        return None
+    rate_limiter = None
+    if config.rate_per_second > 0:
+        if config.backend not in ("memory", "sqlite"):
+            raise ValueError(f"admission.backend no soportado: {config.backend}")
+        backend = SQLiteRateBackend(Path(config.backend_path)) if config.backend == "sqlite" else MemoryRateBackend()
+        rate_limiter = RateLimiter(
+            config.rate_per_second,
+            config.burst,
+            tenants={name: (limit.rate_per_second, limit.burst) for name, limit in config.tenants.items()},
+            backend=backend,
+        )
+    limiter = ConcurrencyLimiter(
+        max_concurrent=config.max_concurrent_proposals,
+        max_queue=config.max_queue,
+        max_queue_age_seconds=config.max_queue_age_seconds,
+    )
+    return AdmissionController(limiter, rate_limiter)
@@ -0,0 +1,214 @@
+"""API HTTP (FastAPI) con entrega progresiva de la propuesta por SSE.
+
+- `POST /proposals/stream`: recibe `Requirements` y responde `text/event-stream`
+  con un evento por seccion y un evento final `complete` que enlaza los
+  artefactos renderizados.
+- `GET /proposals/{id}/archive.{zip|tar|tar.gz}` y
+  `GET /proposals/{id}/artifacts/{ruta}`: sirven los artefactos desde una cache
+  en memoria acotada a `max_bundles` propuestas (las mas antiguas se descartan).
+
+FastAPI y uvicorn son dependencias opcionales; se importan solo al crear la app.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.agent import SolutionArchitectAgent, build_agent
+from src.agent.tools import render_bundle
+from src.api.admission import AdmissionRejected, build_admission_controller
+from src.api.streaming import proposal_events, sse_body
+from src.core.bundle import ARCHIVE_FORMATS, ArtifactBundle
+from src.core.config import AppConfig
+from src.core.config_provider import get_config_provider
+from src.core.deadline import Deadline
+from src.core.schemas import Requirements, SolutionProposal
+
+_MEDIA_TYPES = {
+    "zip": "application/zip",
+    "tar": "application/x-tar",
+    "tar.gz": "application/gzip",
+}
+_ARTIFACT_MEDIA_TYPES = {
+    ".md": "text/markdown; charset=utf-8",
+    ".csv": "text/csv; charset=utf-8",
+    ".json": "application/json",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class BundleCache:
+    """Bundles recientes por id de propuesta (LRU en memoria)."""
+
+    def __init__(self, max_bundles: int = 32) -> None:
+        self.max_bundles = max_bundles
+        self._bundles: "OrderedDict[str, ArtifactBundle]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, bundle: ArtifactBundle) -> str:
+        proposal_id = uuid.uuid4().hex
+        with self._lock:
+            self._bundles[proposal_id] = bundle
+            while len(self._bundles) > self.max_bundles:
+                self._bundles.popitem(last=False)
+        return proposal_id
+
+    def get(self, proposal_id: str) -> Optional[ArtifactBundle]:
+        with self._lock:
+            bundle = self._bundles.get(proposal_id)
+            if bundle is not None:
+                self._bundles.move_to_end(proposal_id)
+            return bundle
+
+
+def artifact_links(proposal_id: str, bundle: ArtifactBundle) -> Dict[str, Any]:
+    base = f"/proposals/{proposal_id}"
+    return {
+        "proposal_id": proposal_id,
+        "archives": {fmt: f"{base}/archive.{fmt}" for fmt in ARCHIVE_FORMATS},
+        "artifacts": {path: f"{base}/artifacts/{path}" for path in sorted(bundle.artifacts)},
+    }
+
+
+def _release_once(slot) -> Callable[[], None]:
+    """Cierra el cupo de admision una sola vez (cuerpo, cierre de la respuesta o error)."""
+    lock = threading.Lock()
+    released = [slot is None]
+
+    def release() -> None:
+        with lock:
+            if released[0]:
+                return
+            released[0] = True
+        slot.__exit__(None, None, None)
+
+    return release
+
+
+def create_app(
+    config: Optional[AppConfig] = None,
+    agent: Optional[SolutionArchitectAgent] = None,
+    max_bundles: int = 32,
+):
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+    config = config or get_config_provider().get()
+    agent = agent or build_agent(config)
+    admission = build_admission_controller(config.admission)
+    bundles = BundleCache(max_bundles)
+    app = FastAPI(title="Solution Architect")
+
+    class SlotStreamingResponse(StreamingResponse):
+        """Libera el cupo de admision al cerrar la respuesta, aunque el cuerpo nunca se itere."""
+
+        def __init__(self, content, release, **kwargs) -> None:
+            super().__init__(content, **kwargs)
+            self._release = release
+
+        async def __call__(self, scope, receive, send) -> None:
+            try:
+                await super().__call__(scope, receive, send)
+            finally:
+                self._release()
+
+    @app.exception_handler(AdmissionRejected)
+    async def _rejected(request: Request, exc: AdmissionRejected):
+        return JSONResponse({"detail": str(exc)}, status_code=exc.status_code, headers=exc.headers())
+
+    async def _render(proposal: SolutionProposal, requirements: Requirements) -> Dict[str, Any]:
+        bundle = await asyncio.to_thread(
+            render_bundle,
+            proposal,
+            resources=requirements.resources or None,
+            scraped_rows=[],
+            region=requirements.regions[0] if requirements.regions else None,
+        )
+        return artifact_links(bundles.put(bundle), bundle)
+
+    @app.post("/proposals/stream")
+    async def stream_proposal(requirements: Requirements, request: Request):
+        tenant = request.headers.get("X-Tenant", "anonymous")
+        deadline = Deadline.from_config(config.execution)
+        slot = admission.admit(tenant, deadline) if admission is not None else None
+        release = _release_once(slot)
+        if slot is not None:
+            # La espera en la cola de admision bloquea; no debe frenar el event loop.
+            entering = asyncio.ensure_future(asyncio.to_thread(slot.__enter__))
+            try:
+                await asyncio.shield(entering)
+            except asyncio.CancelledError:
+                # El cliente se fue mientras esperaba: el cupo se devuelve en cuanto se obtiene.
+                entering.add_done_callback(lambda task: task.cancelled() or task.exception() or release())
+                raise
+
+        async def body():
+            events = proposal_events(
+                agent,
+                requirements,
+                deadline=deadline.stage("generate"),
+                on_complete=lambda proposal: _render(proposal, requirements),
+            )
+            try:
+                async for frame in sse_body(events):
+                    if await request.is_disconnected():
+                        break
+                    yield frame
+            finally:
+                await events.aclose()
+                release()
+
+        try:
+            return SlotStreamingResponse(
+                body(),
+                release,
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+        except BaseException:
+            release()
+            raise
+
+    @app.get("/proposals/{proposal_id}/archive.{fmt}")
+    async def download_archive(proposal_id: str, fmt: str):
+        bundle = bundles.get(proposal_id)
+        if bundle is None or fmt not in ARCHIVE_FORMATS:
+            raise HTTPException(status_code=404, detail="Propuesta o formato no encontrado.")
+        filename = f"{proposal_id}.{fmt}"
+        return StreamingResponse(
+            bundle.iter_archive(fmt),
+            media_type=_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @app.get("/proposals/{proposal_id}/artifacts/{path:path}")
+    async def download_artifact(proposal_id: str, path: str):
+        bundle = bundles.get(proposal_id)
+        if bundle is None or path not in bundle.artifacts:
+            raise HTTPException(status_code=404, detail="Artefacto no encontrado.")
+        suffix = path[path.rfind("."):] if "." in path else ""
+        media_type = _ARTIFACT_MEDIA_TYPES.get(suffix, "application/octet-stream")
+        return Response(bundle.artifacts[path], media_type=media_type)
+
+    return app
+
+
+def main() -> None:
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP del Solution Architect")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--config", default="config/config.yml", help="Ruta a config YAML")
+    args = parser.parse_args()
+    uvicorn.run(create_app(get_config_provider(args.config).get()), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Entrega progresiva de una propuesta como Server-Sent Events.
+
+`proposal_events` emite un evento por seccion de `SolutionProposal` (diagram,
+components, flows, adrs, backlog, risks, cost) en cuanto el agente la genera y
+valida, y al final un evento `complete` con los enlaces a los artefactos (o
+`error`). Si el deadline vence a mitad de camino llega un evento `warnings` y
+`complete` cierra el stream con las secciones emitidas y `partial: true`. La generacion corre en una tarea aparte que escribe en una cola
+acotada: si el cliente lee lento, la tarea espera (y con ella la lectura del
+stream del LLM). Si el cliente se desconecta, al cerrar el iterador se cancela
+la tarea, lo que corta la llamada en curso al modelo, y se cancela el deadline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pydantic_core import to_jsonable_python
+
+from monitoring.metrics import metrics
+from src.core.deadline import Deadline
+from src.core.schemas import Requirements, SolutionProposal
+
+SECTION_EVENTS = {
+    "diagram_mermaid": "diagram",
+    "components": "components",
+    "flows": "flows",
+    "adrs": "adrs",
+    "backlog": "backlog",
+    "risks": "risks",
+    "cost_estimate": "cost",
+}
+
+CompletionHook = Callable[[SolutionProposal], Awaitable[Dict[str, Any]]]
+
+_DONE = object()
+
+
+@dataclass
+class ProposalEvent:
+    event: str
+    data: Any = None
+
+    def encode(self, event_id: Optional[int] = None) -> bytes:
+        if self.event == "ping":
+            return b": ping\n\n"
+        lines = [f"event: {self.event}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        payload = json.dumps(to_jsonable_python(self.data), ensure_ascii=False)
+        lines.extend(f"data: {line}" for line in payload.splitlines())
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+async def proposal_events(
+    agent,
+    requirements: Requirements,
+    deadline: Optional[Deadline] = None,
+    on_complete: Optional[CompletionHook] = None,
+    queue_size: int = 4,
+    heartbeat_seconds: Optional[float] = 15.0,
+) -> AsyncIterator[ProposalEvent]:
+    """Eventos de la propuesta; `on_complete` devuelve los datos extra del evento `complete`."""
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max(1, queue_size))
+
+    async def produce() -> None:
+        try:
+            proposal: Optional[SolutionProposal] = None
+            warnings: Optional[List[str]] = None
+            sent = []
+            async for name, value in agent.stream_sections(requirements, deadline=deadline):
+                if name == "proposal":
+                    proposal = value
+                    continue
+                if name == "warnings":
+                    warnings = value
+                    await queue.put(ProposalEvent("warnings", {"warnings": value}))
+                    continue
+                await queue.put(ProposalEvent(SECTION_EVENTS[name], value))
+                sent.append(SECTION_EVENTS[name])
+            if proposal is None:
+                # Respuesta parcial: sin propuesta completa no hay artefactos que enlazar.
+                await queue.put(
+                    ProposalEvent("complete", {"sections": sent, "warnings": warnings or [], "partial": True})
+                )
+                return
+            extra = await on_complete(proposal) if on_complete is not None else {}
+            await queue.put(
+                ProposalEvent("complete", {"sections": sent, "warnings": proposal.warnings, **extra})
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            metrics.increment("api.stream.errors")
+            await queue.put(ProposalEvent("error", {"message": str(exc), "type": type(exc).__name__}))
+        finally:
+            with suppress(asyncio.QueueFull):
+                queue.put_nowait(_DONE)
+
+    task = asyncio.create_task(produce())
+    finished = False
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ProposalEvent("ping")
+                continue
+            if item is _DONE:
+                finished = True
+                break
+            yield item
+            if item.event in ("complete", "error"):
+                finished = True
+                break
+    finally:
+        if not task.done():
+            # Cliente desconectado (o iterador cerrado): se corta la generacion.
+            if not finished:
+                metrics.increment("api.stream.cancelled")
+                if deadline is not None:
+                    deadline.cancel("Cliente desconectado; se cancela la generacion.")
+            task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def sse_body(events: AsyncIterator[ProposalEvent]) -> AsyncIterator[bytes]:
+    """Codifica los eventos como SSE, numerados para `Last-Event-ID`."""
+    event_id = 0
+    async for event in events:
+        if event.event != "ping":
+            event_id += 1
+        yield event.encode(event_id)
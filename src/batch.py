@@ -0,0 +1,328 @@
+"""Lotes multi-maquina: cualquier numero de workers reclama trabajos de la cola compartida.
+
+    python -m src.batch enqueue --batch 2026-q4 proyectos/            # un JSON de Requirements por archivo
+    python -m src.batch work --batch 2026-q4 --output /mnt/lotes       # en cada maquina, tantos como se quiera
+    python -m src.batch status --batch 2026-q4                         # conteos, throughput, p50/p95 por etapa
+    python -m src.batch dead --batch 2026-q4                           # dead-letters con su ultimo error
+    python -m src.batch query data/columnar --table risks --by id      # group-by/count sobre el export columnar
+
+Cada worker mantiene el estado caliente (`WarmState`: config, cliente de modelo,
+catalogo) entre trabajos, renueva la lease de su trabajo con un hilo de
+heartbeat y escribe el resultado y los tiempos por etapa en la cola. Un worker
+que muere deja su lease vencer y otro retoma el trabajo. Con `work --columnar DIR`
+cada propuesta se agrega ademas a chunks columnares (`src.core.columnar`) que
+`query` agrega sin cargar las propuestas.
+
+Los efectos de un trabajo se publican en dos fases: el procesador escribe en un
+directorio de staging propio del intento; si la lease se pierde, se descarta.
+Si no, el worker renueva la lease, publica (`commit`: staging -> salida final y
+filas columnares) y recien entonces marca el trabajo como terminado.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from monitoring.logger import configure_logging, get_logger, new_trace_id
+from src.core.columnar import TABLES, ColumnarDataset, ColumnarSink
+from src.core.config_provider import get_config_provider
+from src.core.schemas import Requirements
+from src.core.work_queue import Job, LeaseLost, WorkQueue, build_work_queue
+
+JobProcessor = Callable[[Job], Tuple[Dict[str, Any], Dict[str, float]]]
+
+
+class BatchWorker:
+    def __init__(
+        self,
+        queue: WorkQueue,
+        process: JobProcessor,
+        worker_id: Optional[str] = None,
+        batch: Optional[str] = None,
+        lease_seconds: float = 300,
+        heartbeat_seconds: float = 30,
+        poll_seconds: float = 1.0,
+        retry_delay_seconds: float = 10,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.queue = queue
+        self.process = process
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch = batch
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self._log = logger or logging.getLogger("solution-architect.batch")
+
+    def run(self, stop: Optional[threading.Event] = None, max_jobs: Optional[int] = None, exit_when_idle: bool = True) -> int:
+        """Procesa trabajos hasta `stop`, `max_jobs` o (con `exit_when_idle`) que no quede nada pendiente ni en curso."""
+        stop = stop or threading.Event()
+        processed = 0
+        while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+            jobs = self.queue.claim(self.worker_id, self.lease_seconds, batch=self.batch)
+            if not jobs:
+                # Con trabajos en curso de otros workers se sigue esperando: si alguno muere, su lease vence aqui.
+                if exit_when_idle and self.queue.outstanding(self.batch) == 0:
+                    break
+                stop.wait(self.poll_seconds)
+                continue
+            for job in jobs:
+                self._run_job(job)
+                processed += 1
+        return processed
+
+    def _run_job(self, job: Job) -> None:
+        finished = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, finished), name="batch-heartbeat", daemon=True)
+        beat.start()
+        started = time.perf_counter()
+        try:
+            result, timings = self.process(job)
+        except Exception as exc:
+            self._discard(job)
+            if job.lease_lost.is_set():
+                self._log.warning("Lease de %s perdida durante el trabajo; se aborta", job.id)
+                return
+            error = f"{type(exc).__name__}: {exc}"
+            self._log.warning("Trabajo %s fallo (intento %d/%d): %s", job.id, job.attempts, job.max_attempts, error)
+            self.queue.fail(job.id, self.worker_id, error, self.retry_delay_seconds)
+            return
+        finally:
+            finished.set()
+            beat.join()
+        # La publicacion corre dentro de una lease recien renovada: solo el duenio escribe la salida final.
+        if job.lease_lost.is_set() or not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds):
+            self._discard(job)
+            self._log.warning("Lease de %s perdida; otro worker lo retomo y se descarta este resultado", job.id)
+            return
+        commit = getattr(self.process, "commit", None)
+        if commit is not None:
+            try:
+                commit(job)
+            except Exception as exc:
+                self._discard(job)
+                error = f"{type(exc).__name__}: {exc}"
+                self._log.warning("No se pudo publicar %s: %s", job.id, error)
+                self.queue.fail(job.id, self.worker_id, error, self.retry_delay_seconds)
+                return
+        timings = {**timings, "total": time.perf_counter() - started}
+        if not self.queue.complete(job.id, self.worker_id, result, timings):
+            self._log.error("Lease de %s perdida tras publicar; el trabajo se reprocesara", job.id)
+
+    def _discard(self, job: Job) -> None:
+        discard = getattr(self.process, "discard", None)
+        if discard is not None:
+            discard(job)
+
+    def _heartbeat(self, job: Job, finished: threading.Event) -> None:
+        while not finished.wait(self.heartbeat_seconds):
+            if not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds):
+                job.lease_lost.set()
+                return
+
+
+class PipelineJobProcessor:
+    """Ejecuta la canalizacion completa para el `Requirements` del trabajo, con estado caliente.
+
+    La salida se escribe en `<output_root>/.staging/<intento>/<job.id>`; `commit` la mueve a
+    `<output_root>/<job.id>` y agrega la propuesta al sink columnar (al journal del sink; los
+    chunks se escriben cada `chunk_rows` filas o al cerrar), `discard` la borra.
+    """
+
+    def __init__(self, config_path: str, output_root: Path, sink: Optional[ColumnarSink] = None) -> None:
+        from src.daemon import WarmState
+
+        self.config_path = config_path
+        self.output_root = Path(output_root)
+        self.sink = sink
+        self.state = WarmState(get_config_provider(config_path))
+        self._staged: Dict[str, Tuple[Path, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, job: Job) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        if job.lease_lost.is_set():
+            raise LeaseLost(job.id)
+        trace_id = new_trace_id()
+        logger = get_logger("solution-architect", request_id=trace_id)
+        staging = self.output_root / ".staging" / uuid.uuid4().hex
+        with self._lock:
+            self._staged[job.id] = (staging, None)
+        with tempfile.TemporaryDirectory(prefix="batch-") as tmp:
+            input_path = Path(tmp) / "requirements.json"
+            input_path.write_text(json.dumps(job.payload["requirements"], ensure_ascii=False), encoding="utf-8")
+            args = argparse.Namespace(
+                input=str(input_path),
+                config=self.config_path,
+                output=str(staging / job.id),
+                archive=None,
+                archive_format="zip",
+                slo_seconds=None,
+                profile=False,
+                profile_memory=False,
+            )
+            run = self.state.run(args, logger, trace_id)
+        if job.lease_lost.is_set():
+            raise LeaseLost(job.id)
+        warnings = run.results["deadline"].warnings
+        proposal = run.results["propose"]
+        if warnings:
+            proposal = proposal.model_copy(update={"warnings": warnings})
+        with self._lock:
+            self._staged[job.id] = (staging, proposal)
+        written = run.results["write"]
+        location = written.location
+        if Path(location) == (staging / job.id).resolve():
+            location = str((self.output_root / job.id).resolve())
+        result = {
+            "trace_id": trace_id,
+            "location": location,
+            "written": len(written.written),
+            "mode": run.results["client"].mode,
+            "warnings": warnings,
+        }
+        return result, {name: timing.duration for name, timing in run.timings.items()}
+
+    def commit(self, job: Job) -> None:
+        with self._lock:
+            staging, proposal = self._staged.pop(job.id)
+        source, target = staging / job.id, self.output_root / job.id
+        if source.exists():
+            if target.exists():
+                shutil.rmtree(target)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+        shutil.rmtree(staging, ignore_errors=True)
+        if self.sink is not None:
+            # El journal del sink hace durable la propuesta antes de `complete()`; si el
+            # worker muere antes de marcarla, se reprocesa y la consulta descarta el duplicado.
+            self.sink.append(job.id, proposal)
+
+    def discard(self, job: Job) -> None:
+        with self._lock:
+            staged = self._staged.pop(job.id, None)
+        if staged is not None:
+            shutil.rmtree(staged[0], ignore_errors=True)
+
+
+def iter_requirement_files(paths: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(nombre, payload) por cada JSON de `paths` (archivos o directorios); valida cada uno."""
+    for raw in paths:
+        path = Path(raw)
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            payload = json.loads(file.read_text(encoding="utf-8"))
+            Requirements(**payload)
+            yield file.stem, {"requirements": payload}
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lotes sobre la cola compartida de trabajos.")
+    parser.add_argument("--config", default="config/config.yml", help="Ruta a config YAML")
+    parser.add_argument("--batch", default=None, help="Nombre del lote (por defecto, todos).")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Encola un trabajo por archivo de Requirements.")
+    enqueue.add_argument("paths", nargs="+")
+    enqueue.add_argument("--max-attempts", type=int, default=None)
+
+    work = commands.add_parser("work", help="Procesa trabajos hasta vaciar la cola.")
+    work.add_argument("--output", default="data/batch", help="Directorio base (un subdirectorio por trabajo).")
+    work.add_argument("--max-jobs", type=int, default=None)
+    work.add_argument("--forever", action="store_true", help="No termina cuando la cola queda vacia.")
+    work.add_argument("--columnar", default=None, help="Directorio donde agregar las propuestas en formato columnar.")
+    work.add_argument("--columnar-format", choices=["auto", "parquet", "npz"], default="auto")
+
+    commands.add_parser("status", help="Conteos por estado, throughput y tiempos por etapa.")
+    commands.add_parser("dead", help="Trabajos en dead-letter.")
+
+    query = commands.add_parser("query", help="Group-by/count sobre el export columnar.")
+    query.add_argument("directory")
+    query.add_argument("--table", choices=list(TABLES), default="proposals")
+    query.add_argument("--by", action="append", default=[], help="Columna de texto para agrupar (repetible).")
+    query.add_argument("--where", action="append", default=[], help="Filtro columna=valor (repetible).")
+    query.add_argument("--value", default=None, help="Columna numerica a sumar/promediar por grupo.")
+    query.add_argument("--describe", default=None, help="Percentiles de una columna numerica en lugar de agrupar.")
+    query.add_argument("--top", type=int, default=20)
+    return parser.parse_args()
+
+
+def run_query(args: argparse.Namespace) -> Any:
+    dataset = ColumnarDataset(Path(args.directory))
+    where = dict(item.split("=", 1) for item in args.where)
+    if args.describe:
+        return dataset.describe(args.table, args.describe, where=where)
+    if not args.by:
+        return {"rows": dataset.row_counts()}
+    return dataset.group_count(args.table, args.by, where=where, value=args.value, top=args.top)
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.command == "query":
+        try:
+            output = run_query(args)
+        except (FileNotFoundError, ValueError) as exc:
+            raise SystemExit(str(exc))
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+        return
+    config = get_config_provider(args.config).get()
+    settings = config.queue
+    configure_logging(config.logging.format, use_queue=config.logging.queue, level=config.logging.level)
+    logger = get_logger("solution-architect.batch")
+    with build_work_queue(settings) as queue:
+        if args.command == "enqueue":
+            if not args.batch:
+                raise SystemExit("enqueue requiere --batch")
+            items = list(iter_requirement_files(args.paths))
+            added = queue.enqueue(args.batch, items, max_attempts=args.max_attempts or settings.max_attempts)
+            logger.info("Lote %s: %d trabajos encolados (%d ya existian)", args.batch, added, len(items) - added)
+            return
+        if args.command == "work":
+            sink = ColumnarSink(Path(args.columnar), fmt=args.columnar_format, journal=True) if args.columnar else None
+            worker = BatchWorker(
+                queue,
+                PipelineJobProcessor(args.config, Path(args.output), sink=sink),
+                batch=args.batch,
+                lease_seconds=settings.lease_seconds,
+                heartbeat_seconds=settings.heartbeat_seconds,
+                poll_seconds=settings.poll_seconds,
+                retry_delay_seconds=settings.retry_delay_seconds,
+                logger=logger,
+            )
+            logger.info("Worker %s listo (lote=%s)", worker.worker_id, args.batch or "todos")
+            try:
+                processed = worker.run(max_jobs=args.max_jobs, exit_when_idle=not args.forever)
+            finally:
+                if sink is not None:
+                    sink.close()
+            logger.info("Worker %s termino: %d trabajos", worker.worker_id, processed)
+            return
+        if args.command == "status":
+            output: Any = queue.summary(args.batch)
+        else:
+            output = [
+                {"id": record.id, "attempts": record.attempts, "worker": record.worker, "error": record.error}
+                for record in queue.dead_letters(args.batch)
+            ]
+    if args.json or args.command == "status":
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    else:
+        for row in output:
+            print(f"{row['id']}  intentos={row['attempts']}  worker={row['worker']}  {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Regeneracion nocturna por la batch API del proveedor (mitad de costo, sin rate limit sincrono).
+
+    python -m src.bulk run proyectos/ --output data/bulk     # submit + espera + collect
+    python -m src.bulk submit proyectos/                     # sube el JSONL y crea los trabajos
+    python -m src.bulk status batch_abc123
+    python -m src.bulk collect batch_abc123 --output data/bulk
+    python -m src.bulk cancel batch_abc123
+
+Los prompts se arman con el mismo `SolutionArchitectAgent` que usa `propose`,
+una linea por archivo de `Requirements` (`custom_id` = nombre del archivo).
+Por cada trabajo se guardan en `bulk.work_dir` el JSONL enviado, un manifiesto
+con los requerimientos (para retomar `collect` en otro proceso) y el reporte.
+Cada respuesta se valida y persiste como una ejecucion normal
+(`ensure_no_gateway_in_proposal` + `write_docs`, un subdirectorio por
+`custom_id`); las invalidas o con error quedan en el reporte y no se reparan
+con llamadas sincronas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from monitoring.logger import configure_logging, get_logger
+from monitoring.metrics import metrics
+from src.agent import SolutionArchitectAgent, write_docs
+from src.batch import iter_requirement_files
+from src.core.batch_api import BatchAPIClient, BatchJob, parse_results
+from src.core.config import AppConfig
+from src.core.config_provider import get_config_provider
+from src.core.pricing_catalog import PricingCatalog
+from src.core.schemas import Requirements
+from src.core.storage import build_store
+
+
+@dataclass
+class BulkReport:
+    batch_id: str
+    status: str
+    written: Dict[str, str] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class BulkRunner:
+    def __init__(
+        self,
+        config: AppConfig,
+        client: BatchAPIClient,
+        agent: Optional[SolutionArchitectAgent] = None,
+        logger: Optional[logging.Logger] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.config = config
+        self.client = client
+        # Sin reparaciones: cada una seria una llamada sincrona, justo lo que este modo evita.
+        self.agent = agent or SolutionArchitectAgent(max_repair_attempts=0)
+        self.work_dir = Path(config.bulk.work_dir)
+        self._log = logger or logging.getLogger("solution-architect.bulk")
+        self._sleep = sleep
+        catalog_path = config.cost.catalog_path
+        self._catalog = PricingCatalog(Path(catalog_path)) if catalog_path and Path(catalog_path).exists() else None
+
+    def submit(self, items: List[Tuple[str, Requirements]]) -> List[BatchJob]:
+        """Un trabajo por cada `bulk.max_requests_per_batch` requerimientos."""
+        names = [name for name, _ in items]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"custom_id repetidos: {', '.join(duplicated)}")
+        settings = self.config.bulk
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        jobs = []
+        size = max(1, settings.max_requests_per_batch)
+        for start in range(0, len(items), size):
+            chunk = items[start:start + size]
+            content = self.client.build_batch_file(
+                (name, self.agent.build_messages(requirements)) for name, requirements in chunk
+            )
+            draft = self.work_dir / f"input-{uuid.uuid4().hex[:8]}.jsonl"
+            draft.write_bytes(content)
+            file_id = self.client.upload(draft.name, content)
+            job = self.client.create(file_id, settings.completion_window, metadata={"source": "solution-architect"})
+            draft.replace(self.work_dir / f"{job.id}.jsonl")
+            manifest = {
+                "batch_id": job.id,
+                "input_file_id": file_id,
+                "submitted_at": time.time(),
+                "model": self.client.model,
+                "endpoint": self.client.endpoint,
+                "items": {name: requirements.model_dump() for name, requirements in chunk},
+            }
+            self._manifest_path(job.id).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+            metrics.increment("bulk.requests", len(chunk))
+            self._log.info("Trabajo %s creado con %d solicitudes (%s)", job.id, len(chunk), file_id)
+            jobs.append(job)
+        return jobs
+
+    def wait(self, batch_id: str) -> BatchJob:
+        settings = self.config.bulk
+        seen: Dict[str, Any] = {}
+
+        def on_poll(job: BatchJob) -> None:
+            if (job.status, job.request_counts) != (seen.get("status"), seen.get("counts")):
+                self._log.info("Trabajo %s: %s %s", batch_id, job.status, job.request_counts)
+                seen.update(status=job.status, counts=dict(job.request_counts))
+
+        return self.client.wait(
+            batch_id,
+            poll_seconds=settings.poll_seconds,
+            max_poll_seconds=settings.max_poll_seconds,
+            timeout=settings.max_wait_hours * 3600,
+            sleep=self._sleep,
+            on_poll=on_poll,
+        )
+
+    def collect(self, batch_id: str, output_root: Path, job: Optional[BatchJob] = None) -> BulkReport:
+        """Descarga los resultados de un trabajo terminado, los valida y escribe los artefactos."""
+        manifest = json.loads(self._manifest_path(batch_id).read_text(encoding="utf-8"))
+        job = job or self.client.get(batch_id)
+        if not job.done:
+            raise RuntimeError(f"El trabajo {batch_id} sigue en '{job.status}'")
+        report = BulkReport(batch_id=batch_id, status=job.status)
+        files = [self.client.content(file_id) for file_id in (job.output_file_id, job.error_file_id) if file_id]
+        pending = dict(manifest["items"])
+        for result in parse_results(*files):
+            payload = pending.pop(result.custom_id, None)
+            if payload is None:
+                self._log.warning("Resultado con custom_id desconocido en %s: %s", batch_id, result.custom_id)
+                continue
+            if not result.ok:
+                report.failed[result.custom_id] = result.error or "respuesta sin contenido"
+                continue
+            usage = result.body.get("usage") or {}
+            report.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            report.completion_tokens += int(usage.get("completion_tokens") or 0)
+            try:
+                report.written[result.custom_id] = self._persist(result.custom_id, Requirements(**payload), result.body, output_root)
+            except Exception as exc:
+                # Un item que falla (respuesta invalida, error de escritura) no corta el resto del lote.
+                self._log.warning("No se pudo persistir %s de %s: %s", result.custom_id, batch_id, exc)
+                report.failed[result.custom_id] = f"{type(exc).__name__}: {exc}"
+        report.missing = sorted(pending)
+        if job.errors:
+            report.failed.update({name: "; ".join(job.errors) for name in report.missing})
+        metrics.increment("bulk.written", len(report.written))
+        metrics.increment("bulk.failed", len(report.failed))
+        metrics.increment("bulk.tokens.prompt", report.prompt_tokens)
+        metrics.increment("bulk.tokens.completion", report.completion_tokens)
+        path = self.work_dir / f"{batch_id}.report.json"
+        path.write_text(json.dumps(report.as_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        self._log.info(
+            "Trabajo %s: %d escritas, %d fallidas, %d sin resultado (reporte en %s)",
+            batch_id, len(report.written), len(report.failed), len(report.missing), path,
+        )
+        return report
+
+    def run(self, items: List[Tuple[str, Requirements]], output_root: Path) -> List[BulkReport]:
+        return [self.collect(job.id, output_root, self.wait(job.id)) for job in self.submit(items)]
+
+    def _persist(self, custom_id: str, requirements: Requirements, body: Dict[str, Any], output_root: Path) -> str:
+        proposal = self.agent.proposal_from_response(body)
+        target = (output_root / custom_id).resolve()
+        result = write_docs(
+            target,
+            proposal,
+            resources=requirements.resources or None,
+            logger=self._log,
+            catalog=self._catalog,
+            region=requirements.regions[0] if requirements.regions else None,
+            store=build_store(self.config.storage, target),
+        )
+        return result.location
+
+    def _manifest_path(self, batch_id: str) -> Path:
+        return self.work_dir / f"{batch_id}.json"
+
+
+def load_items(paths: List[str]) -> List[Tuple[str, Requirements]]:
+    return [(name, Requirements(**payload["requirements"])) for name, payload in iter_requirement_files(paths)]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generacion masiva por la batch API del proveedor.")
+    parser.add_argument("--config", default="config/config.yml", help="Ruta a config YAML")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Envia, espera y escribe los resultados.")
+    run.add_argument("paths", nargs="+", help="Archivos o directorios con JSON de Requirements.")
+    run.add_argument("--output", default="data/bulk", help="Directorio base (un subdirectorio por requerimiento).")
+
+    submit = commands.add_parser("submit", help="Sube el JSONL y crea los trabajos.")
+    submit.add_argument("paths", nargs="+")
+
+    status = commands.add_parser("status", help="Estado y conteos de un trabajo.")
+    status.add_argument("batch_id")
+
+    collect = commands.add_parser("collect", help="Espera un trabajo y escribe sus resultados.")
+    collect.add_argument("batch_id")
+    collect.add_argument("--output", default="data/bulk")
+    collect.add_argument("--no-wait", action="store_true", help="Falla si el trabajo no termino.")
+
+    cancel = commands.add_parser("cancel", help="Cancela un trabajo.")
+    cancel.add_argument("batch_id")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    config = get_config_provider(args.config).get()
+    configure_logging(config.logging.format, use_queue=config.logging.queue, level=config.logging.level)
+    runner = BulkRunner(config, BatchAPIClient.from_config(config.llm, config.bulk), logger=get_logger("solution-architect.bulk"))
+    if args.command == "run":
+        output: Any = [report.as_dict() for report in runner.run(load_items(args.paths), Path(args.output))]
+    elif args.command == "submit":
+        output = [{"batch_id": job.id, "status": job.status} for job in runner.submit(load_items(args.paths))]
+    elif args.command == "status":
+        output = asdict(runner.client.get(args.batch_id))
+    elif args.command == "collect":
+        job = None if args.no_wait else runner.wait(args.batch_id)
+        output = runner.collect(args.batch_id, Path(args.output), job).as_dict()
+    else:
+        output = asdict(runner.client.cancel(args.batch_id))
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
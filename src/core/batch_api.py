@@ -0,0 +1,229 @@
+"""Cliente minimo de la batch API de OpenAI / Azure OpenAI (solo stdlib).
+
+Flujo: `build_batch_file` arma el JSONL (una solicitud de chat-completions por
+linea, identificada por `custom_id`), `upload` lo sube con `purpose=batch`,
+`create` crea el trabajo, `wait` consulta el estado con espera exponencial
+hasta un estado terminal y `content` descarga los archivos de salida y de
+errores, que `parse_results` convierte en un `BatchResult` por solicitud.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from src.core.config import BulkConfig, LLMConfig
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchAPIError(RuntimeError):
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class BatchJob:
+    id: str
+    status: str
+    input_file_id: str = ""
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    request_counts: Dict[str, int] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "BatchJob":
+        errors = (payload.get("errors") or {}).get("data") or []
+        return cls(
+            id=payload["id"],
+            status=payload.get("status", ""),
+            input_file_id=payload.get("input_file_id", ""),
+            output_file_id=payload.get("output_file_id"),
+            error_file_id=payload.get("error_file_id"),
+            request_counts=dict(payload.get("request_counts") or {}),
+            errors=[item.get("message", str(item)) for item in errors],
+        )
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    status_code: Optional[int]
+    body: Dict[str, Any]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code == 200
+
+
+class BatchAPIClient:
+    def __init__(
+        self,
+        base_url: str,
+        headers: Mapping[str, str],
+        query: Optional[Mapping[str, str]] = None,
+        model: str = "",
+        endpoint: str = "/v1/chat/completions",
+        timeout: float = 60.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers)
+        self.query = dict(query or {})
+        self.model = model
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, llm: LLMConfig, bulk: BulkConfig) -> "BatchAPIClient":
+        provider = llm.provider.lower()
+        if provider == "openai":
+            api_key = os.getenv(llm.api_key_env)
+            if not api_key:
+                raise ValueError(f"Falta la variable de entorno {llm.api_key_env} para OpenAI.")
+            return cls(
+                llm.api_base or "https://api.openai.com/v1",
+                {"Authorization": f"Bearer {api_key}"},
+                model=llm.model,
+                endpoint=bulk.endpoint or "/v1/chat/completions",
+                timeout=bulk.request_timeout_seconds,
+            )
+        if provider == "azure":
+            azure = llm.azure
+            api_key = os.getenv(azure.api_key_env)
+            if not api_key:
+                raise ValueError(f"Falta la variable de entorno {azure.api_key_env} para Azure OpenAI.")
+            if not azure.endpoint or not azure.deployment_name:
+                raise ValueError("Configura azure.endpoint y azure.deployment_name en config.yml.")
+            # En Azure el modelo de cada linea es el deployment (de tipo Global-Batch).
+            return cls(
+                f"{azure.endpoint.rstrip('/')}/openai",
+                {"api-key": api_key},
+                query={"api-version": bulk.azure_api_version},
+                model=azure.deployment_name,
+                endpoint=bulk.endpoint or "/chat/completions",
+                timeout=bulk.request_timeout_seconds,
+            )
+        raise ValueError(f"Proveedor LLM no soportado: {llm.provider}")
+
+    def build_batch_file(self, requests: Iterable[Tuple[str, List[Dict[str, str]]]]) -> bytes:
+        """JSONL con una solicitud por (custom_id, messages)."""
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.endpoint,
+                    "body": {"model": self.model, "messages": messages},
+                },
+                ensure_ascii=False,
+            )
+            for custom_id, messages in requests
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def upload(self, filename: str, content: bytes) -> str:
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            [
+                f'--{boundary}\r\nContent-Disposition: form-data; name="purpose"\r\n\r\nbatch\r\n'.encode(),
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode(),
+                b"Content-Type: application/jsonl\r\n\r\n",
+                content,
+                f"\r\n--{boundary}--\r\n".encode(),
+            ]
+        )
+        payload = self._request("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        return payload["id"]
+
+    def create(self, input_file_id: str, completion_window: str = "24h", metadata: Optional[Dict[str, str]] = None) -> BatchJob:
+        body = {"input_file_id": input_file_id, "endpoint": self.endpoint, "completion_window": completion_window}
+        if metadata:
+            body["metadata"] = metadata
+        return BatchJob.from_payload(self._request("POST", "/batches", json.dumps(body).encode("utf-8")))
+
+    def get(self, batch_id: str) -> BatchJob:
+        return BatchJob.from_payload(self._request("GET", f"/batches/{batch_id}"))
+
+    def cancel(self, batch_id: str) -> BatchJob:
+        return BatchJob.from_payload(self._request("POST", f"/batches/{batch_id}/cancel", b""))
+
+    def content(self, file_id: str) -> bytes:
+        return self._request("GET", f"/files/{file_id}/content", raw=True)
+
+    def wait(
+        self,
+        batch_id: str,
+        poll_seconds: float = 30.0,
+        max_poll_seconds: float = 300.0,
+        timeout: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        on_poll: Optional[Callable[[BatchJob], None]] = None,
+    ) -> BatchJob:
+        """Consulta hasta un estado terminal; la espera se duplica en cada consulta hasta `max_poll_seconds`."""
+        started = clock()
+        delay = poll_seconds
+        while True:
+            job = self.get(batch_id)
+            if on_poll is not None:
+                on_poll(job)
+            if job.done:
+                return job
+            if timeout is not None and clock() - started + delay > timeout:
+                raise TimeoutError(f"El trabajo {batch_id} sigue en '{job.status}' tras {timeout:.0f}s")
+            sleep(delay)
+            delay = min(delay * 2, max_poll_seconds)
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None, content_type: str = "application/json", raw: bool = False) -> Any:
+        url = f"{self.base_url}{path}"
+        if self.query:
+            url = f"{url}?{urllib.parse.urlencode(self.query)}"
+        headers = dict(self.headers)
+        if body is not None:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(url, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = response.read()
+        except urllib.error.HTTPError as exc:
+            detail = exc.read().decode("utf-8", "replace")[:500]
+            raise BatchAPIError(f"{method} {path}: HTTP {exc.code} {detail}", status=exc.code) from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise BatchAPIError(f"{method} {path}: {getattr(exc, 'reason', exc)}") from exc
+        return data if raw else json.loads(data)
+
+
+def parse_results(*files: bytes) -> Iterator[BatchResult]:
+    """Un `BatchResult` por linea de los archivos de salida y de errores."""
+    for data in files:
+        for line in data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            body = response.get("body") or {}
+            error = item.get("error")
+            if error:
+                message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            elif response.get("status_code") != 200:
+                detail = body.get("error") if isinstance(body, dict) else None
+                if isinstance(detail, dict):
+                    detail = detail.get("message")
+                message = f"HTTP {response.get('status_code')}: {detail or body}"
+            else:
+                message = None
+            yield BatchResult(item.get("custom_id", ""), response.get("status_code"), body, message)
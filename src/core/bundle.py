@@ -0,0 +1,123 @@
+"""Bundle de artefactos en memoria y salida como archivo zip/tar en streaming.
+
+Los artefactos renderizados ({ruta relativa: bytes}) se empaquetan sin pasar
+por disco: `write_to()` escribe el archivo en cualquier objeto con `write()`
+(archivo, socket, stdout) aunque no admita `seek`, e `iter_archive()` entrega
+el archivo por fragmentos para respuestas HTTP en streaming. El primer miembro
+es `manifest.json` con el tamano y el sha256 de cada artefacto.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List
+
+from src.core.storage import MANIFEST_NAME
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz")
+_MANIFEST_VERSION = 1
+
+
+@dataclass
+class ArtifactBundle:
+    artifacts: Dict[str, bytes]
+    created_at: float = field(default_factory=time.time)
+
+    def manifest(self) -> Dict[str, Any]:
+        return {
+            "version": _MANIFEST_VERSION,
+            "artifacts": {
+                path: {"sha256": hashlib.sha256(content).hexdigest(), "size": len(content)}
+                for path, content in sorted(self.artifacts.items())
+            },
+        }
+
+    def manifest_bytes(self) -> bytes:
+        return json.dumps(self.manifest(), ensure_ascii=False, indent=2).encode("utf-8")
+
+    @property
+    def total_size(self) -> int:
+        return sum(len(content) for content in self.artifacts.values())
+
+    def write_to(self, fileobj: BinaryIO, fmt: str = "zip") -> int:
+        """Escribe el archivo en `fileobj` (no necesita `seek`); devuelve los bytes escritos."""
+        sink = _Sink(fileobj)
+        for _ in self._write_members(sink, fmt):
+            pass
+        return sink.written
+
+    def iter_archive(self, fmt: str = "zip") -> Iterator[bytes]:
+        """Genera el archivo por fragmentos, uno o mas por artefacto."""
+        sink = _Sink()
+        for _ in self._write_members(sink, fmt):
+            yield from sink.drain()
+        yield from sink.drain()
+
+    def to_bytes(self, fmt: str = "zip") -> bytes:
+        return b"".join(self.iter_archive(fmt))
+
+    def _members(self) -> List[tuple]:
+        return [(MANIFEST_NAME, self.manifest_bytes()), *sorted(self.artifacts.items())]
+
+    def _write_members(self, sink: "_Sink", fmt: str) -> Iterator[str]:
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"formato de archivo no soportado: {fmt} (use {', '.join(ARCHIVE_FORMATS)})")
+        if fmt == "zip":
+            timestamp = time.localtime(self.created_at)[:6]
+            with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, content in self._members():
+                    info = zipfile.ZipInfo(name, date_time=timestamp)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    archive.writestr(info, content)
+                    yield name
+            return
+        # Modo stream ("w|"): tarfile no intenta volver atras en `fileobj`.
+        with tarfile.open(fileobj=sink, mode="w|gz" if fmt == "tar.gz" else "w|") as archive:
+            for name, content in self._members():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mtime = int(self.created_at)
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(content))
+                yield name
+
+
+class _Sink(io.RawIOBase):
+    """Destino de solo escritura que cuenta bytes; sin `fileobj` acumula fragmentos."""
+
+    def __init__(self, fileobj: BinaryIO | None = None) -> None:
+        super().__init__()
+        self._fileobj = fileobj
+        self._chunks: List[bytes] = []
+        self.written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        if self._fileobj is not None:
+            self._fileobj.write(chunk)
+        else:
+            self._chunks.append(chunk)
+        self.written += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.written
+
+    def flush(self) -> None:
+        if self._fileobj is not None and hasattr(self._fileobj, "flush"):
+            self._fileobj.flush()
+
+    def drain(self) -> Iterator[bytes]:
+        if self._chunks:
+            chunks, self._chunks = self._chunks, []
+            yield b"".join(chunks)
@@ -0,0 +1,175 @@
+"""Grabacion y reproduccion de intercambios con el LLM (cassettes).
+
+En modo `record` cada llamada de `SolutionArchitectAgent._call_model` guarda el
+prompt, la respuesta, el uso de tokens y la latencia; en modo `replay` se
+sirven esas respuestas sin red ni cliente de modelo, opcionalmente con la
+latencia grabada. El cassette es un SQLite con prompt y respuesta comprimidos
+(zlib) e indexado por el sha256 de los mensajes; si un mismo prompt se grabo
+varias veces, la reproduccion recorre sus respuestas en orden.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.config import CassetteConfig
+from src.core.deadline import Deadline, DeadlineExceeded
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS exchanges (
+    prompt_hash TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    prompt BLOB NOT NULL,
+    response BLOB NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    latency REAL NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (prompt_hash, seq)
+) WITHOUT ROWID;
+"""
+
+
+class CassetteMiss(LookupError):
+    """El prompt no esta en el cassette (modo replay)."""
+
+
+@dataclass
+class Exchange:
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float
+
+    def as_response(self) -> Dict[str, Any]:
+        """Respuesta con la forma que entiende `_extract_content`/`_extract_usage`."""
+        return {
+            "content": self.content,
+            "usage": {"prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens},
+        }
+
+
+def prompt_hash(messages: List[Dict[str, Any]]) -> str:
+    data = json.dumps(messages, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "replay",
+        replay_latency: bool = False,
+        latency_scale: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"modo de cassette no soportado: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+        self._sleep = sleep
+        if mode == "replay" and not self.path.exists():
+            raise FileNotFoundError(f"No se encontro el cassette: {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._counts: Dict[str, int] = {}
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def record(
+        self, messages: List[Dict[str, Any]], content: str, prompt_tokens: int, completion_tokens: int, latency: float
+    ) -> None:
+        key = prompt_hash(messages)
+        prompt = zlib.compress(json.dumps(messages, ensure_ascii=False).encode("utf-8"))
+        with self._lock, self._conn:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM exchanges WHERE prompt_hash = ?", (key,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO exchanges VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    seq,
+                    prompt,
+                    zlib.compress(content.encode("utf-8")),
+                    prompt_tokens,
+                    completion_tokens,
+                    latency,
+                    time.time(),
+                ),
+            )
+            self._counts.pop(key, None)
+
+    def lookup(self, messages: List[Dict[str, Any]]) -> Exchange:
+        """Siguiente respuesta grabada para `messages`; las repetidas se sirven en orden y en ciclo."""
+        key = prompt_hash(messages)
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                count = self._conn.execute(
+                    "SELECT COUNT(*) FROM exchanges WHERE prompt_hash = ?", (key,)
+                ).fetchone()[0]
+                self._counts[key] = count
+            if not count:
+                raise CassetteMiss(f"Prompt {key[:12]} no grabado en {self.path}.")
+            seq = self._cursors[key] % count
+            self._cursors[key] += 1
+            row = self._conn.execute(
+                "SELECT response, prompt_tokens, completion_tokens, latency FROM exchanges "
+                "WHERE prompt_hash = ? ORDER BY seq LIMIT 1 OFFSET ?",
+                (key, seq),
+            ).fetchone()
+        response, prompt_tokens, completion_tokens, latency = row
+        return Exchange(zlib.decompress(response).decode("utf-8"), prompt_tokens, completion_tokens, latency)
+
+    def replay(self, messages: List[Dict[str, Any]], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        exchange = self.lookup(messages)
+        if self.replay_latency and exchange.latency > 0:
+            delay = exchange.latency * self.latency_scale
+            timeout = deadline.timeout() if deadline is not None else None
+            if timeout is not None and delay > timeout:
+                self._sleep(timeout)
+                raise DeadlineExceeded("Se agoto el tiempo de la etapa generate.")
+            self._sleep(delay)
+        return exchange.as_response()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def build_cassette(config: CassetteConfig) -> Optional[Cassette]:
+    mode = (config.mode or "off").strip().lower()
+    if mode == "off":
+        return None
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"cassette.mode no soportado: {config.mode}")
+    return Cassette(
+        Path(config.path),
+        mode=mode,
+        replay_latency=config.replay_latency,
+        latency_scale=config.latency_scale,
+    )
@@ -0,0 +1,501 @@
+"""Exportacion columnar de las propuestas de un lote y agregaciones group-by.
+
+`ColumnarSink` aplana cada `SolutionProposal` en tablas (`TABLES`: una fila por
+propuesta, componente, item de backlog, riesgo, ADR y linea de costo) y
+acumula columnas en memoria; cada `chunk_rows` filas escribe un chunk por
+tabla. Las columnas de texto van con diccionario: codigos int32 mas la lista
+de valores distintos del chunk.
+
+Formato de los chunks: Parquet si `pyarrow` esta instalado (columnas
+`dictionary<int32, string>`), o `.npz` de NumPy (`<col>.codes` y el diccionario
+como un bloque UTF-8 con offsets). Cada sink nombra sus chunks con un id
+propio y los escribe a un temporal que luego renombra, de modo que varios
+workers pueden escribir en el mismo directorio y un lector nunca ve un chunk a
+medias. Todas las tablas se escriben juntas, con el mismo nombre de chunk.
+
+Las filas aun en memoria se pierden si el proceso muere sin `close()`, salvo
+con `journal=True`: cada propuesta se agrega antes (con fsync) a
+`.journal/<writer>.jsonl`, que se vacia al escribir los chunks; un sink que abre
+el directorio convierte en chunks los journals que encuentre de otros writers.
+
+`ColumnarDataset` lee solo las columnas pedidas, chunk a chunk; remapea los
+codigos de cada chunk a un diccionario global (un paso por valor distinto, no
+por fila) y cuenta con NumPy, sin crear objetos pydantic ni filas Python. Un
+`proposal_id` que aparece en varios chunks (trabajo reprocesado o journal
+recuperado) se cuenta solo en el primero, asi que reexportar es idempotente.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+import uuid
+from array import array
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from src.core.schemas import SolutionProposal
+
+TABLES: Dict[str, Dict[str, str]] = {
+    "proposals": {
+        "proposal_id": "str",
+        "currency": "str",
+        "p10": "f8",
+        "p50": "f8",
+        "p90": "f8",
+        "components": "i4",
+        "flows": "i4",
+        "adrs": "i4",
+        "backlog": "i4",
+        "risks": "i4",
+        "warnings": "i4",
+    },
+    "components": {"proposal_id": "str", "name": "str", "purpose": "str", "dependencies": "i4"},
+    "backlog": {"proposal_id": "str", "id": "str", "epic": "str", "priority": "str", "story": "str"},
+    "risks": {"proposal_id": "str", "id": "str", "description": "str", "impact": "str", "mitigation": "str"},
+    "adrs": {"proposal_id": "str", "id": "str", "title": "str", "decision": "str"},
+    "cost_lines": {"proposal_id": "str", "resource": "str", "driver": "str", "p10": "f8", "p50": "f8", "p90": "f8"},
+}
+
+# Columna de texto: (codigos, diccionario); numerica: ndarray.
+Column = Union[Tuple[np.ndarray, List[str]], np.ndarray]
+
+
+class _TableBuffer:
+    def __init__(self, columns: Dict[str, str]) -> None:
+        self.columns = columns
+        self.reset()
+
+    def reset(self) -> None:
+        self.rows = 0
+        self._codes = {name: array("i") for name, kind in self.columns.items() if kind == "str"}
+        self._dicts: Dict[str, Dict[str, int]] = {name: {} for name in self._codes}
+        self._numbers = {
+            name: array("d" if kind == "f8" else "i") for name, kind in self.columns.items() if kind != "str"
+        }
+
+    def append(self, *values: Any) -> None:
+        for (name, kind), value in zip(self.columns.items(), values):
+            if kind == "str":
+                dictionary = self._dicts[name]
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                self._codes[name].append(code)
+            else:
+                self._numbers[name].append(value)
+        self.rows += 1
+
+    def take(self) -> Dict[str, Column]:
+        chunk: Dict[str, Column] = {}
+        for name, kind in self.columns.items():
+            if kind == "str":
+                chunk[name] = (np.frombuffer(self._codes[name], dtype=np.int32).copy(), list(self._dicts[name]))
+            else:
+                chunk[name] = np.frombuffer(self._numbers[name], dtype=np.float64 if kind == "f8" else np.int32).copy()
+        self.reset()
+        return chunk
+
+
+class _NumpyChunks:
+    suffix = ".npz"
+
+    def write(self, handle, chunk: Dict[str, Column]) -> None:
+        arrays: Dict[str, np.ndarray] = {}
+        for name, column in chunk.items():
+            if isinstance(column, tuple):
+                codes, dictionary = column
+                arrays[f"{name}.codes"] = codes
+                arrays[f"{name}.dict"] = np.frombuffer("".join(dictionary).encode("utf-8"), dtype=np.uint8)
+                arrays[f"{name}.offsets"] = np.cumsum([0] + [len(value) for value in dictionary], dtype=np.int64)
+            else:
+                arrays[name] = column
+        np.savez(handle, **arrays)
+
+    def read(self, path: Path, names: Sequence[str]) -> Dict[str, Column]:
+        chunk: Dict[str, Column] = {}
+        with np.load(path) as data:
+            for name in names:
+                if f"{name}.codes" in data.files:
+                    text = data[f"{name}.dict"].tobytes().decode("utf-8")
+                    offsets = data[f"{name}.offsets"].tolist()
+                    dictionary = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+                    chunk[name] = (data[f"{name}.codes"], dictionary)
+                else:
+                    chunk[name] = data[name]
+        return chunk
+
+
+class _ParquetChunks:
+    suffix = ".parquet"
+
+    def write(self, handle, chunk: Dict[str, Column]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = {}
+        for name, column in chunk.items():
+            if isinstance(column, tuple):
+                codes, dictionary = column
+                arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(dictionary, type=pa.string()))
+            else:
+                arrays[name] = pa.array(column)
+        pq.write_table(pa.table(arrays), handle)
+
+    def read(self, path: Path, names: Sequence[str]) -> Dict[str, Column]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=list(names), read_dictionary=list(names))
+        chunk: Dict[str, Column] = {}
+        for name in names:
+            column = table.column(name)
+            if pa.types.is_dictionary(column.type):
+                column = column.unify_dictionaries()
+                pieces = column.chunks
+                codes = (
+                    np.concatenate([piece.indices.to_numpy(zero_copy_only=False) for piece in pieces])
+                    if pieces
+                    else np.empty(0, dtype=np.int32)
+                )
+                chunk[name] = (codes, pieces[0].dictionary.to_pylist() if pieces else [])
+            else:
+                chunk[name] = column.to_numpy()
+        return chunk
+
+
+_FORMATS = {".npz": _NumpyChunks(), ".parquet": _ParquetChunks()}
+
+
+def _chunk_format(fmt: str):
+    if fmt == "auto":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            return _FORMATS[".npz"]
+        return _FORMATS[".parquet"]
+    if fmt in ("npz", "parquet"):
+        return _FORMATS[f".{fmt}"]
+    raise ValueError(f"Formato columnar no soportado: {fmt}")
+
+
+class ColumnarSink:
+    def __init__(self, directory: Path, chunk_rows: int = 65_536, fmt: str = "auto", journal: bool = False) -> None:
+        self.directory = Path(directory)
+        self.chunk_rows = max(1, chunk_rows)
+        self._format = _chunk_format(fmt)
+        self._writer = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._buffers = {table: _TableBuffer(columns) for table, columns in TABLES.items()}
+        self._buffered: Set[str] = set()
+        self._journal_path = self.directory / ".journal" / f"{self._writer}.jsonl" if journal else None
+        self._journal: Optional[IO[str]] = None
+        self.proposals = 0
+        self.recovered = self._recover() if journal else 0
+
+    def append(self, proposal_id: str, proposal: SolutionProposal) -> None:
+        with self._lock:
+            if proposal_id in self._buffered:
+                return
+            if self._journal_path is not None:
+                self._journal_write(proposal_id, proposal)
+            self._add(proposal_id, proposal)
+            if any(buffer.rows >= self.chunk_rows for buffer in self._buffers.values()):
+                self._flush_all()
+
+    def flush(self) -> None:
+        with self._lock:
+            if any(buffer.rows for buffer in self._buffers.values()):
+                self._flush_all()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._journal_path is not None:
+                self._journal_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ColumnarSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _add(self, proposal_id: str, proposal: SolutionProposal) -> None:
+        cost = proposal.cost_estimate
+        buffers = self._buffers
+        buffers["proposals"].append(
+            proposal_id,
+            cost.currency,
+            _number(cost.p10),
+            _number(cost.p50),
+            _number(cost.p90),
+            len(proposal.components),
+            len(proposal.flows),
+            len(proposal.adrs),
+            len(proposal.backlog),
+            len(proposal.risks),
+            len(proposal.warnings),
+        )
+        components = buffers["components"]
+        for component in proposal.components:
+            components.append(proposal_id, component.name, component.purpose, len(component.dependencies))
+        backlog = buffers["backlog"]
+        for item in proposal.backlog:
+            backlog.append(proposal_id, item.id, item.epic, item.priority, item.story)
+        risks = buffers["risks"]
+        for risk in proposal.risks:
+            risks.append(proposal_id, risk.id, risk.description, risk.impact, risk.mitigation)
+        adrs = buffers["adrs"]
+        for adr in proposal.adrs:
+            adrs.append(proposal_id, adr.id, adr.title, adr.decision)
+        lines = buffers["cost_lines"]
+        for line in cost.breakdown:
+            lines.append(proposal_id, line.resource, line.driver, line.p10, line.p50, line.p90)
+        self._buffered.add(proposal_id)
+        self.proposals += 1
+
+    def _flush_all(self) -> None:
+        self._seq += 1
+        for table, buffer in self._buffers.items():
+            if buffer.rows:
+                self._write_chunk(table, buffer.take())
+        self._buffered.clear()
+        if self._journal is not None:
+            # Lo escrito ya esta en chunks: el journal vuelve a empezar.
+            self._journal.seek(0)
+            self._journal.truncate()
+            self._sync_journal()
+
+    def _write_chunk(self, table: str, chunk: Dict[str, Column]) -> None:
+        folder = self.directory / table
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"part-{self._writer}-{self._seq:05d}{self._format.suffix}"
+        temporary = folder / f".{path.name}.tmp"
+        buffer = io.BytesIO()
+        self._format.write(buffer, chunk)
+        temporary.write_bytes(buffer.getvalue())
+        os.replace(temporary, path)
+
+    def _journal_write(self, proposal_id: str, proposal: SolutionProposal) -> None:
+        # Si otro sink reclamo este journal (lo dio por huerfano), se empieza uno nuevo; sus
+        # filas ya quedaron en chunks y los duplicados se descartan al consultar.
+        if self._journal is None or not self._journal_path.exists():
+            if self._journal is not None:
+                self._journal.close()
+            self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = self._journal_path.open("a+", encoding="utf-8")
+        line = json.dumps({"id": proposal_id, "proposal": proposal.model_dump(mode="json")}, ensure_ascii=False)
+        self._journal.write(line + "\n")
+        self._sync_journal()
+
+    def _sync_journal(self) -> None:
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _recover(self) -> int:
+        """Convierte en chunks los journals de writers que no cerraron su sink."""
+        folder = self._journal_path.parent
+        if not folder.is_dir():
+            return 0
+        recovered = 0
+        for path in sorted(folder.glob("*.jsonl")):
+            if path == self._journal_path:
+                continue
+            claimed = path.with_name(f"{path.name}.recovering-{self._writer}")
+            try:
+                os.replace(path, claimed)
+            except OSError:
+                continue  # otro sink lo reclamo primero, o sigue abierto (Windows)
+            with claimed.open(encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # ultima linea a medio escribir
+                    self.append(entry["id"], SolutionProposal.model_validate(entry["proposal"]))
+                    recovered += 1
+            claimed.unlink()
+        return recovered
+
+
+def _number(value: Optional[float]) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class _GlobalDictionary:
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def remap(self, dictionary: List[str]) -> np.ndarray:
+        """Codigo global de cada valor del diccionario de un chunk."""
+        index = self._index
+        codes = np.empty(len(dictionary), dtype=np.int64)
+        for position, value in enumerate(dictionary):
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(self.values)
+                self.values.append(value)
+            codes[position] = code
+        return codes
+
+
+class ColumnarDataset:
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"No se encontro el directorio columnar: {self.directory}")
+
+    def chunks(self, table: str) -> List[Path]:
+        _columns(table)
+        folder = self.directory / table
+        if not folder.is_dir():
+            return []
+        return sorted(path for path in folder.iterdir() if path.name.startswith("part-") and path.suffix in _FORMATS)
+
+    def scan(self, table: str, names: Sequence[str]) -> Iterator[Dict[str, Column]]:
+        columns = _columns(table)
+        unknown = [name for name in names if name not in columns]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas en {table}: {', '.join(unknown)}")
+        unique = list(dict.fromkeys(["proposal_id", *names]))
+        seen: Set[str] = set()
+        for path in self.chunks(table):
+            chunk = _FORMATS[path.suffix].read(path, unique)
+            codes, dictionary = chunk["proposal_id"]
+            repeated = np.fromiter((value in seen for value in dictionary), dtype=bool, count=len(dictionary))
+            seen.update(dictionary)
+            if repeated.any():
+                # Propuestas ya leidas de un chunk anterior (reproceso o journal recuperado).
+                keep = ~repeated[codes]
+                chunk = {
+                    name: (column[0][keep], column[1]) if isinstance(column, tuple) else column[keep]
+                    for name, column in chunk.items()
+                }
+            yield chunk
+
+    def row_counts(self) -> Dict[str, int]:
+        counts = {}
+        for table, columns in TABLES.items():
+            first = next(iter(columns))
+            counts[table] = sum(len(_codes(chunk[first])) for chunk in self.scan(table, [first]))
+        return counts
+
+    def group_count(
+        self,
+        table: str,
+        by: Sequence[str],
+        where: Optional[Mapping[str, str]] = None,
+        value: Optional[str] = None,
+        top: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
+        """Filas por grupo de `by` (columnas de texto); con `value` (numerica) agrega suma y media."""
+        columns = _columns(table)
+        if not by:
+            raise ValueError("Se requiere al menos una columna para agrupar.")
+        for name in [*by, *(where or {})]:
+            if columns.get(name) != "str":
+                raise ValueError(f"{table}.{name} no es una columna de texto.")
+        if value is not None and columns.get(value) in (None, "str"):
+            raise ValueError(f"{table}.{value} no es una columna numerica.")
+        dictionaries = {name: _GlobalDictionary() for name in by}
+        counts: Dict[Tuple[int, ...], int] = {}
+        sums: Dict[Tuple[int, ...], float] = {}
+        names = [*by, *(where or {}), *([value] if value else [])]
+        for chunk in self.scan(table, names):
+            mask = _where_mask(chunk, where)
+            if mask is not None and not mask.any():
+                continue
+            keys = []
+            for name in by:
+                codes, dictionary = chunk[name]
+                keys.append(dictionaries[name].remap(dictionary)[codes])
+            weights = chunk[value] if value else None
+            if mask is not None:
+                keys = [key[mask] for key in keys]
+                weights = weights[mask] if weights is not None else None
+            sizes = [len(dictionaries[name].values) for name in by]
+            composite = np.ravel_multi_index(keys, sizes) if len(keys) > 1 else keys[0]
+            groups, inverse, group_counts = np.unique(composite, return_inverse=True, return_counts=True)
+            group_sums = np.bincount(inverse, weights=weights) if weights is not None else None
+            decoded = np.unravel_index(groups, sizes) if len(keys) > 1 else (groups,)
+            for position, key in enumerate(zip(*(part.tolist() for part in decoded))):
+                counts[key] = counts.get(key, 0) + int(group_counts[position])
+                if group_sums is not None:
+                    sums[key] = sums.get(key, 0.0) + float(group_sums[position])
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        if top is not None:
+            ordered = ordered[:top]
+        rows = []
+        for key, count in ordered:
+            row: Dict[str, Any] = {name: dictionaries[name].values[code] for name, code in zip(by, key)}
+            row["count"] = count
+            if value is not None:
+                row[f"sum_{value}"] = round(sums[key], 6)
+                row[f"mean_{value}"] = round(sums[key] / count, 6)
+            rows.append(row)
+        return rows
+
+    def describe(
+        self,
+        table: str,
+        column: str,
+        where: Optional[Mapping[str, str]] = None,
+        percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+    ) -> Dict[str, Any]:
+        """Distribucion de una columna numerica (se ignoran los NaN)."""
+        columns = _columns(table)
+        if columns.get(column) in (None, "str"):
+            raise ValueError(f"{table}.{column} no es una columna numerica.")
+        for name in where or {}:
+            if columns.get(name) != "str":
+                raise ValueError(f"{table}.{name} no es una columna de texto.")
+        parts = []
+        for chunk in self.scan(table, [column, *(where or {})]):
+            mask = _where_mask(chunk, where)
+            values = chunk[column] if mask is None else chunk[column][mask]
+            parts.append(values.astype(np.float64, copy=False))
+        values = np.concatenate(parts) if parts else np.empty(0)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {"count": 0}
+        summary: Dict[str, Any] = {
+            "count": int(len(values)),
+            "mean": round(float(values.mean()), 6),
+            "min": round(float(values.min()), 6),
+            "max": round(float(values.max()), 6),
+        }
+        for point, result in zip(percentiles, np.percentile(values, list(percentiles))):
+            summary[f"p{point:g}"] = round(float(result), 6)
+        return summary
+
+
+def _columns(table: str) -> Dict[str, str]:
+    if table not in TABLES:
+        raise ValueError(f"Tabla desconocida: {table} (disponibles: {', '.join(TABLES)})")
+    return TABLES[table]
+
+
+def _codes(column: Column) -> np.ndarray:
+    return column[0] if isinstance(column, tuple) else column
+
+
+def _where_mask(chunk: Dict[str, Column], where: Optional[Mapping[str, str]]) -> Optional[np.ndarray]:
+    mask = None
+    for name, expected in (where or {}).items():
+        codes, dictionary = chunk[name]
+        try:
+            code = dictionary.index(expected)
+        except ValueError:
+            return np.zeros(len(codes), dtype=bool)
+        matches = codes == code
+        mask = matches if mask is None else mask & matches
+    return mask
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 import yaml
 from pydantic import BaseModel, Field
 
+from monitoring.profiling import profiled
+
+# Prefijo de las variables de entorno que reemplazan claves de la config (ver config/README.md).
+ENV_PREFIX = "AGENT__"
+
 
 class AzureLLMConfig(BaseModel):
     endpoint: str = ""
@@ -20,36 +26,208 @@ class LLMConfig(BaseModel):
     model: str = "gpt-4o-mini"
     api_key_env: str = "OPENAI_API_KEY"
     api_base: str = ""
+    max_repair_attempts: int = 2
     azure: AzureLLMConfig = Field(default_factory=AzureLLMConfig)
 
 
+class ModelRouteConfig(LLMConfig):
+    name: str
+    enabled: bool = True
+    max_request_size: Optional[int] = None
+    expected_latency_seconds: float = 30.0
+
+
+class RouterConfig(BaseModel):
+    enabled: bool = False
+    slo_seconds: Optional[float] = None
+    window_seconds: float = 300.0
+    min_samples: int = 5
+    max_error_rate: float = 0.5
+    routes: List[ModelRouteConfig] = Field(default_factory=list)
+
+
 class CostConfig(BaseModel):
     scrape_provider: str = ""
+    catalog_path: str = ""
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = False
+    path: str = ""
+    similarity_threshold: float = 0.85
+    max_entries: int = 512
+    num_perm: int = 64
+    bands: int = 16
 
 
 class PathsConfig(BaseModel):
     output_dir: str = "./docs"
 
 
+class TimeoutsConfig(BaseModel):
+    ingest: float = 10
+    generate: float = 60
+    persist: float = 10
+
+
+class ExecutionConfig(BaseModel):
+    timeouts_seconds: TimeoutsConfig = Field(default_factory=TimeoutsConfig)
+    total_timeout_seconds: Optional[float] = None
+    max_concurrency: int = 4
+
+
+class StorageConfig(BaseModel):
+    backend: str = "local"  # local | s3
+    bucket_name: str = "solution-artifacts"
+    prefix: str = ""
+    endpoint_url: str = ""
+    region: Optional[str] = None
+    max_workers: int = 8
+    multipart_threshold_mb: int = 8
+
+
+class RegistryConfig(BaseModel):
+    enabled: bool = True
+    path: str = "data/.runs/runs.sqlite"
+    batch_size: int = 50
+
+
+class ProfilingConfig(BaseModel):
+    enabled: bool = False
+    output_dir: str = "data/.profiles"
+    trace_allocations: bool = False
+    top_allocations: int = 10
+    sample_interval_ms: float = 5.0
+
+
+class CassetteConfig(BaseModel):
+    mode: str = "off"  # off | record | replay
+    path: str = "data/.cassettes/llm.sqlite"
+    replay_latency: bool = False
+    latency_scale: float = 1.0
+
+
+class TenantLimitConfig(BaseModel):
+    rate_per_second: float
+    burst: float
+
+
+class AdmissionConfig(BaseModel):
+    enabled: bool = False
+    rate_per_second: float = 0.5  # por tenant/API key; 0 desactiva el rate limit
+    burst: float = 5
+    tenants: Dict[str, TenantLimitConfig] = Field(default_factory=dict)
+    max_concurrent_proposals: int = 4
+    max_queue: int = 32
+    max_queue_age_seconds: float = 15
+    backend: str = "memory"  # memory | sqlite
+    backend_path: str = "data/.runs/ratelimit.sqlite"
+
+
+class DaemonConfig(BaseModel):
+    socket_path: str = "data/.daemon/agent.sock"
+    forward: bool = True  # la CLI delega en el daemon si esta corriendo
+    request_timeout_seconds: float = 300  # espera maxima de la CLI por una ejecucion delegada
+    debounce_ms: float = 200
+    poll_ms: float = 100
+
+
+class WorkQueueConfig(BaseModel):
+    backend: str = "sqlite"  # sqlite | memory
+    path: str = "data/.queue/jobs.sqlite"
+    journal_mode: str = "wal"  # delete en volumenes de red sin memoria compartida
+    lease_seconds: float = 300
+    heartbeat_seconds: float = 30
+    max_attempts: int = 3
+    retry_delay_seconds: float = 10
+    poll_seconds: float = 1.0
+
+
+class BulkConfig(BaseModel):
+    completion_window: str = "24h"
+    endpoint: str = ""  # vacio: /v1/chat/completions (openai) o /chat/completions (azure)
+    max_requests_per_batch: int = 50_000
+    poll_seconds: float = 30.0
+    max_poll_seconds: float = 300.0
+    max_wait_hours: float = 26.0
+    request_timeout_seconds: float = 60.0
+    azure_api_version: str = "2024-10-21"
+    work_dir: str = "data/.bulk"
+
+
+class LoggingConfig(BaseModel):
+    format: str = "text"  # text | json
+    queue: bool = False
+    level: str = "INFO"
+    debug_sample_rate: float = 1.0
+    debug_max_per_second: Optional[float] = None
+
+
 class FeaturesConfig(BaseModel):
     enable_observability: bool = True
 
 
 class AppConfig(BaseModel):
     llm: LLMConfig = Field(default_factory=LLMConfig)
+    router: RouterConfig = Field(default_factory=RouterConfig)
     cost: CostConfig = Field(default_factory=CostConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     paths: PathsConfig = Field(default_factory=PathsConfig)
+    execution: ExecutionConfig = Field(default_factory=ExecutionConfig)
+    storage: StorageConfig = Field(default_factory=StorageConfig)
+    registry: RegistryConfig = Field(default_factory=RegistryConfig)
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    cassette: CassetteConfig = Field(default_factory=CassetteConfig)
+    profiling: ProfilingConfig = Field(default_factory=ProfilingConfig)
+    daemon: DaemonConfig = Field(default_factory=DaemonConfig)
+    queue: WorkQueueConfig = Field(default_factory=WorkQueueConfig)
+    bulk: BulkConfig = Field(default_factory=BulkConfig)
     features: FeaturesConfig = Field(default_factory=FeaturesConfig)
 
     class Config:
         extra = "allow"
 
 
-def load_config(path: str = "config/config.yml") -> AppConfig:
+@profiled()
+def load_config(path: str | Path = "config/config.yml", environ: Optional[Mapping[str, str]] = None) -> AppConfig:
+    """Lee el YAML y aplica encima las variables `AGENT__*` de `environ` (por defecto `os.environ`)."""
     config_path = Path(path)
     if not config_path.exists():
         raise FileNotFoundError(
             f"No se encontro el archivo de configuracion: {config_path}"
         )
     payload = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
-    return AppConfig(**payload)
+    if not isinstance(payload, dict):
+        raise TypeError("El archivo de configuracion debe ser un mapa YAML.")
+    return AppConfig(**apply_env_overrides(payload, os.environ if environ is None else environ))
+
+
+def apply_env_overrides(
+    payload: Dict[str, Any], environ: Mapping[str, str], prefix: str = ENV_PREFIX
+) -> Dict[str, Any]:
+    """Copia de `payload` con las variables `PREFIX__SECCION__CLAVE` aplicadas."""
+    merged = _deep_copy(payload)
+    for name in sorted(environ):
+        if not name.startswith(prefix):
+            continue
+        keys = [key.lower() for key in name[len(prefix) :].split("__") if key]
+        if not keys:
+            continue
+        target = merged
+        for key in keys[:-1]:
+            child = target.get(key)
+            if not isinstance(child, dict):
+                child = {}
+                target[key] = child
+            target = child
+        target[keys[-1]] = yaml.safe_load(environ[name]) if environ[name] != "" else ""
+    return merged
+
+
+def _deep_copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _deep_copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_deep_copy(item) for item in value]
+    return value
@@ -0,0 +1,174 @@
+"""Configuracion memoizada y recargable en caliente para procesos de larga duracion.
+
+`ConfigProvider.get()` devuelve el `AppConfig` validado sin releer el archivo.
+El archivo se vigila por mtime/tamano (en `get()` cada `poll_seconds`, o con un
+hilo de fondo iniciado con `start()`); ante un cambio se parsea y valida una
+config nueva y solo entonces se reemplaza la referencia, de modo que el trabajo
+en curso sigue con la config que ya tenia. Una edicion invalida se registra en
+el log y se conserva la config anterior.
+
+Las variables de entorno con prefijo `AGENT__` se aplican encima del YAML;
+`__` separa niveles y el valor se interpreta como YAML:
+
+    AGENT__LLM__MODEL=gpt-4o  AGENT__EXECUTION__MAX_CONCURRENCY=8
+
+Los dependientes se suscriben a secciones (`llm`, `router`, `cost`, ...) y
+reciben `(anterior, nueva, secciones_cambiadas)` para reconstruir solo lo que
+cambio.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+import yaml
+from pydantic import ValidationError
+
+from src.core.config import ENV_PREFIX, AppConfig, apply_env_overrides, load_config
+
+ConfigListener = Callable[[AppConfig, AppConfig, Set[str]], None]
+
+
+@dataclass
+class _Subscription:
+    callback: ConfigListener
+    sections: Optional[Set[str]]
+
+
+def env_overrides(environ: Mapping[str, str], prefix: str = ENV_PREFIX) -> Dict[str, str]:
+    """Variables de `environ` que `apply_env_overrides` aplicaria."""
+    return {name: value for name, value in environ.items() if name.startswith(prefix)}
+
+
+def changed_sections(old: AppConfig, new: AppConfig) -> Set[str]:
+    before, after = old.model_dump(), new.model_dump()
+    return {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+
+
+class ConfigProvider:
+    def __init__(
+        self,
+        path: str | Path = "config/config.yml",
+        poll_seconds: float = 2.0,
+        environ: Optional[Mapping[str, str]] = None,
+        logger: Optional[logging.Logger] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = Path(path)
+        self.poll_seconds = poll_seconds
+        self._environ = environ if environ is not None else os.environ
+        self._log = logger or logging.getLogger("solution-architect.config")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._subscriptions: List[_Subscription] = []
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.version = 0
+        self._signature = self._stat()
+        if self._signature is None:
+            raise FileNotFoundError(f"No se encontro el archivo de configuracion: {self.path}")
+        self._config = self._load()
+        self._checked_at = clock()
+
+    def get(self) -> AppConfig:
+        """Config vigente; revisa el archivo como mucho una vez cada `poll_seconds`."""
+        if self._clock() - self._checked_at >= self.poll_seconds:
+            self.reload()
+        return self._config
+
+    def env_overrides(self) -> Dict[str, str]:
+        return env_overrides(self._environ)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recarga si el archivo cambio (o siempre con `force`); True si se cambio la config."""
+        with self._lock:
+            self._checked_at = self._clock()
+            signature = self._stat()
+            if signature is None or (signature == self._signature and not force):
+                return False
+            self._signature = signature
+            try:
+                new = self._load()
+            except (OSError, yaml.YAMLError, ValidationError, TypeError) as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._log.warning("Config invalida en %s; se mantiene la anterior: %s", self.path, self.last_error)
+                return False
+            old = self._config
+            sections = changed_sections(old, new)
+            self.last_error = None
+            if not sections:
+                return False
+            self._config = new
+            self.version += 1
+            subscriptions = list(self._subscriptions)
+        self._log.info("Config recargada desde %s (version %d): %s", self.path, self.version, sorted(sections))
+        for subscription in subscriptions:
+            if subscription.sections is None or subscription.sections & sections:
+                try:
+                    subscription.callback(old, new, sections)
+                except Exception:
+                    self._log.exception("Fallo un suscriptor de cambios de config")
+        return True
+
+    def subscribe(self, callback: ConfigListener, sections: Optional[Set[str]] = None) -> Callable[[], None]:
+        """Registra `callback` para cambios en `sections` (todas si es None); devuelve la baja."""
+        subscription = _Subscription(callback=callback, sections=set(sections) if sections else None)
+        with self._lock:
+            self._subscriptions.append(subscription)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if subscription in self._subscriptions:
+                    self._subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    def start(self) -> None:
+        """Vigila el archivo en un hilo de fondo."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_seconds + 1)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.reload()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> AppConfig:
+        return load_config(self.path, self._environ)
+
+
+_PROVIDERS: Dict[Path, ConfigProvider] = {}
+_PROVIDERS_LOCK = threading.Lock()
+
+
+def get_config_provider(path: str | Path = "config/config.yml") -> ConfigProvider:
+    """Proveedor compartido por ruta dentro del proceso."""
+    key = Path(path).resolve()
+    with _PROVIDERS_LOCK:
+        provider = _PROVIDERS.get(key)
+        if provider is None:
+            provider = ConfigProvider(key)
+            _PROVIDERS[key] = provider
+        return provider
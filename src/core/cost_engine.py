@@ -0,0 +1,346 @@
+"""Simulacion Monte Carlo de costos mensuales por recurso y region.
+
+Cada recurso consume un "driver" de volumen (solicitudes, tokens LLM, GB
+almacenados u horas de computo fijas) con un precio unitario por region. Los
+volumenes se muestrean para todos los escenarios a la vez y los costos se
+obtienen con productos matriciales de NumPy:
+
+    uso (escenarios x recursos) = volumenes (escenarios x drivers) @ drivers (drivers x recursos)
+    costo por recurso = uso * precio efectivo por recurso (suma sobre regiones)
+    costo por region  = uso @ precio efectivo (recursos x regiones)
+
+sin bucles de Python por escenario, recurso o region.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.core.pricing_catalog import normalize_region
+from src.core.schemas import CostEstimate, CostLine
+
+if TYPE_CHECKING:
+    from src.core.pricing_catalog import PricingCatalog
+
+HOURS_PER_MONTH = 730.0
+SECONDS_PER_MONTH = HOURS_PER_MONTH * 3600.0
+DEFAULT_MONTHLY_REQUESTS = 300.0
+DEFAULT_TOKENS_PER_REQUEST = 3000.0
+DEFAULT_STORAGE_GB = 10.0
+DEFAULT_STORAGE_GROWTH_GB = 5.0
+HORIZON_MONTHS = 12
+
+# Columnas de la matriz de volumenes.
+DRIVERS = ("requests", "tokens", "storage", "hours")
+_DRIVER_UNITS = {
+    "requests": "millon de solicitudes",
+    "tokens": "1K tokens",
+    "storage": "GB-mes",
+    "hours": "hora",
+}
+
+# Palabra clave del recurso -> (driver, precio USD por unidad del driver). Valores de referencia.
+DEFAULT_UNIT_PRICES: Dict[str, Tuple[str, float]] = {
+    "container registry": ("hours", 0.0069),
+    "container instance": ("hours", 0.05),
+    "storage": ("storage", 0.02),
+    "cosmos": ("requests", 0.28),
+    "key vault": ("requests", 3.0),
+    "application insights": ("storage", 2.3),
+    "log analytics": ("storage", 2.3),
+    "monitor": ("hours", 0.01),
+    "service bus": ("requests", 0.05),
+    "event grid": ("requests", 0.6),
+    "event hub": ("hours", 0.03),
+    "api management": ("hours", 0.07),
+    "search": ("hours", 0.34),
+    "container apps": ("requests", 0.4),
+    "web app": ("hours", 0.075),
+    "bot": ("requests", 500.0),
+    "foundry": ("tokens", 0.0006),
+    "openai": ("tokens", 0.0006),
+}
+_FALLBACK_UNIT_PRICE = ("hours", 0.05)
+
+# Token de la region -> multiplicador de precio respecto a regiones de EE. UU.
+_REGION_MULTIPLIERS = (
+    ("europe", 1.08),
+    ("eu", 1.08),
+    ("uk", 1.1),
+    ("asia", 1.12),
+    ("ap", 1.12),
+    ("brazil", 1.3),
+    ("sa", 1.3),
+    ("southamerica", 1.3),
+    ("us", 1.0),
+)
+_DEFAULT_REGION_MULTIPLIER = 1.1
+# Los nombres compactos de Azure ("westeurope", "eastus2") llevan la orientacion pegada.
+_REGION_ORIENTATION_RE = re.compile(r"^(?:north|south|east|west|central)+|(?:north|south|east|west|central)+$")
+
+# Palabras de la unidad del catalogo que identifican el driver.
+_UNIT_DRIVER_RE = (
+    ("tokens", re.compile(r"\btokens?\b")),
+    ("storage", re.compile(r"\b(?:gb|gib|gibibyte|gigabyte)s?\b.*\b(?:mo|month|mes)")),
+    ("hours", re.compile(r"\b(?:h|hr|hrs|hour|hours|hora|horas)\b")),
+    ("requests", re.compile(r"\b(?:requests?|operations?|transactions?|calls?|messages?|events?|executions?|count)\b")),
+)
+_UNIT_QUANTITY_RE = re.compile(r"^\s*(\d+(?:[.,]\d+)*)\s*([km])?\b")
+_DRIVER_SCALE = {"requests": 1e6, "tokens": 1e3, "storage": 1.0, "hours": 1.0}
+
+_TRAFFIC_RE = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(rps|req/s|solicitudes/s|rpm|req/min|solicitudes/mes|requests/month|req/mes)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class VolumeModel:
+    """Supuestos de volumen; cada uno se muestrea como lognormal alrededor de su mediana."""
+
+    monthly_requests: float = DEFAULT_MONTHLY_REQUESTS
+    requests_sigma: float = 0.5
+    tokens_per_request: float = DEFAULT_TOKENS_PER_REQUEST
+    tokens_sigma: float = 0.4
+    storage_gb: float = DEFAULT_STORAGE_GB
+    storage_growth_gb: float = DEFAULT_STORAGE_GROWTH_GB
+    storage_sigma: float = 0.6
+
+    @classmethod
+    def from_traffic_profile(cls, traffic_profile: Optional[str]) -> "VolumeModel":
+        model = cls()
+        match = _TRAFFIC_RE.search(traffic_profile or "")
+        if not match:
+            return model
+        value = float(match.group(1).replace(",", "."))
+        unit = match.group(2).lower()
+        if unit in ("rps", "req/s", "solicitudes/s"):
+            # El perfil suele expresar picos: se asume una utilizacion media del 10 %.
+            model.monthly_requests = value * 0.1 * SECONDS_PER_MONTH
+        elif unit in ("rpm", "req/min"):
+            model.monthly_requests = value * 0.1 * SECONDS_PER_MONTH / 60.0
+        else:
+            model.monthly_requests = value
+        return model
+
+    def sample(self, scenarios: int, rng: np.random.Generator) -> np.ndarray:
+        """Matriz (escenarios x drivers) en las unidades de `_DRIVER_UNITS`."""
+        requests = self.monthly_requests * rng.lognormal(0.0, self.requests_sigma, scenarios)
+        tokens = requests * self.tokens_per_request * rng.lognormal(0.0, self.tokens_sigma, scenarios)
+        # Almacenamiento medio del horizonte: base + crecimiento acumulado a mitad de periodo.
+        growth = self.storage_growth_gb * rng.lognormal(0.0, self.storage_sigma, scenarios)
+        storage = self.storage_gb + growth * HORIZON_MONTHS / 2.0
+        volumes = np.empty((scenarios, len(DRIVERS)))
+        volumes[:, 0] = requests / 1e6
+        volumes[:, 1] = tokens / 1e3
+        volumes[:, 2] = storage
+        volumes[:, 3] = HOURS_PER_MONTH
+        return volumes
+
+
+@dataclass
+class CostSimulation:
+    resources: List[str]
+    regions: List[str]
+    totals: np.ndarray
+    per_resource: np.ndarray
+    per_region: np.ndarray
+    volume_model: VolumeModel
+    drivers: List[str] = field(default_factory=list)
+    currency: str = "USD"
+
+    def percentiles(self, values: np.ndarray) -> Tuple[float, float, float]:
+        p10, p50, p90 = np.percentile(values, (10, 50, 90), axis=0)
+        return float(p10), float(p50), float(p90)
+
+    def resource_lines(self) -> List[CostLine]:
+        p10, p50, p90 = np.percentile(self.per_resource, (10, 50, 90), axis=0)
+        return [
+            CostLine(
+                resource=resource,
+                driver=self.drivers[index],
+                p10=round(float(p10[index]), 2),
+                p50=round(float(p50[index]), 2),
+                p90=round(float(p90[index]), 2),
+            )
+            for index, resource in enumerate(self.resources)
+        ]
+
+    def region_percentiles(self) -> Dict[str, Tuple[float, float, float]]:
+        p10, p50, p90 = np.percentile(self.per_region, (10, 50, 90), axis=0)
+        return {
+            region: (float(p10[index]), float(p50[index]), float(p90[index]))
+            for index, region in enumerate(self.regions)
+        }
+
+    def to_cost_estimate(self) -> CostEstimate:
+        p10, p50, p90 = self.percentiles(self.totals)
+        model = self.volume_model
+        return CostEstimate(
+            range_low=_money(p10, self.currency),
+            range_mid=_money(p50, self.currency),
+            range_high=_money(p90, self.currency),
+            drivers=sorted({_DRIVER_UNITS[driver] for driver in self.drivers}),
+            volume_assumptions=[
+                f"{model.monthly_requests:,.0f} solicitudes/mes (mediana)",
+                f"{model.tokens_per_request:,.0f} tokens por solicitud (mediana)",
+                f"Storage {model.storage_gb:,.0f} GB + {model.storage_growth_gb:,.0f} GB/mes",
+                f"Regiones: {', '.join(self.regions)}",
+                f"Monte Carlo: {len(self.totals):,} escenarios (P10/P50/P90)",
+            ],
+            currency=self.currency,
+            p10=round(p10, 2),
+            p50=round(p50, 2),
+            p90=round(p90, 2),
+            breakdown=self.resource_lines(),
+        )
+
+
+def simulate_costs(
+    resources: Sequence[str],
+    regions: Sequence[str],
+    traffic_profile: Optional[str] = None,
+    unit_prices: Optional[Mapping[str, float]] = None,
+    scenarios: int = 10_000,
+    seed: int = 0,
+    volume_model: Optional[VolumeModel] = None,
+) -> CostSimulation:
+    """Simula el costo mensual de `resources` desplegados en `regions`.
+
+    `unit_prices` reemplaza el precio de referencia (USD por unidad del driver) de
+    un recurso, por nombre exacto, o de un par "recurso@region".
+    """
+    resources = list(resources)
+    regions = list(regions) or ["global"]
+    model = volume_model or VolumeModel.from_traffic_profile(traffic_profile)
+    rng = np.random.default_rng(seed)
+
+    drivers, base_prices = zip(*(resource_unit_price(resource) for resource in resources)) if resources else ((), ())
+    driver_index = np.array([DRIVERS.index(driver) for driver in drivers], dtype=np.intp)
+
+    # Precio por recurso y region; el uso variable se reparte entre regiones y las horas fijas se replican.
+    multipliers = np.array([region_multiplier(region) for region in regions])
+    prices = np.outer(np.array(base_prices, dtype=float), multipliers)
+    for (row, col), value in _price_overrides(resources, regions, unit_prices).items():
+        prices[row, col] = value
+    share = np.where(driver_index[:, None] == DRIVERS.index("hours"), 1.0, 1.0 / len(regions))
+    effective = prices * share
+
+    volumes = model.sample(scenarios, rng)
+    usage = volumes[:, driver_index]
+    per_resource = usage * effective.sum(axis=1)
+    per_region = usage @ effective
+    return CostSimulation(
+        resources=resources,
+        regions=regions,
+        totals=per_resource.sum(axis=1),
+        per_resource=per_resource,
+        per_region=per_region,
+        volume_model=model,
+        drivers=list(drivers),
+    )
+
+
+def resource_unit_price(resource: str) -> Tuple[str, float]:
+    lowered = resource.lower()
+    for keyword, value in DEFAULT_UNIT_PRICES.items():
+        if keyword in lowered:
+            return value
+    return _FALLBACK_UNIT_PRICE
+
+
+def region_multiplier(region: str) -> float:
+    tokens = region_tokens(region)
+    for marker, multiplier in _REGION_MULTIPLIERS:
+        if marker in tokens:
+            return multiplier
+    return _DEFAULT_REGION_MULTIPLIER
+
+
+def region_tokens(region: str) -> Set[str]:
+    """Partes de la region ("eu-west-1" -> eu, west; "australiaeast" -> australia)."""
+    tokens: Set[str] = set()
+    for part in re.split(r"[^a-z]+", region.lower()):
+        if not part:
+            continue
+        tokens.add(part)
+        stripped = _REGION_ORIENTATION_RE.sub("", part)
+        if stripped:
+            tokens.add(stripped)
+    return tokens
+
+
+def catalog_unit_prices(
+    catalog: "PricingCatalog",
+    resources: Sequence[str],
+    regions: Sequence[str],
+    provider: str,
+) -> Dict[str, float]:
+    """Precios "recurso@region" del catalogo offline, en USD por unidad del driver.
+
+    Se omiten las filas en otra moneda o cuya unidad no corresponde al driver del
+    recurso; esos pares siguen con el precio de referencia. Si el catalogo no tiene
+    la region pedida se ajusta el precio de la region encontrada con los multiplicadores.
+    """
+    prices: Dict[str, float] = {}
+    for resource in resources:
+        driver, _ = resource_unit_price(resource)
+        for region in list(regions) or ["global"]:
+            row = catalog.match_resource(resource, provider, region)
+            if row is None or (row.get("moneda") or "USD").upper() != "USD":
+                continue
+            price = driver_unit_price(driver, row.get("unidad") or "", float(row["precio"]))
+            if price is None:
+                continue
+            found = row.get("region") or ""
+            if normalize_region(found) != normalize_region(region):
+                price *= region_multiplier(region) / region_multiplier(found)
+            prices[f"{resource}@{region}"] = price
+    return prices
+
+
+def driver_unit_price(driver: str, unit: str, price: float) -> Optional[float]:
+    """Convierte el precio por `unit` del catalogo a la unidad del driver, o None si no corresponde."""
+    lowered = unit.strip().lower()
+    match = _UNIT_QUANTITY_RE.match(lowered)
+    quantity = 1.0
+    if match:
+        quantity = float(match.group(1).replace(",", ""))
+        quantity *= {"k": 1e3, "m": 1e6}.get(match.group(2) or "", 1.0)
+        lowered = lowered[match.end():]
+    unit_driver = next((name for name, pattern in _UNIT_DRIVER_RE if pattern.search(lowered)), None)
+    if unit_driver is None and match and not lowered.strip(" /"):
+        # Unidades solo numericas ("10K") cuentan operaciones.
+        unit_driver = "requests"
+    if unit_driver != driver or quantity <= 0:
+        return None
+    return price / quantity * _DRIVER_SCALE[driver]
+
+
+def _price_overrides(
+    resources: Sequence[str],
+    regions: Sequence[str],
+    unit_prices: Optional[Mapping[str, float]],
+) -> Dict[Tuple[int, int], float]:
+    overrides: Dict[Tuple[int, int], float] = {}
+    if not unit_prices:
+        return overrides
+    for row, resource in enumerate(resources):
+        for col, region in enumerate(regions):
+            key = f"{resource}@{region}"
+            if key in unit_prices:
+                overrides[(row, col)] = float(unit_prices[key])
+            elif resource in unit_prices:
+                overrides[(row, col)] = float(unit_prices[resource])
+    return overrides
+
+
+def _money(value: float, currency: str) -> str:
+    if math.isnan(value):
+        return f"{currency} 0"
+    return f"{currency} {value:,.0f}"
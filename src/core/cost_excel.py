@@ -2,27 +2,88 @@
 
 from __future__ import annotations
 
+import io
 from pathlib import Path
 from typing import Any, List, Optional
 
 from openpyxl import Workbook
 from openpyxl.styles import Font
 
+from monitoring.profiling import profiled
+from src.core.pricing_catalog import PricingCatalog, resource_keywords
 from src.core.schemas import CostEstimate
 
 
+@profiled()
 def cost_estimate_to_excel(
     cost: CostEstimate,
     path: Path,
     scraped_rows: List[dict[str, Any]] | None = None,
     resources: Optional[List[str]] = None,
+    catalog: Optional[PricingCatalog] = None,
+    provider: Optional[str] = None,
+    region: Optional[str] = None,
 ) -> None:
-    """Escribe la estimación de costos en un archivo .xlsx.
+    """Escribe la estimación de costos en un archivo .xlsx (ver build_cost_workbook)."""
+    wb = build_cost_workbook(
+        cost,
+        scraped_rows=scraped_rows,
+        resources=resources,
+        catalog=catalog,
+        provider=provider,
+        region=region,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+
+
+@profiled()
+def cost_estimate_to_excel_bytes(
+    cost: CostEstimate,
+    scraped_rows: List[dict[str, Any]] | None = None,
+    resources: Optional[List[str]] = None,
+    catalog: Optional[PricingCatalog] = None,
+    provider: Optional[str] = None,
+    region: Optional[str] = None,
+) -> bytes:
+    """Genera el .xlsx en memoria, sin escribir a disco."""
+    wb = build_cost_workbook(
+        cost,
+        scraped_rows=scraped_rows,
+        resources=resources,
+        catalog=catalog,
+        provider=provider,
+        region=region,
+    )
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def build_cost_workbook(
+    cost: CostEstimate,
+    scraped_rows: List[dict[str, Any]] | None = None,
+    resources: Optional[List[str]] = None,
+    catalog: Optional[PricingCatalog] = None,
+    provider: Optional[str] = None,
+    region: Optional[str] = None,
+) -> Workbook:
+    """Construye el libro de estimación de costos.
 
-    - Hoja 'Estimacion': rangos, drivers y supuestos de volumen.
+    - Hoja 'Estimacion': rangos, drivers, supuestos de volumen y P10/P50/P90 numericos (si hay simulacion).
+    - Hoja 'Simulacion_por_recurso': P10/P50/P90 mensual por recurso (si hay breakdown).
     - Hoja 'Precios_nube': precios obtenidos por scraping (provider, servicio, unidad, precio, region).
     - Hoja 'Costos_por_recurso': un fila por recurso del proyecto con precio estimado (si hay resources y scraped_rows).
+
+    Con `catalog` (y `provider`) los precios salen del catálogo offline en lugar del scraping.
     """
+    catalog_matches: dict[str, dict[str, Any] | None] = {}
+    if catalog is not None and provider and resources:
+        catalog_matches = {
+            recurso: catalog.match_resource(recurso, provider, region) for recurso in resources
+        }
+        scraped_rows = [match for match in catalog_matches.values() if match] or scraped_rows
+
     wb = Workbook()
     ws_est = wb.active
     ws_est.title = "Estimacion"
@@ -47,6 +108,21 @@ def cost_estimate_to_excel(
     row += 1
     ws_est.cell(row=row, column=1, value="Supuestos de volumen")
     ws_est.cell(row=row, column=2, value=", ".join(cost.volume_assumptions))
+    for label, value in (("P10", cost.p10), ("P50", cost.p50), ("P90", cost.p90)):
+        if value is not None:
+            row += 1
+            ws_est.cell(row=row, column=1, value=f"{label} mensual ({cost.currency})")
+            ws_est.cell(row=row, column=2, value=value)
+
+    if cost.breakdown:
+        ws_sim = wb.create_sheet("Simulacion_por_recurso")
+        sim_headers = ["recurso", "driver", "p10", "p50", "p90"]
+        for col, h in enumerate(sim_headers, start=1):
+            ws_sim.cell(row=1, column=col, value=h)
+            ws_sim.cell(row=1, column=col).font = Font(bold=True)
+        for r, line in enumerate(cost.breakdown, start=2):
+            for c, key in enumerate(sim_headers, start=1):
+                ws_sim.cell(row=r, column=c, value=getattr(line, "resource" if key == "recurso" else key))
 
     if scraped_rows:
         ws_scraped = wb.create_sheet("Precios_nube")
@@ -67,7 +143,10 @@ def cost_estimate_to_excel(
             ws_recurso.cell(row=1, column=col).font = Font(bold=True)
         for r, recurso in enumerate(resources, start=2):
             ws_recurso.cell(row=r, column=1, value=recurso)
-            match = _match_resource_to_price(recurso, scraped_rows)
+            if recurso in catalog_matches:
+                match = catalog_matches[recurso]
+            else:
+                match = _match_resource_to_price(recurso, scraped_rows)
             if match:
                 ws_recurso.cell(row=r, column=2, value=match.get("servicio", ""))
                 ws_recurso.cell(row=r, column=3, value=match.get("unidad", ""))
@@ -79,34 +158,13 @@ def cost_estimate_to_excel(
                 ws_recurso.cell(row=r, column=4, value="consultar")
                 ws_recurso.cell(row=r, column=6, value="")
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    wb.save(path)
+    return wb
 
 
 def _match_resource_to_price(recurso: str, scraped_rows: List[dict[str, Any]]) -> dict[str, Any] | None:
     """Busca en scraped_rows un servicio que coincida con el nombre del recurso (parcial o mapeo conocido)."""
     recurso_lower = recurso.lower()
-    # Mapeo conocido: nombre en requirements -> subcadena en servicio de precios
-    alias_map = {
-        "container registry": ["container registry", "acr", "registry"],
-        "container instance": ["container instance", "aci", "container instances"],
-        "storage account": ["storage", "blob", "storage account"],
-        "cosmos db": ["cosmos db", "cosmos"],
-        "key vault": ["key vault", "keyvault"],
-        "application insights": ["application insights", "app insights"],
-        "log analytics": ["log analytics", "logs"],
-        "monitor": ["monitor", "azure monitor"],
-        "service bus": ["service bus", "servicebus"],
-        "event grid": ["event grid"],
-        "event hubs": ["event hubs", "event hub"],
-        "api management": ["api management", "apim"],
-        "azure ai search": ["search", "cognitive search", "ai search"],
-        "container apps": ["container apps", "container app"],
-        "azure web apps": ["web app", "app service", "web apps"],
-        "azure bot services": ["bot", "bot service"],
-        "azure ai foundry": ["ai foundry", "foundry", "openai"],
-    }
-    keywords = alias_map.get(recurso_lower, [recurso_lower])
+    keywords = resource_keywords(recurso)
     for row in scraped_rows:
         servicio = (row.get("servicio") or "").lower()
         if any(kw in servicio for kw in keywords):
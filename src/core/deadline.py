@@ -0,0 +1,105 @@
+"""Deadline por ejecucion con presupuestos por etapa y cancelacion cooperativa.
+
+Una ejecucion crea un `Deadline` con un tiempo total; cada etapa obtiene un
+deadline hijo con `stage(nombre)`, cuyo limite es el menor entre el
+presupuesto de la etapa y el tiempo que le queda a la ejecucion. Los hijos
+comparten la senal de cancelacion y la lista de advertencias del padre, de
+modo que una etapa que corta su trabajo deja constancia para la respuesta
+parcial.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, List, Mapping, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """La etapa supero su presupuesto o la ejecucion fue cancelada."""
+
+
+class Deadline:
+    def __init__(
+        self,
+        total_seconds: Optional[float] = None,
+        budgets: Optional[Mapping[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._expires_at = clock() + total_seconds if total_seconds is not None else None
+        self._budgets = dict(budgets or {})
+        self._cancelled = threading.Event()
+        self._warnings: List[str] = []
+        self._lock = threading.Lock()
+        self.name = "run"
+
+    @classmethod
+    def from_config(cls, execution) -> "Deadline":
+        budgets = execution.timeouts_seconds.model_dump()
+        total = execution.total_timeout_seconds
+        if total is None:
+            total = sum(budgets.values())
+        return cls(total_seconds=total, budgets=budgets)
+
+    def stage(self, name: str) -> "Deadline":
+        return self.within(self._budgets.get(name), name=name)
+
+    def within(self, seconds: Optional[float], name: Optional[str] = None) -> "Deadline":
+        """Deadline hijo acotado a `seconds` y al tiempo restante de este."""
+        child = Deadline.__new__(Deadline)
+        child._clock = self._clock
+        child._budgets = self._budgets
+        child._cancelled = self._cancelled
+        child._warnings = self._warnings
+        child._lock = self._lock
+        child.name = name or self.name
+        own_expiry = self._clock() + seconds if seconds is not None else None
+        candidates = [t for t in (self._expires_at, own_expiry) if t is not None]
+        child._expires_at = min(candidates) if candidates else None
+        return child
+
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - self._clock())
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Timeout para una operacion bloqueante: el menor entre `default` y lo que queda."""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return self._cancelled.is_set() or (remaining is not None and remaining <= 0.0)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "") -> None:
+        if reason:
+            self.warn(reason)
+        self._cancelled.set()
+
+    def check(self, what: str = "") -> None:
+        if self.expired:
+            label = what or self.name
+            if self._cancelled.is_set():
+                raise DeadlineExceeded(f"Ejecucion cancelada durante {label}.")
+            raise DeadlineExceeded(f"Se agoto el tiempo de la etapa {label}.")
+
+    def warn(self, message: str) -> None:
+        with self._lock:
+            if message not in self._warnings:
+                self._warnings.append(message)
+
+    @property
+    def warnings(self) -> List[str]:
+        with self._lock:
+            return list(self._warnings)
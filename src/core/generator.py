@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Iterator, List, Mapping, Optional, Tuple, TypeVar
 
+from src.core.cost_engine import simulate_costs
+from src.core.rules import RuleEngine, RuleResult, default_rule_engine
 from src.core.schemas import (
     ADR,
     BacklogItem,
@@ -13,48 +15,83 @@ from src.core.schemas import (
     SolutionProposal,
 )
 
+T = TypeVar("T")
 
-def generate_solution(requirements: Requirements) -> SolutionProposal:
-    diagram_mermaid = _build_mermaid(requirements)
-    components = _build_components(requirements)
-    flows = _build_flows(requirements)
-    adrs = _build_adrs(requirements)
-    backlog = _build_backlog(requirements)
-    risks = _build_risks(requirements)
-    cost_estimate = _build_cost_estimate(requirements)
-
-    return SolutionProposal(
-        diagram_mermaid=diagram_mermaid,
-        components=components,
-        flows=flows,
-        adrs=adrs,
-        backlog=backlog,
-        risks=risks,
-        cost_estimate=cost_estimate,
-    )
 
+def generate_solution(
+    requirements: Requirements,
+    rules: Optional[RuleEngine] = None,
+    unit_prices: Optional[Mapping[str, float]] = None,
+) -> SolutionProposal:
+    return SolutionProposal(**dict(generate_sections(requirements, rules, unit_prices)))
 
-def _build_mermaid(requirements: Requirements) -> str:
-    return "\n".join(
-        [
-            "flowchart LR",
-            "    client[Client Apps]",
-            "    auth[AuthN/AuthZ - JWT/OAuth2]",
-            "    api[API Runtime]",
-            "    orchestrator[Agent Orchestrator]",
-            "    storage[Object Storage]",
-            "    metadata[Metadata DB]",
-            "    vector[Vector Index]",
-            "    obs[Observability]",
-            "",
-            "    client --> auth --> api --> orchestrator",
-            "    orchestrator --> storage",
-            "    orchestrator --> metadata",
-            "    orchestrator --> vector",
-            "    api --> obs",
-            "    orchestrator --> obs",
-        ]
-    )
+
+def generate_sections(
+    requirements: Requirements,
+    rules: Optional[RuleEngine] = None,
+    unit_prices: Optional[Mapping[str, float]] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """Secciones de la propuesta en orden, cada una en cuanto esta lista (para streaming).
+
+    `unit_prices` son precios del catalogo para la simulacion de costos (ver
+    `cost_engine.catalog_unit_prices`).
+    """
+    engine = rules if rules is not None else default_rule_engine()
+    matched = engine.evaluate(requirements)
+    yield "diagram_mermaid", _build_mermaid(requirements, matched)
+    yield "components", _merge(_build_components(requirements), matched.components, key="name")
+    yield "flows", _build_flows(requirements)
+    yield "adrs", _merge(_build_adrs(requirements), matched.adrs, key="id")
+    yield "backlog", _merge(_build_backlog(requirements), matched.backlog, key="id")
+    yield "risks", _merge(_build_risks(requirements), matched.risks, key="id")
+    yield "cost_estimate", _build_cost_estimate(requirements, unit_prices)
+
+
+def _merge(base: List[T], extra: List[T], key: str) -> List[T]:
+    """Agrega lo emitido por las reglas sin repetir nombres o ids."""
+    seen = {getattr(item, key) for item in base}
+    merged = list(base)
+    for item in extra:
+        if getattr(item, key) not in seen:
+            seen.add(getattr(item, key))
+            merged.append(item)
+    return merged
+
+
+def _build_mermaid(requirements: Requirements, matched: Optional[RuleResult] = None) -> str:
+    lines = [
+        "flowchart LR",
+        "    client[Client Apps]",
+        "    auth[AuthN/AuthZ - JWT/OAuth2]",
+        "    api[API Runtime]",
+        "    orchestrator[Agent Orchestrator]",
+        "    storage[Object Storage]",
+        "    metadata[Metadata DB]",
+        "    vector[Vector Index]",
+        "    obs[Observability]",
+        "",
+        "    client --> auth --> api --> orchestrator",
+        "    orchestrator --> storage",
+        "    orchestrator --> metadata",
+        "    orchestrator --> vector",
+        "    api --> obs",
+        "    orchestrator --> obs",
+    ]
+    # Componentes emitidos por reglas: se cuelgan del orquestador.
+    seen = set()
+    for index, component in enumerate(matched.components if matched else [], start=1):
+        if component.name in seen:
+            continue
+        seen.add(component.name)
+        lines.append(f"    rule{index}[{_mermaid_label(component.name)}]")
+        lines.append(f"    orchestrator --> rule{index}")
+    return "\n".join(lines)
+
+
+def _mermaid_label(text: str) -> str:
+    """Etiqueta entre comillas: los nombres de las reglas pueden traer corchetes, flechas o comillas."""
+    escaped = " ".join(text.split()).replace("#", "#35;").replace('"', "#quot;")
+    return f'"{escaped}"'
 
 
 def _build_components(requirements: Requirements) -> List[Component]:
@@ -213,7 +250,18 @@ def _build_risks(requirements: Requirements) -> List[Risk]:
     ]
 
 
-def _build_cost_estimate(requirements: Requirements) -> CostEstimate:
+def _build_cost_estimate(
+    requirements: Requirements, unit_prices: Optional[Mapping[str, float]] = None
+) -> CostEstimate:
+    # Los componentes de entrada gestionados estan fuera del alcance y no se costean.
+    resources = [r for r in requirements.resources if "gateway" not in r.lower()]
+    if resources:
+        return simulate_costs(
+            resources,
+            requirements.regions,
+            traffic_profile=requirements.traffic_profile,
+            unit_prices=unit_prices,
+        ).to_cost_estimate()
     return CostEstimate(
         range_low="USD 300",
         range_mid="USD 1500",
@@ -0,0 +1,367 @@
+"""Catalogo de precios en SQLite construido a partir de las exportaciones masivas de cada proveedor.
+
+Las listas de precios publicadas (Azure Retail Prices JSON, AWS offer files en
+JSON o CSV, listado de SKUs de GCP) pueden pesar cientos de MB o varios GB, por
+lo que se leen en streaming (`ijson` para JSON, `csv` para CSV) e insertan por
+lotes. El catalogo resultante es un unico archivo SQLite con indices por
+proveedor, servicio y region; los procesos que lo consultan lo abren en modo
+solo lectura con `mmap`, de modo que comparten las paginas del sistema operativo
+en lugar de cargar cada uno su propia copia.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CATALOG_MMAP_BYTES = 1 << 30
+INSERT_BATCH_SIZE = 5000
+
+# Nombre del recurso en requirements -> subcadenas del servicio/producto en las listas de precios.
+RESOURCE_ALIASES: Dict[str, List[str]] = {
+    "container registry": ["container registry", "acr", "registry"],
+    "container instance": ["container instance", "aci", "container instances"],
+    "storage account": ["storage", "blob", "storage account"],
+    "cosmos db": ["cosmos db", "cosmos"],
+    "key vault": ["key vault", "keyvault"],
+    "application insights": ["application insights", "app insights"],
+    "log analytics": ["log analytics", "logs"],
+    "monitor": ["monitor", "azure monitor"],
+    "service bus": ["service bus", "servicebus"],
+    "event grid": ["event grid"],
+    "event hubs": ["event hubs", "event hub"],
+    "api management": ["api management", "apim"],
+    "azure ai search": ["search", "cognitive search", "ai search"],
+    "container apps": ["container apps", "container app"],
+    "azure web apps": ["web app", "app service", "web apps"],
+    "azure bot services": ["bot", "bot service"],
+    "azure ai foundry": ["ai foundry", "foundry", "openai"],
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    provider TEXT NOT NULL,
+    service TEXT NOT NULL,
+    service_lc TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    product TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    region TEXT NOT NULL,
+    region_key TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_prices_service ON prices (provider, service_lc, region_key, price);
+CREATE INDEX IF NOT EXISTS ix_prices_region ON prices (provider, region_key);
+"""
+
+PriceRow = Tuple[str, str, str, str, str, float, str]
+
+_PROVIDER_ALIASES = {"google": "gcp", "google cloud": "gcp"}
+_PROVIDER_LABELS = {"azure": "Azure", "aws": "AWS", "gcp": "GCP"}
+
+
+def normalize_provider(provider: str) -> str:
+    lowered = (provider or "").strip().lower()
+    return _PROVIDER_ALIASES.get(lowered, lowered)
+
+
+def normalize_region(region: str) -> str:
+    """Clave de comparacion de regiones: "East US", "east-us" y "eastus" son la misma."""
+    return re.sub(r"[\s_-]+", "", (region or "").lower())
+
+
+def resource_keywords(resource: str) -> List[str]:
+    lowered = resource.strip().lower()
+    return RESOURCE_ALIASES.get(lowered, [lowered])
+
+
+class PricingCatalog:
+    """Acceso de solo lectura al catalogo; una conexion por hilo."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No se encontro el catalogo de precios: {self.path}")
+        self._local = threading.local()
+        self._services: Dict[str, List[str]] = {}
+        self._services_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={CATALOG_MMAP_BYTES}")
+            conn.execute("PRAGMA query_only=1")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def services(self, provider: str) -> List[str]:
+        key = normalize_provider(provider)
+        with self._services_lock:
+            if key not in self._services:
+                rows = self._connection().execute(
+                    "SELECT DISTINCT service_lc FROM prices WHERE provider = ?", (key,)
+                )
+                self._services[key] = [row[0] for row in rows]
+            return self._services[key]
+
+    def match_resource(
+        self, resource: str, provider: str, region: Optional[str] = None, sku: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Fila del servicio que corresponde al recurso, de la coincidencia mas exacta a la menos.
+
+        La region se compara con `normalize_region` ("East US" es "eastus").
+        Orden: region pedida antes que cualquier region; luego SKU o producto igual a `sku`
+        (o al nombre del recurso); luego servicio igual a un alias del recurso antes que uno
+        que solo lo contiene; el precio (no nulo primero, mas bajo) solo desempata.
+        """
+        keywords = resource_keywords(resource)
+        services = [s for s in self.services(provider) if any(kw in s for kw in keywords)]
+        if not services:
+            return None
+        exact = sorted({(sku or resource).strip().lower(), resource.strip().lower()})
+        placeholders = ",".join("?" for _ in services)
+        base = (
+            "SELECT * FROM prices WHERE provider = ? AND service_lc IN "
+            f"({placeholders}) {{region}} ORDER BY "
+            f"lower(sku) IN ({','.join('?' for _ in exact)}) OR lower(product) IN ({','.join('?' for _ in exact)}) DESC, "
+            f"service_lc IN ({','.join('?' for _ in keywords)}) DESC, price <= 0, price LIMIT 1"
+        )
+        ranking: List[Any] = [*exact, *exact, *keywords]
+        params: List[Any] = [normalize_provider(provider), *services]
+        conn = self._connection()
+        row = None
+        if region:
+            row = conn.execute(
+                base.format(region="AND region_key = ?"), [*params, normalize_region(region), *ranking]
+            ).fetchone()
+        if row is None:
+            row = conn.execute(base.format(region=""), [*params, *ranking]).fetchone()
+        return _row_to_pricing(row) if row is not None else None
+
+    def rows_for_resources(
+        self, resources: Iterable[str], provider: str, region: Optional[str] = None
+    ) -> List[dict[str, Any]]:
+        rows = []
+        for resource in resources:
+            match = self.match_resource(resource, provider, region)
+            if match is not None:
+                rows.append(match)
+        return rows
+
+
+def _row_to_pricing(row: sqlite3.Row) -> dict[str, Any]:
+    """Mismo formato que las filas de scraping (ver src/core/scraping.py)."""
+    return {
+        "provider": _PROVIDER_LABELS.get(row["provider"], row["provider"]),
+        "servicio": row["service"],
+        "sku": row["sku"],
+        "producto": row["product"],
+        "unidad": row["unit"],
+        "precio": row["price"],
+        "moneda": row["currency"],
+        "region": row["region"],
+        "fuente": row["source"],
+    }
+
+
+def ingest_price_list(
+    provider: str,
+    source: Path,
+    catalog_path: Path,
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> int:
+    """Carga una exportacion de precios en el catalogo, reemplazando las filas del proveedor.
+
+    El reemplazo ocurre en una sola transaccion: los lectores ven el catalogo
+    anterior hasta el commit.
+    """
+    provider = normalize_provider(provider)
+    source = Path(source)
+    catalog_path = Path(catalog_path)
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(catalog_path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM prices WHERE provider = ?", (provider,))
+        total = 0
+        for batch in _batched(_iter_price_rows(provider, source, conn), batch_size):
+            conn.executemany(
+                "INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        provider, service, service.lower(), sku, product, unit,
+                        region.lower(), normalize_region(region), price, currency, str(source.name),
+                    )
+                    for service, sku, product, unit, region, price, currency in batch
+                ],
+            )
+            total += len(batch)
+        conn.commit()
+        conn.execute("ANALYZE")
+        return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _batched(rows: Iterable[PriceRow], size: int) -> Iterator[List[PriceRow]]:
+    batch: List[PriceRow] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_price_rows(provider: str, source: Path, conn: sqlite3.Connection) -> Iterator[PriceRow]:
+    if provider == "azure":
+        return _iter_azure(source)
+    if provider == "aws":
+        if source.suffix.lower() == ".csv":
+            return _iter_aws_csv(source)
+        return _iter_aws_json(source, conn)
+    if provider == "gcp":
+        return _iter_gcp(source)
+    raise ValueError(f"Proveedor de precios no soportado: {provider}")
+
+
+def _ijson():
+    try:
+        import ijson
+    except ImportError as exc:  # pragma: no cover - depende del entorno
+        raise RuntimeError("Instala ijson para ingerir listas de precios en JSON.") from exc
+    return ijson
+
+
+def _iter_azure(source: Path) -> Iterator[PriceRow]:
+    """Azure Retail Prices API: {"Items": [{serviceName, skuName, retailPrice, ...}]}."""
+    ijson = _ijson()
+    with source.open("rb") as fh:
+        for item in ijson.items(fh, "Items.item"):
+            if item.get("type", "Consumption") != "Consumption":
+                continue
+            yield (
+                item.get("serviceName") or "",
+                item.get("skuId") or item.get("skuName") or "",
+                item.get("productName") or "",
+                item.get("unitOfMeasure") or "",
+                item.get("armRegionName") or "",
+                float(item.get("retailPrice") or 0),
+                item.get("currencyCode") or "USD",
+            )
+
+
+def _iter_aws_json(source: Path, conn: sqlite3.Connection) -> Iterator[PriceRow]:
+    """AWS offer file: `products` se indexa en una tabla temporal y luego se recorre `terms.OnDemand`."""
+    ijson = _ijson()
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS aws_products "
+        "(sku TEXT PRIMARY KEY, service TEXT, family TEXT, region TEXT)"
+    )
+    conn.execute("DELETE FROM aws_products")
+    with source.open("rb") as fh:
+        batch: List[Tuple[str, str, str, str]] = []
+        for sku, product in ijson.kvitems(fh, "products"):
+            attributes = product.get("attributes") or {}
+            batch.append(
+                (
+                    sku,
+                    attributes.get("servicecode", ""),
+                    product.get("productFamily") or "",
+                    attributes.get("regionCode") or attributes.get("location", ""),
+                )
+            )
+            if len(batch) >= INSERT_BATCH_SIZE:
+                conn.executemany("INSERT OR REPLACE INTO aws_products VALUES (?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT OR REPLACE INTO aws_products VALUES (?, ?, ?, ?)", batch)
+
+    with source.open("rb") as fh:
+        for sku, offers in ijson.kvitems(fh, "terms.OnDemand"):
+            product = conn.execute(
+                "SELECT service, family, region FROM aws_products WHERE sku = ?", (sku,)
+            ).fetchone()
+            service, family, region = product if product else ("", "", "")
+            for offer in offers.values():
+                for dimension in (offer.get("priceDimensions") or {}).values():
+                    prices = dimension.get("pricePerUnit") or {}
+                    currency, amount = next(iter(prices.items()), ("USD", 0))
+                    yield (
+                        service,
+                        sku,
+                        dimension.get("description") or family,
+                        dimension.get("unit") or "",
+                        region,
+                        float(amount or 0),
+                        currency,
+                    )
+
+
+def _iter_aws_csv(source: Path) -> Iterator[PriceRow]:
+    """AWS offer file CSV: lineas de metadatos y luego una cabecera que empieza por "SKU"."""
+    with source.open("r", encoding="utf-8", newline="") as fh:
+        for line in fh:
+            if line.startswith('"SKU"') or line.startswith("SKU"):
+                header = next(csv.reader(io.StringIO(line)))
+                break
+        else:
+            return
+        for record in csv.DictReader(fh, fieldnames=header):
+            if record.get("TermType", "OnDemand") != "OnDemand":
+                continue
+            yield (
+                record.get("serviceCode") or record.get("serviceName") or "",
+                record.get("SKU") or "",
+                record.get("PriceDescription") or record.get("Product Family") or "",
+                record.get("Unit") or "",
+                record.get("Region Code") or record.get("Location") or "",
+                float(record.get("PricePerUnit") or 0),
+                record.get("Currency") or "USD",
+            )
+
+
+def _iter_gcp(source: Path) -> Iterator[PriceRow]:
+    """Cloud Billing Catalog: {"skus": [{skuId, category, serviceRegions, pricingInfo}]}."""
+    ijson = _ijson()
+    with source.open("rb") as fh:
+        for sku in ijson.items(fh, "skus.item"):
+            category = sku.get("category") or {}
+            pricing = (sku.get("pricingInfo") or [{}])[0].get("pricingExpression") or {}
+            unit_price = _gcp_base_rate(pricing.get("tieredRates") or [])
+            price = float(unit_price.get("units") or 0) + float(unit_price.get("nanos") or 0) / 1e9
+            for region in sku.get("serviceRegions") or [""]:
+                yield (
+                    category.get("serviceDisplayName") or "",
+                    sku.get("skuId") or "",
+                    sku.get("description") or "",
+                    pricing.get("usageUnitDescription") or pricing.get("usageUnit") or "",
+                    region,
+                    price,
+                    unit_price.get("currencyCode") or "USD",
+                )
+
+
+def _gcp_base_rate(rates: List[dict[str, Any]]) -> dict[str, Any]:
+    """Precio del primer tramo (el de lista); si es la franja gratuita, el primer tramo pagado."""
+    ordered = sorted(rates, key=lambda rate: float(rate.get("startUsageAmount") or 0))
+    for rate in ordered:
+        unit_price = rate.get("unitPrice") or {}
+        if float(unit_price.get("units") or 0) or int(unit_price.get("nanos") or 0):
+            return unit_price
+    return (ordered[0].get("unitPrice") or {}) if ordered else {}
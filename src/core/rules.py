@@ -0,0 +1,291 @@
+"""Motor de reglas indexado para el generador determinista.
+
+Cada regla tiene uno o mas predicados (conjuncion) sobre campos de los
+requerimientos y emite componentes, ADRs, items de backlog y riesgos:
+
+    - id: pci-tokenizacion
+      when:
+        - field: compliance
+          contains: "PCI"
+      components: [...]
+      risks: [...]
+
+Un predicado `contains` compara frases normalizadas (minusculas, sin acentos)
+con limite de palabra; `regex` busca una expresion regular sin distinguir
+mayusculas (sin referencias numeradas: la expresion se combina con otras).
+`field` es opcional: sin el, el predicado aplica a cualquier campo.
+
+Al compilar, cada regla se indexa por un solo predicado:
+    - los `contains` en un indice invertido (campo, token) -> reglas, usando el
+      token mas largo de la frase como ancla;
+    - los `regex` por sus literales obligatorios (extraidos del arbol que arma
+      el parser de `re`), en un indice (campo, trigrama) -> reglas con el
+      trigrama menos frecuente de cada literal. Las expresiones sin un literal
+      obligatorio de al menos 3 caracteres se verifican siempre.
+Una solicitud solo verifica las reglas candidatas que salen de esos indices.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import yaml
+
+from src.core.schemas import ADR, BacklogItem, Component, Requirements, Risk
+from src.core.text import normalize_text
+
+try:
+    from re import _parser as _re_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _re_parser
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parents[2] / "config" / "rules.yml"
+ANY_FIELD = "*"
+_MIN_LITERAL = 3
+
+
+@dataclass
+class RequirementDoc:
+    """Requerimientos preparados para evaluar reglas: texto original y normalizado por campo."""
+
+    raw: Dict[str, List[str]]
+    normalized: Dict[str, List[str]]
+    tokens: Dict[str, Set[str]]
+    trigrams: Dict[str, Set[str]]
+
+    @classmethod
+    def from_requirements(cls, requirements: Requirements) -> "RequirementDoc":
+        raw: Dict[str, List[str]] = {}
+        for name, value in requirements.model_dump().items():
+            values = value if isinstance(value, list) else [value]
+            raw[name] = [str(item) for item in values if item]
+        normalized = {name: [normalize_text(item) for item in items] for name, items in raw.items()}
+        tokens = {
+            name: {token for item in items for token in item.split()}
+            for name, items in normalized.items()
+        }
+        trigrams = {
+            name: {item.lower()[i : i + 3] for item in items for i in range(len(item) - 2)}
+            for name, items in raw.items()
+        }
+        return cls(raw=raw, normalized=normalized, tokens=tokens, trigrams=trigrams)
+
+    def fields(self, name: str) -> Iterable[str]:
+        return self.raw.keys() if name == ANY_FIELD else (name,)
+
+
+@dataclass(frozen=True)
+class Predicate:
+    field: str = ANY_FIELD
+    contains: Optional[str] = None
+    regex: Optional[str] = None
+
+    def matches(self, doc: RequirementDoc) -> bool:
+        if self.contains is not None:
+            needle = f" {self.contains} "
+            return any(
+                needle in f" {text} "
+                for name in doc.fields(self.field)
+                for text in doc.normalized.get(name, [])
+            )
+        pattern = _compile(self.regex or "")
+        return any(
+            pattern.search(text)
+            for name in doc.fields(self.field)
+            for text in doc.raw.get(name, [])
+        )
+
+    def anchor(self) -> Optional[str]:
+        """Token mas largo de la frase `contains`: el mas selectivo para el indice."""
+        if self.contains is None:
+            return None
+        return max(self.contains.split(), key=len, default=None)
+
+
+@dataclass
+class Rule:
+    id: str
+    predicates: Tuple[Predicate, ...]
+    components: List[Component] = field(default_factory=list)
+    adrs: List[ADR] = field(default_factory=list)
+    backlog: List[BacklogItem] = field(default_factory=list)
+    risks: List[Risk] = field(default_factory=list)
+
+    def matches(self, doc: RequirementDoc) -> bool:
+        return all(predicate.matches(doc) for predicate in self.predicates)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Rule":
+        rule_id = str(data.get("id") or "")
+        when = data.get("when") or []
+        if isinstance(when, Mapping):
+            when = [when]
+        predicates = tuple(_predicate_from_dict(rule_id, item) for item in when)
+        if not rule_id or not predicates:
+            raise ValueError(f"Regla invalida {rule_id or '(sin id)'}: requiere id y al menos un predicado.")
+        return cls(
+            id=rule_id,
+            predicates=predicates,
+            components=[Component.model_validate(item) for item in data.get("components", [])],
+            adrs=[ADR.model_validate(item) for item in data.get("adrs", [])],
+            backlog=[BacklogItem.model_validate(item) for item in data.get("backlog", [])],
+            risks=[Risk.model_validate(item) for item in data.get("risks", [])],
+        )
+
+
+@dataclass
+class RuleResult:
+    matched: List[str] = field(default_factory=list)
+    components: List[Component] = field(default_factory=list)
+    adrs: List[ADR] = field(default_factory=list)
+    backlog: List[BacklogItem] = field(default_factory=list)
+    risks: List[Risk] = field(default_factory=list)
+    candidates_checked: int = 0
+
+
+class RuleEngine:
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = list(rules)
+        self._keyword_index: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self._literal_index: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self._always: List[int] = []
+        literals: List[Tuple[int, str, List[str]]] = []
+        for index, rule in enumerate(self.rules):
+            keyword = next((p for p in rule.predicates if p.anchor()), None)
+            if keyword is not None:
+                self._keyword_index[(keyword.field, keyword.anchor())].append(index)
+                continue
+            best = None
+            for predicate in rule.predicates:
+                required = required_literals(predicate.regex or "")
+                if required and (best is None or min(map(len, required)) > min(map(len, best[1]))):
+                    best = (predicate.field, required)
+            if best is None:
+                self._always.append(index)
+            else:
+                literals.append((index, best[0], best[1]))
+
+        frequency: Dict[str, int] = defaultdict(int)
+        for _, _, required in literals:
+            for literal in required:
+                for trigram in _trigrams(literal):
+                    frequency[trigram] += 1
+        for index, field_name, required in literals:
+            for literal in required:
+                rarest = min(_trigrams(literal), key=frequency.__getitem__)
+                self._literal_index[(field_name, rarest)].add(index)
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Mapping[str, Any]]) -> "RuleEngine":
+        return cls([Rule.from_dict(item) for item in items])
+
+    @classmethod
+    def from_file(cls, path: Path) -> "RuleEngine":
+        text = Path(path).read_text(encoding="utf-8")
+        data = json.loads(text) if Path(path).suffix == ".json" else yaml.safe_load(text)
+        if isinstance(data, Mapping):
+            data = data.get("rules", [])
+        return cls.from_dicts(data or [])
+
+    def candidates(self, doc: RequirementDoc) -> Set[int]:
+        found: Set[int] = set(self._always)
+        for name, tokens in doc.tokens.items():
+            for token in tokens:
+                found.update(self._keyword_index.get((name, token), ()))
+                found.update(self._keyword_index.get((ANY_FIELD, token), ()))
+        for name, trigrams in doc.trigrams.items():
+            for trigram in trigrams:
+                found.update(self._literal_index.get((name, trigram), ()))
+                found.update(self._literal_index.get((ANY_FIELD, trigram), ()))
+        return found
+
+    def evaluate(self, requirements: Requirements) -> RuleResult:
+        doc = RequirementDoc.from_requirements(requirements)
+        candidates = sorted(self.candidates(doc))
+        result = RuleResult(candidates_checked=len(candidates))
+        for index in candidates:
+            rule = self.rules[index]
+            if not rule.matches(doc):
+                continue
+            result.matched.append(rule.id)
+            result.components.extend(rule.components)
+            result.adrs.extend(rule.adrs)
+            result.backlog.extend(rule.backlog)
+            result.risks.extend(rule.risks)
+        return result
+
+
+@lru_cache(maxsize=1)
+def default_rule_engine() -> RuleEngine:
+    """Reglas de `config/rules.yml`; sin archivo el motor no emite nada."""
+    if not DEFAULT_RULES_PATH.exists():
+        return RuleEngine([])
+    return RuleEngine.from_file(DEFAULT_RULES_PATH)
+
+
+def _predicate_from_dict(rule_id: str, data: Mapping[str, Any]) -> Predicate:
+    field_name = str(data.get("field") or ANY_FIELD)
+    if data.get("contains"):
+        phrase = normalize_text(str(data["contains"]))
+        if not phrase:
+            raise ValueError(f"Regla {rule_id}: 'contains' vacio tras normalizar.")
+        return Predicate(field=field_name, contains=phrase)
+    if data.get("regex"):
+        pattern = str(data["regex"])
+        _compile(pattern)
+        return Predicate(field=field_name, regex=pattern)
+    raise ValueError(f"Regla {rule_id}: el predicado requiere 'contains' o 'regex'.")
+
+
+@lru_cache(maxsize=4096)
+def _compile(pattern: str) -> "re.Pattern[str]":
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as exc:
+        raise ValueError(f"Expresion regular invalida {pattern!r}: {exc}") from exc
+
+
+def required_literals(pattern: str) -> Optional[List[str]]:
+    """Literales (en minusculas) de los que al menos uno aparece en todo texto que cumple `pattern`."""
+    try:
+        parsed = _re_parser.parse(pattern)
+    except re.error:
+        return None
+    return _literals_of(list(parsed))
+
+
+def _literals_of(items: Sequence[Tuple[Any, Any]]) -> Optional[List[str]]:
+    options: List[List[str]] = []
+    run: List[str] = []
+    for op, value in items:
+        if op is _re_parser.LITERAL:
+            run.append(chr(value))
+            continue
+        if op is _re_parser.AT:
+            continue
+        if run:
+            options.append(["".join(run)])
+            run = []
+        if op is _re_parser.SUBPATTERN:
+            inner = _literals_of(list(value[-1]))
+            if inner:
+                options.append(inner)
+        elif op is _re_parser.BRANCH:
+            branches = [_literals_of(list(branch)) for branch in value[1]]
+            if all(branches):
+                options.append([literal for branch in branches for literal in branch])
+    if run:
+        options.append(["".join(run)])
+    options = [option for option in options if min(map(len, option)) >= _MIN_LITERAL]
+    best = max(options, key=lambda option: min(map(len, option)), default=None)
+    return [literal.lower() for literal in best] if best else None
+
+
+def _trigrams(literal: str) -> Set[str]:
+    return {literal[i : i + 3] for i in range(len(literal) - 2)}
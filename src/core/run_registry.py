@@ -0,0 +1,277 @@
+"""Registro de ejecuciones en SQLite para seguir latencias, tokens y cache.
+
+Cada ejecucion se identifica con un `run_id` (uuid4) propio; el trace id de los
+logs es corto y puede repetirse, asi que es solo una columna mas. Guarda el
+trace id, hashes de entrada y configuracion, modo, duracion por etapa, uso de
+tokens, aciertos de cache, artefactos (ruta, sha256, tamano) y estado. La base
+usa WAL para que varios procesos (workers de lote y consultas) lean y escriban
+sin bloquearse, y los registros se acumulan en memoria y se insertan por lotes
+en una sola transaccion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.core.config import RegistryConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    trace_id TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    total_seconds REAL NOT NULL,
+    status TEXT NOT NULL,
+    mode TEXT,
+    input_hash TEXT,
+    config_hash TEXT,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_hits INTEGER NOT NULL DEFAULT 0,
+    cache_misses INTEGER NOT NULL DEFAULT 0,
+    warnings INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_trace_id ON runs (trace_id);
+CREATE TABLE IF NOT EXISTS run_stages (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_stages_stage ON run_stages (stage, started_at);
+CREATE INDEX IF NOT EXISTS run_stages_run ON run_stages (run_id);
+CREATE TABLE IF NOT EXISTS run_artifacts (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_artifacts_run ON run_artifacts (run_id);
+"""
+
+_BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-W%W"}
+
+
+@dataclass
+class RunRecord:
+    trace_id: str
+    started_at: float
+    total_seconds: float
+    status: str = "ok"  # ok | partial | error
+    mode: str = ""
+    input_hash: str = ""
+    config_hash: str = ""
+    stages: Dict[str, float] = field(default_factory=dict)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    artifacts: Dict[str, Tuple[str, int]] = field(default_factory=dict)
+    warnings: int = 0
+    error: Optional[str] = None
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+def content_hash(payload: Any) -> str:
+    """sha256 de bytes, texto o de un objeto serializable en JSON con claves ordenadas."""
+    if isinstance(payload, bytes):
+        data = payload
+    elif isinstance(payload, str):
+        data = payload.encode("utf-8")
+    else:
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def artifact_hashes(artifacts: Mapping[str, bytes]) -> Dict[str, Tuple[str, int]]:
+    return {path: (content_hash(content), len(content)) for path, content in artifacts.items()}
+
+
+class RunRegistry:
+    def __init__(self, path: Path, batch_size: int = 50) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self._pending: List[RunRecord] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record(self, run: RunRecord) -> None:
+        """Encola la ejecucion; se escribe al completar un lote o con `flush()`."""
+        with self._lock:
+            self._pending.append(run)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> int:
+        with self._lock:
+            return self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def __enter__(self) -> "RunRegistry":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _flush_locked(self) -> int:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run.run_id,
+                        run.trace_id,
+                        run.started_at,
+                        run.total_seconds,
+                        run.status,
+                        run.mode,
+                        run.input_hash,
+                        run.config_hash,
+                        run.prompt_tokens,
+                        run.completion_tokens,
+                        run.cache_hits,
+                        run.cache_misses,
+                        run.warnings,
+                        run.error,
+                    )
+                    for run in batch
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO run_stages VALUES (?, ?, ?, ?)",
+                [
+                    (run.run_id, stage, run.started_at, duration)
+                    for run in batch
+                    for stage, duration in run.stages.items()
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO run_artifacts VALUES (?, ?, ?, ?)",
+                [
+                    (run.run_id, path, sha256, size)
+                    for run in batch
+                    for path, (sha256, size) in run.artifacts.items()
+                ],
+            )
+        return len(batch)
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stage_percentiles(
+        self, since: Optional[float] = None, bucket: str = "day", stage: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """p50/p95/p99 por etapa y periodo; la etapa `total` es la duracion de la ejecucion."""
+        fmt = _BUCKET_FORMATS.get(bucket)
+        if fmt is None:
+            raise ValueError(f"bucket no soportado: {bucket} (use {', '.join(_BUCKET_FORMATS)})")
+        rows = self._query(
+            f"""
+            SELECT stage, strftime('{fmt}', started_at, 'unixepoch') AS bucket, duration FROM (
+                SELECT stage, started_at, duration FROM run_stages
+                UNION ALL
+                SELECT 'total', started_at, total_seconds FROM runs
+            )
+            WHERE started_at >= ? AND (? IS NULL OR stage = ?)
+            ORDER BY bucket, stage, duration
+            """,
+            (since or 0.0, stage, stage),
+        )
+        groups: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        for row in rows:
+            groups[(row["bucket"], row["stage"])].append(row["duration"])
+        return [
+            {
+                "bucket": key[0],
+                "stage": key[1],
+                "count": len(values),
+                "p50": _percentile(values, 0.50),
+                "p95": _percentile(values, 0.95),
+                "p99": _percentile(values, 0.99),
+            }
+            for key, values in groups.items()
+        ]
+
+    def slowest_runs(self, limit: int = 10, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._query(
+            """
+            SELECT r.run_id, r.trace_id, r.started_at, r.total_seconds, r.status, r.mode,
+                   (SELECT stage FROM run_stages s WHERE s.run_id = r.run_id
+                    ORDER BY s.duration DESC LIMIT 1) AS slowest_stage
+            FROM runs r
+            WHERE r.started_at >= ?
+            ORDER BY r.total_seconds DESC
+            LIMIT ?
+            """,
+            (since or 0.0, limit),
+        )
+
+    def cache_effectiveness(self, since: Optional[float] = None, bucket: str = "day") -> List[Dict[str, Any]]:
+        fmt = _BUCKET_FORMATS.get(bucket)
+        if fmt is None:
+            raise ValueError(f"bucket no soportado: {bucket} (use {', '.join(_BUCKET_FORMATS)})")
+        rows = self._query(
+            f"""
+            SELECT strftime('{fmt}', started_at, 'unixepoch') AS bucket,
+                   COUNT(*) AS runs,
+                   SUM(cache_hits) AS hits,
+                   SUM(cache_misses) AS misses,
+                   SUM(prompt_tokens + completion_tokens) AS tokens
+            FROM runs
+            WHERE started_at >= ?
+            GROUP BY bucket
+            ORDER BY bucket
+            """,
+            (since or 0.0,),
+        )
+        for row in rows:
+            lookups = row["hits"] + row["misses"]
+            row["hit_ratio"] = round(row["hits"] / lookups, 4) if lookups else 0.0
+        return rows
+
+    def artifacts(self, run_or_trace_id: str) -> List[Dict[str, Any]]:
+        """Artefactos de una ejecucion por `run_id`, o de todas las que comparten un trace id."""
+        return self._query(
+            """
+            SELECT a.run_id, a.path, a.sha256, a.size FROM run_artifacts a JOIN runs r ON r.run_id = a.run_id
+            WHERE r.run_id = ? OR r.trace_id = ?
+            ORDER BY r.started_at, a.path
+            """,
+            (run_or_trace_id, run_or_trace_id),
+        )
+
+
+def build_run_registry(config: RegistryConfig) -> Optional[RunRegistry]:
+    if not config.enabled or not config.path:
+        return None
+    return RunRegistry(Path(config.path), batch_size=config.batch_size)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
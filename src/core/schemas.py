@@ -65,12 +65,25 @@ class Risk(BaseModel):
     assumptions: List[str]
 
 
+class CostLine(BaseModel):
+    resource: str
+    driver: str = ""
+    p10: float
+    p50: float
+    p90: float
+
+
 class CostEstimate(BaseModel):
     range_low: str
     range_mid: str
     range_high: str
     drivers: List[str]
     volume_assumptions: List[str]
+    currency: str = "USD"
+    p10: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    breakdown: List[CostLine] = Field(default_factory=list)
 
 
 class SolutionProposal(BaseModel):
@@ -81,3 +94,8 @@ class SolutionProposal(BaseModel):
     backlog: List[BacklogItem]
     risks: List[Risk]
     cost_estimate: CostEstimate
+    warnings: List[str] = Field(default_factory=list)
+
+
+# Secciones de `SolutionProposal` en el orden en que se generan y se emiten.
+PROPOSAL_SECTIONS = ("diagram_mermaid", "components", "flows", "adrs", "backlog", "risks", "cost_estimate")
@@ -9,10 +9,13 @@ Playwright/Selenium (no incluido aquí).
 from __future__ import annotations
 
 import logging
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from monitoring.profiling import profiled
+from src.core.deadline import Deadline
 
 logger = logging.getLogger(__name__)
 
@@ -25,30 +28,44 @@ USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; rv:91.0) Gecko/20100101 Firefox/91.0"
 )
 HTML_PARSER = "html.parser"
+REQUEST_TIMEOUT_SECONDS = 15
+_PRICE_MARKERS = ("$", "USD", "€", "EUR", "price", "per ")
 
 
-def fetch_cloud_pricing(provider: str) -> List[dict[str, Any]]:
+@profiled()
+def fetch_cloud_pricing(provider: str, deadline: Optional[Deadline] = None) -> List[dict[str, Any]]:
     """Obtiene precios por web scraping a la página del proveedor (azure, aws, gcp).
 
-    Devuelve lista vacía si no hay datos (error de red, página vacía o sin tablas parseables).
+    Devuelve lista vacía si no hay datos (error de red, página vacía o sin tablas parseables)
+    o si el deadline de la ejecución se agota; en ese caso se deja una advertencia.
     """
     provider = (provider or "").strip().lower()
+    if deadline is not None and deadline.expired:
+        deadline.warn(f"Scraping de precios omitido para {provider}: sin tiempo disponible.")
+        return []
+    timeout = REQUEST_TIMEOUT_SECONDS
+    if deadline is not None:
+        timeout = deadline.timeout(REQUEST_TIMEOUT_SECONDS)
     try:
         if provider == "azure":
-            return _scrape_azure()
-        if provider == "aws":
-            return _scrape_aws()
-        if provider in ("gcp", "google", "google cloud"):
-            return _scrape_gcp()
-        return []
+            rows = _scrape_azure(timeout)
+        elif provider == "aws":
+            rows = _scrape_aws(timeout)
+        elif provider in ("gcp", "google", "google cloud"):
+            rows = _scrape_gcp(timeout)
+        else:
+            rows = []
     except Exception as e:
         logger.warning("Error en scraping de precios para %s: %s", provider, e)
-        return []
+        rows = []
+    if not rows and deadline is not None and deadline.expired:
+        deadline.warn(f"Scraping de precios incompleto para {provider}: se agoto el tiempo.")
+    return rows
 
 
-def _get_html(url: str) -> str:
+def _get_html(url: str, timeout: float = REQUEST_TIMEOUT_SECONDS) -> str:
     try:
-        resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=15)
+        resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
         resp.raise_for_status()
         return resp.text
     except Exception as e:
@@ -90,7 +107,7 @@ def _parse_any_tables_with_prices(soup: BeautifulSoup, provider: str, fuente: st
                     continue
                 if len(servicio) > 100:
                     continue
-                if any(c in precio for c in ("$", "USD", "€", "EUR", "price", "per ")):
+                if any(c in precio for c in _PRICE_MARKERS):
                     rows.append({
                         "provider": provider,
                         "servicio": servicio[:80],
@@ -102,22 +119,157 @@ def _parse_any_tables_with_prices(soup: BeautifulSoup, provider: str, fuente: st
     return rows[:30]
 
 
-def _scrape_azure() -> List[dict[str, Any]]:
-    html = _get_html(AZURE_PRICING_URL)
+def _scrape_azure(timeout: float = REQUEST_TIMEOUT_SECONDS) -> List[dict[str, Any]]:
+    html = _get_html(AZURE_PRICING_URL, timeout)
+    if not html:
+        return []
+    return parse_pricing_page("azure", html)
+
+
+def _scrape_aws(timeout: float = REQUEST_TIMEOUT_SECONDS) -> List[dict[str, Any]]:
+    html = _get_html(AWS_PRICING_URL, timeout)
     if not html:
         return []
-    soup = BeautifulSoup(html, HTML_PARSER)
+    return parse_pricing_page("aws", html)
+
+
+def _scrape_gcp(timeout: float = REQUEST_TIMEOUT_SECONDS) -> List[dict[str, Any]]:
+    html = _get_html(GCP_PRICING_URL, timeout)
+    if not html:
+        return []
+    return parse_pricing_page("gcp", html)
+
+
+_PAGES = {
+    "azure": ("Azure", AZURE_PRICING_URL),
+    "aws": ("AWS", AWS_PRICING_URL),
+    "gcp": ("GCP", GCP_PRICING_URL),
+}
+
+
+def parse_pricing_page(provider: str, html: str, fast: bool = True) -> List[dict[str, Any]]:
+    """Extrae filas de precios del HTML de la página de un proveedor (azure, aws, gcp).
+
+    Con `fast=True` se parsea solo `<table>` y `<a>` (SoupStrainer), con lxml si está
+    instalado, y se recorre el documento una sola vez. `fast=False` es el recorrido
+    original completo con `html.parser`, referencia para el test y el benchmark.
+    """
+    if fast:
+        return _rows_from_extract(provider, _extract_page(html))
+    return _rows_from_soup(provider, BeautifulSoup(html, HTML_PARSER))
+
+
+def fast_html_parser() -> str:
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return HTML_PARSER
+    return "lxml"
+
+
+_STRAINER = SoupStrainer(["table", "a"])
+_CellPair = Tuple[str, str]
+
+
+class _PageExtract:
+    """Tablas y enlaces de una pagina; las celdas de cada tabla se leen una sola vez y bajo demanda."""
+
+    __slots__ = ("tables", "links", "_pairs", "_row_cache")
+
+    def __init__(self) -> None:
+        # (es tabla de 'pricing', tag <table>)
+        self.tables: List[Tuple[bool, Any]] = []
+        # (href, texto del enlace con strip=True)
+        self.links: List[Tuple[str, str]] = []
+        self._pairs: dict[int, List[_CellPair]] = {}
+        self._row_cache: dict[int, Optional[_CellPair]] = {}
+
+    def pairs(self, index: int) -> List[_CellPair]:
+        """(celda0, celda1) de las filas tras la cabecera de la tabla `index`."""
+        if index not in self._pairs:
+            pairs: List[_CellPair] = []
+            for tr in self.tables[index][1].find_all("tr")[1:]:
+                key = id(tr)
+                if key not in self._row_cache:
+                    cells = tr.find_all(["td", "th"], limit=2)
+                    self._row_cache[key] = (
+                        ((cells[0].get_text() or "").strip(), (cells[1].get_text() or "").strip())
+                        if len(cells) >= 2
+                        else None
+                    )
+                pair = self._row_cache[key]
+                if pair is not None:
+                    pairs.append(pair)
+            self._pairs[index] = pairs
+        return self._pairs[index]
+
+
+def _extract_page(html: str) -> _PageExtract:
+    soup = BeautifulSoup(html, fast_html_parser(), parse_only=_STRAINER)
+    extract = _PageExtract()
+    for tag in soup.find_all(["table", "a"]):
+        if tag.name == "a":
+            href = tag.get("href")
+            if href is not None:
+                extract.links.append((href, tag.get_text(strip=True)))
+            continue
+        classes = tag.get("class") or []
+        extract.tables.append(("pricing" in " ".join(classes).lower(), tag))
+    return extract
+
+
+def _row(provider: str, servicio: str, precio: str, fuente: str) -> dict[str, Any]:
+    return {
+        "provider": provider,
+        "servicio": servicio,
+        "unidad": "variable",
+        "precio": precio,
+        "region": "",
+        "fuente": fuente,
+    }
+
+
+def _rows_from_extract(provider: str, extract: _PageExtract) -> List[dict[str, Any]]:
+    label, fuente = _PAGES[provider]
+    rows: List[dict[str, Any]] = []
+    if provider == "azure":
+        for index, (is_pricing, _) in enumerate(extract.tables):
+            if is_pricing:
+                rows.extend(_row(label, s, p, fuente) for s, p in extract.pairs(index) if s and p)
+    else:
+        for href, text in extract.links:
+            if not text:
+                continue
+            if provider == "aws" and "/pricing/" in href and len(text) < 80:
+                rows.append(_row(label, text, "(ver enlace)", fuente))
+            elif provider == "gcp" and "pricing" in href and 3 < len(text) < 80:
+                rows.append(_row(label, text, "(ver enlace)", fuente))
+        rows = rows[:20]
+    if rows:
+        return rows
+    for index in range(min(5, len(extract.tables))):
+        for servicio, precio in extract.pairs(index):
+            if not servicio or not precio or len(servicio) > 100:
+                continue
+            if any(c in precio for c in _PRICE_MARKERS):
+                rows.append(_row(label, servicio[:80], precio[:60], fuente))
+    return rows[:30]
+
+
+# Referencia para el test y el benchmark: el recorrido original de `_scrape_azure`,
+# `_scrape_aws` y `_scrape_gcp`, sin cambios, sobre la sopa ya parseada.
+def _rows_from_soup(provider: str, soup: BeautifulSoup) -> List[dict[str, Any]]:
+    return {"azure": _soup_rows_azure, "aws": _soup_rows_aws, "gcp": _soup_rows_gcp}[provider](soup)
+
+
+def _soup_rows_azure(soup: BeautifulSoup) -> List[dict[str, Any]]:
     rows = _parse_pricing_tables(soup, "Azure", AZURE_PRICING_URL)
     if not rows:
         rows = _parse_any_tables_with_prices(soup, "Azure", AZURE_PRICING_URL)
     return rows
 
 
-def _scrape_aws() -> List[dict[str, Any]]:
-    html = _get_html(AWS_PRICING_URL)
-    if not html:
-        return []
-    soup = BeautifulSoup(html, HTML_PARSER)
+def _soup_rows_aws(soup: BeautifulSoup) -> List[dict[str, Any]]:
     rows = []
     for a in soup.find_all("a", href=True):
         if "/pricing/" in a["href"] and a.get_text(strip=True):
@@ -138,11 +290,7 @@ def _scrape_aws() -> List[dict[str, Any]]:
     return rows
 
 
-def _scrape_gcp() -> List[dict[str, Any]]:
-    html = _get_html(GCP_PRICING_URL)
-    if not html:
-        return []
-    soup = BeautifulSoup(html, HTML_PARSER)
+def _soup_rows_gcp(soup: BeautifulSoup) -> List[dict[str, Any]]:
     rows = []
     for link in soup.find_all("a", href=True):
         if "pricing" in link["href"] and link.get_text(strip=True):
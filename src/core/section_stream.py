@@ -0,0 +1,112 @@
+"""Extraccion incremental de secciones de una propuesta JSON que llega en fragmentos.
+
+El LLM devuelve `SolutionProposal` como un objeto JSON que llega token a
+token. `SectionStreamParser` sigue la anidacion y las cadenas del texto
+recibido y, en cuanto se cierra el valor de una clave de primer nivel, entrega
+`(clave, json_del_valor)`, sin esperar al resto del documento. El texto previo
+a la primera `{` (p. ej. una cerca ```json) se ignora.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from pydantic import TypeAdapter
+
+from src.core.schemas import SolutionProposal
+from src.core.validators import ensure_no_gateway_in_section
+
+
+class SectionStreamParser:
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        self._key: List[str] = []
+        self._value: List[str] = []
+        self._phase = "key"  # key | colon | value
+        self._current_key = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Procesa `chunk`; devuelve las secciones completadas con el."""
+        completed: List[Tuple[str, str]] = []
+        for char in chunk:
+            if self._done:
+                break
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                continue
+            if self._depth == 1 and self._phase != "value":
+                self._read_key(char)
+                continue
+            if self._in_string:
+                self._value.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            if self._depth == 1 and char == ",":
+                completed.append(self._finish_value())
+                continue
+            if self._depth == 0:
+                # Cierre del objeto raiz: el ultimo valor termina aqui.
+                completed.append(self._finish_value())
+                self._done = True
+                continue
+            self._value.append(char)
+        return completed
+
+    def _read_key(self, char: str) -> None:
+        if self._phase == "key":
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._key.append(char)
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._current_key = "".join(self._key)
+                    self._key = []
+                    self._phase = "colon"
+                else:
+                    self._key.append(char)
+            elif char == '"':
+                self._in_string = True
+            elif char == "}":
+                self._depth = 0
+                self._done = True
+        elif self._phase == "colon" and char == ":":
+            self._phase = "value"
+
+    def _finish_value(self) -> Tuple[str, str]:
+        raw = "".join(self._value).strip()
+        self._value = []
+        self._phase = "key"
+        return self._current_key, raw
+
+
+@lru_cache(maxsize=None)
+def _section_adapter(section: str) -> TypeAdapter:
+    return TypeAdapter(SolutionProposal.model_fields[section].annotation)
+
+
+def validate_section(section: str, raw_json: str) -> Any:
+    """Valida el JSON de una seccion contra su tipo en `SolutionProposal` y sin componentes prohibidos."""
+    if section not in SolutionProposal.model_fields:
+        raise ValueError(f"Seccion desconocida: {section}")
+    value = _section_adapter(section).validate_json(raw_json)
+    ensure_no_gateway_in_section(section, value)
+    return value
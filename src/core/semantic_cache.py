@@ -0,0 +1,271 @@
+"""Cache por similitud para propuestas generadas con LLM.
+
+Los requerimientos se normalizan (minusculas, sin acentos ni puntuacion) y se
+convierten en un conjunto de shingles por campo, por lo que el orden de las
+listas y el casing no cambian la clave. Cada entrada guarda una firma MinHash
+indexada en buckets LSH: una consulta solo compara la similitud de Jaccard
+contra las entradas que comparten al menos un bucket, no contra toda la cache.
+Las propuestas se guardan con `src.core.serialization` (compactas y con version
+de esquema) y un hit las decodifica sin revalidar; lo que se lee de disco se
+valida una vez al cargar.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from src.core.config import CacheConfig
+from src.core.schemas import Requirements, SolutionProposal
+from src.core.serialization import SerializationError, dumps, loads
+from src.core.text import normalize_text
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_CACHE_FORMAT_VERSION = 2
+# Codec sin dependencias opcionales: el archivo de cache se puede leer en cualquier host.
+_ENTRY_CODEC = "packed"
+
+
+def requirements_shingles(requirements: Requirements, size: int = 2) -> FrozenSet[str]:
+    """Shingles de palabras por campo, independientes del orden de las listas."""
+    shingles: Set[str] = set()
+    payload = requirements.model_dump()
+    for field_name in sorted(payload):
+        value = payload[field_name]
+        items = value if isinstance(value, list) else [value]
+        for item in items:
+            tokens = normalize_text(str(item or "")).split()
+            if not tokens:
+                continue
+            if len(tokens) < size:
+                shingles.add(f"{field_name}:{' '.join(tokens)}")
+                continue
+            for start in range(len(tokens) - size + 1):
+                shingles.add(f"{field_name}:{' '.join(tokens[start:start + size])}")
+    return frozenset(shingles)
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    union = len(left | right)
+    return len(left & right) / union if union else 0.0
+
+
+class MinHasher:
+    """Firmas MinHash deterministicas entre procesos (no dependen de hash())."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: FrozenSet[str]) -> Tuple[int, ...]:
+        if not shingles:
+            return tuple([_MAX_HASH] * self.num_perm)
+        base = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in base)
+            for a, b in self._params
+        )
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    candidates_checked: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "candidates_checked": self.candidates_checked,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+@dataclass
+class _Entry:
+    shingles: FrozenSet[str]
+    signature: Tuple[int, ...]
+    proposal: bytes
+    band_keys: List[Tuple[int, ...]] = field(default_factory=list)
+
+
+class SemanticCache:
+    """Cache LRU acotada con busqueda por similitud MinHash/LSH y persistencia a disco."""
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_entries: int = 512,
+        num_perm: int = 64,
+        bands: int = 16,
+        path: Optional[Path] = None,
+    ) -> None:
+        if num_perm % bands != 0:
+            raise ValueError("num_perm debe ser multiplo de bands.")
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold debe estar en (0, 1].")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.path = Path(path) if path else None
+        self.stats = CacheStats()
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [dict() for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, requirements: Requirements) -> Optional[SolutionProposal]:
+        shingles = requirements_shingles(requirements)
+        signature = self._hasher.signature(shingles)
+        with self._lock:
+            best_key, best_score = None, 0.0
+            for key in self._candidates(signature):
+                self.stats.candidates_checked += 1
+                score = jaccard(shingles, self._entries[key].shingles)
+                if score >= self.threshold and score > best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.stats.hits += 1
+            payload = self._entries[best_key].proposal
+        return loads(payload, SolutionProposal, trusted=True)
+
+    def store(self, requirements: Requirements, proposal: SolutionProposal) -> None:
+        shingles = requirements_shingles(requirements)
+        self._insert(shingles, self._hasher.signature(shingles), dumps(proposal, codec=_ENTRY_CODEC))
+
+    def save(self, path: Optional[Path] = None) -> None:
+        target = Path(path) if path else self.path
+        if target is None:
+            return
+        with self._lock:
+            payload = {
+                "version": _CACHE_FORMAT_VERSION,
+                "num_perm": self._hasher.num_perm,
+                "entries": [
+                    {"shingles": sorted(entry.shingles), "proposal": base64.b64encode(entry.proposal).decode("ascii")}
+                    for entry in self._entries.values()
+                ],
+            }
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        tmp_path.replace(target)
+
+    def load(self, path: Optional[Path] = None) -> int:
+        source = Path(path) if path else self.path
+        if source is None or not source.exists():
+            return 0
+        payload = json.loads(source.read_text(encoding="utf-8"))
+        version = payload.get("version")
+        if version not in (1, _CACHE_FORMAT_VERSION):
+            return 0
+        loaded = 0
+        for item in payload.get("entries", []):
+            shingles = frozenset(item.get("shingles", []))
+            if version == 1:
+                proposal = SolutionProposal.model_validate_json(item["proposal"])
+            else:
+                try:
+                    proposal = loads(base64.b64decode(item["proposal"]), SolutionProposal)
+                except SerializationError:
+                    # Entrada de otro esquema o con un codec no disponible aqui (msgpack): se omite.
+                    continue
+            # Se recodifica con el esquema actual para que los hits puedan decodificar sin validar.
+            self._insert(shingles, self._hasher.signature(shingles), dumps(proposal, codec=_ENTRY_CODEC), count=False)
+            loaded += 1
+        return loaded
+
+    def _insert(
+        self,
+        shingles: FrozenSet[str],
+        signature: Tuple[int, ...],
+        proposal: bytes,
+        count: bool = True,
+    ) -> None:
+        key = hashlib.sha256("\n".join(sorted(shingles)).encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(shingles=shingles, signature=signature, proposal=proposal)
+            for band, band_key in enumerate(self._band_keys(signature)):
+                entry.band_keys.append(band_key)
+                self._buckets[band].setdefault(band_key, set()).add(key)
+            self._entries[key] = entry
+            if count:
+                self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for band, band_key in enumerate(entry.band_keys):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)
+        ]
+
+    def _candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        found: Set[str] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+
+def build_semantic_cache(config: CacheConfig) -> Optional[SemanticCache]:
+    if not config.enabled:
+        return None
+    cache = SemanticCache(
+        threshold=config.similarity_threshold,
+        max_entries=config.max_entries,
+        num_perm=config.num_perm,
+        bands=config.bands,
+        path=Path(config.path) if config.path else None,
+    )
+    cache.load()
+    return cache
@@ -0,0 +1,371 @@
+"""Serializacion compacta y versionada de los modelos de `src.core.schemas`.
+
+Cada entrada lleva un encabezado de 8 bytes (`MAGIC`, version del sobre, codec,
+compresion, modelo y `SCHEMA_VERSION`) seguido del payload:
+
+- `json`: el JSON de pydantic, con claves (autodescriptivo).
+- `packed`: cada modelo como lista de valores en el orden de sus campos, sin
+  claves, codificada en JSON (`orjson` si esta instalado).
+- `msgpack`: las mismas listas en MessagePack (requiere `msgpack`).
+
+La compresion es opcional (`zlib`, o `zstd` con `zstandard`). `loads(...,
+trusted=True)` arma los modelos sin validar, con constructores generados por
+modelo; solo debe usarse con bytes producidos por `dumps` en este mismo
+esquema (caches y colas propias). Las entradas de un `SCHEMA_VERSION` anterior
+se leen con su layout de `LAYOUTS` y se validan: los campos nuevos toman su
+default y los eliminados se descartan. Al cambiar un modelo de `schemas.py` se
+incrementa `SCHEMA_VERSION` y se agrega su layout (hay un test que lo exige).
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+import struct
+import typing
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel
+
+from src.core.schemas import (
+    ADR,
+    BacklogItem,
+    Component,
+    CostEstimate,
+    CostLine,
+    Flow,
+    Requirements,
+    Risk,
+    SolutionProposal,
+)
+
+MAGIC = b"SP"
+ENVELOPE_VERSION = 1
+SCHEMA_VERSION = 1
+
+# La posicion + 1 es la etiqueta del modelo en el encabezado: solo se agrega al final.
+MODELS: Tuple[Type[BaseModel], ...] = (
+    Requirements,
+    Component,
+    Flow,
+    ADR,
+    BacklogItem,
+    Risk,
+    CostLine,
+    CostEstimate,
+    SolutionProposal,
+)
+
+LAYOUTS: Dict[int, Dict[str, Tuple[str, ...]]] = {
+    1: {
+        "Requirements": (
+            "project_name", "domain", "cloud_provider", "functional_requirements", "non_functional_requirements",
+            "constraints", "data_sources", "resources", "traffic_profile", "regions", "compliance", "assumptions",
+        ),
+        "Component": ("name", "purpose", "inputs", "outputs", "dependencies", "security_considerations"),
+        "Flow": ("name", "steps", "error_handling", "timeouts", "idempotency", "fallback", "happy_path"),
+        "ADR": ("id", "title", "context", "options", "decision", "consequences"),
+        "BacklogItem": ("id", "epic", "story", "priority", "acceptance_criteria", "definition_of_done"),
+        "Risk": ("id", "description", "impact", "mitigation", "assumptions"),
+        "CostLine": ("resource", "driver", "p10", "p50", "p90"),
+        "CostEstimate": (
+            "range_low", "range_mid", "range_high", "drivers", "volume_assumptions", "currency",
+            "p10", "p50", "p90", "breakdown",
+        ),
+        "SolutionProposal": (
+            "diagram_mermaid", "components", "flows", "adrs", "backlog", "risks", "cost_estimate", "warnings",
+        ),
+    },
+}
+
+CODECS = {"json": 1, "packed": 2, "msgpack": 3}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+
+_HEADER = struct.Struct("<2sBBBBH")
+_TAGS = {model: index + 1 for index, model in enumerate(MODELS)}
+
+
+class SerializationError(ValueError):
+    pass
+
+
+def dumps(model: BaseModel, codec: str = "auto", compression: str = "none", level: Optional[int] = None) -> bytes:
+    tag = _TAGS.get(type(model))
+    if tag is None:
+        raise SerializationError(f"Modelo no serializable: {type(model).__name__}")
+    codec = _resolve_codec(codec)
+    if codec == "json":
+        payload = model.model_dump_json().encode("utf-8")
+    else:
+        row = _codec(type(model)).to_row(model)
+        payload = _json_dumps(row) if codec == "packed" else _msgpack().packb(row, use_bin_type=True)
+    if compression not in COMPRESSIONS:
+        raise SerializationError(f"Compresion no soportada: {compression}")
+    header = _HEADER.pack(MAGIC, ENVELOPE_VERSION, CODECS[codec], COMPRESSIONS[compression], tag, SCHEMA_VERSION)
+    return header + _compress(compression, payload, level)
+
+
+def loads(data: bytes, model: Optional[Type[BaseModel]] = None, trusted: bool = False) -> BaseModel:
+    """Decodifica una entrada de `dumps`; con `trusted` omite la validacion si el esquema es el actual."""
+    if len(data) < _HEADER.size:
+        raise SerializationError("Entrada truncada.")
+    magic, envelope, codec_id, compression_id, tag, schema_version = _HEADER.unpack_from(data)
+    if magic != MAGIC or envelope != ENVELOPE_VERSION:
+        raise SerializationError("Encabezado de serializacion invalido.")
+    if not 0 < tag <= len(MODELS):
+        raise SerializationError(f"Modelo desconocido en la entrada: {tag}")
+    cls = MODELS[tag - 1]
+    if model is not None and cls is not model:
+        raise SerializationError(f"La entrada contiene {cls.__name__}, no {model.__name__}")
+    layout = LAYOUTS.get(schema_version)
+    if layout is None:
+        raise SerializationError(f"Version de esquema desconocida: {schema_version} (actual {SCHEMA_VERSION})")
+    payload = _decompress(compression_id, data[_HEADER.size:])
+    trusted = trusted and schema_version == SCHEMA_VERSION
+    if codec_id == CODECS["json"]:
+        if trusted:
+            return _codec(cls).from_dict(_json_loads(payload))
+        return cls.model_validate_json(payload)
+    if codec_id == CODECS["packed"]:
+        row = _json_loads(payload)
+    elif codec_id == CODECS["msgpack"]:
+        row = _msgpack().unpackb(payload, raw=False)
+    else:
+        raise SerializationError(f"Codec desconocido en la entrada: {codec_id}")
+    if trusted:
+        return _codec(cls).from_row(row)
+    return cls.model_validate(_row_to_dict(cls, row, layout))
+
+
+def available_codecs() -> List[str]:
+    return ["json", "packed"] + (["msgpack"] if _optional("msgpack") is not None else [])
+
+
+def available_compressions() -> List[str]:
+    return ["none", "zlib"] + (["zstd"] if _optional("zstandard") is not None else [])
+
+
+def json_backend() -> str:
+    return "orjson" if _orjson() is not None else "json"
+
+
+def current_layout() -> Dict[str, Tuple[str, ...]]:
+    return {model.__name__: tuple(model.model_fields) for model in MODELS}
+
+
+def _resolve_codec(codec: str) -> str:
+    if codec == "auto":
+        return "msgpack" if "msgpack" in available_codecs() else "packed"
+    if codec not in CODECS:
+        raise SerializationError(f"Codec no soportado: {codec}")
+    return codec
+
+
+@functools.lru_cache(maxsize=None)
+def _optional(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _orjson():
+    return _optional("orjson")
+
+
+def _msgpack():
+    module = _optional("msgpack")
+    if module is None:
+        raise SerializationError("El codec msgpack requiere el paquete 'msgpack'.")
+    return module
+
+
+def _zstd():
+    module = _optional("zstandard")
+    if module is None:
+        raise SerializationError("La compresion zstd requiere el paquete 'zstandard'.")
+    return module
+
+
+def _json_dumps(value: Any) -> bytes:
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(payload: bytes) -> Any:
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _compress(compression: str, payload: bytes, level: Optional[int]) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(payload, 1 if level is None else level)
+    if compression == "zstd":
+        return _zstd().ZstdCompressor(level=3 if level is None else level).compress(payload)
+    return payload
+
+
+def _decompress(compression_id: int, payload: bytes) -> bytes:
+    if compression_id == COMPRESSIONS["none"]:
+        return payload
+    if compression_id == COMPRESSIONS["zlib"]:
+        return zlib.decompress(payload)
+    if compression_id == COMPRESSIONS["zstd"]:
+        return _zstd().ZstdDecompressor().decompress(payload)
+    raise SerializationError(f"Compresion desconocida en la entrada: {compression_id}")
+
+
+# (nombre, tipo, submodelo) por campo; tipo: "value", "model", "optional" (modelo o None) o "list" (de modelos).
+_Plan = List[Tuple[str, str, Optional[Type[BaseModel]]]]
+_PLANS: Dict[Type[BaseModel], _Plan] = {}
+
+
+def _plan(cls: Type[BaseModel]) -> _Plan:
+    plan = _PLANS.get(cls)
+    if plan is None:
+        plan = [(name, *_field_kind(cls, name, field.annotation)) for name, field in cls.model_fields.items()]
+        _PLANS[cls] = plan
+    return plan
+
+
+def _field_kind(cls: Type[BaseModel], name: str, annotation: Any) -> Tuple[str, Optional[Type[BaseModel]]]:
+    if _is_model(annotation):
+        return "model", annotation
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin in (list, List) and len(args) == 1 and _is_model(args[0]):
+        return "list", args[0]
+    if origin is typing.Union and len(args) == 2 and type(None) in args:
+        inner = args[0] if args[1] is type(None) else args[1]
+        if _is_model(inner):
+            return "optional", inner
+    if _contains_model(annotation):
+        raise TypeError(f"{cls.__name__}.{name}: tipo anidado no soportado por la serializacion compacta")
+    return "value", None
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _contains_model(annotation: Any) -> bool:
+    return _is_model(annotation) or any(_contains_model(arg) for arg in typing.get_args(annotation))
+
+
+def _row_to_dict(cls: Type[BaseModel], row: List[Any], layout: Dict[str, Tuple[str, ...]]) -> Dict[str, Any]:
+    """Lista posicional (con el layout de su version) a dict con claves del modelo actual."""
+    names = layout.get(cls.__name__)
+    if names is None:
+        raise SerializationError(f"{cls.__name__} no existia en la version de esquema de la entrada")
+    kinds = {name: (kind, sub) for name, kind, sub in _plan(cls)}
+    values: Dict[str, Any] = {}
+    for name, value in zip(names, row):
+        spec = kinds.get(name)
+        if spec is None:
+            continue
+        kind, sub = spec
+        if kind == "list":
+            value = [_row_to_dict(sub, item, layout) for item in value]
+        elif kind != "value" and value is not None:
+            value = _row_to_dict(sub, value, layout)
+        values[name] = value
+    return values
+
+
+class _ModelCodec:
+    __slots__ = ("to_row", "from_row", "from_dict")
+
+    def __init__(self, to_row: Callable, from_row: Callable, from_dict: Callable) -> None:
+        self.to_row = to_row
+        self.from_row = from_row
+        self.from_dict = from_dict
+
+
+_CODECS: Dict[Type[BaseModel], _ModelCodec] = {}
+# Descriptores de los slots de BaseModel en pydantic 2.x (version acotada en requirements.txt).
+# Si una version no los tiene, los modelos se arman con `model_construct`: publico, pero ~5x mas lento.
+try:
+    _SLOTS: Optional[Dict[str, Callable]] = {
+        name: BaseModel.__dict__[name].__set__
+        for name in ("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")
+    }
+except (KeyError, AttributeError):  # pragma: no cover - depende de la version de pydantic
+    _SLOTS = None
+
+
+_COMPILING: Set[Type[BaseModel]] = set()
+
+
+def _codec(cls: Type[BaseModel]) -> _ModelCodec:
+    codec = _CODECS.get(cls)
+    if codec is None:
+        if cls in _COMPILING:
+            raise TypeError(f"{cls.__name__}: modelos recursivos no soportados por la serializacion compacta")
+        _COMPILING.add(cls)
+        try:
+            codec = _compile(cls)
+        finally:
+            _COMPILING.discard(cls)
+        _CODECS[cls] = codec
+    return codec
+
+
+def _compile(cls: Type[BaseModel]) -> _ModelCodec:
+    """Genera to_row/from_row/from_dict para `cls`.
+
+    Se generan con `exec` (como `dataclasses` o `namedtuple`): armar el modelo
+    con un dict literal y sin bucles por campo es lo que hace que la ruta
+    `trusted` sea mas rapida que la validacion de pydantic y que
+    `model_construct` (ver `benchmarks/bench_serialization.py`).
+    """
+    env: Dict[str, Any] = {"new": cls.__new__, "cls": cls, "fields": frozenset(cls.model_fields)}
+    if _SLOTS is not None:
+        # Lo mismo que asigna `model_construct` (todos los campos presentes), sin sus bucles por campo.
+        env.update(
+            set_dict=_SLOTS["__dict__"],
+            set_fields=_SLOTS["__pydantic_fields_set__"],
+            set_extra=_SLOTS["__pydantic_extra__"],
+            set_private=_SLOTS["__pydantic_private__"],
+        )
+    packed, from_row, from_dict = [], [], []
+    for index, (name, kind, sub) in enumerate(_plan(cls)):
+        key = repr(name)
+        if kind == "value":
+            packed.append(f"d[{key}]")
+            from_row.append(f"{key}: row[{index}]")
+            from_dict.append(f"{key}: data[{key}]")
+            continue
+        nested = _codec(sub)
+        env[f"p{index}"], env[f"r{index}"], env[f"d{index}"] = nested.to_row, nested.from_row, nested.from_dict
+        if kind == "list":
+            packed.append(f"[p{index}(x) for x in d[{key}]]")
+            from_row.append(f"{key}: [r{index}(x) for x in row[{index}]]")
+            from_dict.append(f"{key}: [d{index}(x) for x in data[{key}]]")
+        elif kind == "model":
+            packed.append(f"p{index}(d[{key}])")
+            from_row.append(f"{key}: r{index}(row[{index}])")
+            from_dict.append(f"{key}: d{index}(data[{key}])")
+        else:
+            packed.append(f"None if d[{key}] is None else p{index}(d[{key}])")
+            from_row.append(f"{key}: None if row[{index}] is None else r{index}(row[{index}])")
+            from_dict.append(f"{key}: None if data[{key}] is None else d{index}(data[{key}])")
+    build = (
+        " o = new(cls)\n"
+        " set_dict(o, values)\n"
+        " set_fields(o, set(fields))\n"
+        " set_extra(o, None)\n"
+        " set_private(o, None)\n"
+        " return o\n"
+    ) if _SLOTS is not None else " return cls.model_construct(**values)\n"
+    source = (
+        f"def to_row(model):\n d = model.__dict__\n return [{', '.join(packed)}]\n"
+        f"def from_row(row):\n values = {{{', '.join(from_row)}}}\n{build}"
+        f"def from_dict(data):\n values = {{{', '.join(from_dict)}}}\n{build}"
+    )
+    exec(compile(source, f"<serialization {cls.__name__}>", "exec"), env)
+    return _ModelCodec(env["to_row"], env["from_row"], env["from_dict"])
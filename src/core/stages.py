@@ -0,0 +1,135 @@
+"""Ejecucion de etapas como grafo de dependencias.
+
+Cada etapa recibe un diccionario con los resultados de las etapas ya
+terminadas y devuelve su propio resultado. Las etapas cuyas dependencias
+estan completas se lanzan en paralelo en un pool de hilos; al terminar se
+calcula la ruta critica (la cadena de dependencias que determino la duracion
+total) para registrarla en los logs.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from monitoring.profiling import profile_section
+
+StageFn = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: StageFn
+    deps: Sequence[str] = ()
+
+
+@dataclass
+class StageTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class StageRun:
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+
+    @property
+    def total_seconds(self) -> float:
+        if not self.timings:
+            return 0.0
+        start = min(t.start for t in self.timings.values())
+        end = max(t.end for t in self.timings.values())
+        return end - start
+
+    def describe_critical_path(self) -> str:
+        return " -> ".join(
+            f"{name}({self.timings[name].duration * 1000:.0f}ms)" for name in self.critical_path
+        )
+
+
+class StageGraph:
+    def __init__(self) -> None:
+        self._stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, fn: StageFn, deps: Sequence[str] = ()) -> None:
+        if name in self._stages:
+            raise ValueError(f"Etapa duplicada: {name}")
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"La etapa {name} depende de una etapa desconocida: {dep}")
+        self._stages[name] = Stage(name=name, fn=fn, deps=tuple(deps))
+
+    @property
+    def stages(self) -> List[Stage]:
+        return list(self._stages.values())
+
+    def run(self, max_workers: int = 4, results: Optional[Dict[str, Any]] = None) -> StageRun:
+        run = StageRun(results=dict(results or {}))
+        pending = {name: stage for name, stage in self._stages.items() if name not in run.results}
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                ready = [
+                    stage
+                    for stage in pending.values()
+                    if all(dep in run.results for dep in stage.deps)
+                ]
+                for stage in ready:
+                    del pending[stage.name]
+                    snapshot = dict(run.results)
+                    running[pool.submit(self._timed, stage, snapshot)] = stage.name
+                if not running:
+                    raise RuntimeError(f"Dependencias no resueltas: {sorted(pending)}")
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        value, timing = future.result()
+                    except Exception as exc:
+                        # Para los logs y el registro de ejecuciones: en que etapa fallo y
+                        # cuanto duraron las etapas que alcanzaron a correr.
+                        if getattr(exc, "failed_stage", None) is None:
+                            exc.failed_stage = name
+                            timing = getattr(exc, "stage_timing", None)
+                            if timing is not None:
+                                run.timings[name] = timing
+                            exc.partial_run = run
+                        raise
+                    run.results[name] = value
+                    run.timings[name] = timing
+
+        run.critical_path = self._critical_path(run.timings)
+        return run
+
+    @staticmethod
+    def _timed(stage: Stage, results: Dict[str, Any]) -> tuple[Any, StageTiming]:
+        start = time.perf_counter()
+        try:
+            with profile_section(f"stage.{stage.name}"):
+                value = stage.fn(results)
+        except Exception as exc:
+            if getattr(exc, "stage_timing", None) is None:
+                exc.stage_timing = StageTiming(start=start, end=time.perf_counter())
+            raise
+        return value, StageTiming(start=start, end=time.perf_counter())
+
+    def _critical_path(self, timings: Dict[str, StageTiming]) -> List[str]:
+        if not timings:
+            return []
+        current: Optional[str] = max(timings, key=lambda name: timings[name].end)
+        path: List[str] = []
+        while current is not None:
+            path.append(current)
+            deps = [dep for dep in self._stages[current].deps if dep in timings]
+            current = max(deps, key=lambda name: timings[name].end) if deps else None
+        return list(reversed(path))
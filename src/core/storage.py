@@ -0,0 +1,279 @@
+"""Backends de almacenamiento para los artefactos generados.
+
+`LocalStore` escribe en un directorio; `S3Store` sube directo a un bucket
+S3-compatible (AWS, MinIO, moto), sin copiar luego la salida local:
+
+- un cliente boto3 por endpoint, compartido entre ejecuciones y con un pool de
+  conexiones del tamano de la concurrencia de subida;
+- subidas concurrentes y multipart para artefactos grandes;
+- los objetos se direccionan por contenido (`<prefix>objects/<sha256[:2]>/<sha256>`):
+  el mismo contenido de cualquier proyecto o worker es una sola clave, y dos
+  escritores de la misma clave suben exactamente los mismos bytes;
+- cada proyecto (`namespace`, por defecto el nombre del directorio de salida)
+  tiene su manifiesto `<prefix><namespace>/manifest.json` con ruta -> objeto;
+  el manifiesto anterior solo se lee para omitir subidas ya hechas, y el nuevo
+  se escribe completo (sin mezclar con el anterior) al final de la ejecucion,
+  de modo que un lector nunca ve un manifiesto que apunte a objetos a medio
+  subir y dos workers concurrentes no se pisan entradas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import mimetypes
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.config import StorageConfig
+from src.core.deadline import Deadline
+
+ARTIFACT_DIRS = ("architecture", "adr", "backlog", "risk", "cost")
+MANIFEST_NAME = "manifest.json"
+_MANIFEST_VERSION = 2
+
+
+@dataclass
+class StoreResult:
+    location: str
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+
+class ArtifactStore(ABC):
+    """Destino de artefactos {ruta relativa: contenido}."""
+
+    location = ""
+
+    @abstractmethod
+    def write_all(
+        self,
+        artifacts: Dict[str, bytes],
+        logger: Optional[logging.Logger] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResult:
+        """Escribe los artefactos y devuelve que se escribio, que no cambio y que se omitio."""
+
+
+class LocalStore(ArtifactStore):
+    def __init__(self, base_path: Path) -> None:
+        self.base_path = Path(base_path)
+        self.location = str(self.base_path)
+
+    def write_all(
+        self,
+        artifacts: Dict[str, bytes],
+        logger: Optional[logging.Logger] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResult:
+        log = logger or logging.getLogger("solution-architect.storage")
+        result = StoreResult(location=self.location)
+        log.info("Creando directorios en %s", self.base_path)
+        for directory in ARTIFACT_DIRS:
+            (self.base_path / directory).mkdir(parents=True, exist_ok=True)
+        for relative, content in artifacts.items():
+            if _out_of_time(relative, deadline, log):
+                result.skipped.append(relative)
+                continue
+            path = self.base_path / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            log.info("Escribiendo %s", path)
+            path.write_bytes(content)
+            result.written.append(relative)
+        return result
+
+
+_CLIENTS: Dict[Tuple[Optional[str], Optional[str], int], Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _s3_client(endpoint_url: Optional[str], region: Optional[str], pool_size: int):
+    """Cliente boto3 compartido por endpoint/region; los clientes son thread-safe."""
+    key = (endpoint_url, region, pool_size)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.session.Session().client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                config=Config(max_pool_connections=pool_size, retries={"max_attempts": 3, "mode": "standard"}),
+            )
+            _CLIENTS[key] = client
+    return client
+
+
+class S3Store(ArtifactStore):
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        namespace: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        max_workers: int = 8,
+        multipart_threshold_mb: int = 8,
+        client: Any = None,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.namespace = namespace.strip("/") or "default"
+        self.max_workers = max_workers
+        self.multipart_threshold = multipart_threshold_mb * 1024 * 1024
+        self._client = client or _s3_client(endpoint_url or None, region or None, max_workers)
+        self.location = f"s3://{bucket}/{self.prefix}{self.namespace}/"
+
+    def key(self, digest: str) -> str:
+        """Clave del objeto con ese sha256."""
+        return f"{self.prefix}objects/{digest[:2]}/{digest}"
+
+    @property
+    def manifest_key(self) -> str:
+        return f"{self.prefix}{self.namespace}/{MANIFEST_NAME}"
+
+    def read_manifest(self) -> Dict[str, Any]:
+        try:
+            body = self._client.get_object(Bucket=self.bucket, Key=self.manifest_key)["Body"].read()
+        except Exception as exc:  # NoSuchKey o bucket vacio: primera ejecucion
+            if _error_code(exc) in ("NoSuchKey", "404", "NotFound"):
+                return {}
+            raise
+        try:
+            return json.loads(body)
+        except ValueError:
+            return {}
+
+    def write_all(
+        self,
+        artifacts: Dict[str, bytes],
+        logger: Optional[logging.Logger] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResult:
+        log = logger or logging.getLogger("solution-architect.storage")
+        result = StoreResult(location=self.location)
+        # Solo lectura: los objetos listados ya estan subidos (las claves no cambian de contenido).
+        previous = self.read_manifest().get("artifacts", {})
+        stored = {entry.get("sha256") for entry in previous.values()}
+        entries: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[str, bytes, str]] = []
+        for relative, content in artifacts.items():
+            digest = hashlib.sha256(content).hexdigest()
+            if digest in stored:
+                entries[relative] = {"key": self.key(digest), "sha256": digest, "size": len(content)}
+                result.unchanged.append(relative)
+            else:
+                pending.append((relative, content, digest))
+
+        transfer = self._transfer_config()
+
+        def upload(item: Tuple[str, bytes, str]) -> Optional[str]:
+            relative, content, digest = item
+            if _out_of_time(relative, deadline, log):
+                return None
+            log.info("Subiendo %s como %s/%s", relative, self.bucket, self.key(digest))
+            self._client.upload_fileobj(
+                io.BytesIO(content),
+                self.bucket,
+                self.key(digest),
+                ExtraArgs={"Metadata": {"sha256": digest}, "ContentType": _content_type(relative)},
+                Config=transfer,
+            )
+            return relative
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="s3-upload") as pool:
+            for (relative, content, digest), uploaded in zip(pending, pool.map(upload, pending)):
+                if uploaded is None:
+                    result.skipped.append(relative)
+                    if relative in previous:
+                        # Sin tiempo para subir la version nueva: se conserva la anterior en el manifiesto.
+                        entries[relative] = previous[relative]
+                    continue
+                entries[relative] = {"key": self.key(digest), "sha256": digest, "size": len(content)}
+                result.written.append(relative)
+
+        self._commit(entries)
+        log.info(
+            "Artefactos en %s: %d subidos, %d sin cambios, %d omitidos",
+            self.location,
+            len(result.written),
+            len(result.unchanged),
+            len(result.skipped),
+        )
+        return result
+
+    def _commit(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        manifest = {
+            "version": _MANIFEST_VERSION,
+            "namespace": self.namespace,
+            "committed_at": datetime.now(timezone.utc).isoformat(),
+            "artifacts": dict(sorted(entries.items())),
+        }
+        self._client.put_object(
+            Bucket=self.bucket,
+            Key=self.manifest_key,
+            Body=json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    def _transfer_config(self):
+        from boto3.s3.transfer import TransferConfig
+
+        # La concurrencia esta en el pool de artefactos; cada subida usa un hilo.
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_threshold,
+            max_concurrency=1,
+            use_threads=False,
+        )
+
+
+def build_store(config: StorageConfig, base_path: Path, namespace: str = "") -> ArtifactStore:
+    """`namespace` identifica el manifiesto en S3; por defecto, el nombre de `base_path`."""
+    backend = (config.backend or "local").strip().lower()
+    if backend == "local":
+        return LocalStore(base_path)
+    if backend == "s3":
+        if not config.bucket_name:
+            raise ValueError("storage.bucket_name es obligatorio con storage.backend=s3.")
+        return S3Store(
+            config.bucket_name,
+            prefix=config.prefix,
+            namespace=namespace or Path(base_path).name,
+            endpoint_url=config.endpoint_url,
+            region=config.region,
+            max_workers=config.max_workers,
+            multipart_threshold_mb=config.multipart_threshold_mb,
+        )
+    raise ValueError(f"storage.backend no soportado: {config.backend}")
+
+
+def _out_of_time(relative: str, deadline: Optional[Deadline], log: logging.Logger) -> bool:
+    if deadline is None or not deadline.expired:
+        return False
+    deadline.warn(f"No se escribio {relative}: se agoto el tiempo de persistencia.")
+    log.warning("Se omite %s: se agoto el tiempo de persistencia", relative)
+    return True
+
+
+def _content_type(relative: str) -> str:
+    if relative.endswith(".md"):
+        return "text/markdown; charset=utf-8"
+    if relative.endswith(".csv"):
+        return "text/csv; charset=utf-8"
+    return mimetypes.guess_type(relative)[0] or "application/octet-stream"
+
+
+def _error_code(exc: Exception) -> str:
+    response = getattr(exc, "response", None) or {}
+    return str(response.get("Error", {}).get("Code", ""))
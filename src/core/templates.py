@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import List
-
 import csv
 import io
+from typing import List
 
-from src.core.schemas import ADR, BacklogItem, CostEstimate, Flow, Risk, SolutionProposal
+from monitoring.profiling import profiled
+from src.core.schemas import ADR, BacklogItem, Component, CostEstimate, Flow, Risk, SolutionProposal
 
 
+@profiled()
 def proposal_to_markdown(proposal: SolutionProposal) -> str:
     parts: List[str] = []
     parts.append("# Propuesta de arquitectura\n")
@@ -17,60 +18,97 @@ def proposal_to_markdown(proposal: SolutionProposal) -> str:
     parts.append("\n```\n")
 
     parts.append("## 2) Componentes y responsabilidades\n")
-    for component in proposal.components:
-        parts.append(f"### {component.name}\n")
-        parts.append(f"- Proposito: {component.purpose}\n")
-        parts.append(f"- Entradas: {', '.join(component.inputs)}\n")
-        parts.append(f"- Salidas: {', '.join(component.outputs)}\n")
-        parts.append(f"- Dependencias: {', '.join(component.dependencies)}\n")
-        parts.append(
-            f"- Seguridad: {', '.join(component.security_considerations)}\n"
-        )
+    parts.extend(_component_section(component) for component in proposal.components)
 
     parts.append("## 3) Flujos end-to-end\n")
-    for flow in proposal.flows:
-        parts.append(f"### {flow.name}\n")
-        parts.append(f"- Pasos: {', '.join(flow.steps)}\n")
-        parts.append(f"- Errores: {', '.join(flow.error_handling)}\n")
-        parts.append(f"- Timeouts: {', '.join(flow.timeouts)}\n")
-        parts.append(f"- Idempotencia: {', '.join(flow.idempotency)}\n")
-        parts.append(f"- Fallback: {', '.join(flow.fallback)}\n")
-        parts.append(f"- Happy path: {', '.join(flow.happy_path)}\n")
+    parts.extend(_flow_section(flow) for flow in proposal.flows)
 
     parts.append("## 4) ADRs\n")
-    for adr in proposal.adrs:
-        parts.append(f"### {adr.id} - {adr.title}\n")
-        parts.append(f"- Contexto: {adr.context}\n")
-        parts.append(f"- Opciones: {', '.join(adr.options)}\n")
-        parts.append(f"- Decision: {adr.decision}\n")
-        parts.append(f"- Consecuencias: {', '.join(adr.consequences)}\n")
+    parts.extend(_adr_section(adr) for adr in proposal.adrs)
 
     parts.append("## 5) Backlog tecnico\n")
-    for item in proposal.backlog:
-        parts.append(f"### {item.id} - {item.epic}\n")
-        parts.append(f"- Historia: {item.story}\n")
-        parts.append(f"- Prioridad: {item.priority}\n")
-        parts.append(
-            f"- Criterios de aceptacion: {', '.join(item.acceptance_criteria)}\n"
-        )
-        parts.append(
-            f"- Definition of done: {', '.join(item.definition_of_done)}\n"
-        )
+    parts.extend(_backlog_section(item) for item in proposal.backlog)
 
     parts.append("## 6) Riesgos, mitigaciones y supuestos\n")
-    for risk in proposal.risks:
-        parts.append(f"### {risk.id}\n")
-        parts.append(f"- Riesgo: {risk.description}\n")
-        parts.append(f"- Impacto: {risk.impact}\n")
-        parts.append(f"- Mitigacion: {risk.mitigation}\n")
-        parts.append(f"- Supuestos: {', '.join(risk.assumptions)}\n")
+    parts.extend(_risk_section(risk) for risk in proposal.risks)
 
     parts.append("## 7) Estimacion de costos\n")
     parts.append(cost_estimate_to_markdown(proposal.cost_estimate, include_heading=False))
 
+    if proposal.warnings:
+        parts.append("## Advertencias (respuesta parcial)\n")
+        for warning in proposal.warnings:
+            parts.append(f"- {warning}\n")
+
     return "\n".join(parts).strip() + "\n"
 
 
+# Cada seccion de la propuesta completa son sus lineas unidas por "\n", igual que si se
+# agregaran una por una a `parts`.
+def _component_section(component: Component) -> str:
+    return "\n".join(
+        [
+            f"### {component.name}\n",
+            f"- Proposito: {component.purpose}\n",
+            f"- Entradas: {', '.join(component.inputs)}\n",
+            f"- Salidas: {', '.join(component.outputs)}\n",
+            f"- Dependencias: {', '.join(component.dependencies)}\n",
+            f"- Seguridad: {', '.join(component.security_considerations)}\n",
+        ]
+    )
+
+
+def _flow_section(flow: Flow) -> str:
+    return "\n".join(
+        [
+            f"### {flow.name}\n",
+            f"- Pasos: {', '.join(flow.steps)}\n",
+            f"- Errores: {', '.join(flow.error_handling)}\n",
+            f"- Timeouts: {', '.join(flow.timeouts)}\n",
+            f"- Idempotencia: {', '.join(flow.idempotency)}\n",
+            f"- Fallback: {', '.join(flow.fallback)}\n",
+            f"- Happy path: {', '.join(flow.happy_path)}\n",
+        ]
+    )
+
+
+def _adr_section(adr: ADR) -> str:
+    return "\n".join(
+        [
+            f"### {adr.id} - {adr.title}\n",
+            f"- Contexto: {adr.context}\n",
+            f"- Opciones: {', '.join(adr.options)}\n",
+            f"- Decision: {adr.decision}\n",
+            f"- Consecuencias: {', '.join(adr.consequences)}\n",
+        ]
+    )
+
+
+def _backlog_section(item: BacklogItem) -> str:
+    return "\n".join(
+        [
+            f"### {item.id} - {item.epic}\n",
+            f"- Historia: {item.story}\n",
+            f"- Prioridad: {item.priority}\n",
+            f"- Criterios de aceptacion: {', '.join(item.acceptance_criteria)}\n",
+            f"- Definition of done: {', '.join(item.definition_of_done)}\n",
+        ]
+    )
+
+
+def _risk_section(risk: Risk) -> str:
+    return "\n".join(
+        [
+            f"### {risk.id}\n",
+            f"- Riesgo: {risk.description}\n",
+            f"- Impacto: {risk.impact}\n",
+            f"- Mitigacion: {risk.mitigation}\n",
+            f"- Supuestos: {', '.join(risk.assumptions)}\n",
+        ]
+    )
+
+
+@profiled()
 def adr_to_markdown(adr: ADR) -> str:
     return "\n".join(
         [
@@ -88,20 +126,28 @@ def adr_to_markdown(adr: ADR) -> str:
     )
 
 
+@profiled()
 def backlog_to_markdown(items: List[BacklogItem]) -> str:
     lines: List[str] = ["# Backlog tecnico", ""]
-    for item in items:
-        lines.append(f"## {item.id} - {item.epic}")
-        lines.append(f"- Historia: {item.story}")
-        lines.append(f"- Prioridad: {item.priority}")
-        lines.append("- Criterios de aceptacion:")
-        lines.extend([f"  - {criterion}" for criterion in item.acceptance_criteria])
-        lines.append("- Definition of done:")
-        lines.extend([f"  - {done}" for done in item.definition_of_done])
-        lines.append("")
+    lines.extend(_backlog_entry(item) for item in items)
     return "\n".join(lines).strip() + "\n"
 
 
+def _backlog_entry(item: BacklogItem) -> str:
+    lines = [
+        f"## {item.id} - {item.epic}",
+        f"- Historia: {item.story}",
+        f"- Prioridad: {item.priority}",
+        "- Criterios de aceptacion:",
+    ]
+    lines.extend([f"  - {criterion}" for criterion in item.acceptance_criteria])
+    lines.append("- Definition of done:")
+    lines.extend([f"  - {done}" for done in item.definition_of_done])
+    lines.append("")
+    return "\n".join(lines)
+
+
+@profiled()
 def backlog_to_csv(items: List[BacklogItem]) -> str:
     output = io.StringIO()
     writer = csv.writer(output)
@@ -128,19 +174,27 @@ def backlog_to_csv(items: List[BacklogItem]) -> str:
         )
     return output.getvalue()
 
+@profiled()
 def risks_to_markdown(risks: List[Risk]) -> str:
     lines: List[str] = ["# Registro de riesgos", ""]
-    for risk in risks:
-        lines.append(f"## {risk.id}")
-        lines.append(f"- Riesgo: {risk.description}")
-        lines.append(f"- Impacto: {risk.impact}")
-        lines.append(f"- Mitigacion: {risk.mitigation}")
-        lines.append("- Supuestos:")
-        lines.extend([f"  - {assumption}" for assumption in risk.assumptions])
-        lines.append("")
+    lines.extend(_risk_entry(risk) for risk in risks)
     return "\n".join(lines).strip() + "\n"
 
 
+def _risk_entry(risk: Risk) -> str:
+    lines = [
+        f"## {risk.id}",
+        f"- Riesgo: {risk.description}",
+        f"- Impacto: {risk.impact}",
+        f"- Mitigacion: {risk.mitigation}",
+        "- Supuestos:",
+    ]
+    lines.extend([f"  - {assumption}" for assumption in risk.assumptions])
+    lines.append("")
+    return "\n".join(lines)
+
+
+@profiled()
 def cost_estimate_to_markdown(cost: CostEstimate, include_heading: bool = True) -> str:
     lines: List[str] = []
     if include_heading:
@@ -155,4 +209,16 @@ def cost_estimate_to_markdown(cost: CostEstimate, include_heading: bool = True)
             "",
         ]
     )
+    if cost.breakdown:
+        lines.extend(
+            [
+                f"| Recurso | Driver | P10 ({cost.currency}) | P50 ({cost.currency}) | P90 ({cost.currency}) |",
+                "| --- | --- | ---: | ---: | ---: |",
+            ]
+        )
+        lines.extend(
+            f"| {line.resource} | {line.driver} | {line.p10:,.2f} | {line.p50:,.2f} | {line.p90:,.2f} |"
+            for line in cost.breakdown
+        )
+        lines.append("")
     return "\n".join(lines)
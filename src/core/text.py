@@ -0,0 +1,15 @@
+"""Normalizacion de texto compartida por la cache semantica y el motor de reglas."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(value: str) -> str:
+    """Minusculas, sin acentos y con espacios colapsados."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(ascii_text.lower()))
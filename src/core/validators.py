@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Any, Iterable
 
-from src.core.schemas import SolutionProposal
+from src.core.schemas import PROPOSAL_SECTIONS, SolutionProposal
 
 
 def ensure_no_gateway(text: str) -> None:
@@ -16,55 +16,70 @@ def ensure_no_gateway_in_lines(lines: Iterable[str]) -> None:
 
 
 def ensure_no_gateway_in_proposal(proposal: SolutionProposal) -> None:
-    ensure_no_gateway(proposal.diagram_mermaid)
-    for component in proposal.components:
-        ensure_no_gateway_in_lines(
-            [
-                component.name,
-                component.purpose,
-                *component.inputs,
-                *component.outputs,
-                *component.dependencies,
-                *component.security_considerations,
-            ]
-        )
-    for flow in proposal.flows:
-        ensure_no_gateway_in_lines(
-            [
-                flow.name,
-                *flow.steps,
-                *flow.error_handling,
-                *flow.timeouts,
-                *flow.idempotency,
-                *flow.fallback,
-                *flow.happy_path,
-            ]
-        )
-    for adr in proposal.adrs:
-        ensure_no_gateway_in_lines(
-            [adr.id, adr.title, adr.context, *adr.options, adr.decision, *adr.consequences]
-        )
-    for item in proposal.backlog:
+    for section in PROPOSAL_SECTIONS:
+        ensure_no_gateway_in_section(section, getattr(proposal, section))
+    ensure_no_gateway_in_lines(proposal.warnings)
+
+
+def ensure_no_gateway_in_section(section: str, value: Any) -> None:
+    """Valida una seccion de `SolutionProposal` por separado (p. ej. al emitirla en streaming)."""
+    if section == "diagram_mermaid":
+        ensure_no_gateway(value)
+    elif section == "components":
+        for component in value:
+            ensure_no_gateway_in_lines(
+                [
+                    component.name,
+                    component.purpose,
+                    *component.inputs,
+                    *component.outputs,
+                    *component.dependencies,
+                    *component.security_considerations,
+                ]
+            )
+    elif section == "flows":
+        for flow in value:
+            ensure_no_gateway_in_lines(
+                [
+                    flow.name,
+                    *flow.steps,
+                    *flow.error_handling,
+                    *flow.timeouts,
+                    *flow.idempotency,
+                    *flow.fallback,
+                    *flow.happy_path,
+                ]
+            )
+    elif section == "adrs":
+        for adr in value:
+            ensure_no_gateway_in_lines(
+                [adr.id, adr.title, adr.context, *adr.options, adr.decision, *adr.consequences]
+            )
+    elif section == "backlog":
+        for item in value:
+            ensure_no_gateway_in_lines(
+                [
+                    item.id,
+                    item.epic,
+                    item.story,
+                    item.priority,
+                    *item.acceptance_criteria,
+                    *item.definition_of_done,
+                ]
+            )
+    elif section == "risks":
+        for risk in value:
+            ensure_no_gateway_in_lines(
+                [risk.id, risk.description, risk.impact, risk.mitigation, *risk.assumptions]
+            )
+    elif section == "cost_estimate":
         ensure_no_gateway_in_lines(
             [
-                item.id,
-                item.epic,
-                item.story,
-                item.priority,
-                *item.acceptance_criteria,
-                *item.definition_of_done,
+                value.range_low,
+                value.range_mid,
+                value.range_high,
+                *value.drivers,
+                *value.volume_assumptions,
             ]
         )
-    for risk in proposal.risks:
-        ensure_no_gateway_in_lines(
-            [risk.id, risk.description, risk.impact, risk.mitigation, *risk.assumptions]
-        )
-    ensure_no_gateway_in_lines(
-        [
-            proposal.cost_estimate.range_low,
-            proposal.cost_estimate.range_mid,
-            proposal.cost_estimate.range_high,
-            *proposal.cost_estimate.drivers,
-            *proposal.cost_estimate.volume_assumptions,
-        ]
-    )
+        ensure_no_gateway_in_lines(line.resource for line in value.breakdown)
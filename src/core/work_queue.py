@@ -0,0 +1,451 @@
+"""Cola de trabajos compartida con leases para ejecutar lotes en varias maquinas.
+
+Cada trabajo (un `Requirements` serializado) lo reclama un worker con una
+lease de `lease_seconds`; mientras lo procesa la renueva con `heartbeat`. Si
+el worker muere, la lease vence y otro worker lo reclama. Cada reclamo cuenta
+como intento: al agotar `max_attempts` (por errores o por leases vencidas) el
+trabajo pasa a `dead` (dead-letter) con el ultimo error. El resultado y los
+tiempos por etapa se guardan en la misma fila para agregarlos despues.
+
+Backends:
+
+- `SQLiteWorkQueue`: un archivo en un volumen compartido. Reclamar es una
+  transaccion `BEGIN IMMEDIATE` corta, asi que el costo por trabajo no crece
+  con el numero de workers. WAL necesita memoria compartida entre procesos:
+  en sistemas de archivos de red usar `journal_mode="delete"`.
+- `MemoryWorkQueue`: sustituto local en memoria (un proceso, varios hilos),
+  para pruebas y ejecuciones de una sola maquina.
+
+Estados: pending -> leased -> done | pending (reintento) | dead.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from monitoring.metrics import metrics
+from src.core.config import WorkQueueConfig
+
+JOB_STATES = ("pending", "leased", "done", "dead")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    batch TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    result TEXT,
+    timings TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, available_at, seq);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, status);
+"""
+
+
+class LeaseLost(RuntimeError):
+    """El worker perdio la lease del trabajo (vencio y otro worker lo reclamo)."""
+
+
+@dataclass
+class Job:
+    id: str
+    batch: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    # Lo activa el heartbeat del worker si la lease se pierde; el procesador debe abortar.
+    lease_lost: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        return self.id.split("/", 1)[-1]
+
+
+@dataclass
+class JobRecord:
+    id: str
+    batch: str
+    status: str
+    attempts: int
+    worker: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class WorkQueue(ABC):
+    """Interfaz de la cola; `job_id` es `<lote>/<nombre>`, de modo que reencolar no duplica."""
+
+    @abstractmethod
+    def enqueue(self, batch: str, items: Iterable[Tuple[str, Dict[str, Any]]], max_attempts: int = 3) -> int:
+        ...
+
+    @abstractmethod
+    def claim(self, worker: str, lease_seconds: float, limit: int = 1, batch: Optional[str] = None) -> List[Job]:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        """Extiende la lease; False si el worker ya no la tiene (vencio y otro la reclamo)."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any], timings: Dict[str, float]) -> bool:
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, worker: str, error: str, retry_delay: float = 0.0) -> bool:
+        ...
+
+    @abstractmethod
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    def records(self, batch: Optional[str] = None, status: Optional[str] = None) -> List[JobRecord]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def outstanding(self, batch: Optional[str] = None) -> int:
+        counts = self.counts(batch)
+        return counts["pending"] + counts["leased"]
+
+    def dead_letters(self, batch: Optional[str] = None) -> List[JobRecord]:
+        return self.records(batch, status="dead")
+
+    def summary(self, batch: Optional[str] = None) -> Dict[str, Any]:
+        """Conteos por estado, throughput de los trabajos terminados y p50/p95 por etapa."""
+        done = self.records(batch, status="done")
+        summary: Dict[str, Any] = {"counts": self.counts(batch), "workers": len({r.worker for r in done})}
+        if done:
+            span = max(r.finished_at for r in done) - min(r.started_at for r in done)
+            summary["wall_seconds"] = round(span, 3)
+            summary["jobs_per_second"] = round(len(done) / span, 3) if span > 0 else None
+        stages: Dict[str, List[float]] = {}
+        for record in done:
+            for stage, seconds in record.timings.items():
+                stages.setdefault(stage, []).append(seconds)
+        summary["stages"] = {
+            stage: {
+                "count": len(values),
+                "p50": round(float(np.percentile(values, 50)), 6),
+                "p95": round(float(np.percentile(values, 95)), 6),
+            }
+            for stage, values in sorted(stages.items())
+        }
+        return summary
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, path: Path, journal_mode: str = "wal", clock: Callable[[], float] = time.time) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, batch: str, items: Iterable[Tuple[str, Dict[str, Any]]], max_attempts: int = 3) -> int:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (seq,) = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM jobs").fetchone()
+                rows = [
+                    (f"{batch}/{name}", seq + index, batch, json.dumps(payload, ensure_ascii=False), max_attempts, now, now)
+                    for index, (name, payload) in enumerate(items, start=1)
+                ]
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (id, seq, batch, payload, max_attempts, available_at, enqueued_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                added = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def claim(self, worker: str, lease_seconds: float, limit: int = 1, batch: Optional[str] = None) -> List[Job]:
+        now = self._clock()
+        batch_filter = " AND batch = ?" if batch is not None else ""
+        batch_args: Tuple[Any, ...] = (batch,) if batch is not None else ()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dead = self._conn.execute(
+                    "UPDATE jobs SET status = 'dead', finished_at = ?, lease_owner = NULL, "
+                    "error = COALESCE(error, 'Lease vencida sin respuesta del worker ' || lease_owner) "
+                    "WHERE status = 'leased' AND lease_expires_at <= ? AND attempts >= max_attempts" + batch_filter,
+                    (now, now, *batch_args),
+                ).rowcount
+                rows = self._conn.execute(
+                    "SELECT id, batch, payload, attempts, max_attempts, status FROM jobs "
+                    "WHERE ((status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires_at <= ?))"
+                    + batch_filter
+                    + " ORDER BY seq LIMIT ?",
+                    (now, now, *batch_args, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, started_at = ?, worker = ? WHERE id = ?",
+                    [(worker, now + lease_seconds, now, worker, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        _count_claims(rows, dead)
+        return [Job(row[0], row[1], json.loads(row[2]), row[3] + 1, row[4]) for row in rows]
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        return self._update(
+            "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (self._clock() + lease_seconds, job_id, worker),
+        )
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any], timings: Dict[str, float]) -> bool:
+        return self._update(
+            "UPDATE jobs SET status = 'done', finished_at = ?, lease_owner = NULL, result = ?, timings = ?, "
+            "error = NULL WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (self._clock(), json.dumps(result, ensure_ascii=False), json.dumps(timings), job_id, worker),
+        )
+
+    def fail(self, job_id: str, worker: str, error: str, retry_delay: float = 0.0) -> bool:
+        now = self._clock()
+        return self._update(
+            "UPDATE jobs SET error = ?, lease_owner = NULL, "
+            "status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END, "
+            "finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END, "
+            "available_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (error, now, now + retry_delay, job_id, worker),
+        )
+
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        sql = "SELECT status, COUNT(*) FROM jobs" + (" WHERE batch = ?" if batch is not None else "") + " GROUP BY status"
+        with self._lock:
+            rows = self._conn.execute(sql, (batch,) if batch is not None else ()).fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update(dict(rows))
+        return counts
+
+    def records(self, batch: Optional[str] = None, status: Optional[str] = None) -> List[JobRecord]:
+        clauses, params = [], []
+        if batch is not None:
+            clauses.append("batch = ?")
+            params.append(batch)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, batch, status, attempts, worker, started_at, finished_at, result, timings, error "
+                "FROM jobs" + where + " ORDER BY seq",
+                params,
+            ).fetchall()
+        return [
+            JobRecord(
+                id=row[0],
+                batch=row[1],
+                status=row[2],
+                attempts=row[3],
+                worker=row[4],
+                started_at=row[5],
+                finished_at=row[6],
+                result=json.loads(row[7]) if row[7] else {},
+                timings=json.loads(row[8]) if row[8] else {},
+                error=row[9],
+            )
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, sql: str, params: Tuple[Any, ...]) -> bool:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount == 1
+
+
+@dataclass
+class _MemoryJob:
+    job: Job
+    seq: int
+    status: str = "pending"
+    available_at: float = 0.0
+    lease_owner: Optional[str] = None
+    lease_expires_at: float = 0.0
+    record: JobRecord = None  # type: ignore[assignment]
+
+
+class MemoryWorkQueue(WorkQueue):
+    """Misma semantica que `SQLiteWorkQueue`, en memoria del proceso."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _MemoryJob] = {}
+
+    def enqueue(self, batch: str, items: Iterable[Tuple[str, Dict[str, Any]]], max_attempts: int = 3) -> int:
+        now = self._clock()
+        added = 0
+        with self._lock:
+            for name, payload in items:
+                job_id = f"{batch}/{name}"
+                if job_id in self._jobs:
+                    continue
+                job = Job(job_id, batch, json.loads(json.dumps(payload)), 0, max_attempts)
+                self._jobs[job_id] = _MemoryJob(
+                    job, len(self._jobs), available_at=now, record=JobRecord(job_id, batch, "pending", 0)
+                )
+                added += 1
+        return added
+
+    def claim(self, worker: str, lease_seconds: float, limit: int = 1, batch: Optional[str] = None) -> List[Job]:
+        now = self._clock()
+        claimed: List[Job] = []
+        reclaimed = dead = 0
+        with self._lock:
+            for entry in sorted(self._jobs.values(), key=lambda item: item.seq):
+                if batch is not None and entry.job.batch != batch:
+                    continue
+                expired = entry.status == "leased" and entry.lease_expires_at <= now
+                if expired and entry.job.attempts >= entry.job.max_attempts:
+                    entry.record.error = entry.record.error or f"Lease vencida sin respuesta del worker {entry.lease_owner}"
+                    self._set(entry, "dead", finished_at=now)
+                    dead += 1
+                    continue
+                if len(claimed) >= limit or not (expired or (entry.status == "pending" and entry.available_at <= now)):
+                    continue
+                reclaimed += expired
+                entry.job.attempts += 1
+                entry.lease_owner = worker
+                entry.lease_expires_at = now + lease_seconds
+                entry.record.worker = worker
+                entry.record.started_at = now
+                self._set(entry, "leased")
+                claimed.append(Job(entry.job.id, entry.job.batch, entry.job.payload, entry.job.attempts, entry.job.max_attempts))
+        _count(len(claimed), reclaimed, dead)
+        return claimed
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if entry is None:
+                return False
+            entry.lease_expires_at = self._clock() + lease_seconds
+            return True
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any], timings: Dict[str, float]) -> bool:
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if entry is None:
+                return False
+            entry.record.result = dict(result)
+            entry.record.timings = dict(timings)
+            entry.record.error = None
+            self._set(entry, "done", finished_at=self._clock())
+            return True
+
+    def fail(self, job_id: str, worker: str, error: str, retry_delay: float = 0.0) -> bool:
+        now = self._clock()
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if entry is None:
+                return False
+            entry.record.error = error
+            if entry.job.attempts >= entry.job.max_attempts:
+                self._set(entry, "dead", finished_at=now)
+            else:
+                entry.available_at = now + retry_delay
+                self._set(entry, "pending")
+            return True
+
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        counts = {state: 0 for state in JOB_STATES}
+        with self._lock:
+            for entry in self._jobs.values():
+                if batch is None or entry.job.batch == batch:
+                    counts[entry.status] += 1
+        return counts
+
+    def records(self, batch: Optional[str] = None, status: Optional[str] = None) -> List[JobRecord]:
+        with self._lock:
+            entries = sorted(self._jobs.values(), key=lambda item: item.seq)
+            return [
+                JobRecord(**{**entry.record.__dict__, "attempts": entry.job.attempts})
+                for entry in entries
+                if (batch is None or entry.job.batch == batch) and (status is None or entry.status == status)
+            ]
+
+    def _owned(self, job_id: str, worker: str) -> Optional[_MemoryJob]:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry.status != "leased" or entry.lease_owner != worker:
+            return None
+        return entry
+
+    @staticmethod
+    def _set(entry: _MemoryJob, status: str, finished_at: Optional[float] = None) -> None:
+        entry.status = status
+        entry.record.status = status
+        if status != "leased":
+            entry.lease_owner = None
+        if finished_at is not None:
+            entry.record.finished_at = finished_at
+
+
+def _count_claims(rows: List[Tuple[Any, ...]], dead: int) -> None:
+    _count(len(rows), sum(1 for row in rows if row[5] == "leased"), dead)
+
+
+def _count(claimed: int, reclaimed: int, dead: int) -> None:
+    if claimed:
+        metrics.increment("queue.claimed", claimed)
+    if reclaimed:
+        metrics.increment("queue.reclaimed", reclaimed)
+    if dead:
+        metrics.increment("queue.dead", dead)
+
+
+def build_work_queue(config: WorkQueueConfig) -> WorkQueue:
+    backend = (config.backend or "sqlite").strip().lower()
+    if backend == "sqlite":
+        return SQLiteWorkQueue(Path(config.path), journal_mode=config.journal_mode)
+    if backend == "memory":
+        return MemoryWorkQueue()
+    raise ValueError(f"queue.backend no soportado: {config.backend}")
@@ -0,0 +1,317 @@
+"""Daemon residente: mantiene config, cliente de modelo, catalogo y plantillas cargados.
+
+Cada `python -m src.main` paga el arranque del interprete, las importaciones,
+la carga de config y la construccion del cliente de modelo antes de trabajar.
+El daemon hace ese trabajo una vez y atiende solicitudes por un socket Unix
+(`daemon.socket_path`); `python -m src.main` le delega la ejecucion si esta
+corriendo y `python -m src.daemon_client` es el cliente sin importaciones
+pesadas. Los cambios de config se aplican por suscripcion a `ConfigProvider`:
+solo se reconstruye el cliente de modelo si cambian `llm`, `router`, `cache` o
+`cassette`, y el catalogo si cambia `cost`.
+
+`watch` (`python -m src.main --watch`) usa el mismo estado en el proceso y
+regenera cuando cambian el input o la config, agrupando rafagas de escrituras.
+
+    python -m src.daemon --config config/config.yml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from monitoring.logger import configure_logging, get_logger, new_trace_id
+from src.agent import SolutionArchitectAgent, build_agent
+from src.agent.tools import render_artifacts
+from src.core.config import AppConfig
+from src.core.config_provider import ConfigProvider, get_config_provider
+from src.core.generator import generate_solution
+from src.core.pricing_catalog import PricingCatalog
+from src.core.schemas import Requirements
+from src.core.stages import StageRun
+from src.daemon_client import DaemonUnavailable, send_request
+from src.main import run_pipeline
+
+AGENT_SECTIONS = {"llm", "router", "cache", "cassette"}
+
+
+class WarmState:
+    """Objetos caros de construir, reutilizados entre ejecuciones."""
+
+    def __init__(self, provider: ConfigProvider, logger: Optional[logging.Logger] = None) -> None:
+        self.provider = provider
+        self._log = logger or logging.getLogger("solution-architect.daemon")
+        self._lock = threading.Lock()
+        self._agent: Optional[SolutionArchitectAgent] = None
+        self._catalogs: Dict[Path, PricingCatalog] = {}
+        self.agent_builds = 0
+        provider.subscribe(self._reset_agent, AGENT_SECTIONS)
+        provider.subscribe(self._reset_catalogs, {"cost"})
+
+    def agent(self, config: AppConfig) -> SolutionArchitectAgent:
+        with self._lock:
+            if self._agent is None:
+                self._agent = build_agent(config)
+                self.agent_builds += 1
+            return self._agent
+
+    def catalog(self, path: Path) -> PricingCatalog:
+        key = Path(path).resolve()
+        with self._lock:
+            catalog = self._catalogs.get(key)
+            if catalog is None:
+                catalog = PricingCatalog(key)
+                self._catalogs[key] = catalog
+            return catalog
+
+    def warm_up(self) -> None:
+        config = self.provider.get()
+        self.agent(config)
+        if config.cost.catalog_path and Path(config.cost.catalog_path).exists():
+            self.catalog(Path(config.cost.catalog_path))
+        # Un render descartable deja importados y preparados plantillas y Excel.
+        render_artifacts(generate_solution(Requirements()), scraped_rows=[])
+
+    def run(self, args: argparse.Namespace, logger, trace_id: str) -> StageRun:
+        self.provider.reload()
+        return run_pipeline(args, logger, trace_id, build_client=self.agent, load_catalog=self.catalog)
+
+    def _reset_agent(self, old: AppConfig, new: AppConfig, sections: Set[str]) -> None:
+        with self._lock:
+            self._agent = None
+        self._log.info("Config de modelo cambiada (%s); se reconstruye el cliente", sorted(sections & AGENT_SECTIONS))
+
+    def _reset_catalogs(self, old: AppConfig, new: AppConfig, sections: Set[str]) -> None:
+        with self._lock:
+            self._catalogs.clear()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as exc:
+            response: Dict[str, Any] = {"ok": False, "error": f"Solicitud invalida: {exc}"}
+        else:
+            response = self.server.dispatch(payload)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str | Path, state: WarmState, logger: Optional[logging.Logger] = None) -> None:
+        self.socket_path = Path(socket_path)
+        self.state = state
+        self._log = logger or logging.getLogger("solution-architect.daemon")
+        self._run_lock = threading.Lock()
+        self.started_at = time.time()
+        self.runs = 0
+        _claim_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _Handler)
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        op = payload.get("op")
+        if op == "run":
+            return self._run(payload)
+        if op == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "config": str(self.state.provider.path),
+                "config_version": self.state.provider.version,
+                "runs": self.runs,
+                "agent_builds": self.state.agent_builds,
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+            }
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Operacion desconocida: {op}"}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+    def _run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        provider = self.state.provider
+        if Path(payload.get("config") or "").resolve() != provider.path.resolve():
+            return {
+                "ok": False,
+                "code": "config_mismatch",
+                "config": str(provider.path),
+                "error": f"El daemon atiende la config {provider.path}",
+            }
+        # Las variables AGENT__* cambian la config efectiva aunque el archivo sea el mismo.
+        requested_env = payload.get("env") or {}
+        daemon_env = provider.env_overrides()
+        if requested_env != daemon_env:
+            names = requested_env.keys() | daemon_env.keys()
+            differing = sorted(name for name in names if requested_env.get(name) != daemon_env.get(name))
+            return {
+                "ok": False,
+                "code": "config_mismatch",
+                "config": str(provider.path),
+                "error": f"El daemon usa otras variables de entorno: {', '.join(differing)}",
+            }
+        config = provider.get()
+        cwd = Path(payload.get("cwd") or os.getcwd())
+        args = argparse.Namespace(
+            input=payload["input"],
+            config=str(provider.path),
+            output=payload.get("output") or str(cwd / (config.paths.output_dir or "data")),
+            archive=payload.get("archive"),
+            archive_format=payload.get("archive_format") or "zip",
+            slo_seconds=payload.get("slo_seconds"),
+            profile=False,
+            profile_memory=False,
+        )
+        trace_id = new_trace_id()
+        logger = get_logger("solution-architect", request_id=trace_id)
+        started = time.perf_counter()
+        # Las ejecuciones se serializan: comparten cliente de modelo y pueden escribir el mismo directorio.
+        with self._run_lock:
+            try:
+                run = self.state.run(args, logger, trace_id)
+            except Exception as exc:
+                return {
+                    "ok": False,
+                    "trace_id": trace_id,
+                    "stage": getattr(exc, "failed_stage", None),
+                    "error": f"{type(exc).__name__}: {exc}",
+                }
+            self.runs += 1
+        result = run.results["write"]
+        return {
+            "ok": True,
+            "trace_id": trace_id,
+            "location": result.location,
+            "written": len(result.written),
+            "warnings": run.results["deadline"].warnings,
+            "critical_path": run.describe_critical_path(),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+
+def _claim_socket(path: Path) -> None:
+    """Elimina un socket huerfano; falla si otro daemon sigue escuchando en el."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        return
+    try:
+        send_request(path, {"op": "ping"}, timeout=1.0)
+    except (DaemonUnavailable, OSError, ValueError):
+        path.unlink(missing_ok=True)
+        return
+    raise RuntimeError(f"Ya hay un daemon escuchando en {path}")
+
+
+class FileWatcher:
+    """Detecta cambios por mtime/tamano y entrega cada rafaga una vez estable `debounce_seconds`."""
+
+    def __init__(self, paths: Iterable[str | Path], debounce_seconds: float = 0.2, clock=time.monotonic) -> None:
+        self.paths = [Path(path).resolve() for path in paths]
+        self.debounce_seconds = debounce_seconds
+        self._clock = clock
+        self._signatures = {path: _signature(path) for path in self.paths}
+        self._pending: Set[Path] = set()
+        self._last_change = 0.0
+
+    def poll(self) -> Set[Path]:
+        now = self._clock()
+        for path in self.paths:
+            signature = _signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                self._pending.add(path)
+                self._last_change = now
+        if self._pending and now - self._last_change >= self.debounce_seconds:
+            ready, self._pending = self._pending, set()
+            return ready
+        return set()
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def watch(
+    args: argparse.Namespace,
+    logger,
+    stop: Optional[threading.Event] = None,
+    state: Optional[WarmState] = None,
+) -> int:
+    """Regenera al cambiar el input o la config hasta `stop` o Ctrl+C; devuelve las regeneraciones."""
+    provider = get_config_provider(args.config)
+    settings = provider.get().daemon
+    state = state or WarmState(provider, logger)
+    watcher = FileWatcher([args.input, provider.path], debounce_seconds=settings.debounce_ms / 1000)
+    stop = stop or threading.Event()
+    logger.info("Vigilando %s y %s (Ctrl+C para terminar)", args.input, provider.path)
+    runs = 0
+    _regenerate(state, args)
+    try:
+        while not stop.wait(settings.poll_ms / 1000):
+            changed = watcher.poll()
+            if not changed:
+                continue
+            logger.info("Cambios en %s; regenerando", ", ".join(path.name for path in sorted(changed)))
+            _regenerate(state, args)
+            runs += 1
+    except KeyboardInterrupt:
+        pass
+    return runs
+
+
+def _regenerate(state: WarmState, args: argparse.Namespace) -> None:
+    trace_id = new_trace_id()
+    logger = get_logger("solution-architect", request_id=trace_id)
+    try:
+        state.run(args, logger, trace_id)
+    except Exception:
+        pass  # run_pipeline ya registro el fallo; se espera al siguiente cambio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Daemon del Arquitecto de Solucion")
+    parser.add_argument("--config", default="config/config.yml", help="Ruta a config YAML")
+    parser.add_argument("--socket", default=None, help="Socket Unix (por defecto daemon.socket_path)")
+    args = parser.parse_args()
+
+    provider = get_config_provider(args.config)
+    config = provider.get()
+    settings = config.logging
+    configure_logging(settings.format, use_queue=settings.queue, level=settings.level)
+    logger = get_logger("solution-architect.daemon")
+    state = WarmState(provider, logger)
+    started = time.perf_counter()
+    state.warm_up()
+    server = DaemonServer(args.socket or config.daemon.socket_path, state, logger)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    logger.info("Daemon listo en %s (precarga %.0fms)", server.socket_path, (time.perf_counter() - started) * 1000)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Daemon detenido tras %d ejecuciones", server.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Cliente liviano del daemon (`src.daemon`): solo usa la biblioteca estandar.
+
+Protocolo: por el socket Unix se envia una linea JSON con la solicitud y se
+recibe una linea JSON con la respuesta. Operaciones: `run` (genera la
+propuesta; las rutas van absolutas, resueltas en el directorio del cliente, y
+se envian las variables `AGENT__*` del cliente para que el daemon rechace con
+`config_mismatch` una config efectiva distinta), `ping` y `shutdown`. El socket
+y el tiempo maximo de espera salen de `daemon.*` en `--config` (y sus variables
+`AGENT__DAEMON__*`), salvo que se pasen `--socket` o `--timeout`.
+
+    python -m src.daemon_client --input data/requirements.json
+    python -m src.daemon_client --status
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+DEFAULT_SOCKET_PATH = "data/.daemon/agent.sock"
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 300.0
+# `ping` y `shutdown` responden al instante: un daemon colgado no debe colgar la CLI.
+CONTROL_TIMEOUT_SECONDS = 5.0
+# Mismo prefijo que `src.core.config.ENV_PREFIX` (este modulo no importa el proyecto).
+ENV_PREFIX = "AGENT__"
+
+
+class DaemonUnavailable(ConnectionError):
+    """No hay un daemon escuchando en el socket."""
+
+
+def send_request(socket_path: str | Path, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    path = Path(socket_path)
+    if getattr(socket, "AF_UNIX", None) is None or not path.exists():
+        raise DaemonUnavailable(f"No hay daemon en {path}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError) as exc:
+            raise DaemonUnavailable(f"No hay daemon en {path}") from exc
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise DaemonUnavailable(f"El daemon en {path} cerro la conexion sin responder")
+    return json.loads(line)
+
+
+def daemon_settings(config_path: Optional[str], environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """Seccion `daemon` de la config (YAML con PyYAML si esta instalado, si no JSON) con sus `AGENT__DAEMON__*`."""
+    environ = os.environ if environ is None else environ
+    settings: Dict[str, Any] = {}
+    try:
+        text = Path(config_path).read_text(encoding="utf-8") if config_path else ""
+    except OSError:
+        text = ""
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+    try:
+        data = (yaml.safe_load(text) if yaml is not None else json.loads(text or "{}")) or {}
+    except Exception:  # YAML o JSON invalido: valores por defecto
+        data = {}
+    if isinstance(data, dict) and isinstance(data.get("daemon"), dict):
+        settings.update(data["daemon"])
+    prefix = f"{ENV_PREFIX}DAEMON__"
+    settings.update({name[len(prefix) :].lower(): value for name, value in environ.items() if name.startswith(prefix)})
+    return settings
+
+
+def build_run_request(
+    args: argparse.Namespace, cwd: Optional[Path] = None, environ: Optional[Mapping[str, str]] = None
+) -> Dict[str, Any]:
+    """Solicitud `run` con las rutas de `args` resueltas en `cwd` y las variables `AGENT__*` de `environ`."""
+    base = Path(cwd or os.getcwd())
+    environ = os.environ if environ is None else environ
+
+    def absolute(value: Optional[str]) -> Optional[str]:
+        if not value or value == "-":
+            return value
+        return str((base / value).resolve())
+
+    return {
+        "op": "run",
+        "cwd": str(base),
+        "input": absolute(args.input),
+        "config": absolute(args.config),
+        "output": absolute(args.output),
+        "archive": absolute(args.archive),
+        "archive_format": args.archive_format,
+        "slo_seconds": args.slo_seconds,
+        "env": {name: value for name, value in environ.items() if name.startswith(ENV_PREFIX)},
+    }
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cliente del daemon del Arquitecto de Solucion")
+    parser.add_argument("--socket", default=None, help="Socket del daemon (por defecto, daemon.socket_path).")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Segundos de espera (por defecto, daemon.request_timeout_seconds; 5 con --status/--stop).",
+    )
+    parser.add_argument("--input", default="data/requirements.json")
+    parser.add_argument("--config", default="config/config.yml")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--archive", default=None, help="Ruta del archivo (no admite '-').")
+    parser.add_argument("--archive-format", default="zip")
+    parser.add_argument("--slo-seconds", type=float, default=None)
+    parser.add_argument("--status", action="store_true", help="Muestra el estado del daemon.")
+    parser.add_argument("--stop", action="store_true", help="Detiene el daemon.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.archive == "-":
+        print("--archive - no se admite a traves del daemon; usa python -m src.main", file=sys.stderr)
+        return 2
+    settings = daemon_settings(args.config)
+    socket_path = args.socket or settings.get("socket_path") or DEFAULT_SOCKET_PATH
+    timeout = args.timeout or CONTROL_TIMEOUT_SECONDS
+    if args.status:
+        payload: Dict[str, Any] = {"op": "ping"}
+    elif args.stop:
+        payload = {"op": "shutdown"}
+    else:
+        payload = build_run_request(args)
+        timeout = args.timeout or float(settings.get("request_timeout_seconds") or DEFAULT_REQUEST_TIMEOUT_SECONDS)
+    try:
+        response = send_request(socket_path, payload, timeout=timeout)
+    except DaemonUnavailable as exc:
+        print(f"{exc}; inicia uno con python -m src.daemon", file=sys.stderr)
+        return 3
+    except TimeoutError:
+        print(f"El daemon en {socket_path} no respondio en {timeout:.0f}s", file=sys.stderr)
+        return 4
+    if not response.get("ok"):
+        print(f"Error ({response.get('stage') or '-'}): {response.get('error')}", file=sys.stderr)
+        return 1
+    if payload["op"] == "run":
+        for warning in response.get("warnings", []):
+            print(f"Respuesta parcial: {warning}", file=sys.stderr)
+        print(f"Salida generada en {response['location']} ({response['elapsed_ms']:.0f}ms)")
+    else:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+"""Servidor local que imita chat-completions de OpenAI/Azure para pruebas de carga.
+
+Responde con la propuesta determinista (`SolutionProposal` valida) para los
+requerimientos del prompt, con latencia configurable (tiempo hasta el primer
+token + tokens de respuesta / tokens_por_segundo), y puede inyectar errores
+HTTP y solicitudes colgadas. Se apunta desde `llm.api_base`:
+
+    python -m src.fake_llm --port 8089 --latency lognormal --median-ms 800
+    AGENT__LLM__ENABLED=true AGENT__LLM__API_BASE=http://127.0.0.1:8089/v1 OPENAI_API_KEY=x python -m src.main
+
+Rutas: `POST /v1/chat/completions` (OpenAI), `POST /openai/deployments/<d>/chat/completions`
+(Azure) y `GET /stats` con los contadores del servidor. Tambien imita la batch
+API (`/v1/files`, `/v1/files/<id>/content`, `/v1/batches`, `/v1/batches/<id>`,
+`/v1/batches/<id>/cancel`, y lo mismo bajo `/openai/`): cada trabajo procesa su
+JSONL en un hilo, tarda `batch_seconds` y aplica `error_rate` por solicitud.
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.parser
+import email.policy
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class FakeModelSettings:
+    latency: str = "lognormal"  # fixed | uniform | exponential | lognormal
+    median_ms: float = 500.0  # tiempo hasta el primer token
+    sigma: float = 0.5  # dispersion de lognormal; en uniform, +-sigma * mediana
+    tokens_per_second: float = 0.0  # 0: la respuesta llega de una vez
+    error_rate: float = 0.0
+    error_status: int = 500
+    timeout_rate: float = 0.0
+    hang_seconds: float = 60.0
+    model: str = "fake-gpt"
+    seed: Optional[int] = None
+    batch_seconds: float = 0.0  # duracion de cada trabajo de la batch API
+
+
+class FakeModel:
+    """Decide latencia, fallos y cuerpo de cada respuesta; seguro entre hilos."""
+
+    def __init__(self, settings: FakeModelSettings) -> None:
+        if settings.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"distribucion de latencia no soportada: {settings.latency}")
+        self.settings = settings
+        self.stats: Counter = Counter()
+        self._random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+
+    def plan(self, completion_tokens: int) -> Tuple[str, float]:
+        """("ok" | "error" | "timeout", segundos a esperar antes de responder)."""
+        settings = self.settings
+        with self._lock:
+            roll = self._random.random()
+            first_token = self._first_token_seconds()
+        if roll < settings.timeout_rate:
+            outcome = "timeout"
+            delay = settings.hang_seconds
+        elif roll < settings.timeout_rate + settings.error_rate:
+            outcome, delay = "error", first_token
+        else:
+            outcome = "ok"
+            delay = first_token
+            if settings.tokens_per_second > 0:
+                delay += completion_tokens / settings.tokens_per_second
+        with self._lock:
+            self.stats[outcome] += 1
+        return outcome, delay
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def complete(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        content = _canned_proposal(_requirements_json(prompt))
+        prompt_tokens, completion_tokens = _tokens(prompt), _tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.settings.model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _first_token_seconds(self) -> float:
+        settings = self.settings
+        median = settings.median_ms / 1000
+        if settings.latency == "fixed":
+            return median
+        if settings.latency == "uniform":
+            return max(0.0, self._random.uniform(median * (1 - settings.sigma), median * (1 + settings.sigma)))
+        if settings.latency == "exponential":
+            # Mediana de una exponencial = ln 2 / lambda.
+            return self._random.expovariate(0.6931471805599453 / median) if median > 0 else 0.0
+        return median * self._random.lognormvariate(0.0, settings.sigma)
+
+
+class FakeBatchAPI:
+    """Archivos y trabajos de la batch API en memoria; cada trabajo corre en su propio hilo."""
+
+    def __init__(self, model: FakeModel) -> None:
+        self.model = model
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._cancelled: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def add_file(self, filename: str, content: bytes, purpose: str) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        record = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+        }
+        with self._lock:
+            self.files[file_id] = {**record, "content": content}
+        return record
+
+    def file_content(self, file_id: str) -> Optional[bytes]:
+        with self._lock:
+            record = self.files.get(file_id)
+        return None if record is None else record["content"]
+
+    def create(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        input_file_id = body.get("input_file_id")
+        with self._lock:
+            known = input_file_id in self.files
+        if not known:
+            return 404, {"error": {"message": f"archivo no encontrado: {input_file_id}", "type": "invalid_request_error"}}
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body.get("endpoint", "/v1/chat/completions"),
+            "input_file_id": input_file_id,
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get("metadata"),
+        }
+        with self._lock:
+            self.batches[batch_id] = batch
+            self._cancelled[batch_id] = threading.Event()
+        self.model.count("batches")
+        threading.Thread(target=self._run, args=(batch_id,), name=f"fake-batch-{batch_id}", daemon=True).start()
+        return 200, self.get(batch_id)
+
+    def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            return None if batch is None else json.loads(json.dumps(batch))
+
+    def cancel(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+                batch["status"] = "cancelling"
+                self._cancelled[batch_id].set()
+        return self.get(batch_id)
+
+    def _run(self, batch_id: str) -> None:
+        with self._lock:
+            batch = self.batches[batch_id]
+            lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+            batch["status"] = "in_progress"
+        cancelled = self._cancelled[batch_id]
+        outputs, errors = [], []
+        for line in filter(str.strip, lines):
+            if cancelled.is_set():
+                break
+            ok, entry = self._process(line, batch["endpoint"])
+            (outputs if ok else errors).append(json.dumps(entry))
+            with self._lock:
+                counts = batch["request_counts"]
+                counts["total"] += 1
+                counts["completed" if ok else "failed"] += 1
+        cancelled.wait(self.model.settings.batch_seconds)
+        output_file = self.add_file(f"{batch_id}_output.jsonl", "\n".join(outputs).encode("utf-8"), "batch_output") if outputs else None
+        error_file = self.add_file(f"{batch_id}_error.jsonl", "\n".join(errors).encode("utf-8"), "batch_output") if errors else None
+        with self._lock:
+            batch["output_file_id"] = output_file["id"] if output_file else None
+            batch["error_file_id"] = error_file["id"] if error_file else None
+            batch["status"] = "cancelled" if cancelled.is_set() else "completed"
+            batch["completed_at"] = int(time.time())
+
+    def _process(self, line: str, endpoint: str) -> Tuple[bool, Dict[str, Any]]:
+        request_id = f"batch_req_{uuid.uuid4().hex[:12]}"
+        try:
+            item = json.loads(line)
+            custom_id = item["custom_id"]
+            messages = item["body"]["messages"]
+        except (ValueError, KeyError, TypeError):
+            return False, {"id": request_id, "custom_id": None, "response": None, "error": {"code": "invalid_request", "message": "linea invalida"}}
+        if item.get("url") != endpoint:
+            return False, {
+                "id": request_id,
+                "custom_id": custom_id,
+                "response": None,
+                "error": {"code": "invalid_url", "message": f"url {item.get('url')} distinta del endpoint {endpoint}"},
+            }
+        outcome, _ = self.model.plan(0)
+        if outcome != "ok":
+            status = self.model.settings.error_status if outcome == "error" else 504
+            body = {"error": {"message": f"error inyectado ({outcome})", "type": "server_error"}}
+            return False, {"id": request_id, "custom_id": custom_id, "response": {"status_code": status, "request_id": request_id, "body": body}, "error": None}
+        response = self.model.complete(messages)
+        return True, {"id": request_id, "custom_id": custom_id, "response": {"status_code": 200, "request_id": request_id, "body": response}, "error": None}
+
+
+class FakeLLMServer:
+    def __init__(self, settings: Optional[FakeModelSettings] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.model = FakeModel(settings or FakeModelSettings())
+        self.batches = FakeBatchAPI(self.model)
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self.model, self.batches))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def _handler_for(model: FakeModel, batches: FakeBatchAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            path = _batch_path(self.path)
+            if path == "/stats":
+                self._send(200, model.snapshot())
+                return
+            parts = path.strip("/").split("/")
+            if len(parts) == 4 and parts[:2] == ["v1", "files"] and parts[3] == "content":
+                content = batches.file_content(parts[2])
+                if content is not None:
+                    self._send_bytes(200, content, "application/jsonl")
+                    return
+            elif len(parts) == 3 and parts[:2] == ["v1", "batches"]:
+                batch = batches.get(parts[2])
+                if batch is not None:
+                    self._send(200, batch)
+                    return
+            self._send(404, {"error": {"message": "ruta no encontrada", "type": "not_found"}})
+
+        def do_POST(self) -> None:
+            path = self.path.split("?", 1)[0]
+            batch_path = _batch_path(self.path)
+            if batch_path.startswith(("/v1/files", "/v1/batches")):
+                self._batch_post(batch_path)
+                return
+            if not path.endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "ruta no encontrada", "type": "not_found"}})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                messages = body["messages"]
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": {"message": "cuerpo invalido", "type": "invalid_request_error"}})
+                return
+            response = model.complete(messages)
+            outcome, delay = model.plan(response["usage"]["completion_tokens"])
+            time.sleep(delay)
+            if outcome == "ok":
+                self._send(200, response)
+                return
+            status = model.settings.error_status if outcome == "error" else 504
+            headers = {"Retry-After": "1"} if status == 429 else {}
+            self._send(status, {"error": {"message": f"error inyectado ({outcome})", "type": "server_error"}}, headers)
+
+        def _batch_post(self, path: str) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            parts = path.strip("/").split("/")
+            if parts == ["v1", "files"]:
+                fields = _multipart(self.headers.get("Content-Type", ""), body)
+                if "file" not in fields:
+                    self._send(400, {"error": {"message": "falta el archivo", "type": "invalid_request_error"}})
+                    return
+                filename, content = fields["file"]
+                self._send(200, batches.add_file(filename or "batch.jsonl", content, fields.get("purpose", ("", b""))[1].decode()))
+                return
+            if parts == ["v1", "batches"]:
+                try:
+                    status, payload = batches.create(json.loads(body or b"{}"))
+                except ValueError:
+                    status, payload = 400, {"error": {"message": "cuerpo invalido", "type": "invalid_request_error"}}
+                self._send(status, payload)
+                return
+            if len(parts) == 4 and parts[:2] == ["v1", "batches"] and parts[3] == "cancel":
+                batch = batches.cancel(parts[2])
+                if batch is not None:
+                    self._send(200, batch)
+                    return
+            self._send(404, {"error": {"message": "ruta no encontrada", "type": "not_found"}})
+
+        def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+            self._send_bytes(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+        def _send_bytes(self, status: int, data: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # El cliente corto la conexion (su propio timeout) mientras esperaba.
+                pass
+
+        def log_message(self, format: str, *args: Any) -> None:
+            return
+
+    return Handler
+
+
+def _batch_path(raw_path: str) -> str:
+    """Ruta sin query; las rutas de Azure (`/openai/files`, `/openai/batches`) se tratan como `/v1/...`."""
+    path = raw_path.split("?", 1)[0].rstrip("/")
+    if path.startswith(("/openai/files", "/openai/batches")):
+        return "/v1" + path[len("/openai"):]
+    return path
+
+
+def _multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """Campos de un multipart/form-data: nombre -> (filename, contenido)."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    if not message.is_multipart():
+        return {}
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def _requirements_json(prompt: str) -> str:
+    """Extrae el JSON de requerimientos del prompt del agente ("Requerimientos:\\n{...}")."""
+    marker = prompt.find("Requerimientos:")
+    start = prompt.find("{", marker if marker >= 0 else 0)
+    end = prompt.rfind("}")
+    return prompt[start : end + 1] if 0 <= start < end else "{}"
+
+
+@lru_cache(maxsize=256)
+def _canned_proposal(requirements_json: str) -> str:
+    try:
+        requirements = Requirements.model_validate_json(requirements_json)
+    except ValidationError:
+        requirements = Requirements()
+    return generate_solution(requirements).model_dump_json()
+
+
+def _tokens(text: str) -> int:
+    # Aproximacion habitual: ~4 caracteres por token.
+    return max(1, len(text) // 4)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor LLM simulado (chat-completions OpenAI/Azure).")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--median-ms", type=float, default=500.0, help="Mediana del tiempo hasta el primer token.")
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Velocidad de generacion; 0 = instantanea.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraccion de respuestas con error HTTP.")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraccion de solicitudes que se cuelgan.")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-seconds", type=float, default=0.0, help="Duracion de cada trabajo de la batch API.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    settings = FakeModelSettings(
+        latency=args.latency,
+        median_ms=args.median_ms,
+        sigma=args.sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+        batch_seconds=args.batch_seconds,
+    )
+    server = FakeLLMServer(settings, host=args.host, port=args.port)
+    print(f"LLM simulado en {server.api_base} (Ctrl+C para terminar)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from monitoring.logger import get_logger, new_trace_id
+from src.core.pricing_catalog import ingest_price_list
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Ingesta de listas de precios masivas (Azure, AWS, GCP) al catalogo offline."
+    )
+    parser.add_argument(
+        "--provider",
+        type=str,
+        required=True,
+        help="Proveedor de la exportacion: azure | aws | gcp.",
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        required=True,
+        help="Archivo exportado (Azure Retail Prices JSON, AWS offer file JSON/CSV, GCP SKUs JSON).",
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        default="data/pricing/catalog.sqlite",
+        help="Ruta del catalogo SQLite (por defecto data/pricing/catalog.sqlite).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logger = get_logger("solution-architect.pricing", request_id=new_trace_id())
+    logger.info("Ingestando %s (provider=%s) en %s", args.input, args.provider, args.catalog)
+    start = time.perf_counter()
+    total = ingest_price_list(args.provider, Path(args.input), Path(args.catalog))
+    logger.info("Catalogo actualizado: %d precios en %.1fs", total, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
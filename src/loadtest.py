@@ -0,0 +1,364 @@
+"""Generador de carga para la CLI o un endpoint HTTP, con LLM simulado opcional.
+
+Objetivos:
+- `cli`: cada solicitud ejecuta `python -m src.main` en un subproceso. Los
+  logs van en JSON y nivel DEBUG (via `AGENT__LOGGING__*`) para leer la
+  duracion de cada etapa y la etapa que fallo.
+- `http`: POST de los requerimientos a `--url`; las duraciones por etapa se
+  leen del header `Server-Timing` si el servidor lo envia.
+
+La carga es de lazo cerrado (`--concurrency` clientes, cada uno envia al
+terminar la anterior) o de lazo abierto (`--rps`, llegadas a ritmo fijo; la
+latencia se mide desde el instante programado, asi las esperas por saturacion
+cuentan). Con `--fake-llm` se levanta `src.fake_llm` en el proceso y la CLI
+apunta a el via `llm.api_base`.
+
+    python -m src.loadtest --fake-llm --fake-median-ms 300 --concurrency 4 --requests 40
+    python -m src.loadtest --target http --url http://localhost:8000/proposals --rps 5 --duration 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.fake_llm import LATENCY_DISTRIBUTIONS, FakeLLMServer, FakeModelSettings
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class RequestResult:
+    ok: bool
+    latency: float
+    stages: Dict[str, float] = field(default_factory=dict)
+    failed_stage: Optional[str] = None
+    error: Optional[str] = None
+
+
+Sender = Callable[[], RequestResult]
+
+
+def parse_stage_log(lines: Iterable[str]) -> Tuple[Dict[str, float], Optional[str]]:
+    """(segundos por etapa, etapa que fallo) a partir de los logs JSON de `src.main`."""
+    stages: Dict[str, float] = {}
+    failed: Optional[str] = None
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        stage = entry.get("stage")
+        if not stage:
+            continue
+        if entry.get("level") == "ERROR":
+            failed = stage
+        elif "duration_ms" in entry:
+            stages[stage] = float(entry["duration_ms"]) / 1000
+    return stages, failed
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """`Server-Timing: propose;dur=812.4, render;dur=9` -> {etapa: segundos}."""
+    stages: Dict[str, float] = {}
+    for metric in (header or "").split(","):
+        parts = [part.strip() for part in metric.split(";")]
+        if not parts[0]:
+            continue
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    stages[parts[0]] = float(value) / 1000
+                except ValueError:
+                    pass
+    return stages
+
+
+class CliTarget:
+    """Ejecuta la CLI completa por solicitud, cada una con su propio directorio de salida."""
+
+    def __init__(self, input_path: str, config_path: str, env: Mapping[str, str], timeout: float) -> None:
+        self.command = [sys.executable, "-m", "src.main", "--input", input_path, "--config", config_path]
+        self.env = {
+            **os.environ,
+            "AGENT__LOGGING__FORMAT": "json",
+            "AGENT__LOGGING__LEVEL": "DEBUG",
+            "AGENT__LOGGING__QUEUE": "false",
+            "AGENT__LOGGING__DEBUG_SAMPLE_RATE": "1.0",
+            "AGENT__LOGGING__DEBUG_MAX_PER_SECOND": "null",
+            **env,
+        }
+        self.timeout = timeout
+
+    def __call__(self) -> RequestResult:
+        output = tempfile.mkdtemp(prefix="loadtest-")
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                [*self.command, "--output", output],
+                cwd=ROOT,
+                env=self.env,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return RequestResult(ok=False, latency=time.perf_counter() - start, error="timeout")
+        finally:
+            shutil.rmtree(output, ignore_errors=True)
+        latency = time.perf_counter() - start
+        stages, failed = parse_stage_log(completed.stderr.splitlines())
+        if completed.returncode != 0:
+            return RequestResult(
+                ok=False, latency=latency, stages=stages, failed_stage=failed, error=f"exit {completed.returncode}"
+            )
+        return RequestResult(ok=True, latency=latency, stages=stages)
+
+
+class HttpTarget:
+    def __init__(self, url: str, body: bytes, timeout: float) -> None:
+        self.url = url
+        self.body = body
+        self.timeout = timeout
+
+    def __call__(self) -> RequestResult:
+        request = urllib.request.Request(
+            self.url, data=self.body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                stages = parse_server_timing(response.headers.get("Server-Timing"))
+        except urllib.error.HTTPError as exc:
+            stages = parse_server_timing(exc.headers.get("Server-Timing") if exc.headers else None)
+            return RequestResult(ok=False, latency=time.perf_counter() - start, stages=stages, error=f"HTTP {exc.code}")
+        except (urllib.error.URLError, OSError) as exc:
+            reason = getattr(exc, "reason", exc)
+            error = "timeout" if "timed out" in str(reason) else type(reason).__name__
+            return RequestResult(ok=False, latency=time.perf_counter() - start, error=error)
+        return RequestResult(ok=True, latency=time.perf_counter() - start, stages=stages)
+
+
+def drive(
+    send: Sender,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    concurrency: int = 1,
+    rps: Optional[float] = None,
+    max_in_flight: int = 64,
+) -> Tuple[List[RequestResult], float]:
+    """Envia hasta `requests` solicitudes o durante `duration` segundos; devuelve (resultados, segundos)."""
+    if requests is None and duration is None:
+        raise ValueError("Indica requests o duration.")
+    results: List[RequestResult] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    stop_at = start + duration if duration is not None else math.inf
+
+    def record(result: RequestResult) -> None:
+        with lock:
+            results.append(result)
+
+    if rps:
+        # Lazo abierto: la latencia incluye el retraso respecto al instante programado.
+        def scheduled(at: float) -> None:
+            result = send()
+            result.latency = time.perf_counter() - at
+            record(result)
+
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="loadtest") as pool:
+            index = 0
+            while requests is None or index < requests:
+                at = start + index / rps
+                if at >= stop_at:
+                    break
+                delay = at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(scheduled, at)
+                index += 1
+        return results, time.perf_counter() - start
+
+    issued = 0
+
+    def worker() -> None:
+        nonlocal issued
+        while time.perf_counter() < stop_at:
+            with lock:
+                if requests is not None and issued >= requests:
+                    return
+                issued += 1
+            record(send())
+
+    threads = [threading.Thread(target=worker, name=f"loadtest-{i}") for i in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results: List[RequestResult], elapsed: float) -> Dict[str, Any]:
+    ok = [result for result in results if result.ok]
+    latencies = sorted(result.latency for result in results)
+    stage_durations: Dict[str, List[float]] = defaultdict(list)
+    stage_failures: Counter = Counter()
+    for result in results:
+        for stage, seconds in result.stages.items():
+            stage_durations[stage].append(seconds)
+        if result.failed_stage:
+            stage_failures[result.failed_stage] += 1
+    stages = {}
+    for stage in sorted(set(stage_durations) | set(stage_failures)):
+        durations = sorted(stage_durations.get(stage, []))
+        attempts = len(durations) + stage_failures[stage]
+        stages[stage] = {
+            "count": len(durations),
+            "p50": _percentile(durations, 0.50),
+            "p95": _percentile(durations, 0.95),
+            "p99": _percentile(durations, 0.99),
+            "errors": stage_failures[stage],
+            "error_rate": round(stage_failures[stage] / attempts, 4) if attempts else 0.0,
+        }
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": dict(Counter(result.error for result in results if not result.ok)),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "stages": stages,
+    }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def _print_report(summary: Dict[str, Any]) -> None:
+    latency = summary["latency"]
+    print(
+        f"{summary['requests']} solicitudes en {summary['elapsed_seconds']:.1f}s: "
+        f"{summary['ok']} ok, error_rate={summary['error_rate']:.2%}, throughput={summary['throughput_rps']:.2f}/s"
+    )
+    print(
+        f"latencia p50/p95/p99/max: {latency['p50'] * 1000:.0f} / {latency['p95'] * 1000:.0f} / "
+        f"{latency['p99'] * 1000:.0f} / {latency['max'] * 1000:.0f} ms"
+    )
+    for error, count in sorted(summary["errors"].items()):
+        print(f"  error {error}: {count}")
+    if summary["stages"]:
+        print(f"{'etapa':14s} {'n':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'errores':>8s}")
+        for stage, row in summary["stages"].items():
+            print(
+                f"{stage:14s} {row['count']:5d} {row['p50'] * 1000:9.1f} {row['p95'] * 1000:9.1f} "
+                f"{row['p99'] * 1000:9.1f} {row['errors']:4d} ({row['error_rate']:.0%})"
+            )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la CLI o de un endpoint HTTP.")
+    parser.add_argument("--target", choices=("cli", "http"), default="cli")
+    parser.add_argument("--url", type=str, default=None, help="Endpoint para --target http.")
+    parser.add_argument("--input", type=str, default="data/requirements.json")
+    parser.add_argument("--config", type=str, default="config/config.yml")
+    parser.add_argument("--requests", type=int, default=None, help="Total de solicitudes.")
+    parser.add_argument("--duration", type=float, default=None, help="Segundos de prueba.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Clientes en lazo cerrado.")
+    parser.add_argument("--rps", type=float, default=None, help="Lazo abierto a este ritmo (ignora --concurrency).")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout por solicitud.")
+    parser.add_argument("--json", action="store_true", help="Reporte en JSON.")
+
+    fake = parser.add_argument_group("LLM simulado (solo --target cli)")
+    fake.add_argument("--fake-llm", action="store_true", help="Levanta src.fake_llm y apunta la CLI a el.")
+    fake.add_argument("--fake-latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    fake.add_argument("--fake-median-ms", type=float, default=500.0)
+    fake.add_argument("--fake-sigma", type=float, default=0.5)
+    fake.add_argument("--fake-tokens-per-second", type=float, default=0.0)
+    fake.add_argument("--fake-error-rate", type=float, default=0.0)
+    fake.add_argument("--fake-error-status", type=int, default=500)
+    fake.add_argument("--fake-timeout-rate", type=float, default=0.0)
+    fake.add_argument("--fake-hang-seconds", type=float, default=60.0)
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 20
+    if args.target == "http" and not args.url:
+        parser.error("--target http requiere --url")
+    return args
+
+
+def main() -> None:
+    args = _parse_args()
+    server: Optional[FakeLLMServer] = None
+    if args.target == "http":
+        send: Sender = HttpTarget(args.url, Path(args.input).read_bytes(), args.timeout)
+    else:
+        env: Dict[str, str] = {}
+        if args.fake_llm:
+            settings = FakeModelSettings(
+                latency=args.fake_latency,
+                median_ms=args.fake_median_ms,
+                sigma=args.fake_sigma,
+                tokens_per_second=args.fake_tokens_per_second,
+                error_rate=args.fake_error_rate,
+                error_status=args.fake_error_status,
+                timeout_rate=args.fake_timeout_rate,
+                hang_seconds=args.fake_hang_seconds,
+            )
+            server = FakeLLMServer(settings).start()
+            env = {
+                "AGENT__LLM__ENABLED": "true",
+                "AGENT__LLM__PROVIDER": "openai",
+                "AGENT__LLM__API_BASE": server.api_base,
+                "AGENT__ROUTER__ENABLED": "false",
+                # Sin cache semantica: cada solicitud debe llegar al modelo.
+                "AGENT__CACHE__ENABLED": "false",
+                "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "fake-key"),
+            }
+        send = CliTarget(args.input, args.config, env, args.timeout)
+    try:
+        results, elapsed = drive(
+            send, requests=args.requests, duration=args.duration, concurrency=args.concurrency, rps=args.rps
+        )
+    finally:
+        if server is not None:
+            server.stop()
+    summary = summarize(results, elapsed)
+    if server is not None:
+        summary["fake_llm"] = server.model.snapshot()
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        _print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
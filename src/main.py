@@ -2,13 +2,27 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+import time
 from pathlib import Path
+from typing import Callable, Dict, Optional
 
-from monitoring.logger import get_logger, new_trace_id
-from src.agent import SolutionArchitectAgent, write_docs
-from src.core.config import load_config
-from src.core.llm import build_model_client
+from monitoring.logger import configure_logging, get_logger, new_trace_id
+from monitoring.metrics import metrics
+from monitoring.profiling import Profiler, profiled, start_profiling, stop_profiling
+from src.agent import SolutionArchitectAgent, build_agent
+from src.agent.tools import render_artifacts, scrape_pricing, write_artifacts
+from src.core.bundle import ARCHIVE_FORMATS, ArtifactBundle
+from src.core.config import AppConfig, ProfilingConfig
+from src.core.config_provider import get_config_provider
+from src.core.cost_engine import catalog_unit_prices
+from src.daemon_client import DaemonUnavailable, build_run_request, send_request
+from src.core.deadline import Deadline
+from src.core.pricing_catalog import PricingCatalog
+from src.core.run_registry import RunRecord, artifact_hashes, build_run_registry, content_hash
 from src.core.schemas import Requirements
+from src.core.stages import StageGraph, StageRun
+from src.core.storage import StoreResult, build_store
 
 
 def _parse_args() -> argparse.Namespace:
@@ -31,9 +45,48 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="Directorio base donde se generan los docs.",
     )
+    parser.add_argument(
+        "--archive",
+        type=str,
+        default=None,
+        help="Empaqueta los artefactos en un archivo (ruta, o '-' para stdout) en lugar de escribirlos.",
+    )
+    parser.add_argument(
+        "--archive-format",
+        choices=ARCHIVE_FORMATS,
+        default="zip",
+        help="Formato de --archive (por defecto zip).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Perfila cada etapa (pstats, pilas colapsadas para flamegraph) en profiling.output_dir.",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Con --profile, registra tambien los sitios que mas memoria asignan (tracemalloc).",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Regenera la salida cada vez que cambian el input o la config (con debounce).",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Ejecuta en este proceso aunque haya un daemon corriendo.",
+    )
+    parser.add_argument(
+        "--slo-seconds",
+        type=float,
+        default=None,
+        help="SLO de latencia para esta solicitud (usado por el router de modelos).",
+    )
     return parser.parse_args()
 
 
+@profiled()
 def _load_requirements(path: str) -> Requirements:
     input_path = Path(path)
     if not input_path.exists():
@@ -46,44 +99,297 @@ def _load_requirements(path: str) -> Requirements:
     return Requirements(**payload)
 
 
+def _scrape_provider(config: AppConfig, requirements: Requirements) -> str:
+    return (config.cost.scrape_provider or "").strip() or (requirements.cloud_provider or "").strip()
+
+
+def _build_stage_graph(
+    args: argparse.Namespace,
+    logger,
+    build_client: Callable[[AppConfig], SolutionArchitectAgent] = build_agent,
+    load_catalog: Callable[[Path], PricingCatalog] = PricingCatalog,
+) -> StageGraph:
+    """Etapas de la ejecucion: scraping y cliente de modelo corren en paralelo con la generacion.
+
+    `build_client` y `load_catalog` permiten reutilizar objetos ya construidos
+    (daemon, `--watch`) en lugar de crearlos en cada ejecucion.
+    """
+    graph = StageGraph()
+
+    def stage_config(results):
+        logger.info("Cargando configuracion desde %s", args.config)
+        config = get_config_provider(args.config).get()
+        logger.info("Configuracion cargada; LLM habilitado=%s", config.llm.enabled)
+        return config
+
+    def stage_requirements(results):
+        logger.info("Cargando requerimientos desde %s", args.input)
+        requirements = _load_requirements(args.input)
+        logger.info("Requerimientos cargados: project_name=%s, cloud_provider=%s", requirements.project_name, requirements.cloud_provider)
+        return requirements
+
+    def stage_client(results):
+        logger.info("Construyendo cliente de modelo (si aplica)")
+        agent = build_client(results["config"])
+        logger.info("Agente listo; modo=%s", agent.mode)
+        return agent
+
+    def stage_propose(results):
+        agent = results["client"]
+        logger.info("Generando propuesta de arquitectura")
+        slo_seconds = args.slo_seconds if args.slo_seconds is not None else results["config"].router.slo_seconds
+        requirements = results["requirements"]
+        unit_prices = None
+        provider = _scrape_provider(results["config"], requirements)
+        if results["catalog"] is not None and provider:
+            unit_prices = catalog_unit_prices(results["catalog"], requirements.resources, requirements.regions, provider)
+            logger.info("Precios del catalogo para la simulacion de costos: %d", len(unit_prices))
+        proposal = agent.propose(
+            requirements,
+            deadline=results["deadline"].stage("generate"),
+            slo_seconds=slo_seconds,
+            unit_prices=unit_prices,
+        )
+        logger.info("Propuesta generada: %d componentes, %d flujos, %d ADRs, %d items backlog", len(proposal.components), len(proposal.flows), len(proposal.adrs), len(proposal.backlog))
+        cache = agent.cache
+        if cache is not None:
+            cache.save()
+            logger.info("Cache semantica: %s", cache.stats.as_dict())
+        if agent.router is not None:
+            logger.info("Router de modelos: %s", agent.router.stats())
+        return proposal
+
+    def stage_catalog(results):
+        catalog_path = results["config"].cost.catalog_path
+        if not catalog_path or not Path(catalog_path).exists():
+            return None
+        logger.info("Usando catalogo de precios offline %s", catalog_path)
+        return load_catalog(Path(catalog_path))
+
+    def stage_scrape(results):
+        if results["catalog"] is not None:
+            return []
+        provider = _scrape_provider(results["config"], results["requirements"])
+        return scrape_pricing(
+            provider or None, logger=logger, deadline=results["deadline"].stage("ingest")
+        )
+
+    def stage_render(results):
+        requirements = results["requirements"]
+        proposal = results["propose"]
+        warnings = results["deadline"].warnings
+        if warnings:
+            proposal = proposal.model_copy(update={"warnings": warnings})
+        return render_artifacts(
+            proposal,
+            scraped_rows=results["scrape"],
+            resources=requirements.resources or None,
+            max_workers=results["config"].execution.max_concurrency,
+            catalog=results["catalog"],
+            provider=_scrape_provider(results["config"], requirements) or None,
+            region=requirements.regions[0] if requirements.regions else None,
+        )
+
+    def stage_write(results):
+        if args.archive:
+            return _write_archive(args.archive, args.archive_format, results["render"], logger)
+        config = results["config"]
+        output_dir = args.output or config.paths.output_dir or "data"
+        store = build_store(config.storage, Path(output_dir).resolve())
+        provider = _scrape_provider(config, results["requirements"])
+        logger.info("Escribiendo salida en %s (scrape_provider=%s)", store.location, provider or "ninguno")
+        result = write_artifacts(
+            Path(output_dir).resolve(),
+            results["render"],
+            logger=logger,
+            deadline=results["deadline"].stage("persist"),
+            store=store,
+        )
+        return result
+
+    graph.add("config", stage_config)
+    graph.add("deadline", lambda results: Deadline.from_config(results["config"].execution), deps=("config",))
+    graph.add("requirements", stage_requirements)
+    graph.add("client", stage_client, deps=("config",))
+    graph.add("catalog", stage_catalog, deps=("config",))
+    graph.add("propose", stage_propose, deps=("client", "requirements", "deadline", "catalog"))
+    graph.add("scrape", stage_scrape, deps=("config", "requirements", "deadline", "catalog"))
+    graph.add("render", stage_render, deps=("propose", "scrape", "catalog", "config"))
+    graph.add("write", stage_write, deps=("render",))
+    return graph
+
+
+def _write_archive(target: str, fmt: str, artifacts: Dict[str, bytes], logger) -> StoreResult:
+    bundle = ArtifactBundle(artifacts)
+    if target == "-":
+        size = bundle.write_to(sys.stdout.buffer, fmt)
+        sys.stdout.buffer.flush()
+        location = "stdout"
+    else:
+        path = Path(target).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            size = bundle.write_to(handle, fmt)
+        location = str(path)
+    logger.info("Archivo %s con %d artefactos (%d bytes) en %s", fmt, len(artifacts), size, location)
+    return StoreResult(location=location, written=sorted(artifacts))
+
+
+def run_pipeline(
+    args: argparse.Namespace,
+    logger,
+    trace_id: str,
+    build_client: Callable[[AppConfig], SolutionArchitectAgent] = build_agent,
+    load_catalog: Callable[[Path], PricingCatalog] = PricingCatalog,
+) -> StageRun:
+    """Ejecuta las etapas, registra el resultado en el log y en el registro de ejecuciones."""
+    started_at = time.time()
+    counters = metrics.snapshot()
+    try:
+        run = _build_stage_graph(args, logger, build_client, load_catalog).run()
+    except Exception as exc:
+        stage = getattr(exc, "failed_stage", None)
+        logger.error("Fallo la etapa %s: %s", stage or "-", exc, extra={"stage": stage})
+        _record_run(args, trace_id, started_at, counters, run=getattr(exc, "partial_run", None), error=exc)
+        raise
+    for name, timing in run.timings.items():
+        logger.debug("Etapa %s terminada", name, extra={"stage": name, "duration_ms": round(timing.duration * 1000, 3)})
+    logger.info(
+        "Ruta critica: %s (total %.0fms)",
+        run.describe_critical_path(),
+        run.total_seconds * 1000,
+        extra={"duration_ms": round(run.total_seconds * 1000, 3)},
+    )
+    for warning in run.results["deadline"].warnings:
+        logger.warning("Respuesta parcial: %s", warning)
+    logger.info("Salida generada en %s", run.results["write"].location)
+    _record_run(args, trace_id, started_at, counters, run=run)
+    return run
+
+
 def main() -> None:
     args = _parse_args()
     trace_id = new_trace_id()
-    logger = get_logger("solution-architect", request_id=trace_id)
-    logger.info("Inicio de ejecucion (input=%s, config=%s)", args.input, args.config)
-
-    logger.info("Cargando configuracion desde %s", args.config)
-    config = load_config(args.config)
-    logger.info("Configuracion cargada; LLM habilitado=%s", config.llm.enabled)
-
-    logger.info("Cargando requerimientos desde %s", args.input)
-    requirements = _load_requirements(args.input)
-    logger.info("Requerimientos cargados: project_name=%s, cloud_provider=%s", requirements.project_name, requirements.cloud_provider)
-
-    logger.info("Construyendo cliente de modelo (si aplica)")
-    model_client = build_model_client(config.llm)
-    agent = SolutionArchitectAgent(
-        enable_autogen=config.llm.enabled,
-        model_client=model_client,
+    # --profile arranca antes de cargar la configuracion para que su carga tambien quede perfilada.
+    profiler = _start_profiler(args, ProfilingConfig(), trace_id) if args.profile else None
+    logger = None
+    try:
+        config = get_config_provider(args.config).get()
+        settings = config.logging
+        configure_logging(
+            settings.format,
+            use_queue=settings.queue,
+            level=settings.level,
+            debug_sample_rate=settings.debug_sample_rate,
+            debug_max_per_second=settings.debug_max_per_second,
+        )
+        logger = get_logger("solution-architect", request_id=trace_id)
+        logger.info("Inicio de ejecucion (input=%s, config=%s)", args.input, args.config)
+
+        profiling = config.profiling
+        if profiler is not None:
+            profiler.configure(
+                output_dir=Path(profiling.output_dir) / trace_id,
+                trace_allocations=profiling.trace_allocations,
+                top_allocations=profiling.top_allocations,
+                sample_interval=profiling.sample_interval_ms / 1000,
+            )
+        if args.watch:
+            from src.daemon import watch
+
+            watch(args, logger)
+            return
+        if _forward_to_daemon(args, config, logger):
+            return
+        if profiler is None and profiling.enabled:
+            profiler = _start_profiler(args, profiling, trace_id)
+        run_pipeline(args, logger, trace_id)
+    finally:
+        profile_dir = stop_profiling()
+        if profile_dir is not None and logger is not None:
+            logger.info("Perfiles por etapa en %s", profile_dir)
+
+
+def _start_profiler(args: argparse.Namespace, profiling: ProfilingConfig, trace_id: str) -> Profiler:
+    return start_profiling(
+        Path(profiling.output_dir) / trace_id,
+        trace_allocations=args.profile_memory or profiling.trace_allocations,
+        top_allocations=profiling.top_allocations,
+        sample_interval=profiling.sample_interval_ms / 1000,
+    )
+
+
+def _forward_to_daemon(args: argparse.Namespace, config: AppConfig, logger) -> bool:
+    """Delega la ejecucion al daemon si esta corriendo; False para ejecutar en el proceso."""
+    # El perfilado mide este proceso: con perfilado activo no se delega.
+    if args.no_daemon or args.profile or config.profiling.enabled or args.archive == "-" or not config.daemon.forward:
+        return False
+    timeout = config.daemon.request_timeout_seconds
+    try:
+        response = send_request(config.daemon.socket_path, build_run_request(args), timeout=timeout)
+    except DaemonUnavailable:
+        return False
+    except TimeoutError as exc:
+        # No se reintenta en el proceso: el daemon podria seguir escribiendo la misma salida.
+        raise RuntimeError(f"El daemon no respondio en {timeout:.0f}s") from exc
+    if response.get("code") == "config_mismatch":
+        logger.info("%s; se ejecuta en el proceso", response.get("error"))
+        return False
+    if not response.get("ok"):
+        raise RuntimeError(f"El daemon fallo en la etapa {response.get('stage') or '-'}: {response.get('error')}")
+    logger.info(
+        "Ejecucion atendida por el daemon (trace=%s) en %.0fms; salida en %s",
+        response["trace_id"],
+        response["elapsed_ms"],
+        response["location"],
     )
-    logger.info("Agente listo; modo=%s", "LLM" if config.llm.enabled else "determinista")
-
-    logger.info("Generando propuesta de arquitectura")
-    proposal = agent.propose(requirements)
-    logger.info("Propuesta generada: %d componentes, %d flujos, %d ADRs, %d items backlog", len(proposal.components), len(proposal.flows), len(proposal.adrs), len(proposal.backlog))
-
-    output_dir = args.output or config.paths.output_dir or "data"
-    base_path = Path(output_dir).resolve()
-    scrape_provider = (config.cost.scrape_provider or "").strip() or (requirements.cloud_provider or "").strip()
-    logger.info("Escribiendo salida en %s (scrape_provider=%s)", base_path, scrape_provider or "ninguno")
-    write_docs(
-        base_path,
-        proposal,
-        scrape_provider=scrape_provider or None,
-        resources=requirements.resources or None,
-        logger=logger,
+    for warning in response.get("warnings", []):
+        logger.warning("Respuesta parcial: %s", warning)
+    return True
+
+
+def _record_run(
+    args: argparse.Namespace,
+    trace_id: str,
+    started_at: float,
+    counters: Dict[str, int],
+    run: Optional[StageRun] = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Guarda la ejecucion en el registro SQLite (`registry.path`), tambien si fallo."""
+    results = run.results if run is not None else {}
+    config = results.get("config")
+    if config is None:
+        try:
+            config = get_config_provider(args.config).get()
+        except Exception:
+            return
+    registry = build_run_registry(config.registry)
+    if registry is None:
+        return
+    usage = {name: value - counters.get(name, 0) for name, value in metrics.snapshot().items()}
+    warnings = results["deadline"].warnings if "deadline" in results else []
+    requirements = results.get("requirements")
+    agent = results.get("client")
+    record = RunRecord(
+        trace_id=trace_id,
+        started_at=started_at,
+        total_seconds=time.time() - started_at,
+        status="error" if error is not None else ("partial" if warnings else "ok"),
+        mode=agent.mode if agent is not None else "",
+        input_hash=content_hash(requirements.model_dump()) if requirements is not None else "",
+        config_hash=content_hash(config.model_dump()),
+        stages={name: timing.duration for name, timing in run.timings.items()} if run is not None else {},
+        prompt_tokens=usage.get("llm.tokens.prompt", 0),
+        completion_tokens=usage.get("llm.tokens.completion", 0),
+        cache_hits=usage.get("cache.hits", 0),
+        cache_misses=usage.get("cache.misses", 0),
+        artifacts=artifact_hashes(results["render"]) if "render" in results else {},
+        warnings=len(warnings),
+        error=f"{type(error).__name__}: {error}" if error is not None else None,
     )
-    logger.info("Salida generada en %s", base_path)
+    with registry:
+        registry.record(record)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.core.run_registry import RunRegistry
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Consultas sobre el registro de ejecuciones.")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default="data/.runs/runs.sqlite",
+        help="Ruta del registro SQLite (por defecto data/.runs/runs.sqlite).",
+    )
+    parser.add_argument(
+        "--since-days",
+        type=float,
+        default=None,
+        help="Solo ejecuciones de los ultimos N dias.",
+    )
+    parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    percentiles = commands.add_parser("percentiles", help="p50/p95/p99 por etapa y periodo.")
+    percentiles.add_argument("--stage", type=str, default=None)
+    percentiles.add_argument("--bucket", choices=("hour", "day", "week"), default="day")
+
+    slowest = commands.add_parser("slowest", help="Ejecuciones mas lentas.")
+    slowest.add_argument("--limit", type=int, default=10)
+
+    cache = commands.add_parser("cache", help="Aciertos de cache y tokens por periodo.")
+    cache.add_argument("--bucket", choices=("hour", "day", "week"), default="day")
+    return parser.parse_args()
+
+
+def _print_table(rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        print("(sin ejecuciones registradas)")
+        return
+    columns = list(rows[0])
+    cells = [[_format(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(line, widths)))
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return "" if value is None else str(value)
+
+
+def main() -> None:
+    args = _parse_args()
+    if not Path(args.db).exists():
+        raise FileNotFoundError(f"No se encontro el registro de ejecuciones: {args.db}")
+    since = time.time() - args.since_days * 86400 if args.since_days else None
+    with RunRegistry(Path(args.db)) as registry:
+        if args.command == "percentiles":
+            rows = registry.stage_percentiles(since=since, bucket=args.bucket, stage=args.stage)
+        elif args.command == "slowest":
+            rows = registry.slowest_runs(limit=args.limit, since=since)
+            for row in rows:
+                row["started_at"] = datetime.fromtimestamp(row["started_at"], tz=timezone.utc).isoformat(
+                    timespec="seconds"
+                )
+        else:
+            rows = registry.cache_effectiveness(since=since, bucket=args.bucket)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        _print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.api.admission import (
+    AdmissionController,
+    ConcurrencyLimiter,
+    MemoryRateBackend,
+    Overloaded,
+    RateLimited,
+    RateLimiter,
+    SQLiteRateBackend,
+)
+from src.api.app import _release_once
+from src.core.schemas import Requirements
+
+
+def test_token_bucket_per_tenant_with_overrides() -> None:
+    now = [0.0]
+    limiter = RateLimiter(1.0, 2, tenants={"vip": (10.0, 1)}, backend=MemoryRateBackend(clock=lambda: now[0]))
+
+    assert [limiter.check("a"), limiter.check("a")] == [0.0, 0.0]
+    assert limiter.check("a") == pytest.approx(1.0)
+    assert limiter.check("b") == 0.0
+    assert limiter.check("vip") == 0.0 and limiter.check("vip") == pytest.approx(0.1)
+    now[0] = 1.0
+    assert limiter.check("a") == 0.0
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "rate.sqlite"
+    first = RateLimiter(0.01, 1, backend=SQLiteRateBackend(path, clock=lambda: 100.0))
+    second = RateLimiter(0.01, 1, backend=SQLiteRateBackend(path, clock=lambda: 100.0))
+
+    assert first.check("tenant") == 0.0
+    assert second.check("tenant") == pytest.approx(100.0)
+
+
+def test_sheds_load_when_queue_is_full() -> None:
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, max_queue_age_seconds=5)
+    release = threading.Event()
+    admitted = []
+
+    def hold() -> None:
+        with limiter.slot():
+            release.wait(5)
+
+    def queued() -> None:
+        with limiter.slot():
+            admitted.append("en cola")
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while limiter.snapshot()["active"] < 1:
+        time.sleep(0.001)
+    waiter = threading.Thread(target=queued)
+    waiter.start()
+    while limiter.snapshot()["queued"] < 1:
+        time.sleep(0.001)
+
+    with pytest.raises(Overloaded) as rejected:
+        with limiter.slot():
+            pass
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers()["Retry-After"]) >= 1
+
+    release.set()
+    holder.join()
+    waiter.join()
+    assert admitted == ["en cola"]
+
+
+def test_queue_age_limits_waiting() -> None:
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=10, max_queue_age_seconds=0.05)
+    with limiter.slot():
+        with pytest.raises(Overloaded):
+            with limiter.slot():
+                pass
+    assert limiter.snapshot()["queued"] == 0
+
+
+def test_controller_rate_limits_propose() -> None:
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=2), RateLimiter(0.001, 1))
+    agent = SolutionArchitectAgent(enable_autogen=False, model_client=None)
+
+    assert controller.propose(agent, "tenant", Requirements()).components
+    with pytest.raises(RateLimited):
+        controller.propose(agent, "tenant", Requirements())
+
+
+def test_stream_slot_is_released_once_even_if_the_body_never_runs() -> None:
+    controller = AdmissionController(ConcurrencyLimiter(max_concurrent=1, max_queue=0))
+    slot = controller.admit("t")
+    slot.__enter__()
+    release = _release_once(slot)
+    assert controller.limiter.snapshot()["active"] == 1
+
+    # Cierre de la respuesta sin haber iterado el cuerpo, y luego el `finally` del cuerpo.
+    release()
+    release()
+    assert controller.limiter.snapshot()["active"] == 0
+    with controller.admit("t"):
+        pass
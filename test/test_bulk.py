@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import write_docs
+from src.bulk import BulkRunner
+from src.core.batch_api import BatchAPIClient, BatchJob, parse_results
+from src.core.config import AppConfig, AzureLLMConfig, BulkConfig, LLMConfig
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+from src.fake_llm import FakeLLMServer, FakeModelSettings
+
+
+def _config(tmp_path: Path, **bulk) -> AppConfig:
+    return AppConfig(bulk=BulkConfig(work_dir=str(tmp_path / "work"), poll_seconds=0.01, max_poll_seconds=0.05, **bulk))
+
+
+def _client(server: FakeLLMServer) -> BatchAPIClient:
+    return BatchAPIClient(server.api_base, {"Authorization": "Bearer test"}, model="fake-gpt")
+
+
+def _items(count: int):
+    return [(f"req-{index}", Requirements(project_name=f"Proyecto {index}", resources=["Key Vault"])) for index in range(count)]
+
+
+def test_run_writes_artifacts_and_reports_failures(tmp_path: Path) -> None:
+    settings = FakeModelSettings(error_rate=0.3, seed=7)
+    with FakeLLMServer(settings) as server:
+        runner = BulkRunner(_config(tmp_path, max_requests_per_batch=4), _client(server))
+        reports = runner.run(_items(10), tmp_path / "out")
+        assert server.model.snapshot()["batches"] == 3
+
+    assert len(reports) == 3
+    written = {name for report in reports for name in report.written}
+    failed = {name for report in reports for name in report.failed}
+    assert written and failed
+    assert written | failed == {f"req-{index}" for index in range(10)}
+    assert not any(report.missing for report in reports)
+    for name in written:
+        assert (tmp_path / "out" / name / "architecture" / "solution-proposal.md").exists()
+        assert (tmp_path / "out" / name / "cost" / "cost-estimate.xlsx").exists()
+    assert all("HTTP" in message for report in reports for message in report.failed.values())
+    assert sum(report.prompt_tokens for report in reports) > 0
+
+    report_file = tmp_path / "work" / f"{reports[0].batch_id}.report.json"
+    assert json.loads(report_file.read_text(encoding="utf-8"))["written"] == reports[0].written
+    manifest = json.loads((tmp_path / "work" / f"{reports[0].batch_id}.json").read_text(encoding="utf-8"))
+    assert list(manifest["items"]) == ["req-0", "req-1", "req-2", "req-3"]
+
+
+def test_batch_file_uses_the_agent_prompt(tmp_path: Path) -> None:
+    with FakeLLMServer(FakeModelSettings(seed=1)) as server:
+        runner = BulkRunner(_config(tmp_path), _client(server))
+        [job] = runner.submit(_items(2))
+        lines = (tmp_path / "work" / f"{job.id}.jsonl").read_text(encoding="utf-8").splitlines()
+        runner.wait(job.id)
+
+    first = json.loads(lines[0])
+    assert first["custom_id"] == "req-0"
+    assert first["url"] == "/v1/chat/completions"
+    assert first["body"]["messages"] == runner.agent.build_messages(_items(1)[0][1])
+
+
+def test_invalid_response_is_reported_not_repaired(tmp_path: Path) -> None:
+    body = {"choices": [{"message": {"content": "no es json"}}]}
+    line = json.dumps({"custom_id": "req-0", "response": {"status_code": 200, "body": body}, "error": None})
+    [result] = parse_results(line.encode("utf-8"))
+    assert result.ok
+    runner = BulkRunner(_config(tmp_path), BatchAPIClient("http://127.0.0.1:9", {}))
+    with pytest.raises(ValueError):
+        runner._persist("req-0", Requirements(project_name="X"), result.body, tmp_path / "out")
+    assert runner.agent._max_repair_attempts == 0
+
+
+def test_collect_records_per_item_failures_and_keeps_going(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    valid = generate_solution(Requirements(project_name="X")).model_dump_json()
+    bodies = {
+        "req-0": {"choices": [{"message": {"role": "assistant", "content": None}}]},  # rechazo / tool call
+        "req-1": {"choices": [{"message": {"content": valid}}]},
+        "req-2": {"choices": [{"message": {"content": valid}}]},
+    }
+    output = "\n".join(
+        json.dumps({"custom_id": name, "response": {"status_code": 200, "body": body}, "error": None})
+        for name, body in bodies.items()
+    )
+    runner = BulkRunner(_config(tmp_path), BatchAPIClient("http://127.0.0.1:9", {}))
+    runner.work_dir.mkdir(parents=True, exist_ok=True)
+    items = {name: Requirements(project_name=name).model_dump() for name in bodies}
+    (runner.work_dir / "b1.json").write_text(json.dumps({"items": items}), encoding="utf-8")
+    monkeypatch.setattr(runner.client, "content", lambda file_id: output.encode("utf-8"))
+    def failing_write(target, *args, **kwargs):
+        if Path(target).name == "req-1":
+            raise OSError("disco lleno")
+        return write_docs(target, *args, **kwargs)
+
+    monkeypatch.setattr("src.bulk.write_docs", failing_write)
+    report = runner.collect("b1", tmp_path / "out", BatchJob(id="b1", status="completed", output_file_id="f1"))
+
+    assert list(report.written) == ["req-2"]
+    assert report.failed["req-0"].startswith("ValueError") and "contenido" in report.failed["req-0"]
+    assert report.failed["req-1"] == "OSError: disco lleno"
+    saved = json.loads((runner.work_dir / "b1.report.json").read_text(encoding="utf-8"))
+    assert sorted(saved["failed"]) == ["req-0", "req-1"]
+
+
+def test_duplicate_custom_ids_are_rejected(tmp_path: Path) -> None:
+    runner = BulkRunner(_config(tmp_path), BatchAPIClient("http://127.0.0.1:9", {}))
+    with pytest.raises(ValueError, match="req-0"):
+        runner.submit(_items(1) + _items(1))
+
+
+def test_cancel_and_collect_partial_results(tmp_path: Path) -> None:
+    with FakeLLMServer(FakeModelSettings(seed=3, batch_seconds=30)) as server:
+        runner = BulkRunner(_config(tmp_path), _client(server))
+        [job] = runner.submit(_items(3))
+        assert runner.client.cancel(job.id).status in ("cancelling", "cancelled")
+        job = runner.wait(job.id)
+        assert job.status == "cancelled"
+        report = runner.collect(job.id, tmp_path / "out", job)
+    assert report.status == "cancelled"
+    assert set(report.written) | set(report.failed) | set(report.missing) == {"req-0", "req-1", "req-2"}
+
+
+def test_azure_client_uses_deployment_and_api_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "secreto")
+    with FakeLLMServer(FakeModelSettings(seed=5)) as server:
+        host, port = server.address
+        llm = LLMConfig(provider="azure", azure=AzureLLMConfig(endpoint=f"http://{host}:{port}", deployment_name="gpt-batch"))
+        client = BatchAPIClient.from_config(llm, BulkConfig())
+        assert client.base_url.endswith("/openai")
+        assert client.query == {"api-version": BulkConfig().azure_api_version}
+        assert client.endpoint == "/chat/completions"
+
+        runner = BulkRunner(_config(tmp_path, endpoint="/chat/completions"), client)
+        [report] = runner.run(_items(2), tmp_path / "out")
+    assert set(report.written) == {"req-0", "req-1"}
+    line = json.loads((tmp_path / "work" / f"{report.batch_id}.jsonl").read_text(encoding="utf-8").splitlines()[0])
+    assert line["body"]["model"] == "gpt-batch"
+
+
+def test_wait_backs_off_and_times_out() -> None:
+    class _Pending(BatchAPIClient):
+        def __init__(self) -> None:
+            super().__init__("http://127.0.0.1:9", {})
+            self.polls = 0
+
+        def get(self, batch_id):
+            self.polls += 1
+            return BatchJob(id=batch_id, status="in_progress")
+
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    client = _Pending()
+    with pytest.raises(TimeoutError):
+        client.wait("batch_x", poll_seconds=10, max_poll_seconds=40, timeout=200, sleep=sleep, clock=lambda: now[0])
+    assert sleeps == [10, 20, 40, 40, 40, 40]
+    assert client.polls == len(sleeps) + 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent.tools import render_bundle
+from src.core.bundle import ArtifactBundle
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+
+ARTIFACTS = {
+    "architecture/solution-proposal.md": b"# Propuesta",
+    "backlog/backlog.csv": b"id,epic\nBL-001,Agente\n",
+}
+
+
+class _Unseekable:
+    """Como un socket: solo `write`."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, chunk: bytes) -> int:
+        self.data += chunk
+        return len(chunk)
+
+
+def test_zip_streams_to_unseekable_target_with_manifest_first() -> None:
+    bundle = ArtifactBundle(ARTIFACTS)
+    target = _Unseekable()
+    size = bundle.write_to(target, "zip")
+    assert size == len(target.data)
+
+    archive = zipfile.ZipFile(io.BytesIO(bytes(target.data)))
+    assert archive.namelist()[0] == "manifest.json"
+    manifest = json.loads(archive.read("manifest.json"))
+    for path, content in ARTIFACTS.items():
+        assert archive.read(path) == content
+        assert manifest["artifacts"][path] == {"sha256": hashlib.sha256(content).hexdigest(), "size": len(content)}
+
+
+@pytest.mark.parametrize("fmt", ["tar", "tar.gz"])
+def test_tar_chunks_rebuild_the_archive(fmt: str) -> None:
+    bundle = ArtifactBundle(ARTIFACTS)
+    data = b"".join(bundle.iter_archive(fmt))
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+        assert archive.getnames() == ["manifest.json", *sorted(ARTIFACTS)]
+        assert archive.extractfile("backlog/backlog.csv").read() == ARTIFACTS["backlog/backlog.csv"]
+    with pytest.raises(ValueError):
+        bundle.to_bytes("rar")
+
+
+def test_render_bundle_includes_every_adr() -> None:
+    payload = json.loads((ROOT / "data" / "requirements.json").read_text(encoding="utf-8"))
+    proposal = generate_solution(Requirements(**payload))
+    bundle = render_bundle(proposal)
+    adrs = [path for path in bundle.artifacts if path.startswith("adr/")]
+    assert len(adrs) == len(proposal.adrs) > 1
+    assert "cost/cost-estimate.xlsx" in bundle.manifest()["artifacts"]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.core.cassette import Cassette, CassetteMiss, build_cassette
+from src.core.config import CassetteConfig
+from src.core.deadline import Deadline
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+
+
+class _ScriptedClient:
+    def __init__(self, responses: list[str]) -> None:
+        self._responses = list(responses)
+        self.calls = 0
+
+    def create(self, messages):
+        self.calls += 1
+        return {"content": self._responses.pop(0), "usage": {"prompt_tokens": 100, "completion_tokens": 50}}
+
+
+def test_replay_serves_recorded_exchanges_without_client(tmp_path: Path) -> None:
+    path = tmp_path / "llm.sqlite"
+    body = generate_solution(Requirements(project_name="Grabado")).model_dump_json()
+    client = _ScriptedClient([body])
+    recorder = SolutionArchitectAgent(enable_autogen=True, model_client=client, cassette=Cassette(path, mode="record"))
+    recorded = recorder.propose(Requirements(project_name="Grabado"))
+    assert client.calls == 1
+
+    player = SolutionArchitectAgent(enable_autogen=True, cassette=Cassette(path, mode="replay"))
+    assert player.mode == "replay"
+    assert player.propose(Requirements(project_name="Grabado")) == recorded
+    with pytest.raises(CassetteMiss):
+        player.propose(Requirements(project_name="Otro"))
+
+
+def test_repeated_prompts_replay_in_order_with_latency(tmp_path: Path) -> None:
+    path = tmp_path / "llm.sqlite"
+    messages = [{"role": "user", "content": "hola"}]
+    recorder = Cassette(path, mode="record")
+    recorder.record(messages, "uno", 10, 1, latency=0.5)
+    recorder.record(messages, "dos", 10, 2, latency=2.0)
+    assert len(recorder) == 2
+
+    sleeps: list[float] = []
+    player = Cassette(path, mode="replay", replay_latency=True, latency_scale=0.5, sleep=sleeps.append)
+    assert player.replay(messages)["content"] == "uno"
+    second = player.replay(messages)
+    assert second["content"] == "dos" and second["usage"]["completion_tokens"] == 2
+    assert player.replay(messages)["content"] == "uno"
+    assert sleeps == [0.25, 1.0, 0.25]
+
+    with pytest.raises(TimeoutError):
+        player.replay(messages, deadline=Deadline(total_seconds=0.1))
+
+
+def test_build_cassette_modes(tmp_path: Path) -> None:
+    assert build_cassette(CassetteConfig()) is None
+    with pytest.raises(FileNotFoundError):
+        build_cassette(CassetteConfig(mode="replay", path=str(tmp_path / "no.sqlite")))
+    with pytest.raises(ValueError):
+        build_cassette(CassetteConfig(mode="rewind", path=str(tmp_path / "x.sqlite")))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.batch import BatchWorker, PipelineJobProcessor
+from src.core.columnar import ColumnarDataset, ColumnarSink
+from src.core.generator import generate_solution
+from src.core.schemas import CostLine, Requirements
+from src.core.work_queue import MemoryWorkQueue
+
+
+def _proposals():
+    proposals = []
+    for index, (provider, resources) in enumerate(
+        [("Azure", ["Cosmos DB", "Key Vault"]), ("AWS", ["Service Bus"]), ("GCP", ["Key Vault", "Event Grid", "Storage Account"])]
+    ):
+        proposal = generate_solution(Requirements(cloud_provider=provider, resources=resources))
+        lines = [CostLine(resource=name, driver="uso", p10=i, p50=10.0 * (i + index), p90=99) for i, name in enumerate(resources)]
+        cost = proposal.cost_estimate.model_copy(update={"breakdown": lines, "p50": 100.0 * (index + 1)})
+        proposals.append(proposal.model_copy(update={"cost_estimate": cost, "warnings": ["lento"] * index}))
+    return proposals * 5
+
+
+@pytest.mark.parametrize("fmt", ["npz", "parquet"])
+def test_group_by_matches_naive_aggregation(fmt: str, tmp_path: Path) -> None:
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    proposals = _proposals()
+    # Dos writers con chunks chicos: varios chunks con diccionarios distintos por tabla.
+    for offset, part in ((0, proposals[:8]), (8, proposals[8:])):
+        with ColumnarSink(tmp_path, chunk_rows=5, fmt=fmt) as sink:
+            for index, proposal in enumerate(part, start=offset):
+                sink.append(f"p{index}", proposal)
+    dataset = ColumnarDataset(tmp_path)
+    assert len(dataset.chunks("components")) > 2
+
+    counts = dataset.row_counts()
+    assert counts["proposals"] == len(proposals)
+    assert counts["components"] == sum(len(p.components) for p in proposals)
+
+    rows = dataset.group_count("risks", ["id", "impact"], top=None)
+    expected = Counter((risk.id, risk.impact) for p in proposals for risk in p.risks)
+    assert {(row["id"], row["impact"]): row["count"] for row in rows} == expected
+    assert [row["count"] for row in rows] == sorted(expected.values(), reverse=True)
+
+    by_resource = dataset.group_count("cost_lines", ["resource"], value="p50", top=None)
+    lines = [line for p in proposals for line in p.cost_estimate.breakdown]
+    key_vault = next(row for row in by_resource if row["resource"] == "Key Vault")
+    values = [line.p50 for line in lines if line.resource == "Key Vault"]
+    assert key_vault["count"] == len(values)
+    assert key_vault["sum_p50"] == pytest.approx(sum(values))
+    assert key_vault["mean_p50"] == pytest.approx(sum(values) / len(values))
+
+    filtered = dataset.group_count("cost_lines", ["resource"], where={"driver": "uso", "resource": "Service Bus"})
+    assert filtered == [{"resource": "Service Bus", "count": 5}]
+    assert dataset.group_count("cost_lines", ["resource"], where={"resource": "no existe"}) == []
+    assert dataset.group_count("components", ["name"], top=1)[0]["count"] == 15
+
+    summary = dataset.describe("proposals", "p50")
+    assert (summary["count"], summary["min"], summary["max"], summary["p50"]) == (15, 100.0, 300.0, 200.0)
+    assert dataset.describe("proposals", "warnings")["mean"] == pytest.approx(1.0)
+
+
+def test_dataset_rejects_unknown_tables_and_columns(tmp_path: Path) -> None:
+    with ColumnarSink(tmp_path, fmt="npz") as sink:
+        sink.append("p0", _proposals()[0])
+    dataset = ColumnarDataset(tmp_path)
+    with pytest.raises(ValueError, match="Tabla desconocida"):
+        dataset.group_count("nada", ["id"])
+    with pytest.raises(ValueError, match="texto"):
+        dataset.group_count("proposals", ["p50"])
+    with pytest.raises(ValueError, match="numerica"):
+        dataset.describe("risks", "impact")
+    with pytest.raises(ValueError, match="texto"):
+        dataset.describe("proposals", "p50", where={"p90": "1"})
+    with pytest.raises(FileNotFoundError):
+        ColumnarDataset(tmp_path / "no-existe")
+
+
+def test_batch_worker_appends_proposals_to_sink(tmp_path: Path) -> None:
+    config = tmp_path / "config.yml"
+    config.write_text("llm:\n  enabled: false\nregistry:\n  enabled: false\n", encoding="utf-8")
+    queue = MemoryWorkQueue()
+    payload = json.loads((ROOT / "data" / "requirements.json").read_text(encoding="utf-8"))
+    queue.enqueue("q", [("uno", {"requirements": payload}), ("dos", {"requirements": payload})])
+    sink = ColumnarSink(tmp_path / "columnar", fmt="npz", journal=True)
+    BatchWorker(queue, PipelineJobProcessor(str(config), tmp_path / "out", sink=sink), worker_id="w").run()
+    # Sin chunks por trabajo: las filas esperan en memoria y en el journal hasta `close()`.
+    assert ColumnarDataset(tmp_path / "columnar").chunks("proposals") == []
+    assert len(list((tmp_path / "columnar" / ".journal").glob("*.jsonl"))) == 1
+    sink.close()
+    assert list((tmp_path / "columnar" / ".journal").glob("*.jsonl")) == []
+    assert len(ColumnarDataset(tmp_path / "columnar").chunks("proposals")) == 1
+
+    dataset = ColumnarDataset(tmp_path / "columnar")
+    rows = dataset.group_count("proposals", ["proposal_id"])
+    assert {row["proposal_id"] for row in rows} == {"q/uno", "q/dos"}
+    assert dataset.row_counts()["backlog"] > 0
+
+
+def test_orphaned_journal_is_recovered_and_duplicates_count_once(tmp_path: Path) -> None:
+    proposals = _proposals()[:3]
+    crashed = ColumnarSink(tmp_path, fmt="npz", journal=True)
+    for index, proposal in enumerate(proposals):
+        crashed.append(f"p{index}", proposal)
+    # Otro worker abre el directorio: el journal sin cerrar se convierte en chunks.
+    with ColumnarSink(tmp_path, fmt="npz", journal=True) as sink:
+        assert sink.recovered == 3
+        sink.append("p0", proposals[0])  # trabajo reprocesado: ya esta en el journal recuperado
+    crashed.close()  # el primer writer seguia vivo y tambien escribe sus filas
+
+    dataset = ColumnarDataset(tmp_path)
+    assert len(dataset.chunks("proposals")) == 2
+    assert dataset.row_counts()["proposals"] == 3
+    assert dataset.row_counts()["components"] == sum(len(p.components) for p in proposals)
+    rows = dataset.group_count("proposals", ["proposal_id"])
+    assert sorted((row["proposal_id"], row["count"]) for row in rows) == [("p0", 1), ("p1", 1), ("p2", 1)]
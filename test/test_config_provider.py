@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.core.config import load_config
+from src.core.config_provider import ConfigProvider, apply_env_overrides
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _write(path: Path, text: str, tick: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    # mtime distinto aunque el sistema de archivos tenga resolucion gruesa.
+    os.utime(path, ns=(tick * 10**9, tick * 10**9))
+
+
+def test_memoizes_and_swaps_on_change(tmp_path: Path) -> None:
+    path = tmp_path / "config.yml"
+    _write(path, "llm:\n  model: a\n", 1)
+    clock = FakeClock()
+    provider = ConfigProvider(path, poll_seconds=5, environ={}, clock=clock)
+    events = []
+    provider.subscribe(lambda old, new, sections: events.append(sections), sections={"llm"})
+    provider.subscribe(lambda old, new, sections: events.append("cost"), sections={"cost"})
+
+    first = provider.get()
+    _write(path, "llm:\n  model: b\n", 2)
+    assert provider.get() is first  # dentro del intervalo de sondeo
+
+    clock.now = 5
+    updated = provider.get()
+    assert updated.llm.model == "b" and first.llm.model == "a"
+    assert events == [{"llm"}] and provider.version == 1
+
+
+def test_invalid_edit_keeps_previous_config(tmp_path: Path) -> None:
+    path = tmp_path / "config.yml"
+    _write(path, "execution:\n  max_concurrency: 4\n", 1)
+    provider = ConfigProvider(path, poll_seconds=0, environ={})
+
+    _write(path, "execution:\n  max_concurrency: [muchos]\n", 2)
+    assert provider.get().execution.max_concurrency == 4
+    assert provider.last_error
+
+    _write(path, "execution: {max_concurrency: 8", 3)
+    assert provider.get().execution.max_concurrency == 4
+
+    _write(path, "execution:\n  max_concurrency: 8\n", 4)
+    assert provider.get().execution.max_concurrency == 8
+    assert provider.last_error is None
+
+
+def test_env_overrides_are_layered(tmp_path: Path) -> None:
+    path = tmp_path / "config.yml"
+    _write(path, "llm:\n  enabled: false\n  model: a\n", 1)
+    environ = {"AGENT__LLM__ENABLED": "true", "AGENT__CACHE__MAX_ENTRIES": "64", "OTRA": "x"}
+    config = ConfigProvider(path, environ=environ).get()
+
+    assert config.llm.enabled is True and config.llm.model == "a"
+    assert config.cache.max_entries == 64
+    assert apply_env_overrides({"a": {"b": 1}}, {"AGENT__A__C": "2"}) == {"a": {"b": 1, "c": 2}}
+    # load_config aplica las mismas variables que el proveedor.
+    assert load_config(path, environ) == config
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.core.cost_engine import VolumeModel, catalog_unit_prices, region_multiplier, simulate_costs
+from src.core.generator import generate_solution
+from src.core.pricing_catalog import PricingCatalog, ingest_price_list
+from src.core.schemas import Requirements
+
+
+def test_simulation_percentiles_and_breakdown() -> None:
+    simulation = simulate_costs(
+        ["Cosmos DB", "Key Vault", "Container Registry"],
+        ["us-east-1", "westeurope"],
+        traffic_profile="Picos de 20 rps",
+        scenarios=2000,
+    )
+    estimate = simulation.to_cost_estimate()
+
+    assert estimate.p10 <= estimate.p50 <= estimate.p90
+    assert [line.resource for line in estimate.breakdown] == ["Cosmos DB", "Key Vault", "Container Registry"]
+    # Las horas fijas se replican por region: 730 h * 0.0069 USD * (1.0 + 1.08).
+    registry = estimate.breakdown[2]
+    assert registry.p10 == registry.p90 == round(730 * 0.0069 * 2.08, 2)
+    per_region = simulation.region_percentiles()
+    assert per_region["us-east-1"][1] < per_region["westeurope"][1]
+
+
+def test_unit_price_overrides_and_traffic_profile() -> None:
+    assert VolumeModel.from_traffic_profile("1000 solicitudes/mes").monthly_requests == 1000
+    simulation = simulate_costs(
+        ["Container Registry"], ["eastus"], unit_prices={"Container Registry@eastus": 1.0}, scenarios=10
+    )
+    assert simulation.to_cost_estimate().p50 == 730.0
+
+
+def test_generator_costs_requested_resources_without_gateway() -> None:
+    proposal = generate_solution(
+        Requirements(resources=["Cosmos DB", "API Gateway"], regions=["eastus"])
+    )
+    assert [line.resource for line in proposal.cost_estimate.breakdown] == ["Cosmos DB"]
+    assert proposal.cost_estimate.range_mid.startswith("USD")
+
+
+def test_region_multiplier_matches_tokens_not_substrings() -> None:
+    assert region_multiplier("australiaeast") == region_multiplier("russia") != region_multiplier("eastus")
+    assert region_multiplier("eastus2") == region_multiplier("us-central1") == 1.0
+    assert region_multiplier("westeurope") == region_multiplier("eu-west-1") == region_multiplier("europe-west1")
+    assert region_multiplier("sa-east-1") == region_multiplier("brazilsouth")
+
+
+def test_catalog_prices_feed_the_simulation(tmp_path: Path) -> None:
+    items = [
+        {"serviceName": "Key Vault", "skuName": "Standard", "productName": "Key Vault", "unitOfMeasure": "10K", "armRegionName": "eastus", "retailPrice": 0.05, "currencyCode": "USD", "type": "Consumption"},
+        {"serviceName": "Container Registry", "skuName": "Basic", "productName": "Container Registry", "unitOfMeasure": "1 Hour", "armRegionName": "eastus", "retailPrice": 0.01, "currencyCode": "USD", "type": "Consumption"},
+        {"serviceName": "Azure Cosmos DB", "skuName": "RU", "productName": "Cosmos DB", "unitOfMeasure": "100/Hour", "armRegionName": "eastus", "retailPrice": 0.008, "currencyCode": "USD", "type": "Consumption"},
+    ]
+    source, catalog_path = tmp_path / "azure.json", tmp_path / "catalog.sqlite"
+    source.write_text(json.dumps({"Items": items}), encoding="utf-8")
+    ingest_price_list("azure", source, catalog_path)
+    catalog = PricingCatalog(catalog_path)
+
+    prices = catalog_unit_prices(catalog, ["Key Vault", "Container Registry", "Cosmos DB"], ["eastus", "westeurope"], "azure")
+    assert prices["Key Vault@eastus"] == pytest.approx(5.0)
+    # Sin fila en westeurope se ajusta el precio de eastus con el multiplicador de region.
+    assert prices["Container Registry@westeurope"] == pytest.approx(0.01 * 1.08)
+    # RU por hora no es un precio por solicitud: Cosmos DB conserva el precio de referencia.
+    assert not any(key.startswith("Cosmos DB@") for key in prices)
+    # "East US" es la region eastus del catalogo: sin ajuste por region.
+    assert catalog_unit_prices(catalog, ["Key Vault"], ["East US"], "azure") == {"Key Vault@East US": pytest.approx(5.0)}
+
+    requirements = Requirements(resources=["Container Registry"], regions=["eastus"])
+    estimate = generate_solution(requirements, unit_prices=prices).cost_estimate
+    assert estimate.p50 == round(730 * 0.01, 2)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.core.config import AppConfig, ProfilingConfig
+from src.core.config_provider import get_config_provider
+from src.daemon import DaemonServer, FileWatcher, WarmState, watch
+from src.daemon_client import DaemonUnavailable, build_run_request, daemon_settings, send_request
+from src.daemon_client import main as client_main
+
+
+def _write_config(path: Path, model: str = "gpt-4o-mini") -> None:
+    path.write_text(
+        f"llm:\n  enabled: false\n  model: {model}\n"
+        "registry:\n  enabled: false\n"
+        "daemon:\n  debounce_ms: 50\n  poll_ms: 10\n",
+        encoding="utf-8",
+    )
+
+
+def _args(tmp_path: Path, config: Path) -> argparse.Namespace:
+    requirements = tmp_path / "requirements.json"
+    if not requirements.exists():
+        requirements.write_text(json.dumps({"project_name": "Daemon"}), encoding="utf-8")
+    return argparse.Namespace(
+        input=str(requirements),
+        config=str(config),
+        output=str(tmp_path / "out"),
+        archive=None,
+        archive_format="zip",
+        slo_seconds=None,
+        profile=False,
+        profile_memory=False,
+    )
+
+
+def test_file_watcher_debounces_bursts(tmp_path: Path) -> None:
+    target = tmp_path / "input.json"
+    target.write_text("{}", encoding="utf-8")
+    now = [0.0]
+    watcher = FileWatcher([target], debounce_seconds=0.2, clock=lambda: now[0])
+    assert watcher.poll() == set()
+    for index in range(3):
+        target.write_text("{" + " " * (index + 1) + "}", encoding="utf-8")
+        now[0] += 0.05
+        assert watcher.poll() == set()
+    now[0] += 0.25
+    assert watcher.poll() == {target.resolve()}
+    assert watcher.poll() == set()
+
+
+def test_daemon_serves_runs_with_warm_client(tmp_path: Path) -> None:
+    config = tmp_path / "config.yml"
+    _write_config(config)
+    state = WarmState(get_config_provider(config))
+    server = DaemonServer(tmp_path / "agent.sock", state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = build_run_request(_args(tmp_path, config))
+        first = send_request(server.socket_path, request)
+        second = send_request(server.socket_path, request)
+        assert first["ok"] and second["ok"], first
+        assert (tmp_path / "out" / "architecture" / "solution-proposal.md").exists()
+        assert send_request(server.socket_path, {"op": "ping"})["agent_builds"] == 1
+
+        time.sleep(0.01)
+        _write_config(config, model="gpt-4o")
+        assert send_request(server.socket_path, request)["ok"]
+        assert send_request(server.socket_path, {"op": "ping"})["agent_builds"] == 2
+
+        other = dict(request, config=str(tmp_path / "otra.yml"))
+        assert send_request(server.socket_path, other)["code"] == "config_mismatch"
+        overridden = build_run_request(_args(tmp_path, config), environ={"AGENT__LLM__MODEL": "gpt-4o-mini", "HOME": "/x"})
+        assert overridden["env"] == {"AGENT__LLM__MODEL": "gpt-4o-mini"}
+        mismatch = send_request(server.socket_path, overridden)
+        assert mismatch["code"] == "config_mismatch" and "AGENT__LLM__MODEL" in mismatch["error"]
+        with pytest.raises(RuntimeError):
+            DaemonServer(server.socket_path, state)
+        assert send_request(server.socket_path, {"op": "shutdown"})["ok"]
+        thread.join(timeout=5)
+    finally:
+        server.server_close()
+    with pytest.raises(DaemonUnavailable):
+        send_request(server.socket_path, {"op": "ping"})
+
+
+def test_thin_client_uses_configured_socket_and_times_out(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    config = tmp_path / "config.yml"
+    config.write_text(f"daemon:\n  socket_path: {tmp_path / 'hung.sock'}\n  request_timeout_seconds: 0.2\n", encoding="utf-8")
+    settings = daemon_settings(str(config), environ={"AGENT__DAEMON__REQUEST_TIMEOUT_SECONDS": "0.1"})
+    assert settings == {"socket_path": str(tmp_path / "hung.sock"), "request_timeout_seconds": "0.1"}
+
+    # Un "daemon" que acepta conexiones y nunca responde.
+    hung = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    hung.bind(str(tmp_path / "hung.sock"))
+    hung.listen(4)
+    try:
+        started = time.perf_counter()
+        assert client_main(["--config", str(config), "--input", str(tmp_path / "r.json")]) == 4
+        assert time.perf_counter() - started < 5
+        assert "no respondio" in capsys.readouterr().err
+        assert client_main(["--config", str(config), "--status", "--timeout", "0.1"]) == 4
+    finally:
+        hung.close()
+    assert client_main(["--config", str(config), "--socket", str(tmp_path / "otro.sock"), "--status"]) == 3
+
+
+def test_watch_regenerates_on_input_change(tmp_path: Path) -> None:
+    config = tmp_path / "config.yml"
+    _write_config(config)
+    args = _args(tmp_path, config)
+    output = tmp_path / "out" / "architecture" / "solution-proposal.md"
+    stop = threading.Event()
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("runs", watch(args, _quiet(), stop)), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not output.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    first = output.stat().st_mtime_ns
+    Path(args.input).write_text(json.dumps({"project_name": "Vigilado"}), encoding="utf-8")
+    while output.stat().st_mtime_ns == first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(timeout=5)
+    assert result["runs"] >= 1
+    assert output.stat().st_mtime_ns != first
+
+
+def _quiet():
+    import logging
+
+    logger = logging.getLogger("test.daemon.watch")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def test_profiled_runs_are_not_forwarded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import src.main as cli
+
+    def _unexpected(*_args, **_kwargs):
+        raise AssertionError("no se debe contactar al daemon")
+
+    monkeypatch.setattr(cli, "send_request", _unexpected)
+    config = AppConfig(profiling=ProfilingConfig(enabled=True))
+    args = argparse.Namespace(no_daemon=False, profile=False, archive=None)
+    assert cli._forward_to_daemon(args, config, logging.getLogger("test")) is False
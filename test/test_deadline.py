@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.core.deadline import Deadline, DeadlineExceeded
+from src.core.schemas import Requirements
+from src.core.scraping import fetch_cloud_pricing
+from src.core.templates import proposal_to_markdown
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _SlowClient:
+    async def create(self, messages):
+        await asyncio.sleep(5)
+        return {"content": "{}"}
+
+
+class _SlowSyncClient:
+    def create(self, messages):
+        time.sleep(5)
+        return {"content": "{}"}
+
+
+def test_stage_uses_smaller_of_budget_and_remaining() -> None:
+    clock = _FakeClock()
+    deadline = Deadline(total_seconds=30, budgets={"generate": 60, "persist": 10}, clock=clock)
+    assert deadline.stage("generate").remaining() == 30
+    assert deadline.stage("persist").remaining() == 10
+    clock.now = 25
+    assert deadline.stage("persist").remaining() == 5
+    clock.now = 31
+    with pytest.raises(DeadlineExceeded):
+        deadline.stage("persist").check()
+
+
+def test_cancel_is_shared_with_stages() -> None:
+    deadline = Deadline(total_seconds=100)
+    stage = deadline.stage("generate")
+    deadline.cancel("cancelado por el cliente")
+    assert stage.expired
+    assert stage.warnings == ["cancelado por el cliente"]
+
+
+def test_llm_timeout_returns_partial_proposal_with_warnings() -> None:
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=_SlowClient())
+    deadline = Deadline(total_seconds=0.05)
+
+    proposal = agent.propose(Requirements(), deadline=deadline.stage("generate"))
+
+    assert proposal.components
+    assert proposal.warnings
+    assert "Advertencias" in proposal_to_markdown(proposal)
+
+
+def test_sync_client_is_abandoned_when_the_budget_runs_out() -> None:
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=_SlowSyncClient())
+    deadline = Deadline(total_seconds=0.05)
+
+    started = time.perf_counter()
+    proposal = agent.propose(Requirements(), deadline=deadline.stage("generate"))
+
+    assert time.perf_counter() - started < 2
+    assert proposal.components and proposal.warnings
+
+
+def test_scraping_skipped_when_deadline_expired() -> None:
+    deadline = Deadline(total_seconds=0)
+    assert fetch_cloud_pricing("azure", deadline=deadline) == []
+    assert deadline.warnings
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from monitoring.metrics import metrics
+from src.agent import SolutionArchitectAgent
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+
+
+class _ScriptedClient:
+    def __init__(self, responses: list[str]) -> None:
+        self._responses = list(responses)
+        self.prompts: list[str] = []
+
+    def create(self, messages):
+        self.prompts.append(messages[-1]["content"])
+        return {"content": self._responses.pop(0)}
+
+
+def test_only_failing_sections_are_regenerated() -> None:
+    metrics.reset()
+    proposal = generate_solution(Requirements()).model_dump()
+    fixed_risk = dict(proposal["risks"][1])
+    del proposal["risks"][1]["mitigation"]
+    client = _ScriptedClient(
+        [json.dumps(proposal), json.dumps({"risks.1": fixed_risk})]
+    )
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=client)
+
+    result = agent.propose(Requirements())
+
+    assert result.risks[1].mitigation == fixed_risk["mitigation"]
+    assert len(client.prompts) == 2
+    assert "risks.1" in client.prompts[1]
+    assert "project_name" not in client.prompts[1]
+    assert metrics.get("llm.repair.attempts") == 1
+    assert metrics.get("llm.repair.success") == 1
+
+
+def test_repair_attempts_are_capped() -> None:
+    metrics.reset()
+    proposal = generate_solution(Requirements()).model_dump()
+    del proposal["flows"][0]["timeouts"]
+    client = _ScriptedClient([json.dumps(proposal), "{}", "{}", "{}"])
+    agent = SolutionArchitectAgent(
+        enable_autogen=True, model_client=client, max_repair_attempts=2
+    )
+
+    with pytest.raises(ValueError):
+        agent.propose(Requirements())
+    assert len(client.prompts) == 3
+    assert metrics.get("llm.repair.failures") == 1
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.core.schemas import Requirements, SolutionProposal
+from src.fake_llm import FakeLLMServer, FakeModelSettings
+from src.loadtest import RequestResult, drive, parse_server_timing, parse_stage_log, summarize
+
+
+def _post(url: str, payload: dict) -> dict:
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+class _HttpClient:
+    """Cliente chat-completions minimo contra el servidor simulado."""
+
+    def __init__(self, api_base: str) -> None:
+        self.url = f"{api_base}/chat/completions"
+
+    def create(self, messages):
+        return _post(self.url, {"model": "fake-gpt", "messages": messages})
+
+
+def test_fake_server_speaks_chat_completions() -> None:
+    settings = FakeModelSettings(latency="fixed", median_ms=1, seed=1)
+    with FakeLLMServer(settings) as server:
+        agent = SolutionArchitectAgent(enable_autogen=True, model_client=_HttpClient(server.api_base))
+        proposal = agent.propose(Requirements(project_name="Carga"))
+        assert isinstance(proposal, SolutionProposal)
+
+        raw = _post(f"{server.api_base}/chat/completions", {"messages": [{"role": "user", "content": "hola"}]})
+        assert raw["object"] == "chat.completion"
+        assert raw["usage"]["total_tokens"] == raw["usage"]["prompt_tokens"] + raw["usage"]["completion_tokens"]
+        SolutionProposal.model_validate_json(raw["choices"][0]["message"]["content"])
+        assert server.model.snapshot() == {"ok": 2}
+
+
+def test_fake_server_injects_errors() -> None:
+    settings = FakeModelSettings(latency="fixed", median_ms=0, error_rate=1.0, error_status=429)
+    with FakeLLMServer(settings) as server:
+        with pytest.raises(urllib.error.HTTPError) as info:
+            _post(f"{server.api_base}/chat/completions", {"messages": []})
+        assert info.value.code == 429 and info.value.headers["Retry-After"] == "1"
+
+
+def test_stage_parsing_and_summary() -> None:
+    lines = [
+        "texto libre",
+        json.dumps({"level": "DEBUG", "stage": "propose", "duration_ms": 812.5}),
+        json.dumps({"level": "ERROR", "stage": "write", "message": "fallo"}),
+    ]
+    assert parse_stage_log(lines) == ({"propose": 0.8125}, "write")
+    assert parse_server_timing("propose;dur=800, render;desc=x;dur=10, bad") == {"propose": 0.8, "render": 0.01}
+
+    calls = iter(range(10))
+
+    def send() -> RequestResult:
+        index = next(calls)
+        if index % 5 == 4:
+            return RequestResult(ok=False, latency=0.0, stages={"propose": 0.2}, failed_stage="write", error="exit 1")
+        return RequestResult(ok=True, latency=0.0, stages={"propose": 0.1, "write": 0.01})
+
+    results, elapsed = drive(send, requests=10, concurrency=3)
+    summary = summarize(results, elapsed)
+    assert summary["requests"] == 10 and summary["ok"] == 8
+    assert summary["errors"] == {"exit 1": 2}
+    assert summary["stages"]["write"]["error_rate"] == 0.2
+    assert summary["stages"]["propose"]["count"] == 10
+
+    results, _ = drive(lambda: RequestResult(ok=True, latency=0.0), requests=5, rps=200)
+    assert len(results) == 5 and all(result.latency >= 0 for result in results)
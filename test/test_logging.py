@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from monitoring.logger import BASE_LOGGER, SamplingFilter, configure_logging, get_logger, shutdown_logging
+
+
+@pytest.fixture(autouse=True)
+def _restore_base_logger():
+    yield
+    shutdown_logging()
+    base = logging.getLogger(BASE_LOGGER)
+    for handler in list(base.handlers):
+        base.removeHandler(handler)
+    base.propagate = True
+
+
+def test_queue_mode_emits_json_lines_with_trace_fields() -> None:
+    stream = io.StringIO()
+    configure_logging("json", use_queue=True, level="DEBUG", stream=stream)
+    logger = get_logger("solution-architect.test", request_id="abc123")
+    values = ["a"]
+    logger.info("Escribiendo %s", values, extra={"stage": "write", "duration_ms": 1.5})
+    values.append("b")  # el mensaje se interpola al registrar, no al escribir
+    shutdown_logging()
+
+    line = json.loads(stream.getvalue().splitlines()[0])
+    assert line["message"] == "Escribiendo ['a']"
+    assert (line["trace_id"], line["stage"], line["duration_ms"]) == ("abc123", "write", 1.5)
+    assert line["logger"] == "solution-architect.test"
+
+
+def test_debug_is_sampled_and_rate_limited() -> None:
+    stream = io.StringIO()
+    configure_logging("text", level="DEBUG", debug_sample_rate=0.0, stream=stream)
+    logger = get_logger("solution-architect.test", request_id="t")
+    for _ in range(10):
+        logger.debug("ruido")
+    logger.info("importante")
+    assert stream.getvalue().count("ruido") == 0 and "importante" in stream.getvalue()
+
+    now = [0.0]
+    limiter = SamplingFilter(max_per_second=2, clock=lambda: now[0])
+    assert [limiter.allow(logging.DEBUG) for _ in range(3)] == [True, True, False]
+    now[0] = 0.5
+    assert limiter.allow(logging.DEBUG) and not limiter.allow(logging.DEBUG)
+    assert limiter.allow(logging.WARNING) and limiter.dropped == 2
+
+
+def test_get_logger_reuses_adapters_per_trace_id() -> None:
+    first = get_logger("solution-architect.test", request_id="r1")
+    assert get_logger("solution-architect.test", request_id="r1") is first
+    assert get_logger("solution-architect.test", request_id="r2") is not first
+    assert get_logger("solution-architect.test").extra == {"trace_id": "-"}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.agent.router import ModelRoute, ModelRouter, build_model_router
+from src.core.config import RouterConfig
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+from src.core.semantic_cache import SemanticCache
+
+
+class _Client:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = 0
+
+    def create(self, messages):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("modelo caido")
+        return {"content": generate_solution(Requirements()).model_dump_json()}
+
+
+def test_plan_respects_slo_and_request_size() -> None:
+    big = ModelRoute(name="grande", client=_Client(), expected_latency_seconds=40)
+    fast = ModelRoute(name="rapido", client=_Client(), max_request_size=3, expected_latency_seconds=5)
+    router = ModelRouter([big, fast])
+
+    assert router.plan(Requirements()) == [big, fast, None]
+    assert router.plan(Requirements(), slo_seconds=10) == [fast, None]
+    large = Requirements(resources=["a", "b", "c", "d"])
+    assert router.plan(large, slo_seconds=10) == [None]
+
+
+def test_degraded_model_fails_over_to_faster_route() -> None:
+    broken, healthy = _Client(fail=True), _Client()
+    router = ModelRouter(
+        [ModelRoute(name="grande", client=broken), ModelRoute(name="rapido", client=healthy)],
+        min_samples=2,
+    )
+    agent = SolutionArchitectAgent(enable_autogen=True, router=router)
+
+    for _ in range(3):
+        assert agent.propose(Requirements()).components
+
+    assert broken.calls == 2
+    assert healthy.calls == 3
+    assert router.stats()["grande"]["error_rate"] == 1.0
+
+
+def test_cache_hits_are_not_recorded_as_latency_samples() -> None:
+    client = _Client()
+    router = ModelRouter([ModelRoute(name="grande", client=client)])
+    agent = SolutionArchitectAgent(enable_autogen=True, router=router, cache=SemanticCache())
+
+    for _ in range(3):
+        agent.propose(Requirements())
+
+    assert client.calls == 1
+    assert router.stats()["grande"]["count"] == 1
+
+
+def test_enabled_router_without_routes_fails_fast() -> None:
+    assert build_model_router(RouterConfig()) is None
+    with pytest.raises(ValueError, match="router.routes"):
+        build_model_router(RouterConfig(enabled=True))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from src.core import serialization
+from src.core.generator import generate_solution
+from src.core.schemas import CostLine, Requirements, Risk, SolutionProposal
+from src.core.serialization import SerializationError, available_codecs, available_compressions, dumps, loads
+
+
+def _proposal() -> SolutionProposal:
+    proposal = generate_solution(Requirements(cloud_provider="Azure", resources=["Cosmos DB", "Key Vault"], compliance=["GDPR"]))
+    lines = [CostLine(resource="Cosmos DB", driver="RU/s", p10=1.5, p50=2.25, p90=3.0)]
+    cost = proposal.cost_estimate.model_copy(update={"p50": 2.25, "breakdown": lines})
+    return proposal.model_copy(update={"cost_estimate": cost, "warnings": ["Deadline: ñandú"]})
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+@pytest.mark.parametrize("compression", available_compressions())
+@pytest.mark.parametrize("trusted", [False, True])
+def test_round_trip_is_lossless(codec: str, compression: str, trusted: bool) -> None:
+    proposal = _proposal()
+    data = dumps(proposal, codec=codec, compression=compression)
+    decoded = loads(data, SolutionProposal, trusted=trusted)
+    assert decoded == proposal
+    assert decoded.model_dump_json() == proposal.model_dump_json()
+    assert decoded.model_fields_set == proposal.model_fields_set
+    decoded.warnings.append("otro")
+    assert proposal.warnings == ["Deadline: ñandú"]
+
+
+def test_packed_is_smaller_than_json_and_every_model_round_trips() -> None:
+    proposal = _proposal()
+    assert len(dumps(proposal, codec="packed")) < 0.8 * len(proposal.model_dump_json())
+    assert len(dumps(proposal, codec="packed", compression="zlib")) < 0.4 * len(proposal.model_dump_json())
+    for model in (Requirements(regions=["eu"]), proposal.risks[0], proposal.cost_estimate, proposal.flows[0]):
+        assert loads(dumps(model, codec="packed"), trusted=True) == model
+        assert loads(dumps(model, codec="packed")) == model
+
+
+def test_layout_matches_current_schemas() -> None:
+    assert serialization.current_layout() == serialization.LAYOUTS[serialization.SCHEMA_VERSION], (
+        "schemas.py cambio: incrementar SCHEMA_VERSION y agregar el layout nuevo a LAYOUTS"
+    )
+
+
+def test_entries_from_previous_schema_version_are_upgraded(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Version 0 ficticia: CostLine no tenia "driver" (hoy con default) y Risk tenia un "owner" que se elimino.
+    old_layout = dict(
+        serialization.LAYOUTS[1],
+        CostLine=("resource", "p10", "p50", "p90"),
+        Risk=("id", "owner", "description", "impact", "mitigation", "assumptions"),
+    )
+    monkeypatch.setitem(serialization.LAYOUTS, 0, old_layout)
+
+    def entry(model, row) -> bytes:
+        header = serialization._HEADER.pack(b"SP", 1, serialization.CODECS["packed"], 0, serialization._TAGS[model], 0)
+        return header + orjson.dumps(row)
+
+    line = loads(entry(CostLine, ["Key Vault", 1.0, 2.0, 3.0]), CostLine, trusted=True)
+    assert line == CostLine(resource="Key Vault", driver="", p10=1.0, p50=2.0, p90=3.0)
+    risk = loads(entry(Risk, ["R-9", "equipo", "Caida", "Alto", "Reintentos", []]), Risk)
+    assert risk == Risk(id="R-9", description="Caida", impact="Alto", mitigation="Reintentos", assumptions=[])
+
+
+def test_untrusted_decode_validates_and_bad_entries_fail() -> None:
+    header = serialization._HEADER.pack(b"SP", 1, serialization.CODECS["packed"], 0, serialization._TAGS[CostLine], 1)
+    tampered = header + orjson.dumps(["Cosmos DB", "RU/s", "barato", 2.0, 3.0])
+    with pytest.raises(ValidationError):
+        loads(tampered, CostLine)
+    assert loads(tampered, CostLine, trusted=True).p10 == "barato"
+
+    data = dumps(_proposal())
+    with pytest.raises(SerializationError, match="contiene SolutionProposal"):
+        loads(data, Risk)
+    with pytest.raises(SerializationError, match="Encabezado"):
+        loads(b"XX" + data[2:])
+    future = data[:6] + (serialization.SCHEMA_VERSION + 1).to_bytes(2, "little") + data[8:]
+    with pytest.raises(SerializationError, match="Version de esquema"):
+        loads(future)
+    with pytest.raises(SerializationError, match="no soportado"):
+        dumps(_proposal(), codec="xml")
+
+
+@pytest.mark.parametrize("slots", [True, False])
+def test_trusted_decode_matches_model_construct(slots: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    if not slots:
+        # Sin los slots de pydantic (otra version) se arma con `model_construct`.
+        monkeypatch.setattr(serialization, "_SLOTS", None)
+    monkeypatch.setattr(serialization, "_CODECS", {})
+    data = dumps(_proposal(), codec="packed")
+    first, second = loads(data, SolutionProposal, trusted=True), loads(data, SolutionProposal, trusted=True)
+    expected = SolutionProposal.model_construct(**dict(first))
+    assert first.model_fields_set == expected.model_fields_set
+    assert (first.__pydantic_extra__, first.__pydantic_private__) == (expected.__pydantic_extra__, expected.__pydantic_private__)
+    assert first.risks[0] == second.risks[0]
+    assert first.model_fields_set is not second.model_fields_set
+    assert first.risks[0].model_fields_set is not second.risks[0].model_fields_set
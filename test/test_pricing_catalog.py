@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from openpyxl import load_workbook
+
+from src.core.cost_excel import cost_estimate_to_excel
+from src.core.generator import generate_solution
+from src.core.pricing_catalog import PricingCatalog, ingest_price_list
+from src.core.schemas import Requirements
+
+
+def _azure_export(path: Path) -> None:
+    items = [
+        {"serviceName": "Azure Cosmos DB", "skuName": "RU", "productName": "Cosmos DB", "unitOfMeasure": "100/Hour", "armRegionName": "eastus", "retailPrice": 0.008, "currencyCode": "USD", "type": "Consumption"},
+        {"serviceName": "Azure Cosmos DB", "skuName": "RU", "productName": "Cosmos DB", "unitOfMeasure": "100/Hour", "armRegionName": "westeurope", "retailPrice": 0.01, "currencyCode": "USD", "type": "Consumption"},
+        {"serviceName": "Key Vault", "skuName": "Standard", "productName": "Key Vault", "unitOfMeasure": "10K", "armRegionName": "eastus", "retailPrice": 0.03, "currencyCode": "USD", "type": "Consumption"},
+        {"serviceName": "Key Vault", "skuName": "Standard", "productName": "Key Vault", "unitOfMeasure": "1 Year", "armRegionName": "eastus", "retailPrice": 100, "currencyCode": "USD", "type": "Reservation"},
+    ]
+    path.write_text(json.dumps({"BillingCurrency": "USD", "Items": items}), encoding="utf-8")
+
+
+def test_azure_ingest_and_resource_match(tmp_path: Path) -> None:
+    source, catalog_path = tmp_path / "azure.json", tmp_path / "catalog.sqlite"
+    _azure_export(source)
+
+    assert ingest_price_list("azure", source, catalog_path, batch_size=2) == 3
+    catalog = PricingCatalog(catalog_path)
+    match = catalog.match_resource("Cosmos DB", "azure", region="westeurope")
+    assert match["precio"] == 0.01 and match["region"] == "westeurope"
+    for written in ("West Europe", "west-europe", "WEST_EUROPE"):
+        assert catalog.match_resource("Cosmos DB", "azure", region=written)["region"] == "westeurope"
+    assert catalog.match_resource("Key Vault", "azure")["precio"] == 0.03
+    assert catalog.match_resource("Event Grid", "azure") is None
+
+    xlsx = tmp_path / "cost.xlsx"
+    cost_estimate_to_excel(
+        generate_solution(Requirements()).cost_estimate,
+        xlsx,
+        resources=["Cosmos DB", "Event Grid"],
+        catalog=catalog,
+        provider="azure",
+        region="eastus",
+    )
+    sheet = load_workbook(xlsx)["Costos_por_recurso"]
+    assert sheet.cell(row=2, column=4).value == 0.008
+    assert sheet.cell(row=3, column=4).value == "consultar"
+
+
+def test_aws_offer_files_json_and_csv(tmp_path: Path) -> None:
+    offer = {
+        "products": {
+            "SKU1": {"sku": "SKU1", "productFamily": "Storage", "attributes": {"servicecode": "AmazonS3", "regionCode": "us-east-1"}},
+        },
+        "terms": {
+            "OnDemand": {
+                "SKU1": {"SKU1.T": {"priceDimensions": {"SKU1.T.R": {"unit": "GB-Mo", "description": "S3 storage", "pricePerUnit": {"USD": "0.023"}}}}},
+            }
+        },
+    }
+    json_path = tmp_path / "aws.json"
+    json_path.write_text(json.dumps(offer), encoding="utf-8")
+    csv_path = tmp_path / "aws.csv"
+    csv_path.write_text(
+        '"FormatVersion","v1.0"\n"Disclaimer","x"\n'
+        '"SKU","OfferTermCode","TermType","PriceDescription","Unit","PricePerUnit","Currency","serviceCode","Region Code"\n'
+        '"S2","T","OnDemand","SQS requests","Requests","0.0000004","USD","AWSQueueService","us-east-1"\n'
+        '"S3","T","Reserved","SQS reserved","Requests","0.1","USD","AWSQueueService","us-east-1"\n',
+        encoding="utf-8",
+    )
+
+    catalog_path = tmp_path / "catalog.sqlite"
+    assert ingest_price_list("aws", json_path, catalog_path) == 1
+    catalog = PricingCatalog(catalog_path)
+    assert catalog.match_resource("amazons3", "aws", "us-east-1")["unidad"] == "GB-Mo"
+
+    assert ingest_price_list("aws", csv_path, catalog_path) == 1
+    assert PricingCatalog(catalog_path).match_resource("amazons3", "aws") is None
+
+
+def test_gcp_base_tier_and_exact_match_over_cheapest(tmp_path: Path) -> None:
+    def rate(start, units, nanos):
+        return {"startUsageAmount": start, "unitPrice": {"currencyCode": "USD", "units": units, "nanos": nanos}}
+
+    skus = [
+        {
+            "skuId": "STD-1",
+            "description": "Standard Storage",
+            "category": {"serviceDisplayName": "Cloud Storage"},
+            "serviceRegions": ["us-east1"],
+            "pricingInfo": [{"pricingExpression": {"usageUnit": "GiBy.mo", "tieredRates": [
+                rate(1000, "0", 10_000_000), rate(0, "0", 0), rate(5, "0", 20_000_000),
+            ]}}],
+        },
+        {
+            "skuId": "ARC-1",
+            "description": "Archive Storage",
+            "category": {"serviceDisplayName": "Cloud Storage"},
+            "serviceRegions": ["us-east1"],
+            "pricingInfo": [{"pricingExpression": {"usageUnit": "GiBy.mo", "tieredRates": [rate(0, "0", 1_200_000)]}}],
+        },
+    ]
+    source, catalog_path = tmp_path / "gcp.json", tmp_path / "catalog.sqlite"
+    source.write_text(json.dumps({"skus": skus}), encoding="utf-8")
+    assert ingest_price_list("gcp", source, catalog_path) == 2
+    catalog = PricingCatalog(catalog_path)
+
+    # Sin SKU pedido desempata el precio; con SKU gana la coincidencia exacta, y el tramo es el de lista.
+    assert catalog.match_resource("Cloud Storage", "gcp")["sku"] == "ARC-1"
+    standard = catalog.match_resource("Cloud Storage", "gcp", region="us-east1", sku="Standard Storage")
+    assert (standard["sku"], standard["precio"]) == ("STD-1", 0.02)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import pstats
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from monitoring.profiling import profile_section, profiled, profiling, start_profiling, stop_profiling
+from src.core.config_provider import ConfigProvider
+from src.core.stages import StageGraph
+
+
+@profiled()
+def _allocate(size: int) -> list:
+    return [str(index) for index in range(size)]
+
+
+def test_hooks_are_inert_without_profiler() -> None:
+    assert profile_section("a") is profile_section("b")
+    assert len(_allocate(3)) == 3
+    assert stop_profiling() is None
+
+
+def test_profiles_each_stage_and_nested_function(tmp_path: Path) -> None:
+    graph = StageGraph()
+    graph.add("slow", lambda results: time.sleep(0.1))
+    graph.add("build", lambda results: len(_allocate(50_000)), deps=("slow",))
+
+    with profiling(tmp_path, trace_allocations=True):
+        with pytest.raises(RuntimeError):
+            start_profiling(tmp_path / "otro")
+        run = graph.run()
+    assert run.results["build"] == 50_000
+
+    summary = json.loads((tmp_path / "summary.json").read_text(encoding="utf-8"))
+    assert set(summary) == {"stage.slow", "stage.build", "_allocate"}
+    assert summary["stage.slow"]["samples"] > 0
+    assert any("test_profiling.py" in site["site"] for site in summary["_allocate"]["top_allocations"])
+
+    stats = pstats.Stats(str(tmp_path / "_allocate.pstats"))
+    assert any(func[2] == "<listcomp>" for func in stats.stats)
+    lines = (tmp_path / "all.collapsed").read_text(encoding="utf-8").splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("stage.slow;") and "<lambda> (test_profiling.py" in line for line in lines)
+
+
+def test_config_load_is_profiled_and_output_can_move(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.yml"
+    config_path.write_text("profiling:\n  top_allocations: 3\n", encoding="utf-8")
+    with profiling(tmp_path / "antes") as profiler:
+        config = ConfigProvider(config_path, environ={}).get()
+        profiler.configure(output_dir=tmp_path / "despues", top_allocations=config.profiling.top_allocations)
+    assert profiler.top_allocations == 3
+    assert not (tmp_path / "antes").exists()
+    assert "load_config" in json.loads((tmp_path / "despues" / "summary.json").read_text(encoding="utf-8"))
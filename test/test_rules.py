@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.core.generator import generate_solution
+from src.core.rules import RequirementDoc, RuleEngine, default_rule_engine
+from src.core.schemas import Requirements
+from src.core.validators import ensure_no_gateway_in_proposal
+
+RISK = {"id": "R-900", "description": "d", "impact": "Alto", "mitigation": "m", "assumptions": []}
+
+
+def _engine() -> RuleEngine:
+    return RuleEngine.from_dicts(
+        [
+            {"id": "pci", "when": {"field": "compliance", "contains": "PCI"}, "risks": [RISK]},
+            {"id": "regex", "when": [{"field": "resources", "regex": r"cosmos\s*db"}]},
+            {
+                "id": "conjuncion",
+                "when": [
+                    {"field": "resources", "contains": "Key Vault"},
+                    {"field": "regions", "regex": "^eu"},
+                ],
+            },
+            {"id": "cualquier-campo", "when": {"contains": "datos personales"}},
+        ]
+    )
+
+
+def test_only_indexed_candidates_are_checked() -> None:
+    engine = _engine()
+    result = engine.evaluate(
+        Requirements(compliance=["Cumplimiento PCI-DSS"], resources=["Key Vault"], regions=["us-east-1"])
+    )
+
+    assert result.matched == ["pci"]
+    assert [risk.id for risk in result.risks] == ["R-900"]
+    # "conjuncion" es candidata por su ancla (vault) pero falla el segundo predicado.
+    assert result.candidates_checked == 2
+
+
+def test_regex_automaton_and_any_field_match() -> None:
+    engine = _engine()
+    result = engine.evaluate(
+        Requirements(
+            resources=["Azure Cosmos  DB", "Key Vault"],
+            regions=["eu-west-1"],
+            constraints=["Sin exportar Datos Personales"],
+        )
+    )
+
+    assert sorted(result.matched) == ["conjuncion", "cualquier-campo", "regex"]
+    doc = RequirementDoc.from_requirements(Requirements(resources=["Cosmos DB"]))
+    assert sorted(engine.candidates(doc)) == [1]
+
+
+def test_invalid_rules_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        RuleEngine.from_dicts([{"id": "sin-predicado", "when": []}])
+    with pytest.raises(ValueError):
+        RuleEngine.from_dicts([{"id": "regex-rota", "when": {"regex": "("}}])
+
+
+def test_generator_is_driven_by_requirements() -> None:
+    assert default_rule_engine().rules
+    base = generate_solution(Requirements())
+    pci = generate_solution(Requirements(compliance=["PCI DSS"], resources=["Cosmos DB"]))
+
+    assert "Tokenization Service" in [c.name for c in pci.components]
+    assert "Tokenization Service" in pci.diagram_mermaid
+    assert len(pci.adrs) > len(base.adrs)
+    ensure_no_gateway_in_proposal(pci)
+
+
+def test_rule_component_names_are_escaped_in_the_diagram() -> None:
+    name = 'Cola [DLQ] --> "reintentos" #1'
+    component = {"name": name, "purpose": "p", "inputs": [], "outputs": [], "dependencies": [], "security_considerations": []}
+    engine = RuleEngine.from_dicts([{"id": "dlq", "when": {"contains": "cola"}, "components": [component]}])
+    proposal = generate_solution(Requirements(functional_requirements=["Cola de mensajes"]), rules=engine)
+
+    assert name in [c.name for c in proposal.components]
+    assert '    rule1["Cola [DLQ] --> #quot;reintentos#quot; #35;1"]' in proposal.diagram_mermaid.splitlines()
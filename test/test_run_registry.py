@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.core.run_registry import RunRecord, RunRegistry, artifact_hashes
+
+DAY = 86400.0
+
+
+def _run(trace_id: str, started_at: float, total: float, **kwargs) -> RunRecord:
+    return RunRecord(
+        trace_id=trace_id,
+        started_at=started_at,
+        total_seconds=total,
+        stages={"propose": total * 0.8, "write": total * 0.1},
+        **kwargs,
+    )
+
+
+def test_records_are_batched_and_queryable(tmp_path: Path) -> None:
+    db = tmp_path / "runs.sqlite"
+    registry = RunRegistry(db, batch_size=3)
+    registry.record(_run("a", DAY, 1.0, cache_hits=1, cache_misses=1))
+    registry.record(_run("b", DAY + 60, 3.0, cache_misses=1, artifacts=artifact_hashes({"x.md": b"hola"})))
+
+    reader = RunRegistry(db)
+    assert reader.slowest_runs() == []  # aun en el lote pendiente
+
+    registry.record(_run("c", 2 * DAY, 2.0, status="partial", cache_hits=2))
+    slowest = reader.slowest_runs(limit=2)
+    assert [row["trace_id"] for row in slowest] == ["b", "c"]
+    assert slowest[0]["slowest_stage"] == "propose"
+    assert reader.artifacts("b")[0]["size"] == 4
+    registry.close()
+    reader.close()
+
+
+def test_stage_percentiles_and_cache_effectiveness(tmp_path: Path) -> None:
+    with RunRegistry(tmp_path / "runs.sqlite") as registry:
+        for index in range(10):
+            registry.record(_run(f"r{index}", DAY + index, float(index + 1), cache_hits=index % 2, cache_misses=1))
+        registry.record(_run("otro-dia", 2 * DAY, 50.0))
+        registry.flush()
+
+        rows = registry.stage_percentiles(stage="total")
+        first_day = next(row for row in rows if row["bucket"] == "1970-01-02")
+        assert (first_day["count"], first_day["p50"], first_day["p95"]) == (10, 5.0, 10.0)
+        assert len(registry.stage_percentiles(stage="propose", since=2 * DAY)) == 1
+
+        cache = registry.cache_effectiveness()
+        assert cache[0]["runs"] == 10
+        assert cache[0]["hit_ratio"] == round(5 / 15, 4)
+
+
+def test_repeated_trace_ids_keep_separate_runs(tmp_path: Path) -> None:
+    with RunRegistry(tmp_path / "runs.sqlite") as registry:
+        first = _run("abcd1234", DAY, 1.0, artifacts=artifact_hashes({"a.md": b"uno"}))
+        second = _run("abcd1234", DAY + 5, 2.0, status="error", artifacts=artifact_hashes({"b.md": b"dos"}))
+        registry.record(first)
+        registry.record(second)
+        registry.flush()
+
+        rows = registry.slowest_runs()
+        assert sorted(row["run_id"] for row in rows) == sorted([first.run_id, second.run_id])
+        assert [row["path"] for row in registry.artifacts(second.run_id)] == ["b.md"]
+        assert [row["path"] for row in registry.artifacts("abcd1234")] == ["a.md", "b.md"]
+        assert registry.stage_percentiles(stage="propose")[0]["count"] == 2
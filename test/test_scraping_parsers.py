@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.core.scraping import parse_pricing_page
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "pricing"
+
+
+def test_fast_extraction_matches_full_parse_on_fixtures() -> None:
+    for provider in ("azure", "aws", "gcp"):
+        html = (FIXTURES / f"{provider}.html").read_text(encoding="utf-8")
+        fast = parse_pricing_page(provider, html)
+        assert fast, provider
+        assert fast == parse_pricing_page(provider, html, fast=False), provider
+
+
+def test_fallback_to_any_table_with_prices() -> None:
+    html = (
+        "<html><body><a href='/docs'>Docs</a><table><tr><th>S</th><th>P</th></tr>"
+        "<tr><td> Storage </td><td>USD 0.02 per GB</td></tr>"
+        "<tr><td>Support</td><td>Contact us</td></tr></table></body></html>"
+    )
+    rows = parse_pricing_page("aws", html)
+    assert [row["servicio"] for row in rows] == ["Storage"]
+    assert rows == parse_pricing_page("aws", html, fast=False)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import base64
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src.core.generator import generate_solution
+from src.core.schemas import Requirements
+from src.core.semantic_cache import SemanticCache, requirements_shingles
+from src.core.serialization import CODECS
+
+
+def _requirements(**overrides) -> Requirements:
+    payload = {
+        "project_name": "Portal de pagos",
+        "cloud_provider": "Azure",
+        "functional_requirements": [
+            "Generar propuesta de arquitectura",
+            "Entregar diagrama y backlog tecnico",
+            "Registrar pagos con tarjeta",
+        ],
+        "constraints": ["Sin API Gateway", "Datos en la region"],
+        "resources": ["Cosmos DB", "Key Vault", "Service Bus"],
+    }
+    payload.update(overrides)
+    return Requirements(**payload)
+
+
+def test_reordered_and_recased_requirements_hit() -> None:
+    cache = SemanticCache(threshold=0.8)
+    cache.store(_requirements(), generate_solution(Requirements()))
+    variant = _requirements(
+        constraints=["datos en la REGION", "sin api gateway"],
+        resources=["Service Bus", "Cosmos DB", "Key Vault"],
+    )
+    assert cache.lookup(variant) is not None
+    assert cache.lookup(_requirements(project_name="Otro", resources=["S3"], functional_requirements=["ETL"])) is None
+    assert cache.stats.hit_ratio == 0.5
+
+
+def test_cache_is_bounded_and_persisted(tmp_path: Path) -> None:
+    cache = SemanticCache(max_entries=2, path=tmp_path / "cache.json")
+    proposal = generate_solution(Requirements())
+    for name in ("uno", "dos", "tres"):
+        cache.store(_requirements(project_name=name, functional_requirements=[name]), proposal)
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    cache.save()
+
+    reloaded = SemanticCache(path=tmp_path / "cache.json")
+    assert reloaded.load() == 2
+    assert reloaded.lookup(_requirements(project_name="tres", functional_requirements=["tres"])) is not None
+
+
+def test_cache_loads_previous_json_format(tmp_path: Path) -> None:
+    proposal = generate_solution(Requirements())
+    shingles = sorted(requirements_shingles(_requirements()))
+    path = tmp_path / "cache.json"
+    path.write_text(
+        json.dumps({"version": 1, "num_perm": 64, "entries": [{"shingles": shingles, "proposal": proposal.model_dump_json()}]}),
+        encoding="utf-8",
+    )
+    cache = SemanticCache(path=path)
+    assert cache.load() == 1
+    assert cache.lookup(_requirements()) == proposal
+
+
+def test_cache_file_is_portable_and_skips_unreadable_entries(tmp_path: Path) -> None:
+    path = tmp_path / "cache.json"
+    cache = SemanticCache(path=path)
+    cache.store(_requirements(), generate_solution(Requirements()))
+    cache.save()
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    entry = base64.b64decode(payload["entries"][0]["proposal"])
+    assert entry[3] == CODECS["packed"]
+
+    # Una entrada con un codec que este host no puede leer (p. ej. msgpack sin el paquete) se omite.
+    unreadable = entry[:3] + bytes([99]) + entry[4:]
+    other = sorted(requirements_shingles(_requirements(project_name="otro")))
+    payload["entries"].append({"shingles": other, "proposal": base64.b64encode(unreadable).decode("ascii")})
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    assert SemanticCache(path=path).load() == 1
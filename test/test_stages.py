@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.core.stages import StageGraph
+
+
+def _sleep(seconds: float, value: str):
+    def fn(results):
+        time.sleep(seconds)
+        return value
+
+    return fn
+
+
+def test_independent_stages_overlap_and_critical_path() -> None:
+    graph = StageGraph()
+    graph.add("config", _sleep(0.0, "cfg"))
+    graph.add("propose", _sleep(0.2, "proposal"), deps=("config",))
+    graph.add("scrape", _sleep(0.15, "rows"), deps=("config",))
+    graph.add("render", lambda results: results["propose"] + results["scrape"], deps=("propose", "scrape"))
+
+    run = graph.run()
+
+    assert run.results["render"] == "proposalrows"
+    assert run.total_seconds < 0.33
+    assert run.critical_path == ["config", "propose", "render"]
+
+
+def test_unknown_dependency_is_rejected() -> None:
+    graph = StageGraph()
+    with pytest.raises(ValueError, match="propose"):
+        graph.add("render", lambda results: None, deps=("propose",))
+
+
+def test_failed_run_keeps_the_timings_of_finished_stages() -> None:
+    def fail(results):
+        time.sleep(0.05)
+        raise RuntimeError("sin red")
+
+    graph = StageGraph()
+    graph.add("config", _sleep(0.0, "cfg"))
+    graph.add("scrape", fail, deps=("config",))
+
+    with pytest.raises(RuntimeError) as info:
+        graph.run()
+
+    assert info.value.failed_stage == "scrape"
+    run = info.value.partial_run
+    assert run.results == {"config": "cfg"}
+    assert set(run.timings) == {"config", "scrape"}
+    assert run.timings["scrape"].duration >= 0.05
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent.tools import write_artifacts
+from src.core.config import StorageConfig
+from src.core.deadline import Deadline
+from src.core.storage import ArtifactStore, LocalStore, S3Store, build_store
+
+ARTIFACTS = {
+    "architecture/solution-proposal.md": b"# Propuesta",
+    "backlog/backlog.csv": b"id,epic\nBL-001,Agente\n",
+}
+
+
+def test_local_store_writes_and_skips_when_out_of_time(tmp_path: Path) -> None:
+    result = write_artifacts(tmp_path, ARTIFACTS)
+    assert sorted(result.written) == sorted(ARTIFACTS)
+    assert (tmp_path / "backlog" / "backlog.csv").read_bytes() == ARTIFACTS["backlog/backlog.csv"]
+
+    expired = Deadline(total_seconds=0)
+    result = LocalStore(tmp_path / "otra").write_all(ARTIFACTS, deadline=expired)
+    assert result.written == [] and len(expired.warnings) == 2
+
+
+def test_build_store_rejects_unknown_backend(tmp_path: Path) -> None:
+    assert isinstance(build_store(StorageConfig(), tmp_path), LocalStore)
+    with pytest.raises(ValueError):
+        build_store(StorageConfig(backend="ftp"), tmp_path)
+    with pytest.raises(TypeError):
+        ArtifactStore()
+
+
+@pytest.fixture
+def s3_endpoint():
+    pytest.importorskip("boto3")
+    server_module = pytest.importorskip("moto.server")
+    server = server_module.ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+def test_s3_store_uploads_changed_objects_and_commits_manifest(s3_endpoint, monkeypatch) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+
+    def store(namespace: str) -> S3Store:
+        return S3Store(
+            "artefactos",
+            prefix="runs",
+            namespace=namespace,
+            endpoint_url=s3_endpoint,
+            region="us-east-1",
+            multipart_threshold_mb=5,
+        )
+
+    demo = store("demo")
+    client = demo._client
+    client.create_bucket(Bucket="artefactos")
+
+    big = {"cost/cost-estimate.xlsx": b"x" * (6 * 1024 * 1024)}
+    first = demo.write_all({**ARTIFACTS, **big})
+    assert sorted(first.written) == sorted([*ARTIFACTS, *big])
+
+    changed = dict(ARTIFACTS, **{"backlog/backlog.csv": b"id,epic\nBL-002,Otro\n"}, **big)
+    second = demo.write_all(changed)
+    assert second.written == ["backlog/backlog.csv"]
+    assert sorted(second.unchanged) == ["architecture/solution-proposal.md", "cost/cost-estimate.xlsx"]
+
+    other = store("otro").write_all(ARTIFACTS)
+    assert sorted(other.written) == sorted(ARTIFACTS)
+
+    def manifest(namespace: str) -> dict:
+        key = f"runs/{namespace}/manifest.json"
+        return json.loads(client.get_object(Bucket="artefactos", Key=key)["Body"].read())
+
+    entries = manifest("demo")["artifacts"]
+    assert entries["backlog/backlog.csv"]["size"] == len(changed["backlog/backlog.csv"])
+    head = client.head_object(Bucket="artefactos", Key=entries["cost/cost-estimate.xlsx"]["key"])
+    assert head["ContentLength"] == 6 * 1024 * 1024
+    assert "-" in head["ETag"]  # ETag multipart: "<md5>-<partes>"
+    body = client.get_object(Bucket="artefactos", Key=entries["backlog/backlog.csv"]["key"])["Body"].read()
+    assert body == changed["backlog/backlog.csv"]
+    # Otro proyecto no pisa el manifiesto ni los objetos de "demo".
+    assert manifest("otro")["artifacts"]["backlog/backlog.csv"]["key"] != entries["backlog/backlog.csv"]["key"]
+    assert entries["architecture/solution-proposal.md"]["key"].startswith("runs/objects/")
+
+
+def test_s3_store_keeps_previous_entries_for_artifacts_skipped_by_deadline(s3_endpoint, monkeypatch) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    store = S3Store("artefactos", namespace="demo", endpoint_url=s3_endpoint, region="us-east-1")
+    store._client.create_bucket(Bucket="artefactos")
+    store.write_all(ARTIFACTS)
+    before = store.read_manifest()["artifacts"]
+
+    changed = dict(ARTIFACTS, **{"backlog/backlog.csv": b"id,epic\nBL-002,Otro\n", "risk/nuevo.md": b"# Nuevo"})
+    expired = Deadline(total_seconds=0)
+    result = store.write_all(changed, deadline=expired)
+    assert sorted(result.skipped) == ["backlog/backlog.csv", "risk/nuevo.md"]
+    assert result.unchanged == ["architecture/solution-proposal.md"]
+
+    # La version anterior sigue alcanzable; lo que nunca se subio no aparece.
+    after = store.read_manifest()["artifacts"]
+    assert after == before
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.agent import SolutionArchitectAgent
+from src.api.streaming import proposal_events, sse_body
+from src.core.deadline import Deadline
+from src.core.generator import generate_solution
+from src.core.schemas import PROPOSAL_SECTIONS, Requirements
+from src.core.section_stream import SectionStreamParser, validate_section
+from src.core.semantic_cache import SemanticCache
+
+SECTION_ORDER = ["diagram", "components", "flows", "adrs", "backlog", "risks", "cost"]
+
+
+class _StreamingClient:
+    """Cliente con `create_stream` que entrega el JSON de la propuesta en trozos."""
+
+    def __init__(self, body: str, chunk_size: int = 40, gate: asyncio.Event | None = None) -> None:
+        self.body = body
+        self.chunk_size = chunk_size
+        self.gate = gate
+        self.sent = 0
+        self.cancelled = False
+
+    def create(self, messages):
+        return {"content": self.body}
+
+    async def create_stream(self, messages):
+        try:
+            for start in range(0, len(self.body), self.chunk_size):
+                if self.gate is not None and start >= len(self.body) // 2:
+                    await self.gate.wait()
+                self.sent = start + self.chunk_size
+                yield self.body[start : start + self.chunk_size]
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def _collect(agen):
+    async def run():
+        return [event async for event in agen]
+
+    return asyncio.run(run())
+
+
+def test_parser_emits_sections_as_soon_as_they_close() -> None:
+    proposal = generate_solution(Requirements(project_name="Stream"))
+    body = "```json\n" + proposal.model_dump_json() + "\n```"
+    rng = random.Random(7)
+    parser = SectionStreamParser()
+    found = []
+    position = 0
+    while position < len(body):
+        size = rng.randint(1, 30)
+        found.extend(parser.feed(body[position : position + size]))
+        position += size
+    names = [name for name, _ in found]
+    assert names[: len(PROPOSAL_SECTIONS)] == list(PROPOSAL_SECTIONS)
+    raw = dict(found)
+    assert validate_section("components", raw["components"]) == proposal.components
+    assert validate_section("cost_estimate", raw["cost_estimate"]) == proposal.cost_estimate
+
+
+def test_deterministic_stream_ends_with_complete_links() -> None:
+    agent = SolutionArchitectAgent(enable_autogen=False)
+
+    async def links(proposal):
+        return {"proposal_id": "abc", "adrs": len(proposal.adrs)}
+
+    events = _collect(proposal_events(agent, Requirements(project_name="SSE"), on_complete=links))
+    assert [event.event for event in events] == SECTION_ORDER + ["complete"]
+    complete = events[-1].data
+    assert complete["proposal_id"] == "abc" and complete["sections"] == SECTION_ORDER
+
+    async def frames():
+        return [frame async for frame in sse_body(proposal_events(agent, Requirements(project_name="SSE")))]
+
+    first = asyncio.run(frames())[0].decode("utf-8")
+    assert first.startswith("event: diagram\nid: 1\ndata: ")
+    assert json.loads(first.split("data: ", 1)[1]).startswith("flowchart")
+
+
+def test_deterministic_stream_degrades_to_partial_sections_when_deadline_expires() -> None:
+    agent = SolutionArchitectAgent(enable_autogen=False)
+    clock = iter([0.0] + [10.0] * 100)
+    deadline = Deadline(total_seconds=5, clock=lambda: next(clock))
+
+    async def links(proposal):
+        raise AssertionError("una respuesta parcial no escribe artefactos")
+
+    events = _collect(proposal_events(agent, Requirements(project_name="Lento"), deadline=deadline, on_complete=links))
+    assert [event.event for event in events] == ["diagram", "warnings", "complete"]
+    assert "secciones generadas" in events[1].data["warnings"][0]
+    assert events[-1].data == {"sections": ["diagram"], "warnings": events[1].data["warnings"], "partial": True}
+
+
+def test_streaming_client_emits_sections_before_stream_ends() -> None:
+    requirements = Requirements(project_name="Progresivo")
+    expected = generate_solution(requirements)
+    client = _StreamingClient(expected.model_dump_json())
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=client)
+    total = len(client.body)
+
+    async def run():
+        seen = []
+        async for name, value in agent.stream_sections(requirements):
+            seen.append((name, client.sent))
+            if name == "proposal":
+                assert value == expected
+        return seen
+
+    seen = asyncio.run(run())
+    assert [name for name, _ in seen] == list(PROPOSAL_SECTIONS) + ["proposal"]
+    assert seen[0][1] < total // 2
+
+
+def test_streaming_looks_up_the_cache_once_per_request() -> None:
+    requirements = Requirements(project_name="Cacheado")
+    expected = generate_solution(requirements)
+    client = _StreamingClient(expected.model_dump_json())
+    cache = SemanticCache()
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=client, cache=cache)
+
+    first = _collect(agent.stream_sections(requirements))
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (0, 1, 1)
+    client.sent = 0
+    second = _collect(agent.stream_sections(requirements))
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert client.sent == 0  # el acierto no llama al modelo
+    assert [name for name, _ in second] == list(PROPOSAL_SECTIONS) + ["proposal"]
+    assert second[-1][1] == first[-1][1] == expected
+
+
+def test_closing_stream_cancels_generation_and_deadline() -> None:
+    requirements = Requirements(project_name="Desconectado")
+    gate = asyncio.Event()
+    client = _StreamingClient(generate_solution(requirements).model_dump_json(), gate=gate)
+    agent = SolutionArchitectAgent(enable_autogen=True, model_client=client)
+    deadline = Deadline(total_seconds=30)
+
+    async def run():
+        events = proposal_events(agent, requirements, deadline=deadline, queue_size=1)
+        first = await events.__anext__()
+        await events.aclose()
+        return first
+
+    first = asyncio.run(run())
+    assert first.event == "diagram"
+    assert client.cancelled and deadline.cancelled
+    assert client.sent < len(client.body)
+
+
+def test_fastapi_endpoint_streams_and_serves_archive() -> None:
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from src.api.app import create_app
+    from src.core.config import AppConfig
+
+    app = create_app(AppConfig(), agent=SolutionArchitectAgent(enable_autogen=False))
+    client = TestClient(app)
+    response = client.post("/proposals/stream", json={"project_name": "API"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [block for block in response.text.split("\n\n") if block.startswith("event:")]
+    assert blocks[-1].startswith("event: complete")
+    links = json.loads(blocks[-1].split("data: ", 1)[1])
+    archive = client.get(links["archives"]["zip"])
+    assert archive.status_code == 200 and archive.content[:2] == b"PK"
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+
+from src.batch import BatchWorker, PipelineJobProcessor
+from src.core.work_queue import MemoryWorkQueue, SQLiteWorkQueue, WorkQueue
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _queue(kind: str, tmp_path: Path, clock=time.time):
+    if kind == "sqlite":
+        return SQLiteWorkQueue(tmp_path / "jobs.sqlite", clock=clock)
+    return MemoryWorkQueue(clock=clock)
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "memory"])
+def test_expired_leases_are_reclaimed_then_dead_lettered(kind: str, tmp_path: Path) -> None:
+    clock = _Clock()
+    queue = _queue(kind, tmp_path, clock)
+    assert queue.enqueue("q", [("a", {"n": 1}), ("b", {"n": 2})], max_attempts=2) == 2
+    assert queue.enqueue("q", [("a", {"n": 1})]) == 0
+
+    (job,) = queue.claim("w1", lease_seconds=10)
+    assert (job.id, job.payload, job.attempts) == ("q/a", {"n": 1}, 1)
+    clock.now += 5
+    assert queue.heartbeat(job.id, "w1", lease_seconds=10)
+    clock.now += 9
+    assert [j.id for j in queue.claim("w2", lease_seconds=10)] == ["q/b"]
+
+    clock.now += 2  # la lease de w1 vencio: w2 retoma el trabajo
+    (again,) = queue.claim("w2", lease_seconds=10)
+    assert (again.id, again.attempts) == ("q/a", 2)
+    assert not queue.heartbeat(job.id, "w1", lease_seconds=10)
+    assert not queue.complete(job.id, "w1", {"ok": True}, {})
+
+    clock.now += 20  # w2 tambien muere: "a" agoto sus intentos, "b" tiene uno mas
+    assert [(j.id, j.attempts) for j in queue.claim("w3", lease_seconds=10, limit=5)] == [("q/b", 2)]
+    clock.now += 20
+    assert queue.claim("w4", lease_seconds=10) == []
+    counts = queue.counts("q")
+    assert counts == {"pending": 0, "leased": 0, "done": 0, "dead": 2}
+    assert all("Lease vencida" in record.error for record in queue.dead_letters("q"))
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "memory"])
+def test_failures_retry_until_cap_and_results_are_aggregated(kind: str, tmp_path: Path) -> None:
+    clock = _Clock()
+    queue = _queue(kind, tmp_path, clock)
+    queue.enqueue("q", [("ok", {}), ("roto", {})], max_attempts=2)
+    first, second = queue.claim("w", lease_seconds=60, limit=5)
+    clock.now += 1
+    assert queue.complete(first.id, "w", {"location": "x"}, {"propose": 0.5, "render": 0.2})
+    assert queue.fail(second.id, "w", "ValueError: uno", retry_delay=30)
+    assert queue.claim("w", lease_seconds=60) == []
+    clock.now += 30
+    (retry,) = queue.claim("w", lease_seconds=60)
+    assert queue.fail(retry.id, "w", "ValueError: dos")
+
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "dead": 1}
+    (dead,) = queue.dead_letters()
+    assert (dead.id, dead.attempts, dead.error) == ("q/roto", 2, "ValueError: dos")
+    summary = queue.summary("q")
+    assert summary["jobs_per_second"] == 1.0
+    assert summary["stages"]["propose"]["p50"] == 0.5
+
+
+def test_workers_share_queue_and_survivors_reclaim_crashed_jobs(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.sqlite"
+    SQLiteWorkQueue(path).enqueue("q", [(f"p{i}", {"i": i}) for i in range(20)])
+    # Un worker "muerto" se queda con un trabajo y nunca renueva la lease.
+    SQLiteWorkQueue(path).claim("caido", lease_seconds=0.3)
+
+    def process(job):
+        time.sleep(0.01)
+        if job.payload["i"] == 7 and job.attempts == 1:
+            raise RuntimeError("fallo transitorio")
+        return {"i": job.payload["i"]}, {"propose": 0.01}
+
+    workers = [
+        BatchWorker(SQLiteWorkQueue(path), process, worker_id=f"w{n}", lease_seconds=5, heartbeat_seconds=0.05,
+                    poll_seconds=0.05, retry_delay_seconds=0)
+        for n in range(3)
+    ]
+    processed = []
+    threads = [threading.Thread(target=lambda w=w: processed.append(w.run())) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=20)
+
+    queue = SQLiteWorkQueue(path)
+    assert queue.counts("q")["done"] == 20
+    assert sum(processed) == 21  # 20 trabajos + un reintento
+    records = {record.id: record for record in queue.records("q")}
+    assert records["q/p0"].worker != "caido" and records["q/p0"].attempts == 2
+    assert records["q/p7"].attempts == 2 and records["q/p7"].result == {"i": 7}
+    assert queue.summary("q")["workers"] > 1
+
+
+def test_pipeline_processor_runs_requirements_job(tmp_path: Path) -> None:
+    config = tmp_path / "config.yml"
+    config.write_text("llm:\n  enabled: false\nregistry:\n  enabled: false\n", encoding="utf-8")
+    queue = MemoryWorkQueue()
+    payload = json.loads((ROOT / "data" / "requirements.json").read_text(encoding="utf-8"))
+    queue.enqueue("q", [("proyecto", {"requirements": payload})])
+    worker = BatchWorker(queue, PipelineJobProcessor(str(config), tmp_path / "out"), worker_id="w")
+    assert worker.run() == 1
+    (record,) = queue.records("q")
+    assert record.status == "done" and record.result["mode"] == "determinista"
+    assert {"propose", "render", "write", "total"} <= set(record.timings)
+    assert (tmp_path / "out" / "q" / "proyecto" / "architecture" / "solution-proposal.md").exists()
+
+
+def test_worker_that_lost_its_lease_publishes_nothing(tmp_path: Path) -> None:
+    config = tmp_path / "config.yml"
+    config.write_text("llm:\n  enabled: false\nregistry:\n  enabled: false\n", encoding="utf-8")
+    clock = _Clock()
+    queue = MemoryWorkQueue(clock=clock)
+    payload = json.loads((ROOT / "data" / "requirements.json").read_text(encoding="utf-8"))
+    queue.enqueue("q", [("proyecto", {"requirements": payload})])
+    pipeline = PipelineJobProcessor(str(config), tmp_path / "out")
+
+    class _Stolen:
+        """Mientras corre, la lease vence y otro worker reclama el trabajo."""
+
+        commits = 0
+
+        def __call__(self, job):
+            output = pipeline(job)
+            clock.now += 60
+            assert [stolen.id for stolen in queue.claim("otro", lease_seconds=30)] == [job.id]
+            return output
+
+        def commit(self, job):
+            self.commits += 1
+            pipeline.commit(job)
+
+        def discard(self, job):
+            pipeline.discard(job)
+
+    process = _Stolen()
+    worker = BatchWorker(queue, process, worker_id="w", lease_seconds=30, heartbeat_seconds=60)
+    assert worker.run(max_jobs=1) == 1
+
+    (record,) = queue.records("q")
+    assert (record.status, record.worker) == ("leased", "otro")
+    assert process.commits == 0
+    assert not (tmp_path / "out" / "q").exists()
+    assert list((tmp_path / "out" / ".staging").iterdir()) == []
+
+
+def test_work_queue_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        WorkQueue()